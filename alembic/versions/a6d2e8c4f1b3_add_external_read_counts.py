@@ -0,0 +1,145 @@
+"""add external_read_counts table and test_cases keyset index
+
+Counts cache for the MCP / app external read APIs (per-team and per-set case
+counts, per-ad-hoc-run sheet/item counts). The table is backfilled here; the
+application keeps it current from session write hooks plus a daily reconcile.
+
+Revision ID: a6d2e8c4f1b3
+Revises: f3c9a2e7b5d1
+Create Date: 2026-10-19 23:00:00.000000
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "a6d2e8c4f1b3"
+down_revision: Union[str, Sequence[str], None] = "f3c9a2e7b5d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "external_read_counts"
+_KEYSET_INDEX = "ix_test_cases_team_created"
+
+
+def _existing_indexes(inspector, table_name: str) -> set[str]:
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _KEYSET_INDEX not in _existing_indexes(inspector, "test_cases"):
+        op.create_index(_KEYSET_INDEX, "test_cases", ["team_id", "created_at", "id"], unique=False)
+
+    if _TABLE in set(inspector.get_table_names()):
+        return
+
+    counts = op.create_table(
+        _TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("scope", sa.String(length=16), nullable=False),
+        sa.Column("scope_id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("sheet_count", sa.Integer(), nullable=False),
+        sa.Column("executed_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("scope", "scope_id", name="uq_external_read_counts_scope"),
+    )
+    op.create_index("ix_external_read_counts_team_scope", _TABLE, ["team_id", "scope"], unique=False)
+
+    teams = sa.table("teams", sa.column("id", sa.Integer()))
+    cases = sa.table(
+        "test_cases",
+        sa.column("id", sa.Integer()),
+        sa.column("team_id", sa.Integer()),
+        sa.column("test_case_set_id", sa.Integer()),
+    )
+    case_sets = sa.table("test_case_sets", sa.column("id", sa.Integer()), sa.column("team_id", sa.Integer()))
+    runs = sa.table("adhoc_runs", sa.column("id", sa.Integer()), sa.column("team_id", sa.Integer()))
+    sheets = sa.table("adhoc_run_sheets", sa.column("id", sa.Integer()), sa.column("adhoc_run_id", sa.Integer()))
+    items = sa.table(
+        "adhoc_run_items",
+        sa.column("id", sa.Integer()),
+        sa.column("sheet_id", sa.Integer()),
+        sa.column("test_result", sa.String()),
+    )
+    now = sa.literal(datetime.utcnow(), sa.DateTime())
+    zero = sa.literal(0, sa.Integer())
+    columns = ["scope", "scope_id", "team_id", "item_count", "sheet_count", "executed_count", "updated_at"]
+
+    op.execute(
+        counts.insert().from_select(
+            columns,
+            sa.select(
+                sa.literal("team", sa.String()),
+                teams.c.id,
+                teams.c.id,
+                sa.func.count(cases.c.id),
+                zero,
+                zero,
+                now,
+            )
+            .select_from(teams.outerjoin(cases, cases.c.team_id == teams.c.id))
+            .group_by(teams.c.id),
+        )
+    )
+    op.execute(
+        counts.insert().from_select(
+            columns,
+            sa.select(
+                sa.literal("case_set", sa.String()),
+                case_sets.c.id,
+                case_sets.c.team_id,
+                sa.func.count(cases.c.id),
+                zero,
+                zero,
+                now,
+            )
+            .select_from(
+                case_sets.outerjoin(
+                    cases,
+                    sa.and_(
+                        cases.c.test_case_set_id == case_sets.c.id,
+                        cases.c.team_id == case_sets.c.team_id,
+                    ),
+                )
+            )
+            .group_by(case_sets.c.id, case_sets.c.team_id),
+        )
+    )
+    op.execute(
+        counts.insert().from_select(
+            columns,
+            sa.select(
+                sa.literal("adhoc_run", sa.String()),
+                runs.c.id,
+                runs.c.team_id,
+                sa.func.count(items.c.id),
+                sa.func.count(sa.distinct(sheets.c.id)),
+                sa.func.count(items.c.test_result),
+                now,
+            )
+            .select_from(
+                runs.outerjoin(sheets, sheets.c.adhoc_run_id == runs.c.id).outerjoin(
+                    items, items.c.sheet_id == sheets.c.id
+                )
+            )
+            .group_by(runs.c.id, runs.c.team_id),
+        )
+    )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _TABLE in set(inspector.get_table_names()):
+        op.drop_index("ix_external_read_counts_team_scope", table_name=_TABLE)
+        op.drop_table(_TABLE)
+    if _KEYSET_INDEX in _existing_indexes(inspector, "test_cases"):
+        op.drop_index(_KEYSET_INDEX, table_name="test_cases")
@@ -0,0 +1,137 @@
+"""add automation_script_group_members membership table
+
+Revision ID: a7c3e9d1b2f4
+Revises: f0c1e2d3a4b5
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "a7c3e9d1b2f4"
+down_revision: Union[str, Sequence[str], None] = "f0c1e2d3a4b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BACKFILL_BATCH_SIZE = 500
+
+
+def _member_paths(raw: str | None) -> list[str]:
+    if not raw:
+        return []
+    try:
+        payload = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(payload, list):
+        return []
+    return [str(item) for item in payload if str(item).strip()]
+
+
+def _backfill_members(bind) -> None:
+    groups = sa.table(
+        "automation_script_groups",
+        sa.column("id", sa.Integer),
+        sa.column("team_id", sa.Integer),
+        sa.column("ref_repo", sa.String),
+        sa.column("script_paths_json", sa.Text),
+    )
+    members = sa.table(
+        "automation_script_group_members",
+        sa.column("group_id", sa.Integer),
+        sa.column("team_id", sa.Integer),
+        sa.column("position", sa.Integer),
+        sa.column("ref_repo", sa.String),
+        sa.column("ref_path", sa.String),
+    )
+    existing = {
+        row[0]
+        for row in bind.execute(sa.select(sa.distinct(sa.column("group_id"))).select_from(
+            sa.table("automation_script_group_members")
+        ))
+    }
+    pending: list[dict] = []
+    for group_id, team_id, ref_repo, raw_paths in bind.execute(
+        sa.select(groups.c.id, groups.c.team_id, groups.c.ref_repo, groups.c.script_paths_json)
+    ):
+        if group_id in existing:
+            continue
+        for position, path in enumerate(_member_paths(raw_paths)):
+            pending.append(
+                {
+                    "group_id": group_id,
+                    "team_id": team_id,
+                    "position": position,
+                    "ref_repo": ref_repo or "",
+                    "ref_path": path,
+                }
+            )
+            if len(pending) >= _BACKFILL_BATCH_SIZE:
+                bind.execute(members.insert(), pending)
+                pending = []
+    if pending:
+        bind.execute(members.insert(), pending)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    if "automation_script_group_members" not in existing_tables:
+        op.create_table(
+            "automation_script_group_members",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("group_id", sa.Integer(), nullable=False),
+            sa.Column("team_id", sa.Integer(), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.Column("ref_repo", sa.String(length=255), nullable=False, server_default=""),
+            sa.Column("ref_path", sa.String(length=500), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["group_id"], ["automation_script_groups.id"], ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(["team_id"], ["teams.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(
+                "group_id", "position", name="uq_automation_script_group_member_position"
+            ),
+        )
+        op.create_index(
+            "ix_automation_script_group_members_team_path",
+            "automation_script_group_members",
+            ["team_id", "ref_path"],
+            unique=False,
+        )
+
+    script_indexes = {ix["name"] for ix in inspector.get_indexes("automation_scripts")}
+    if "ix_automation_scripts_team_path" not in script_indexes:
+        op.create_index(
+            "ix_automation_scripts_team_path",
+            "automation_scripts",
+            ["team_id", "ref_path"],
+            unique=False,
+        )
+
+    _backfill_members(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    script_indexes = {ix["name"] for ix in inspector.get_indexes("automation_scripts")}
+    if "ix_automation_scripts_team_path" in script_indexes:
+        op.drop_index("ix_automation_scripts_team_path", table_name="automation_scripts")
+
+    if "automation_script_group_members" in set(inspector.get_table_names()):
+        op.drop_index(
+            "ix_automation_script_group_members_team_path",
+            table_name="automation_script_group_members",
+        )
+        op.drop_table("automation_script_group_members")
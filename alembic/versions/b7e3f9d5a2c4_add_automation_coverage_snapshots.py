@@ -0,0 +1,52 @@
+"""add automation_coverage_snapshots table
+
+Materialized per-team automation coverage (summary, by-format, by-group and
+daily trend points). Rows are created lazily on first read; session write hooks
+bump ``source_version`` so readers know when to recompute.
+
+Revision ID: b7e3f9d5a2c4
+Revises: a6d2e8c4f1b3
+Create Date: 2026-10-19 23:30:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.db_types import MediumText
+
+
+revision: str = "b7e3f9d5a2c4"
+down_revision: Union[str, Sequence[str], None] = "a6d2e8c4f1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "automation_coverage_snapshots"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _TABLE in set(inspector.get_table_names()):
+        return
+
+    op.create_table(
+        _TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("source_version", sa.Integer(), nullable=False),
+        sa.Column("computed_version", sa.Integer(), nullable=True),
+        sa.Column("payload_json", MediumText(), nullable=True),
+        sa.Column("computed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["team_id"], ["teams.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("team_id", name="uq_automation_coverage_snapshots_team"),
+    )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _TABLE in set(inspector.get_table_names()):
+        op.drop_table(_TABLE)
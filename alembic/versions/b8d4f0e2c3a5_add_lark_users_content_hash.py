@@ -0,0 +1,35 @@
+"""add content_hash to lark_users
+
+Bulk user sync compares a hash of the synced fields to skip unchanged rows.
+
+Revision ID: b8d4f0e2c3a5
+Revises: a7c3e9d1b2f4
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "b8d4f0e2c3a5"
+down_revision: Union[str, Sequence[str], None] = "a7c3e9d1b2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {col["name"] for col in inspector.get_columns("lark_users")}
+    if "content_hash" not in columns:
+        with op.batch_alter_table("lark_users") as batch_op:
+            batch_op.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {col["name"] for col in inspector.get_columns("lark_users")}
+    if "content_hash" in columns:
+        with op.batch_alter_table("lark_users") as batch_op:
+            batch_op.drop_column("content_hash")
@@ -0,0 +1,107 @@
+"""add test_run_config_scope normalized scope table
+
+Revision ID: c9e5a1f3d4b6
+Revises: b8d4f0e2c3a5
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "c9e5a1f3d4b6"
+down_revision: Union[str, Sequence[str], None] = "b8d4f0e2c3a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BACKFILL_BATCH_SIZE = 500
+
+
+def _scope_set_ids(raw: str | None) -> list[int]:
+    if not raw:
+        return []
+    try:
+        parsed = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    normalized: list[int] = []
+    for value in parsed if isinstance(parsed, list) else [parsed]:
+        try:
+            set_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if set_id > 0 and set_id not in normalized:
+            normalized.append(set_id)
+    return normalized
+
+
+def _backfill_scope(bind) -> None:
+    configs = sa.table(
+        "test_run_configs",
+        sa.column("id", sa.Integer),
+        sa.column("test_case_set_ids_json", sa.Text),
+    )
+    scope = sa.table(
+        "test_run_config_scope",
+        sa.column("config_id", sa.Integer),
+        sa.column("set_id", sa.Integer),
+        sa.column("position", sa.Integer),
+    )
+    existing = {
+        row[0]
+        for row in bind.execute(
+            sa.select(sa.distinct(sa.column("config_id"))).select_from(
+                sa.table("test_run_config_scope")
+            )
+        )
+    }
+    pending: list[dict] = []
+    for config_id, raw_scope in bind.execute(
+        sa.select(configs.c.id, configs.c.test_case_set_ids_json).where(
+            configs.c.test_case_set_ids_json.isnot(None)
+        )
+    ):
+        if config_id in existing:
+            continue
+        for position, set_id in enumerate(_scope_set_ids(raw_scope)):
+            pending.append({"config_id": config_id, "set_id": set_id, "position": position})
+            if len(pending) >= _BACKFILL_BATCH_SIZE:
+                bind.execute(scope.insert(), pending)
+                pending = []
+    if pending:
+        bind.execute(scope.insert(), pending)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "test_run_config_scope" not in set(inspector.get_table_names()):
+        op.create_table(
+            "test_run_config_scope",
+            sa.Column("config_id", sa.Integer(), nullable=False),
+            sa.Column("set_id", sa.Integer(), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["config_id"], ["test_run_configs.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("config_id", "set_id"),
+        )
+        op.create_index(
+            "ix_test_run_config_scope_set_id",
+            "test_run_config_scope",
+            ["set_id"],
+            unique=False,
+        )
+
+    _backfill_scope(bind)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "test_run_config_scope" in set(inspector.get_table_names()):
+        op.drop_index("ix_test_run_config_scope_set_id", table_name="test_run_config_scope")
+        op.drop_table("test_run_config_scope")
@@ -0,0 +1,61 @@
+"""add qa_ai_helper_llm_response_cache table
+
+Revision ID: d2a7c4e9f1b3
+Revises: c9e5a1f3d4b6
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+
+revision: str = "d2a7c4e9f1b3"
+down_revision: Union[str, Sequence[str], None] = "c9e5a1f3d4b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "qa_ai_helper_llm_response_cache"
+
+
+def _qa_ai_helper_large_text() -> sa.Text:
+    return sa.Text().with_variant(mysql.MEDIUMTEXT(), "mysql")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _TABLE in set(inspector.get_table_names()):
+        return
+
+    op.create_table(
+        _TABLE,
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("stage", sa.String(length=32), nullable=False),
+        sa.Column("model_name", sa.String(length=255), nullable=False),
+        sa.Column("temperature", sa.Float(), nullable=False),
+        sa.Column("prompt_hash", sa.String(length=64), nullable=False),
+        sa.Column("content", _qa_ai_helper_large_text(), nullable=False),
+        sa.Column("finish_reason", sa.String(length=32), nullable=True),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=False),
+        sa.Column("completion_tokens", sa.Integer(), nullable=False),
+        sa.Column("total_tokens", sa.Integer(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index("ix_qa_ai_helper_llm_response_cache_expires_at", _TABLE, ["expires_at"], unique=False)
+    op.create_index("ix_qa_ai_helper_llm_response_cache_last_used_at", _TABLE, ["last_used_at"], unique=False)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _TABLE in set(inspector.get_table_names()):
+        op.drop_index("ix_qa_ai_helper_llm_response_cache_last_used_at", table_name=_TABLE)
+        op.drop_index("ix_qa_ai_helper_llm_response_cache_expires_at", table_name=_TABLE)
+        op.drop_table(_TABLE)
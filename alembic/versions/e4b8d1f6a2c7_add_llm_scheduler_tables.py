@@ -0,0 +1,58 @@
+"""add llm scheduler slot and token bucket tables
+
+Revision ID: e4b8d1f6a2c7
+Revises: d2a7c4e9f1b3
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "e4b8d1f6a2c7"
+down_revision: Union[str, Sequence[str], None] = "d2a7c4e9f1b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_SLOTS = "llm_scheduler_slots"
+_BUCKETS = "llm_scheduler_token_buckets"
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if _SLOTS not in existing:
+        op.create_table(
+            _SLOTS,
+            sa.Column("slot_no", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("lease_key", sa.String(length=64), nullable=True),
+            sa.Column("stage", sa.String(length=64), nullable=True),
+            sa.Column("acquired_at", sa.DateTime(), nullable=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("slot_no"),
+        )
+
+    if _BUCKETS not in existing:
+        op.create_table(
+            _BUCKETS,
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("bucket_started_at", sa.DateTime(), nullable=False),
+            sa.Column("used_tokens", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("bucket_started_at", name="uq_llm_scheduler_token_bucket_started_at"),
+        )
+        op.create_index("ix_llm_scheduler_token_buckets_expires_at", _BUCKETS, ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if _BUCKETS in existing:
+        op.drop_index("ix_llm_scheduler_token_buckets_expires_at", table_name=_BUCKETS)
+        op.drop_table(_BUCKETS)
+    if _SLOTS in existing:
+        op.drop_table(_SLOTS)
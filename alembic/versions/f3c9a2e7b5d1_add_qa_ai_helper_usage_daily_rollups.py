@@ -0,0 +1,64 @@
+"""add qa_ai_helper_usage_daily_rollups table
+
+Revision ID: f3c9a2e7b5d1
+Revises: e4b8d1f6a2c7
+Create Date: 2026-10-19 21:00:00.000000
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "f3c9a2e7b5d1"
+down_revision: Union[str, Sequence[str], None] = "e4b8d1f6a2c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLE = "qa_ai_helper_usage_daily_rollups"
+_METRIC_COLUMNS = (
+    "session_count",
+    "completed_session_count",
+    "failed_session_count",
+    "output_session_count",
+    "generated_seed_count",
+    "included_seed_count",
+    "generated_tc_count",
+    "selected_tc_count",
+    "committed_tc_count",
+    "item_count",
+    "ai_item_count",
+    "edited_item_count",
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _TABLE in set(inspector.get_table_names()):
+        return
+
+    op.create_table(
+        _TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("stat_date", sa.Date(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        *[sa.Column(name, sa.Integer(), nullable=False) for name in _METRIC_COLUMNS],
+        sa.Column("source_updated_at", sa.DateTime(), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("stat_date", "team_id", "user_id", name="uq_qa_ai_helper_usage_daily_rollup_key"),
+    )
+    op.create_index(
+        "ix_qa_ai_helper_usage_daily_rollups_team_date", _TABLE, ["team_id", "stat_date"], unique=False
+    )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _TABLE in set(inspector.get_table_names()):
+        op.drop_index("ix_qa_ai_helper_usage_daily_rollups_team_date", table_name=_TABLE)
+        op.drop_table(_TABLE)
@@ -0,0 +1,95 @@
+"""add audit_user_activity index table
+
+Compact per-user activity index maintained at audit write time so the homepage
+dashboard no longer scans audit_logs. Each (user_id, team_id) keeps its most
+recent 50 rows; existing audit history is backfilled with the same depth.
+
+Revision ID: c5e8f1a2b3d4
+Revises: b1c2d3e4f506
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c5e8f1a2b3d4"
+down_revision: Union[str, Sequence[str], None] = "b1c2d3e4f506"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 與 app.audit.database.USER_ACTIVITY_INDEX_DEPTH 一致；migration 不 import app 模組
+_INDEX_DEPTH = 50
+
+
+def upgrade() -> None:
+    activity = op.create_table(
+        "audit_user_activity",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("action_type", sa.String(length=32), nullable=False),
+        sa.Column("resource_type", sa.String(length=64), nullable=False),
+        sa.Column("resource_id", sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_audit_user_activity_user_team_time",
+        "audit_user_activity",
+        ["user_id", "team_id", "timestamp"],
+        unique=False,
+    )
+
+    # 以既有 audit_logs 回填每個 (user, team) 最近的紀錄
+    audit_logs = sa.table(
+        "audit_logs",
+        sa.column("id", sa.Integer()),
+        sa.column("user_id", sa.Integer()),
+        sa.column("team_id", sa.Integer()),
+        sa.column("timestamp", sa.DateTime()),
+        sa.column("action_type", sa.String()),
+        sa.column("resource_type", sa.String()),
+        sa.column("resource_id", sa.String()),
+    )
+    ranked = (
+        sa.select(
+            audit_logs.c.user_id,
+            audit_logs.c.team_id,
+            audit_logs.c.timestamp,
+            audit_logs.c.action_type,
+            audit_logs.c.resource_type,
+            audit_logs.c.resource_id,
+            sa.func.row_number()
+            .over(
+                partition_by=(audit_logs.c.user_id, audit_logs.c.team_id),
+                order_by=(audit_logs.c.timestamp.desc(), audit_logs.c.id.desc()),
+            )
+            .label("activity_rank"),
+        )
+        .where(audit_logs.c.team_id.isnot(None))
+        .subquery()
+    )
+    op.execute(
+        activity.insert().from_select(
+            ["user_id", "team_id", "timestamp", "action_type", "resource_type", "resource_id"],
+            sa.select(
+                ranked.c.user_id,
+                ranked.c.team_id,
+                ranked.c.timestamp,
+                ranked.c.action_type,
+                ranked.c.resource_type,
+                ranked.c.resource_id,
+            )
+            .where(ranked.c.activity_rank <= _INDEX_DEPTH)
+            .order_by(ranked.c.timestamp.asc()),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_user_activity_user_team_time", table_name="audit_user_activity")
+    op.drop_table("audit_user_activity")
@@ -1,112 +1,128 @@
 """
 API 路由初始化
+
+路由模組不在 import ``app.api`` 時載入：``API_ROUTERS`` 只記錄模組路徑，``include_api_routers``
+掛載時才 import，並直接 include 進 FastAPI app（不再先組一個中介 ``api_router`` 再整包 include，
+FastAPI 每層 include 都會重建一次所有 route 與 dependant，中介層等於白做一倍）。
+
+非 core 的 group 可由 ``app.disabled_router_groups``（TCRT_DISABLED_ROUTER_GROUPS）整組停用；
+被停用的 group 連模組都不會 import，適合專責 worker（例如只服務 MCP / App API 的副本）。
 """
 
-from fastapi import APIRouter
-from .auth import router as auth_router
-from .users import router as users_router
-from .teams import router as teams_router
-from .test_run_configs import router as test_run_configs_router, search_router as test_run_configs_search_router
-from .test_cases import router as test_cases_router
-from .test_runs import router as test_runs_router
-from .test_run_sets import router as test_run_sets_router
-from .attachments import router as attachments_router
-from .test_run_items import assignee_router as test_run_assignee_router, router as test_run_items_router
-from .contacts import router as contacts_router
-from .team_sync import router as team_sync_router
-from .organization_sync import router as organization_sync_router
-from .jira import router as jira_router
-from .lark_groups import router as lark_groups_router
-from .lark_users import router as lark_users_router
-from .admin import router as admin_router
-from .version import router as version_router
-from .permissions import router as permissions_router
-from .audit import router as audit_router
-from .team_statistics import router as team_statistics_router
-from .team_statistics_qa_ai_helper import router as team_statistics_qa_ai_helper_router
-from .test_case_sets import router as test_case_sets_router
-from .test_case_sections import router as test_case_sections_router
-from .qa_ai_helper import router as qa_ai_helper_router
-from .mcp import router as mcp_router
-from .app_tokens import router as app_tokens_router
-from .app_read import router as app_read_router
-from .app_test_cases import router as app_test_cases_router
-from .app_test_runs import router as app_test_runs_router
-from .app_automation import router as app_automation_router
-from .app_pins import router as app_pins_router
-from .automation_providers import router as automation_providers_router
-from .system_automation_providers import router as system_automation_providers_router
-from .system_automation_hub import router as system_automation_hub_router
-from .automation_scripts import router as automation_scripts_router
-from .automation_links import router as automation_links_router
-from .automation_script_groups import router as automation_script_groups_router
-from .automation_coverage import router as automation_coverage_router
-from .automation_environments import (
-    router as automation_environments_router,
-    script_env_router as automation_script_env_vars_router,
+import importlib
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+from fastapi import APIRouter, FastAPI
+
+CORE_ROUTER_GROUP = "core"
+
+
+@dataclass(frozen=True)
+class RouterSpec:
+    module: str
+    attribute: str = "router"
+    group: str = CORE_ROUTER_GROUP
+    prefix: str = ""
+
+
+# 掛載順序即 route 比對順序，調整時需留意 path 相同的 route
+API_ROUTERS: Tuple[RouterSpec, ...] = (
+    RouterSpec("app.api.auth"),
+    RouterSpec("app.api.avatars"),
+    RouterSpec("app.api.users"),
+    RouterSpec("app.api.teams"),
+    RouterSpec("app.api.test_run_configs"),
+    RouterSpec("app.api.test_run_configs", "search_router"),  # 新增搜尋路由
+    RouterSpec("app.api.test_cases"),
+    RouterSpec("app.api.test_runs"),
+    RouterSpec("app.api.test_run_sets"),
+    RouterSpec("app.api.attachments"),
+    RouterSpec("app.api.test_run_items"),
+    RouterSpec("app.api.test_run_items", "assignee_router"),
+    RouterSpec("app.api.contacts"),
+    RouterSpec("app.api.team_sync"),
+    RouterSpec("app.api.organization_sync"),
+    RouterSpec("app.api.jira"),
+    RouterSpec("app.api.lark_groups"),
+    RouterSpec("app.api.lark_users"),
+    RouterSpec("app.api.admin"),
+    RouterSpec("app.api.admin_assistant", group="assistant"),
+    RouterSpec("app.api.version"),
+    RouterSpec("app.api.permissions"),
+    RouterSpec("app.api.audit"),
+    RouterSpec("app.api.team_statistics"),
+    RouterSpec("app.api.team_statistics_qa_ai_helper", group="qa_ai_helper"),  # QA AI Helper 統計路由
+    RouterSpec("app.api.test_case_sets"),  # Test Case Set 路由
+    RouterSpec("app.api.test_case_sections"),  # Test Case Section 路由
+    RouterSpec("app.api.qa_ai_helper", group="qa_ai_helper"),  # 新版 QA AI Helper 路由
+    RouterSpec("app.api.mcp", group="mcp"),  # MCP Read 路由
+    RouterSpec("app.api.app_tokens", group="app_api"),  # App Token 管理路由
+    RouterSpec("app.api.app_read", group="app_api"),  # App Token Read 路由
+    RouterSpec("app.api.app_test_cases", group="app_api"),  # App Token Test Case Mutation 路由
+    RouterSpec("app.api.app_test_runs", group="app_api"),  # App Token Test Run Mutation 路由
+    RouterSpec("app.api.app_automation", group="automation"),  # App Token Automation 路由
+    RouterSpec("app.api.app_pins", group="app_api"),  # App Token Pins 路由
+    RouterSpec("app.api.automation_providers", group="automation"),  # 團隊層 Provider 設定（僅 storage）
+    RouterSpec("app.api.system_automation_providers", group="automation"),  # 組織層 Provider 設定（CI / Result）
+    RouterSpec("app.api.system_automation_hub", group="automation"),  # 組織層 Automation Hub 入口開關
+    RouterSpec("app.api.automation_scripts", group="automation"),  # Automation Hub Script 快取路由
+    RouterSpec("app.api.automation_links", group="automation"),  # Automation Hub Script Link 路由
+    RouterSpec("app.api.automation_script_groups", group="automation"),  # Automation Hub Suite 路由
+    RouterSpec("app.api.automation_coverage", group="automation"),  # Automation Hub Coverage 路由
+    RouterSpec("app.api.automation_environments", group="automation"),  # Automation Hub 環境設定路由
+    # Automation Hub per-script 變數覆寫路由
+    RouterSpec("app.api.automation_environments", "script_env_router", group="automation"),
+    RouterSpec("app.api.automation_webhooks", group="automation"),  # Automation Hub Webhook (admin) 路由
+    RouterSpec("app.api.automation_webhooks_public", group="automation"),  # Automation Hub Webhook (公開 CI callback)
+    # Automation Hub Result provider 連結（dashboard / report URL）
+    RouterSpec("app.api.automation_result", group="automation"),
+    RouterSpec("app.api.pins"),  # 使用者釘選 (Pin) 路由
+    RouterSpec("app.api.assistant", group="assistant"),  # 全域 AI 助手路由
+    RouterSpec("app.api.dashboard"),
+)
+
+# 接在 API_ROUTERS 之後掛載、各自決定前綴的路由（原本由 main.py 個別 include）
+ROOT_ROUTERS: Tuple[RouterSpec, ...] = (
+    RouterSpec("app.api.system"),
+    RouterSpec("app.api.user_story_maps", group="user_story_map", prefix="/api"),
+    RouterSpec("app.api.adhoc", prefix="/api"),
+    RouterSpec("app.api.knowledge", group="knowledge"),
 )
-from .automation_webhooks import router as automation_webhooks_router
-from .automation_webhooks_public import router as automation_webhooks_public_router
-from .automation_result import router as automation_result_router
-from .pins import router as pins_router
-from .assistant import router as assistant_router
-from .admin_assistant import router as admin_assistant_router
-from .dashboard import router as dashboard_router
-from .avatars import router as avatars_router
-
-# 創建主 API 路由器
-api_router = APIRouter()
-
-# 包含所有子路由
-api_router.include_router(auth_router)
-api_router.include_router(avatars_router)
-api_router.include_router(users_router)
-api_router.include_router(teams_router)
-api_router.include_router(test_run_configs_router)
-api_router.include_router(test_run_configs_search_router)  # 新增搜尋路由
-api_router.include_router(test_cases_router)
-api_router.include_router(test_runs_router)
-api_router.include_router(test_run_sets_router)
-api_router.include_router(attachments_router)
-api_router.include_router(test_run_items_router)
-api_router.include_router(test_run_assignee_router)
-api_router.include_router(contacts_router)
-api_router.include_router(team_sync_router)
-api_router.include_router(organization_sync_router)
-api_router.include_router(jira_router)
-api_router.include_router(lark_groups_router)
-api_router.include_router(lark_users_router)
-api_router.include_router(admin_router)
-api_router.include_router(admin_assistant_router)
-api_router.include_router(version_router)
-api_router.include_router(permissions_router)
-api_router.include_router(audit_router)
-api_router.include_router(team_statistics_router)
-api_router.include_router(team_statistics_qa_ai_helper_router)  # QA AI Helper 統計路由
-api_router.include_router(test_case_sets_router)  # Test Case Set 路由
-api_router.include_router(test_case_sections_router)  # Test Case Section 路由
-api_router.include_router(qa_ai_helper_router)  # 新版 QA AI Helper 路由
-api_router.include_router(mcp_router)  # MCP Read 路由
-api_router.include_router(app_tokens_router)  # App Token 管理路由
-api_router.include_router(app_read_router)  # App Token Read 路由
-api_router.include_router(app_test_cases_router)  # App Token Test Case Mutation 路由
-api_router.include_router(app_test_runs_router)  # App Token Test Run Mutation 路由
-api_router.include_router(app_automation_router)  # App Token Automation 路由
-api_router.include_router(app_pins_router)  # App Token Pins 路由
-api_router.include_router(automation_providers_router)  # 團隊層 Provider 設定（僅 storage）
-api_router.include_router(system_automation_providers_router)  # 組織層 Provider 設定（CI / Result）
-api_router.include_router(system_automation_hub_router)  # 組織層 Automation Hub 入口開關
-api_router.include_router(automation_scripts_router)  # Automation Hub Script 快取路由
-api_router.include_router(automation_links_router)  # Automation Hub Script Link 路由
-api_router.include_router(automation_script_groups_router)  # Automation Hub Suite 路由
-api_router.include_router(automation_coverage_router)  # Automation Hub Coverage 路由
-api_router.include_router(automation_environments_router)  # Automation Hub 環境設定路由
-api_router.include_router(automation_script_env_vars_router)  # Automation Hub per-script 變數覆寫路由
-api_router.include_router(automation_webhooks_router)  # Automation Hub Webhook (admin) 路由
-api_router.include_router(automation_webhooks_public_router)  # Automation Hub Webhook (公開 CI callback)
-api_router.include_router(automation_result_router)  # Automation Hub Result provider 連結（dashboard / report URL）
-api_router.include_router(pins_router)  # 使用者釘選 (Pin) 路由
-api_router.include_router(assistant_router)  # 全域 AI 助手路由
-api_router.include_router(dashboard_router)
-
-# 可以在此添加其他 API 路由
+
+ROUTER_GROUPS = frozenset(spec.group for spec in API_ROUTERS + ROOT_ROUTERS)
+
+
+def _enabled_specs(specs: Iterable[RouterSpec], disabled_groups: Iterable[str]) -> list[RouterSpec]:
+    disabled = {group.strip() for group in disabled_groups if group and group.strip()}
+    disabled.discard(CORE_ROUTER_GROUP)
+    return [spec for spec in specs if spec.group not in disabled]
+
+
+def load_router(spec: RouterSpec) -> APIRouter:
+    return getattr(importlib.import_module(spec.module), spec.attribute)
+
+
+def include_api_routers(
+    target: FastAPI | APIRouter,
+    specs: Iterable[RouterSpec] = API_ROUTERS,
+    *,
+    prefix: str = "",
+    disabled_groups: Iterable[str] = (),
+) -> list[str]:
+    """依序 import 並掛載啟用中的路由；回傳實際掛載的 ``module:attribute`` 清單。"""
+    mounted: list[str] = []
+    for spec in _enabled_specs(specs, disabled_groups):
+        target.include_router(load_router(spec), prefix=prefix + spec.prefix)
+        mounted.append(f"{spec.module}:{spec.attribute}")
+    return mounted
+
+
+def __getattr__(name: str):
+    # 向後相容：仍有外部程式以 ``from app.api import api_router`` 取得完整 /api 路由
+    if name == "api_router":
+        router = APIRouter()
+        include_api_routers(router)
+        globals()["api_router"] = router
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,6 +13,11 @@ from app.db_access.main import MainAccessBoundary, get_main_access_boundary
 from app.db_access.audit import AuditAccessBoundary, get_audit_access_boundary
 from app.audit.database import KnowledgeQueryLogTable
 from app.models.database_models import TestCaseLocal, TestRunItem, User
+from app.services.avatar_proxy_service import get_avatar_proxy_service
+from app.services.database_backup_service import get_database_backup_service
+from app.services.llm_scheduler import get_llm_scheduler
+from app.services.scheduler import task_scheduler
+from app.utils.startup_profiler import startup_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -120,6 +125,9 @@ async def _load_daily_counts(
 
 @router.get("/system_metrics", include_in_schema=False)
 async def system_metrics():
+    # LLM client 連帶 aiohttp，只在查詢指標時才載入，避免 admin router 拖慢冷啟動
+    from app.services.assistant.assistant_llm_service import llm_call_metrics
+
     now = datetime.now(timezone.utc)
     uptime = time.time() - _PROCESS_START_TIME
 
@@ -129,6 +137,12 @@ async def system_metrics():
         "load": _get_loadavg(),
         "cpu": {"percent": _get_cpu_percent()},
         "memory": _get_memory_info(),
+        "assistant_llm": llm_call_metrics.snapshot(),
+        "llm_scheduler": get_llm_scheduler().snapshot(),
+        "avatar_cache": get_avatar_proxy_service().metrics_snapshot(),
+        "database_backup": get_database_backup_service().metrics_snapshot(),
+        "startup": startup_profiler.snapshot(),
+        "scheduler": task_scheduler.metrics_snapshot(),
     }
     return JSONResponse(payload)
 
@@ -435,6 +449,40 @@ async def get_system_runtime_settings(
     return JSONResponse(content=snapshot, headers=_NO_STORE_HEADERS)
 
 
+# ---------------------------------------------------------------------------
+# Super Admin machine API 流量治理用量（per-credential / per-team bucket）
+# ---------------------------------------------------------------------------
+
+
+@router.get("/machine-api-usage", include_in_schema=False)
+async def get_machine_api_usage(
+    current_user: User = Depends(require_super_admin()),
+) -> JSONResponse:
+    """列出各 app token / team bucket 的放行、限流次數、累計 cost 與目前 in-flight 數。"""
+    from app.config import get_settings
+    from app.services.machine_api_governance import get_machine_api_governor
+
+    governor = get_machine_api_governor()
+    auth_cfg = get_settings().auth
+    payload = {
+        "enabled": auth_cfg.machine_api_governance_enabled,
+        "limits": {
+            "credential": {
+                "rate_per_minute": auth_cfg.machine_api_credential_rate_per_minute,
+                "burst": auth_cfg.machine_api_credential_burst,
+                "max_in_flight": auth_cfg.machine_api_credential_max_in_flight,
+            },
+            "team": {
+                "rate_per_minute": auth_cfg.machine_api_team_rate_per_minute,
+                "burst": auth_cfg.machine_api_team_burst,
+                "max_in_flight": auth_cfg.machine_api_team_max_in_flight,
+            },
+        },
+        "items": await governor.usage_snapshot(),
+    }
+    return JSONResponse(content=payload, headers=_NO_STORE_HEADERS)
+
+
 # ---------------------------------------------------------------------------
 # Super Admin 知識圖譜查詢記錄（openspec: log-knowledge-graph-queries）
 # 唯讀、自寫分頁查詢與條件 builder，不重用 audit_service.query_logs / _build_conditions。
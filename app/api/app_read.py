@@ -24,6 +24,7 @@ from app.models.mcp import (
     MCPTeamsResponse,
 )
 from app.services.external_read import (
+    InvalidCursorError,
     MissingLookupFilterError,
     TestCaseNotFoundError,
     TestCaseSetNotFoundError,
@@ -88,6 +89,9 @@ async def list_app_team_test_cases(
     include_test_data: bool = Query(
         False, description="是否回傳每筆 case 的 test_data 陣列（含 id/name/category/value）"
     ),
+    cursor: Optional[str] = Query(
+        None, description="Keyset cursor (page.next_cursor); skip is ignored when set"
+    ),
     db: AsyncSession = Depends(get_db),
     principal: AppTokenPrincipal = Depends(_require_read_scope),
 ):
@@ -117,12 +121,18 @@ async def list_app_team_test_cases(
             include_test_data=include_test_data,
             skip=skip,
             limit=limit,
+            cursor=cursor,
         )
     except TestCaseSetNotFoundError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"code": AppTokenErrorCodes.RESOURCE_NOT_FOUND, "message": str(exc)},
         ) from exc
+    except InvalidCursorError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": AppTokenErrorCodes.VALIDATION_ERROR, "message": str(exc)},
+        ) from exc
 
 
 @router.get("/teams/{team_id}/test-cases/{case_id}", response_model=MCPTestCaseDetailResponse)
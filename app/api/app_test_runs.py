@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 import json
 import logging
@@ -30,6 +31,7 @@ from app.api.test_run_items import (
     _db_to_response,
     _verify_team_and_config,
     apply_batch_item_update_sync,
+    bulk_create_items_sync,
 )
 from app.audit import ActionType
 from app.auth.app_token_dependencies import (
@@ -64,6 +66,13 @@ from app.models.test_run_set import (
     TestRunSetUpdate,
 )
 from app.services.attachment_storage import build_attachment_metadata, get_attachments_root_dir
+from app.services.attachment_upload import (
+    STAGING_DIR_NAME,
+    AttachmentTooLargeError,
+    discard_stored_uploads,
+    get_max_upload_bytes,
+    store_upload_streaming,
+)
 from app.services.test_run_scope_service import TestRunScopeService
 from app.services.test_run_assignee import (
     AssigneeValidationError,
@@ -847,72 +856,14 @@ async def batch_create_app_test_run_items(
                     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                     detail=f"items[{index}] assignee: {exc}",
                 ) from exc
-        config_scope_ids = TestRunScopeService.get_config_scope_ids(
-            sync_db, config_db, allow_fallback=True, persist_fallback=False
+        return bulk_create_items_sync(
+            sync_db,
+            team_id=team_id,
+            config_db=config_db,
+            items=payload.items,
+            resolved_assignees=resolved_assignees,
+            include_payload_fields=False,
         )
-        allowed_scope_ids = set(config_scope_ids)
-        auto_scope_ids: List[int] = []
-
-        from app.models.database_models import TestCaseLocal as TestCaseLocalDB
-
-        created = 0
-        skipped = 0
-        errors: List[str] = []
-
-        for idx, item in enumerate(payload.items):
-            try:
-                existing = (
-                    sync_db.query(TestRunItemDB)
-                    .filter(
-                        TestRunItemDB.team_id == team_id,
-                        TestRunItemDB.config_id == config_id,
-                        TestRunItemDB.test_case_number == item.test_case_number,
-                    )
-                    .first()
-                )
-                if existing:
-                    skipped += 1
-                    continue
-
-                test_case = (
-                    sync_db.query(TestCaseLocalDB)
-                    .filter(TestCaseLocalDB.team_id == team_id, TestCaseLocalDB.test_case_number == item.test_case_number)
-                    .first()
-                )
-                if not test_case:
-                    errors.append(f"index {idx}: 找不到測試案例 {item.test_case_number}")
-                    continue
-
-                case_set_id = getattr(test_case, "test_case_set_id", None)
-                if allowed_scope_ids:
-                    if case_set_id not in allowed_scope_ids:
-                        errors.append(
-                            f"index {idx}: 測試案例 {item.test_case_number} 不在此 Test Run 允許的 Test Case Set 範圍內"
-                        )
-                        continue
-                elif case_set_id is not None:
-                    auto_scope_ids.append(case_set_id)
-
-                db_item = TestRunItemDB(
-                    team_id=team_id,
-                    config_id=config_id,
-                    test_case_number=item.test_case_number,
-                    test_result=item.test_result,
-                    executed_at=item.executed_at,
-                    execution_duration=item.execution_duration,
-                )
-                apply_resolved_assignee(db_item, resolved_assignees[idx])
-                sync_db.add(db_item)
-                created += 1
-            except Exception as exc:  # noqa: BLE001
-                errors.append(f"index {idx}: {exc}")
-                continue
-
-        if not allowed_scope_ids and auto_scope_ids:
-            inferred_scope = TestRunScopeService.normalize_scope_ids(auto_scope_ids)
-            TestRunScopeService.set_config_scope_ids(config_db, inferred_scope)
-
-        return {"created": created, "skipped": skipped, "errors": errors}
 
     result = await boundary.run_sync_serialized_write(_create)
     await log_app_token_audit(
@@ -1196,30 +1147,44 @@ async def upload_app_test_run_item_results(
     history = ctx["history"]
 
     root_dir = get_attachments_root_dir()
-    target_dir = root_dir / "test-runs" / str(team_id) / str(config_id) / str(item_id)
-    target_dir.mkdir(parents=True, exist_ok=True)
+    dedup_scope = root_dir / "test-runs" / str(team_id)
+    target_dir = dedup_scope / str(config_id) / str(item_id)
 
     ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
     safe_re = re.compile(r"[^A-Za-z0-9_.\-]+")
+    max_bytes = get_max_upload_bytes()
     uploaded: List[Dict[str, Any]] = []
-    for f in files:
-        orig_name = f.filename or "unnamed"
-        stored_name = f"{ts}-{safe_re.sub('_', orig_name)}"
-        stored_path = target_dir / stored_name
-        content = await f.read()
-        with open(stored_path, "wb") as out:
-            out.write(content)
-        meta = build_attachment_metadata(
-            root_dir=root_dir,
-            stored_path=stored_path,
-            original_name=orig_name,
-            stored_name=stored_name,
-            size=len(content),
-            content_type=f.content_type or "application/octet-stream",
-            uploaded_at=datetime.utcnow().isoformat(),
-        )
-        existing.append(meta)
-        uploaded.append(meta)
+    stored_uploads = []
+    try:
+        for f in files:
+            orig_name = f.filename or "unnamed"
+            stored_name = f"{ts}-{safe_re.sub('_', orig_name)}"
+            stored = await store_upload_streaming(
+                f,
+                target_dir / stored_name,
+                staging_dir=root_dir / STAGING_DIR_NAME,
+                dedup_scope=dedup_scope,
+                max_bytes=max_bytes,
+            )
+            stored_uploads.append(stored)
+            meta = build_attachment_metadata(
+                root_dir=root_dir,
+                stored_path=stored.path,
+                original_name=orig_name,
+                stored_name=stored_name,
+                size=stored.size,
+                content_type=f.content_type or "application/octet-stream",
+                uploaded_at=datetime.utcnow().isoformat(),
+                sha256=stored.sha256,
+            )
+            existing.append(meta)
+            uploaded.append(meta)
+    except AttachmentTooLargeError as exc:
+        await asyncio.to_thread(discard_stored_uploads, stored_uploads, dedup_scope)
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+    except BaseException:
+        await asyncio.to_thread(discard_stored_uploads, stored_uploads, dedup_scope)
+        raise
 
     history.append({"uploaded": len(uploaded), "at": datetime.utcnow().isoformat(), "files": uploaded})
     execution_results_json = json.dumps(existing, ensure_ascii=False)
@@ -1,20 +1,19 @@
 """全域 AI 助手 API 路由（openspec change add-global-ai-assistant，task 5）。
 
 端點只負責：認證/擁有權過濾、per-worker slot 預留、TurnStart/Confirm 判斷順序與
-DB-tail SSE 串流；實際併發控制與交易邊界都委派給 `conversation_service`，
+SSE 串流（DB 補播 + 事件匯流排喚醒）；實際併發控制與交易邊界都委派給 `conversation_service`，
 agent 迴圈本體委派給 `assistant_agent_service`（detached runner，不隸屬本次 request）。
 """
 
 from __future__ import annotations
 
-import asyncio
 import contextlib
 import json
 import logging
 import mimetypes
 import urllib.parse
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Security, UploadFile, status
 from fastapi.responses import JSONResponse, StreamingResponse
@@ -37,10 +36,8 @@ from app.models.assistant import (
     StopAckResponse,
 )
 from app.models.database_models import User
-from app.services.assistant import assistant_agent_service as agent_svc
 from app.services.assistant import attachment_storage, ids
-from app.services.assistant.assistant_llm_service import get_assistant_llm_service
-from app.services.assistant.conversation_service import ConversationService
+from app.services.assistant.event_bus import get_assistant_event_bus
 from app.services.assistant.errors import (
     AdmissionDeniedError,
     AssistantError,
@@ -50,20 +47,26 @@ from app.services.assistant.errors import (
 from app.services.assistant.locale_context import normalize_ui_locale
 from app.services.assistant.param_validation import validate_arguments
 from app.services.assistant.runner_supervisor import RunnerSupervisor, get_runner_supervisor
-from app.services.assistant.tool_executor import RejectionResult, ToolExecutor, combined_schema
-from app.services.assistant.tool_registry import get_tool_registry
+
+if TYPE_CHECKING:
+    from app.services.assistant.assistant_llm_service import AssistantLLMService
+    from app.services.assistant.conversation_service import ConversationService
+    from app.services.assistant.tool_executor import ToolExecutor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/assistant", tags=["assistant"])
 
 _TERMINAL_EVENT_TYPES = {"done", "cancelled"}
-_POLL_INTERVAL_SECONDS = 0.5
-_KEEPALIVE_EVERY_N_TICKS = 30  # ~15s
+# 沒有新事件時送 keepalive 的間隔；同時作為漏接通知時重新讀 DB 的保險
+_KEEPALIVE_SECONDS = 15.0
 
 
 # ---------------------------------------------------------------------- #
 # Dependencies
+#
+# agent loop / LLM client（aiohttp）/ tool registry 只在 provider 第一次被呼叫時才匯入，
+# 掛載本 router 不會把整個助手服務圖帶進 worker 冷啟動。
 # ---------------------------------------------------------------------- #
 
 
@@ -71,10 +74,18 @@ def _get_config() -> AssistantConfig:
     return get_settings().ai.assistant
 
 
+def _get_llm_service() -> AssistantLLMService:
+    from app.services.assistant.assistant_llm_service import get_assistant_llm_service
+
+    return get_assistant_llm_service()
+
+
 def _get_conversation_service(
     config: AssistantConfig = Depends(_get_config),
     boundary: MainAccessBoundary = Depends(get_main_access_boundary),
 ) -> ConversationService:
+    from app.services.assistant.conversation_service import ConversationService
+
     return ConversationService(boundary, config)
 
 
@@ -83,6 +94,9 @@ def _get_executor(
     config: AssistantConfig = Depends(_get_config),
     boundary: MainAccessBoundary = Depends(get_main_access_boundary),
 ) -> ToolExecutor:
+    from app.services.assistant.tool_executor import ToolExecutor
+    from app.services.assistant.tool_registry import get_tool_registry
+
     return ToolExecutor(app=request.app, main_boundary=boundary, config=config, registry=get_tool_registry())
 
 
@@ -91,7 +105,7 @@ def _get_runner_supervisor(config: AssistantConfig = Depends(_get_config)) -> Ru
 
 
 def _require_enabled(config: AssistantConfig) -> None:
-    if not (config.enabled and get_assistant_llm_service().is_configured()):
+    if not (config.enabled and _get_llm_service().is_configured()):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail={"code": "ASSISTANT_NOT_CONFIGURED", "message": "assistant is disabled or not configured"},
@@ -99,31 +113,32 @@ def _require_enabled(config: AssistantConfig) -> None:
 
 
 # ---------------------------------------------------------------------- #
-# SSE：DB-tail（design D6/D7；spec assistant-agent-loop「SSE 事件協定」）
+# SSE：DB 補播 + 事件匯流排喚醒（design D6/D7；spec assistant-agent-loop「SSE 事件協定」）
 # ---------------------------------------------------------------------- #
 
 
 async def _tail_turn_events(conv_svc: ConversationService, *, turn_id: int, turn_key: str, after_seq: int):
+    """先由 DB 補播 `after_seq` 之後的事件，之後等事件匯流排通知才再讀 DB（不再定時輪詢）。"""
+    bus = get_assistant_event_bus()
+    bus.configure(conv_svc.config)
     cursor = after_seq
-    idle_ticks = 0
-    while True:
-        events = await conv_svc.get_events_after(turn_id=turn_id, after_seq=cursor)
-        if not events:
-            if await conv_svc.is_turn_terminal(turn_id=turn_id):
-                return
-            idle_ticks += 1
-            if idle_ticks % _KEEPALIVE_EVERY_N_TICKS == 0:
-                yield b": keepalive\n\n"
-            await asyncio.sleep(_POLL_INTERVAL_SECONDS)
-            continue
-        idle_ticks = 0
-        for event in events:
-            payload = json.loads(event.payload_json) if event.payload_json else None
-            data = json.dumps({"seq": event.seq, "payload": payload}, ensure_ascii=False)
-            yield f"event: {event.event_type}\nid: {turn_key}:{event.seq}\ndata: {data}\n\n".encode("utf-8")
-            cursor = event.seq
-            if event.event_type in _TERMINAL_EVENT_TYPES:
-                return
+    with bus.subscribe(turn_id) as subscription:
+        while True:
+            subscription.clear()
+            events = await conv_svc.get_events_after(turn_id=turn_id, after_seq=cursor)
+            if not events:
+                if await conv_svc.is_turn_terminal(turn_id=turn_id):
+                    return
+                if not await subscription.wait(_KEEPALIVE_SECONDS):
+                    yield b": keepalive\n\n"
+                continue
+            for event in events:
+                payload = json.loads(event.payload_json) if event.payload_json else None
+                data = json.dumps({"seq": event.seq, "payload": payload}, ensure_ascii=False)
+                yield f"event: {event.event_type}\nid: {turn_key}:{event.seq}\ndata: {data}\n\n".encode("utf-8")
+                cursor = event.seq
+                if event.event_type in _TERMINAL_EVENT_TYPES:
+                    return
 
 
 def _stream_response(conv_svc: ConversationService, *, turn_id: int, turn_key: str, after_seq: int) -> StreamingResponse:
@@ -149,7 +164,7 @@ async def get_availability(
     current_user: User = Depends(get_current_user),
     config: AssistantConfig = Depends(_get_config),
 ) -> AvailabilityResponse:
-    return AvailabilityResponse(enabled=config.enabled and get_assistant_llm_service().is_configured())
+    return AvailabilityResponse(enabled=config.enabled and _get_llm_service().is_configured())
 
 
 # ---------------------------------------------------------------------- #
@@ -343,6 +358,8 @@ async def post_message_endpoint(
     executor: ToolExecutor = Depends(_get_executor),
     supervisor: RunnerSupervisor = Depends(_get_runner_supervisor),
 ) -> StreamingResponse:
+    from app.services.assistant import assistant_agent_service as agent_svc
+
     _require_enabled(config)
     jwt = credentials.credentials
     conversation = await conv_svc.get_conversation_owned(user_id=current_user.id, conversation_id=conversation_id)
@@ -422,7 +439,7 @@ async def post_message_endpoint(
         result.turn.turn_key,
         lambda: agent_svc.run_agent_turn(
             conversation=conversation, turn=result.turn, user_id=current_user.id, role=current_user.role, jwt=jwt,
-            conversation_service=conv_svc, executor=executor, llm_service=get_assistant_llm_service(),
+            conversation_service=conv_svc, executor=executor, llm_service=_get_llm_service(),
             registry=executor.registry, config=config, ui_locale=reply_locale,
         ),
     )
@@ -475,6 +492,9 @@ async def confirm_action_endpoint(
     executor: ToolExecutor = Depends(_get_executor),
     supervisor: RunnerSupervisor = Depends(_get_runner_supervisor),
 ):
+    from app.services.assistant import assistant_agent_service as agent_svc
+    from app.services.assistant.tool_executor import RejectionResult, combined_schema
+
     _require_enabled(config)
     jwt = credentials.credentials
     # 回覆語言取「confirm 當下的 UI 語系」，與必須取 turn 快照的有效 team 不同：語言只影響本次
@@ -747,7 +767,7 @@ async def confirm_action_endpoint(
         lambda: agent_svc.run_confirm_turn(
             conversation=conversation, continuation_turn=continuation, pending_action=action, tool=tool,
             user_id=current_user.id, role=current_user.role, jwt=jwt,
-            conversation_service=conv_svc, executor=executor, llm_service=get_assistant_llm_service(),
+            conversation_service=conv_svc, executor=executor, llm_service=_get_llm_service(),
             registry=executor.registry, config=config, execution_payload=execution_payload,
             ui_locale=reply_locale,
         ),
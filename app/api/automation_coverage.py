@@ -13,7 +13,7 @@ from app.models.automation_coverage import (
     AutomationCoverageResponse,
 )
 from app.models.database_models import Team, User
-from app.services.automation.coverage_service import AutomationCoverageService
+from app.services.automation.coverage_service import AutomationCoverageService, load_team_coverage
 
 
 logger = logging.getLogger(__name__)
@@ -27,16 +27,12 @@ async def get_automation_coverage(
     current_user: User = Depends(require_team_read),
     main_boundary: MainAccessBoundary = Depends(get_main_access_boundary),
 ) -> AutomationCoverageResponse:
-    async def _get(session: AsyncSession) -> AutomationCoverageResponse:
+    async def _check(session: AsyncSession) -> None:
         await _ensure_team_exists(session, team_id)
-        service = AutomationCoverageService(session)
-        result = await service.compute_coverage(
-            team_id=team_id,
-            uncovered_limit=uncovered_limit,
-        )
-        return AutomationCoverageResponse(**result)
 
-    return await main_boundary.run_read(_get)
+    await main_boundary.run_read(_check)
+    result = await load_team_coverage(main_boundary, team_id, uncovered_limit=uncovered_limit)
+    return AutomationCoverageResponse(**result)
 
 
 @router.get("/cases", response_model=AutomationCoverageCasesPage)
@@ -73,22 +73,24 @@ async def get_avatar_viewer(
     return user
 
 
-def _avatar_response(payload) -> Response:
-    return Response(
-        content=payload.body,
-        media_type=payload.content_type,
-        headers={
-            "Cache-Control": _CACHE_CONTROL,
-            "X-Avatar-Cache": "HIT" if payload.cache_hit else "MISS",
-            # Reduce chance of access_token query leaking via Referer on navigations.
-            "Referrer-Policy": "no-referrer",
-        },
-    )
+def _avatar_response(payload, request: Request) -> Response:
+    headers = {
+        "Cache-Control": _CACHE_CONTROL,
+        "ETag": payload.etag,
+        "X-Avatar-Cache": "HIT" if payload.cache_hit else "MISS",
+        # Reduce chance of access_token query leaking via Referer on navigations.
+        "Referrer-Policy": "no-referrer",
+    }
+    if_none_match = request.headers.get("if-none-match") or ""
+    if payload.etag and payload.etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload.body, media_type=payload.content_type, headers=headers)
 
 
 @router.get("/users/{user_id}")
 async def get_user_avatar(
     user_id: int,
+    request: Request,
     current_user: User = Depends(get_avatar_viewer),
     main_boundary: MainAccessBoundary = Depends(get_main_access_boundary),
 ):
@@ -116,7 +118,7 @@ async def get_user_avatar(
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed loading user avatar context for %s: %s", user_id, exc)
         payload = service.placeholder_svg(name=str(user_id), seed=str(user_id))
-        return _avatar_response(payload)
+        return _avatar_response(payload, request)
 
     payload = await service.resolve(
         cache_key=f"user:{user_id}",
@@ -124,12 +126,13 @@ async def get_user_avatar(
         display_name=display_name,
         seed=seed,
     )
-    return _avatar_response(payload)
+    return _avatar_response(payload, request)
 
 
 @router.get("/lark/{lark_user_id}")
 async def get_lark_avatar(
     lark_user_id: str,
+    request: Request,
     current_user: User = Depends(get_avatar_viewer),
     main_boundary: MainAccessBoundary = Depends(get_main_access_boundary),
 ):
@@ -152,7 +155,7 @@ async def get_lark_avatar(
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed loading lark avatar context for %s: %s", normalized, exc)
         payload = service.placeholder_svg(name=normalized, seed=normalized)
-        return _avatar_response(payload)
+        return _avatar_response(payload, request)
 
     payload = await service.resolve(
         cache_key=f"lark:{normalized}",
@@ -160,4 +163,4 @@ async def get_lark_avatar(
         display_name=display_name,
         seed=normalized,
     )
-    return _avatar_response(payload)
+    return _avatar_response(payload, request)
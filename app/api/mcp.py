@@ -15,11 +15,13 @@ from app.auth.mcp_dependencies import (
     require_mcp_team_access,
 )
 from app.database import get_db
+from app.db_access.main import MainAccessBoundary, get_main_access_boundary
 from app.models.database_models import (
     AutomationRun as AutomationRunDB,
     AutomationScript as AutomationScriptDB,
     AutomationScriptCaseLink as AutomationScriptCaseLinkDB,
     AutomationScriptGroup as AutomationScriptGroupDB,
+    AutomationScriptGroupMember as AutomationScriptGroupMemberDB,
     TestCaseLocal as TestCaseLocalDB,
     TestRunSet as TestRunSetDB,
 )
@@ -43,9 +45,9 @@ from app.models.mcp import (
     MCPTestCaseDetailResponse,
     MCPTestCaseLookupResponse,
 )
-from app.services.automation.coverage_service import AutomationCoverageService
-from app.services.automation.script_group_service import _load_script_paths
+from app.services.automation.coverage_service import load_team_coverage
 from app.services.external_read import (
+    InvalidCursorError,
     TestCaseNotFoundError,
     TestCaseSetNotFoundError,
     TeamNotFoundError,
@@ -224,6 +226,9 @@ async def list_team_test_cases(
     ),
     skip: int = Query(0, ge=0, description="分頁 offset"),
     limit: int = Query(100, ge=1, le=1000, description="分頁大小"),
+    cursor: Optional[str] = Query(
+        None, description="Keyset cursor (page.next_cursor); skip is ignored when set"
+    ),
 ):
     del principal  # 由 dependency 完成 team scope 驗證
     await _ensure_team_exists(db, team_id)
@@ -243,12 +248,18 @@ async def list_team_test_cases(
             include_test_data=include_test_data,
             skip=skip,
             limit=limit,
+            cursor=cursor,
         )
     except TestCaseSetNotFoundError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(exc),
         ) from exc
+    except InvalidCursorError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
 
 
 @router.get(
@@ -348,37 +359,24 @@ def _parse_string_list(raw: Optional[str]) -> list[str]:
     return [str(item) for item in data if item is not None]
 
 
-async def _batch_linked_case_numbers(
-    db: AsyncSession,
-    team_id: int,
-    script_ids: list[int],
-    *,
-    per_script_limit: int = 20,
-) -> Dict[int, list[str]]:
-    if not script_ids:
-        return {}
-    result = await db.execute(
-        select(
-            AutomationScriptCaseLinkDB.automation_script_id,
-            TestCaseLocalDB.test_case_number,
-            AutomationScriptCaseLinkDB.id,
-        )
-        .join(
-            TestCaseLocalDB,
-            TestCaseLocalDB.id == AutomationScriptCaseLinkDB.test_case_id,
-        )
-        .where(
-            AutomationScriptCaseLinkDB.team_id == team_id,
-            AutomationScriptCaseLinkDB.automation_script_id.in_(script_ids),
-        )
-        .order_by(AutomationScriptCaseLinkDB.automation_script_id, AutomationScriptCaseLinkDB.id)
+_LINKED_CASE_NUMBERS_PER_SCRIPT = 20
+
+
+def _keyset_page_meta(*, skip: int, limit: int, total: int, ids: list[int]) -> tuple[list[int], MCPPageMeta]:
+    """Trim a ``limit + 1`` id window to the page and build the page meta.
+
+    Listings fetch one extra row so ``has_next`` does not depend on ``total``;
+    ``next_cursor`` is the last returned id (ids are ordered descending).
+    """
+    has_next = len(ids) > limit
+    page_ids = ids[:limit]
+    return page_ids, MCPPageMeta(
+        skip=skip,
+        limit=limit,
+        total=total,
+        has_next=has_next,
+        next_cursor=str(page_ids[-1]) if has_next and page_ids else None,
     )
-    grouped: Dict[int, list[str]] = {}
-    for script_id, test_case_number, _link_id in result.all():
-        bucket = grouped.setdefault(int(script_id), [])
-        if len(bucket) < per_script_limit and test_case_number:
-            bucket.append(str(test_case_number))
-    return grouped
 
 
 @router.get(
@@ -391,6 +389,7 @@ async def list_team_automation_scripts(
     principal: MCPMachinePrincipal = Depends(require_mcp_team_access),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = Query(None, ge=1, description="Keyset cursor (page.next_cursor); skip is ignored when set"),
     script_format: Optional[str] = Query(None, description="Filter by script_format"),
     keyword: Optional[str] = Query(None, description="Partial match against name or ref_path"),
 ):
@@ -407,27 +406,63 @@ async def list_team_automation_scripts(
     total_stmt = select(func.count(AutomationScriptDB.id)).where(*conditions)
     total = int((await db.execute(total_stmt)).scalar_one() or 0)
 
+    page_stmt = select(AutomationScriptDB.id).where(*conditions)
+    if cursor is not None:
+        page_stmt = page_stmt.where(AutomationScriptDB.id < cursor)
+    else:
+        page_stmt = page_stmt.offset(skip)
+    page = page_stmt.order_by(AutomationScriptDB.id.desc()).limit(limit + 1).subquery("page")
+
+    # Linked test case numbers are ranked per script inside the page window and
+    # joined back in the same statement (replaces a second per-page lookup).
+    # Joined (not IN) against the page derived table: MySQL rejects LIMIT in IN.
+    ranked_links = (
+        select(
+            AutomationScriptCaseLinkDB.automation_script_id.label("script_id"),
+            TestCaseLocalDB.test_case_number.label("test_case_number"),
+            func.row_number()
+            .over(
+                partition_by=AutomationScriptCaseLinkDB.automation_script_id,
+                order_by=AutomationScriptCaseLinkDB.id,
+            )
+            .label("rn"),
+        )
+        .join(page, page.c.id == AutomationScriptCaseLinkDB.automation_script_id)
+        .join(TestCaseLocalDB, TestCaseLocalDB.id == AutomationScriptCaseLinkDB.test_case_id)
+        .where(AutomationScriptCaseLinkDB.team_id == team_id)
+        .subquery("ranked_links")
+    )
     rows_stmt = (
-        select(AutomationScriptDB)
-        .where(*conditions)
-        .order_by(AutomationScriptDB.id.desc())
-        .offset(skip)
-        .limit(limit)
+        select(AutomationScriptDB, ranked_links.c.test_case_number)
+        .join(page, page.c.id == AutomationScriptDB.id)
+        .outerjoin(
+            ranked_links,
+            (ranked_links.c.script_id == AutomationScriptDB.id)
+            & (ranked_links.c.rn <= _LINKED_CASE_NUMBERS_PER_SCRIPT),
+        )
+        .order_by(AutomationScriptDB.id.desc(), ranked_links.c.rn)
     )
-    scripts = list((await db.execute(rows_stmt)).scalars().all())
-    script_ids = [int(script.id) for script in scripts]
+    scripts: Dict[int, AutomationScriptDB] = {}
+    linked_numbers: Dict[int, list[str]] = {}
+    for script, test_case_number in (await db.execute(rows_stmt)).all():
+        script_id = int(script.id)
+        scripts.setdefault(script_id, script)
+        bucket = linked_numbers.setdefault(script_id, [])
+        if test_case_number:
+            bucket.append(str(test_case_number))
+
+    page_ids, page_meta = _keyset_page_meta(skip=skip, limit=limit, total=total, ids=list(scripts))
 
     # last_run batch lookup removed: run history is owned by Test Run Set
     # (see move-run-history-to-test-run-set). Callers wanting the latest
     # run status for a script should follow the script's groups to their
     # triggering Test Run Set.
-    linked_numbers = await _batch_linked_case_numbers(db, team_id, script_ids, per_script_limit=20)
-
     items: list[MCPAutomationScriptItem] = []
-    for script in scripts:
+    for script_id in page_ids:
+        script = scripts[script_id]
         items.append(
             MCPAutomationScriptItem(
-                id=int(script.id),
+                id=script_id,
                 name=script.name,
                 script_format=to_text(script.script_format) or "OTHER",
                 ref_path=script.ref_path,
@@ -436,7 +471,7 @@ async def list_team_automation_scripts(
                 preferred_runner_label=script.preferred_runner_label,
                 tags=_parse_string_list(script.tags_json),
                 linked_test_case_count=int(script.linked_test_case_count or 0),
-                linked_test_case_numbers=linked_numbers.get(int(script.id), []),
+                linked_test_case_numbers=linked_numbers.get(script_id, []),
                 # last_run_* removed: run history is owned by Test Run Set
                 # (see move-run-history-to-test-run-set).
                 last_synced_at=script.last_synced_at,
@@ -445,11 +480,7 @@ async def list_team_automation_scripts(
             )
         )
 
-    return MCPTeamAutomationScriptsResponse(
-        team_id=team_id,
-        items=items,
-        page=MCPPageMeta(skip=skip, limit=limit, total=total, has_next=(skip + len(items)) < total),
-    )
+    return MCPTeamAutomationScriptsResponse(team_id=team_id, items=items, page=page_meta)
 
 
 @router.get(
@@ -462,6 +493,7 @@ async def list_team_automation_script_groups(
     principal: MCPMachinePrincipal = Depends(require_mcp_team_access),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = Query(None, ge=1, description="Keyset cursor (page.next_cursor); skip is ignored when set"),
     keyword: Optional[str] = Query(None, description="Partial match against name or description"),
 ):
     """List executable suites (``AutomationScriptGroup``) for a team.
@@ -485,53 +517,61 @@ async def list_team_automation_script_groups(
 
     total = int((await db.execute(select(func.count(AutomationScriptGroupDB.id)).where(*conditions))).scalar_one() or 0)
 
+    page_stmt = select(AutomationScriptGroupDB.id).where(*conditions)
+    if cursor is not None:
+        page_stmt = page_stmt.where(AutomationScriptGroupDB.id < cursor)
+    else:
+        page_stmt = page_stmt.offset(skip)
+    page = page_stmt.order_by(AutomationScriptGroupDB.id.desc()).limit(limit + 1).subquery("page")
+
+    # Members come from the normalized automation_script_group_members table
+    # (kept in sync with script_paths_json on save). ref_path is NOT unique
+    # within a team (uq is team+provider+ref_repo+ref_path+ref_branch), so a
+    # member resolves against its suite's OWN repo, mirroring
+    # AutomationScriptGroupService.load_group_scripts; the lowest script id wins
+    # when several branches share the path.
+    member = AutomationScriptGroupMemberDB
     rows_stmt = (
-        select(AutomationScriptGroupDB)
-        .where(*conditions)
-        .order_by(AutomationScriptGroupDB.id.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-    groups = list((await db.execute(rows_stmt)).scalars().all())
-
-    # Resolve each suite's stored ref_paths → current script ids in one query.
-    # ref_path is NOT unique within a team (uq is team+provider+ref_repo+ref_path+
-    # ref_branch), so a suite must resolve against its OWN repo — key the lookup by
-    # (ref_repo, ref_path), mirroring AutomationScriptGroupService.load_group_scripts.
-    # Parse with the same _load_script_paths the run path uses so MCP and the Test
-    # Run Set trigger agree on a suite's composition.
-    paths_by_group = {int(g.id): _load_script_paths(g.script_paths_json) for g in groups}
-    all_paths = {path for paths in paths_by_group.values() for path in paths}
-    repo_path_to_id: Dict[tuple[str, str], int] = {}
-    if all_paths:
-        id_rows = await db.execute(
-            select(
-                AutomationScriptDB.ref_repo,
-                AutomationScriptDB.ref_path,
-                AutomationScriptDB.id,
-            ).where(
-                AutomationScriptDB.team_id == team_id,
-                AutomationScriptDB.ref_path.in_(all_paths),
-            )
+        select(AutomationScriptGroupDB, member.position, member.ref_path, AutomationScriptDB.id)
+        .join(page, page.c.id == AutomationScriptGroupDB.id)
+        .outerjoin(member, member.group_id == AutomationScriptGroupDB.id)
+        .outerjoin(
+            AutomationScriptDB,
+            (AutomationScriptDB.team_id == member.team_id)
+            & (AutomationScriptDB.ref_repo == member.ref_repo)
+            & (AutomationScriptDB.ref_path == member.ref_path),
         )
-        for ref_repo, ref_path, script_id in id_rows.all():
-            repo_path_to_id[(ref_repo or "", str(ref_path))] = int(script_id)
+        .order_by(AutomationScriptGroupDB.id.desc(), member.position, AutomationScriptDB.id)
+    )
+    groups: Dict[int, AutomationScriptGroupDB] = {}
+    paths_by_group: Dict[int, list[str]] = {}
+    script_ids_by_group: Dict[int, list[int]] = {}
+    last_position: Dict[int, int] = {}
+    for group, position, ref_path, script_id in (await db.execute(rows_stmt)).all():
+        group_id = int(group.id)
+        groups.setdefault(group_id, group)
+        paths = paths_by_group.setdefault(group_id, [])
+        script_ids = script_ids_by_group.setdefault(group_id, [])
+        if position is None or last_position.get(group_id) == position:
+            continue
+        last_position[group_id] = position
+        paths.append(str(ref_path))
+        if script_id is not None:
+            script_ids.append(int(script_id))
+
+    page_ids, page_meta = _keyset_page_meta(skip=skip, limit=limit, total=total, ids=list(groups))
 
     items: list[MCPAutomationScriptGroupItem] = []
-    for group in groups:
-        repo = group.ref_repo or ""
-        paths = paths_by_group[int(group.id)]
+    for group_id in page_ids:
+        group = groups[group_id]
+        paths = paths_by_group[group_id]
         items.append(
             MCPAutomationScriptGroupItem(
-                id=int(group.id),
+                id=group_id,
                 name=group.name,
                 description=group.description,
                 ref_repo=group.ref_repo or None,
-                script_ids=[
-                    repo_path_to_id[(repo, path)]
-                    for path in paths
-                    if (repo, path) in repo_path_to_id
-                ],
+                script_ids=script_ids_by_group[group_id],
                 script_paths=paths,
                 script_count=len(paths),
                 ci_job_name=group.ci_job_name,
@@ -541,11 +581,7 @@ async def list_team_automation_script_groups(
             )
         )
 
-    return MCPTeamAutomationScriptGroupsResponse(
-        team_id=team_id,
-        items=items,
-        page=MCPPageMeta(skip=skip, limit=limit, total=total, has_next=(skip + len(items)) < total),
-    )
+    return MCPTeamAutomationScriptGroupsResponse(team_id=team_id, items=items, page=page_meta)
 
 
 @router.get(
@@ -645,15 +681,12 @@ async def get_team_automation_coverage(
     db: AsyncSession = Depends(get_db),
     principal: MCPMachinePrincipal = Depends(require_mcp_team_access),
     uncovered_limit: int = Query(50, ge=1, le=200),
+    main_boundary: MainAccessBoundary = Depends(get_main_access_boundary),
 ):
     del principal
     await _ensure_team_exists(db, team_id)
 
-    service = AutomationCoverageService(db)
-    data = await service.compute_coverage(
-        team_id=team_id,
-        uncovered_limit=uncovered_limit,
-    )
+    data = await load_team_coverage(main_boundary, team_id, uncovered_limit=uncovered_limit)
 
     summary = MCPAutomationCoverageSummary(
         total_test_cases=int(data.get("total_test_cases", 0) or 0),
@@ -686,4 +719,5 @@ async def get_team_automation_coverage(
         summary=summary,
         uncovered_sample=uncovered,
         trend=trend,
+        snapshot_computed_at=data.get("snapshot_computed_at"),
     )
@@ -587,6 +587,18 @@ async def list_scheduled_services(
         ) from exc
 
 
+@router.get("/scheduled-services/metrics")
+async def get_scheduled_service_metrics(
+    current_user: User = Depends(require_super_admin()),
+):
+    """本 worker 的排程執行指標：執行次數、耗時、延遲、錯過與略過次數。"""
+    _ = current_user
+    return {
+        "success": True,
+        "data": task_scheduler.metrics_snapshot(),
+    }
+
+
 @router.put("/scheduled-services/{service_key}")
 async def update_scheduled_service(
     service_key: str,
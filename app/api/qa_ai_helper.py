@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+from typing import TYPE_CHECKING
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
@@ -43,11 +44,38 @@ from app.models.qa_ai_helper import (
     QAAIHelperTestcaseSectionSelectionRequest,
     QAAIHelperWorkspaceResponse,
 )
-from app.services.qa_ai_helper_service import QAAIHelperService
+from app.services.llm_scheduler import bind_llm_request_scope
+
+if TYPE_CHECKING:
+    from app.services.qa_ai_helper_service import QAAIHelperService
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/teams/{team_id}/qa-ai-helper", tags=["qa-ai-helper"])
+
+def get_qa_ai_helper_service() -> QAAIHelperService:
+    """依需求建立 QA AI Helper 服務。
+
+    服務圖（planner、LLM client、aiohttp 等）延後到第一次請求才載入，
+    router 掛載時只需匯入路由與 schema，不拖慢 worker 冷啟動。
+    """
+    from app.services.qa_ai_helper_service import QAAIHelperService
+
+    return QAAIHelperService()
+
+
+async def _bind_llm_request_scope(team_id: int, current_user: User = Depends(get_current_user)) -> None:
+    # 全域 LLM scheduler 依 team / user 公平排隊；scope 隨 request context 傳入背景 task
+    bind_llm_request_scope(team_id=team_id, user_id=current_user.id)
+
+
+router = APIRouter(
+    prefix="/teams/{team_id}/qa-ai-helper",
+    tags=["qa-ai-helper"],
+    dependencies=[Depends(_bind_llm_request_scope)],
+)
+
+# 串流生成的背景 task 需保留 reference，避免 client 斷線後被回收
+_background_generation_tasks: set[asyncio.Task] = set()
 
 
 def _map_exception(exc: Exception) -> HTTPException:
@@ -102,7 +130,7 @@ async def create_session(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.start_session(
             team_id=team_id,
@@ -121,7 +149,7 @@ async def create_no_ticket_session(
 ) -> QAAIHelperWorkspaceResponse:
     """建立無需求單模式的 session，直接進入 verification_planning 階段。"""
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.start_no_ticket_session(
             team_id=team_id,
@@ -142,7 +170,7 @@ async def list_sessions(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperSessionListResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.list_sessions(team_id=team_id, limit=limit, offset=offset, search=search.strip())
     except Exception as exc:  # noqa: BLE001
@@ -156,7 +184,7 @@ async def get_workspace(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.get_workspace(team_id=team_id, session_id=session_id)
     except Exception as exc:  # noqa: BLE001
@@ -170,7 +198,7 @@ async def delete_session(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperDeleteResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.delete_session(team_id=team_id, session_id=session_id)
     except Exception as exc:  # noqa: BLE001
@@ -184,7 +212,7 @@ async def restart_session(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperRestartResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.restart_session(team_id=team_id, session_id=session_id)
     except Exception as exc:  # noqa: BLE001
@@ -199,7 +227,7 @@ async def reopen_session(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.reopen_session(
             team_id=team_id,
@@ -217,7 +245,7 @@ async def initialize_requirement_plan(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.initialize_requirement_plan(team_id=team_id, session_id=session_id)
     except Exception as exc:  # noqa: BLE001
@@ -232,7 +260,7 @@ async def save_requirement_plan(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.save_requirement_plan(
             team_id=team_id,
@@ -251,7 +279,7 @@ async def lock_requirement_plan(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.lock_requirement_plan(
             team_id=team_id,
@@ -269,7 +297,7 @@ async def unlock_requirement_plan(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.unlock_requirement_plan(team_id=team_id, session_id=session_id)
     except Exception as exc:  # noqa: BLE001
@@ -284,7 +312,7 @@ async def generate_seed_set(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     force_regenerate = bool(request and request.force_regenerate)
     try:
         return await service.generate_seed_set(
@@ -292,11 +320,66 @@ async def generate_seed_set(
             session_id=session_id,
             user_id=current_user.id,
             force_regenerate=force_regenerate,
+            bypass_cache=bool(request and request.bypass_cache),
         )
     except Exception as exc:  # noqa: BLE001
         raise _map_exception(exc) from exc
 
 
+@router.post("/sessions/{session_id}/seed-sets/stream")
+async def generate_seed_set_stream(
+    team_id: int,
+    session_id: int,
+    request: QAAIHelperTestcaseGenerateRequest | None = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Generate a seed set batch by batch and stream SSE progress events."""
+    await _verify_team_write_access(team_id=team_id, current_user=current_user)
+
+    service = get_qa_ai_helper_service()
+    event_queue: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event_type: str, data: dict):
+        event_queue.put_nowait((event_type, data))
+
+    async def _run():
+        try:
+            await service.generate_seed_set_stream(
+                team_id=team_id,
+                session_id=session_id,
+                user_id=current_user.id,
+                on_event=on_event,
+                bypass_cache=bool(request and request.bypass_cache),
+            )
+        except Exception as exc:
+            logger.exception("seed streaming generation failed: %s", exc)
+            on_event("done", {"success": False, "error": str(exc)})
+        finally:
+            await event_queue.put(None)
+
+    async def sse_generator():
+        # 各 batch 完成即已寫入；client 中途斷線時讓生成繼續完成，重新載入 workspace 即可看到結果
+        task = asyncio.create_task(_run())
+        _background_generation_tasks.add(task)
+        task.add_done_callback(_background_generation_tasks.discard)
+        while True:
+            item = await event_queue.get()
+            if item is None:
+                break
+            event_type, data = item
+            yield f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        sse_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.put(
     "/sessions/{session_id}/seed-sets/{seed_set_id}/items/{seed_item_id}",
     response_model=QAAIHelperWorkspaceResponse,
@@ -310,7 +393,7 @@ async def update_seed_item_review(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.update_seed_item_review(
             team_id=team_id,
@@ -336,7 +419,7 @@ async def update_seed_section_inclusion(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.update_seed_section_inclusion(
             team_id=team_id,
@@ -361,7 +444,7 @@ async def refine_seed_set(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.refine_seed_set(
             team_id=team_id,
@@ -384,7 +467,7 @@ async def lock_seed_set(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.lock_seed_set(
             team_id=team_id,
@@ -406,7 +489,7 @@ async def unlock_seed_set(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.unlock_seed_set(
             team_id=team_id,
@@ -425,7 +508,7 @@ async def generate_testcase_draft_set(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.generate_testcase_draft_set(
             team_id=team_id,
@@ -450,7 +533,7 @@ async def update_testcase_draft(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.update_testcase_draft(
             team_id=team_id,
@@ -476,7 +559,7 @@ async def update_testcase_draft_selection(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.update_testcase_draft_selection(
             team_id=team_id,
@@ -502,7 +585,7 @@ async def update_testcase_section_selection(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.update_testcase_section_selection(
             team_id=team_id,
@@ -526,7 +609,7 @@ async def open_testcase_set_selection(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.open_testcase_set_selection(
             team_id=team_id,
@@ -548,7 +631,7 @@ async def return_to_testcase_review(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.return_to_testcase_review(
             team_id=team_id,
@@ -571,7 +654,7 @@ async def commit_selected_testcases(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         if request.testcase_draft_set_id != draft_set_id:
             raise HTTPException(
@@ -598,7 +681,7 @@ async def fetch_ticket(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.fetch_ticket(
             team_id=team_id,
@@ -617,7 +700,7 @@ async def reparse_ticket(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.reparse_ticket(
             team_id=team_id,
@@ -636,7 +719,7 @@ async def reload_ticket_from_jira(
 ) -> QAAIHelperWorkspaceResponse:
     """從 JIRA 重新取得 ticket 內容並更新 ticket_snapshot（不進入 canonical revision 流程）。"""
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.reload_ticket_from_jira(
             team_id=team_id,
@@ -654,7 +737,7 @@ async def save_canonical_revision(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.save_canonical_revision(
             team_id=team_id,
@@ -674,7 +757,7 @@ async def plan_session(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.plan_session(
             team_id=team_id,
@@ -694,7 +777,7 @@ async def apply_planning_overrides(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.apply_planning_overrides(
             team_id=team_id,
@@ -714,7 +797,7 @@ async def apply_requirement_delta(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.apply_requirement_delta(
             team_id=team_id,
@@ -734,7 +817,7 @@ async def lock_planning(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.lock_planning(
             team_id=team_id,
@@ -753,7 +836,7 @@ async def unlock_planning(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.unlock_planning(team_id=team_id, session_id=session_id)
     except Exception as exc:  # noqa: BLE001
@@ -768,7 +851,7 @@ async def generate_drafts(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.generate_drafts(
             team_id=team_id,
@@ -789,7 +872,7 @@ async def update_draft(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.update_draft(
             team_id=team_id,
@@ -810,7 +893,7 @@ async def discard_draft_set(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperWorkspaceResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.discard_draft_set(
             team_id=team_id,
@@ -829,7 +912,7 @@ async def commit_draft_set(
     current_user: User = Depends(get_current_user),
 ) -> QAAIHelperCommitResponse:
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
     try:
         return await service.commit_draft_set(
             team_id=team_id,
@@ -844,12 +927,13 @@ async def commit_draft_set(
 async def run_council_inspection(
     team_id: int,
     session_id: int,
+    bypass_cache: bool = Query(False),
     current_user: User = Depends(get_current_user),
 ) -> StreamingResponse:
     """Run council inspection and stream SSE progress events."""
     await _verify_team_write_access(team_id=team_id, current_user=current_user)
 
-    service = QAAIHelperService()
+    service = get_qa_ai_helper_service()
 
     from app.models.database_models import (
         QAAIHelperSession as SessionDB,
@@ -888,6 +972,7 @@ async def run_council_inspection(
                 session=session_obj,
                 ticket_snapshot=snapshot_obj,
                 on_event=on_event,
+                bypass_cache=bypass_cache,
             )
             if result.get("success") and result.get("sections_payload"):
                 await service.apply_council_inspection_results(
@@ -11,14 +11,13 @@ import hashlib
 import json
 import logging
 import math
-import time
 from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import require_admin
@@ -29,13 +28,18 @@ from app.models.database_models import (
     QAAIHelperSeedSet,
     QAAIHelperSession,
     QAAIHelperTelemetryEvent,
-    QAAIHelperTestcaseDraft,
     QAAIHelperTestcaseDraftSet,
     Team,
     TestCaseLocal,
     User,
 )
 from app.models.team import TeamStatus
+from app.services.qa_ai_helper_usage_stats import (
+    UsageTotals,
+    load_daily_usage,
+    qa_ai_helper_stats_cache,
+    summarize_usage,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -47,10 +51,9 @@ router = APIRouter(
 MAX_STAT_RANGE_DAYS = 90
 
 # ---------------------------------------------------------------------------
-# 快取（60 秒 TTL）
+# 快取（有界 LRU，60 秒 TTL；session commit 時清除）
 # ---------------------------------------------------------------------------
-_cache: Dict[str, Tuple[float, Any]] = {}
-_CACHE_TTL = 60.0
+_cache = qa_ai_helper_stats_cache
 
 
 def _cache_key(endpoint: str, **params: Any) -> str:
@@ -59,14 +62,11 @@ def _cache_key(endpoint: str, **params: Any) -> str:
 
 
 def _get_cached(key: str) -> Any | None:
-    entry = _cache.get(key)
-    if entry and (time.monotonic() - entry[0]) < _CACHE_TTL:
-        return entry[1]
-    return None
+    return _cache.get(key)
 
 
 def _set_cached(key: str, value: Any) -> None:
-    _cache[key] = (time.monotonic(), value)
+    _cache.set(key, value)
 
 
 # ---------------------------------------------------------------------------
@@ -197,148 +197,51 @@ async def get_qa_ai_helper_overview(
         if cached is not None:
             return JSONResponse(cached)
 
-        async def _load(sess: AsyncSession) -> Dict[str, Any]:
-            conds = _session_filter(start_dt, end_dt, parsed_team_ids)
-
-            # -- session 統計 --
-            base = select(QAAIHelperSession).where(*conds)
-            all_sessions = (await sess.execute(base)).scalars().all()
-
-            total = len(all_sessions)
-            completed = sum(1 for s in all_sessions if s.status == "completed")
-            failed = sum(1 for s in all_sessions if s.status == "failed")
-
-            session_ids = {s.id for s in all_sessions}
-            involved_team_ids = {s.team_id for s in all_sessions}
-
-            # -- seed sets 聚合 --
-            if session_ids:
-                ss_rows = (
-                    await sess.execute(
-                        select(
-                            QAAIHelperSession.team_id,
-                            func.sum(QAAIHelperSeedSet.generated_seed_count),
-                            func.sum(QAAIHelperSeedSet.included_seed_count),
-                        )
-                        .join(QAAIHelperSession, QAAIHelperSeedSet.session_id == QAAIHelperSession.id)
-                        .where(QAAIHelperSeedSet.session_id.in_(session_ids))
-                        .group_by(QAAIHelperSession.team_id)
-                    )
-                ).all()
-            else:
-                ss_rows = []
-
-            team_seed: Dict[int, Dict[str, int]] = {}
-            total_gen_seed = 0
-            total_inc_seed = 0
-            for tid, gen, inc in ss_rows:
-                g, i = int(gen or 0), int(inc or 0)
-                team_seed[tid] = {"generated": g, "included": i}
-                total_gen_seed += g
-                total_inc_seed += i
-
-            # -- testcase draft sets 聚合 --
-            if session_ids:
-                td_rows = (
-                    await sess.execute(
-                        select(
-                            QAAIHelperSession.team_id,
-                            func.sum(QAAIHelperTestcaseDraftSet.generated_testcase_count),
-                            func.sum(QAAIHelperTestcaseDraftSet.selected_for_commit_count),
-                        )
-                        .join(QAAIHelperSession, QAAIHelperTestcaseDraftSet.session_id == QAAIHelperSession.id)
-                        .where(QAAIHelperTestcaseDraftSet.session_id.in_(session_ids))
-                        .group_by(QAAIHelperSession.team_id)
-                    )
-                ).all()
-            else:
-                td_rows = []
-
-            team_tc: Dict[int, Dict[str, int]] = {}
-            total_gen_tc = 0
-            total_sel_tc = 0
-            for tid, gen, sel in td_rows:
-                g, s = int(gen or 0), int(sel or 0)
-                team_tc[tid] = {"generated": g, "selected": s}
-                total_gen_tc += g
-                total_sel_tc += s
-
-            # -- commit links 聚合 --
-            if session_ids:
-                cl_rows = (
-                    await sess.execute(
-                        select(
-                            QAAIHelperSession.team_id,
-                            func.count(QAAIHelperCommitLink.id),
-                        )
-                        .join(QAAIHelperSession, QAAIHelperCommitLink.session_id == QAAIHelperSession.id)
-                        .where(QAAIHelperCommitLink.session_id.in_(session_ids))
-                        .group_by(QAAIHelperSession.team_id)
-                    )
-                ).all()
-            else:
-                cl_rows = []
-
-            team_committed: Dict[int, int] = {}
-            total_committed = 0
-            for tid, cnt in cl_rows:
-                c = int(cnt or 0)
-                team_committed[tid] = c
-                total_committed += c
-
-            # -- 團隊名稱 --
-            team_names = await _load_team_names(sess, involved_team_ids)
-
-            # -- 團隊排行 session 計數 --
-            team_session_counts: Dict[int, Dict[str, int]] = defaultdict(lambda: {"total": 0, "completed": 0})
-            for s in all_sessions:
-                team_session_counts[s.team_id]["total"] += 1
-                if s.status == "completed":
-                    team_session_counts[s.team_id]["completed"] += 1
-
-            team_ranking = []
-            for tid in sorted(involved_team_ids):
-                sc = team_session_counts[tid]
-                sd_data = team_seed.get(tid, {"generated": 0, "included": 0})
-                td_data = team_tc.get(tid, {"generated": 0, "selected": 0})
-                committed_count = team_committed.get(tid, 0)
-                team_ranking.append(
-                    {
-                        "team_id": tid,
-                        "team_name": team_names.get(tid, f"Team #{tid}"),
-                        "session_count": sc["total"],
-                        "completed_session_count": sc["completed"],
-                        "completion_rate": _safe_adoption(sc["completed"], sc["total"]),
-                        "generated_seed_count": sd_data["generated"],
-                        "included_seed_count": sd_data["included"],
-                        "seed_adoption_rate": _safe_adoption(sd_data["included"], sd_data["generated"]),
-                        "generated_tc_count": td_data["generated"],
-                        "selected_tc_count": td_data["selected"],
-                        "tc_adoption_rate": _safe_adoption(td_data["selected"], td_data["generated"]),
-                        "committed_tc_count": committed_count,
-                    }
-                )
-
-            # 按 committed_tc_count 降序
-            team_ranking.sort(key=lambda x: x["committed_tc_count"], reverse=True)
-
-            return {
-                "kpi": {
-                    "total_sessions": total,
-                    "completed_sessions": completed,
-                    "completion_rate": _safe_adoption(completed, total),
-                    "failed_sessions": failed,
-                    "total_seeds_generated": total_gen_seed,
-                    "total_tcs_generated": total_gen_tc,
-                    "total_tcs_committed": total_committed,
-                    "overall_seed_adoption_rate": _safe_adoption(total_inc_seed, total_gen_seed),
-                    "overall_tc_adoption_rate": _safe_adoption(total_sel_tc, total_gen_tc),
-                },
-                "team_ranking": team_ranking,
-                "date_range": _date_range_payload(sd, ed, range_days),
-            }
+        rows = await load_daily_usage(
+            main_boundary, start_dt=start_dt, end_dt=end_dt, team_ids=parsed_team_ids
+        )
+        overall = summarize_usage(rows).get(None, UsageTotals())
+        by_team = summarize_usage(rows, key=lambda row: row.team_id)
+        team_names = await main_boundary.run_read(lambda sess: _load_team_names(sess, set(by_team)))
+
+        team_ranking = []
+        for tid in sorted(by_team):
+            totals = by_team[tid]
+            team_ranking.append(
+                {
+                    "team_id": tid,
+                    "team_name": team_names.get(tid, f"Team #{tid}"),
+                    "session_count": totals.session_count,
+                    "completed_session_count": totals.completed_session_count,
+                    "completion_rate": _safe_adoption(totals.completed_session_count, totals.session_count),
+                    "generated_seed_count": totals.generated_seed_count,
+                    "included_seed_count": totals.included_seed_count,
+                    "seed_adoption_rate": _safe_adoption(totals.included_seed_count, totals.generated_seed_count),
+                    "generated_tc_count": totals.generated_tc_count,
+                    "selected_tc_count": totals.selected_tc_count,
+                    "tc_adoption_rate": _safe_adoption(totals.selected_tc_count, totals.generated_tc_count),
+                    "committed_tc_count": totals.committed_tc_count,
+                }
+            )
 
-        payload = await main_boundary.run_read(_load)
+        # 按 committed_tc_count 降序
+        team_ranking.sort(key=lambda x: x["committed_tc_count"], reverse=True)
+
+        payload = {
+            "kpi": {
+                "total_sessions": overall.session_count,
+                "completed_sessions": overall.completed_session_count,
+                "completion_rate": _safe_adoption(overall.completed_session_count, overall.session_count),
+                "failed_sessions": overall.failed_session_count,
+                "total_seeds_generated": overall.generated_seed_count,
+                "total_tcs_generated": overall.generated_tc_count,
+                "total_tcs_committed": overall.committed_tc_count,
+                "overall_seed_adoption_rate": _safe_adoption(overall.included_seed_count, overall.generated_seed_count),
+                "overall_tc_adoption_rate": _safe_adoption(overall.selected_tc_count, overall.generated_tc_count),
+            },
+            "team_ranking": team_ranking,
+            "date_range": _date_range_payload(sd, ed, range_days),
+        }
         _set_cached(ck, payload)
         return JSONResponse(payload)
 
@@ -372,239 +275,115 @@ async def get_qa_ai_helper_adoption(
 
         date_labels = _build_date_labels(date.fromisoformat(sd), date.fromisoformat(ed))
 
-        async def _load(sess: AsyncSession) -> Dict[str, Any]:
-            conds = _session_filter(start_dt, end_dt, parsed_team_ids)
-            all_sessions = (await sess.execute(select(QAAIHelperSession).where(*conds))).scalars().all()
-
-            session_ids = {s.id for s in all_sessions}
-            involved_team_ids = {s.team_id for s in all_sessions}
-            session_team_map = {s.id: s.team_id for s in all_sessions}
-            session_user_map = {s.id: s.created_by_user_id for s in all_sessions}
-
-            if not session_ids:
-                return _empty_adoption(date_labels, sd, ed, range_days)
-
-            # -- seed sets (set 級別) --
-            ss_rows = (
-                (await sess.execute(select(QAAIHelperSeedSet).where(QAAIHelperSeedSet.session_id.in_(session_ids))))
-                .scalars()
-                .all()
-            )
-
-            # -- testcase draft sets (set 級別) --
-            td_rows = (
-                (
-                    await sess.execute(
-                        select(QAAIHelperTestcaseDraftSet).where(QAAIHelperTestcaseDraftSet.session_id.in_(session_ids))
-                    )
-                )
-                .scalars()
-                .all()
-            )
-
-            # -- seed items (item 級別，用於 edit rate / ai ratio) --
-            si_rows = (
-                await sess.execute(
-                    select(
-                        QAAIHelperSeedItem.is_ai_generated,
-                        QAAIHelperSeedItem.user_edited,
-                    )
-                    .join(QAAIHelperSeedSet, QAAIHelperSeedItem.seed_set_id == QAAIHelperSeedSet.id)
-                    .where(QAAIHelperSeedSet.session_id.in_(session_ids))
-                )
-            ).all()
-
-            # -- testcase drafts (item 級別) --
-            tcd_rows = (
-                await sess.execute(
-                    select(
-                        QAAIHelperTestcaseDraft.is_ai_generated,
-                        QAAIHelperTestcaseDraft.user_edited,
-                    )
-                    .join(
-                        QAAIHelperTestcaseDraftSet,
-                        QAAIHelperTestcaseDraft.testcase_draft_set_id == QAAIHelperTestcaseDraftSet.id,
-                    )
-                    .where(QAAIHelperTestcaseDraftSet.session_id.in_(session_ids))
-                )
-            ).all()
-
-            # ---- overall ----
-            total_gen_seed = sum(s.generated_seed_count or 0 for s in ss_rows)
-            total_inc_seed = sum(s.included_seed_count or 0 for s in ss_rows)
-            total_gen_tc = sum(t.generated_testcase_count or 0 for t in td_rows)
-            total_sel_tc = sum(t.selected_for_commit_count or 0 for t in td_rows)
-
-            all_items = list(si_rows) + list(tcd_rows)
-            total_items = len(all_items)
-            ai_count = sum(1 for r in all_items if r[0])
-            edited_count = sum(1 for r in all_items if r[1])
-
-            overall = {
-                "seed_adoption_rate": _safe_adoption(total_inc_seed, total_gen_seed),
-                "tc_adoption_rate": _safe_adoption(total_sel_tc, total_gen_tc),
-                "user_edit_rate": _safe_adoption(edited_count, total_items),
-                "ai_generated_ratio": _safe_adoption(ai_count, total_items),
+        rows = await load_daily_usage(
+            main_boundary, start_dt=start_dt, end_dt=end_dt, team_ids=parsed_team_ids
+        )
+        if not rows:
+            payload = _empty_adoption(date_labels, sd, ed, range_days)
+            _set_cached(ck, payload)
+            return JSONResponse(payload)
+
+        by_team = summarize_usage(rows, key=lambda row: row.team_id)
+        by_date = summarize_usage(rows, key=lambda row: row.stat_date.isoformat())
+        by_team_date = summarize_usage(rows, key=lambda row: (row.team_id, row.stat_date.isoformat()))
+        by_user = {
+            uid: totals
+            for uid, totals in summarize_usage(
+                (row for row in rows if row.user_id is not None), key=lambda row: row.user_id
+            ).items()
+            if totals.output_session_count > 0
+        }
+        # user -> team 映射（取最常用的 team）
+        user_team_sessions = summarize_usage(
+            (row for row in rows if row.user_id in by_user), key=lambda row: (row.user_id, row.team_id)
+        )
+        user_team: Dict[int, int] = {}
+        for (uid, tid), totals in sorted(user_team_sessions.items()):
+            current = user_team.get(uid)
+            if current is None or totals.session_count > user_team_sessions[(uid, current)].session_count:
+                user_team[uid] = tid
+
+        async def _load_names(sess: AsyncSession) -> Tuple[Dict[int, str], Dict[int, str]]:
+            team_names = await _load_team_names(sess, set(by_team))
+            user_names = await _load_user_names(sess, set(by_user)) if by_user else {}
+            return team_names, user_names
+
+        team_names, user_names = await main_boundary.run_read(_load_names)
+
+        def _trend(series: Dict[Any, UsageTotals], key_of) -> Dict[str, List[float]]:
+            empty = UsageTotals()
+            points = [series.get(key_of(d), empty) for d in date_labels]
+            return {
+                "seed_adoption": [_safe_adoption(p.included_seed_count, p.generated_seed_count) for p in points],
+                "tc_adoption": [_safe_adoption(p.selected_tc_count, p.generated_tc_count) for p in points],
             }
 
-            # ---- overall trend (按日) ----
-            date_seed_gen: Dict[str, int] = defaultdict(int)
-            date_seed_inc: Dict[str, int] = defaultdict(int)
-            date_tc_gen: Dict[str, int] = defaultdict(int)
-            date_tc_sel: Dict[str, int] = defaultdict(int)
-
-            for ss in ss_rows:
-                d = ss.created_at.date().isoformat() if ss.created_at else None
-                if d:
-                    date_seed_gen[d] += ss.generated_seed_count or 0
-                    date_seed_inc[d] += ss.included_seed_count or 0
-
-            for td in td_rows:
-                d = td.created_at.date().isoformat() if td.created_at else None
-                if d:
-                    date_tc_gen[d] += td.generated_testcase_count or 0
-                    date_tc_sel[d] += td.selected_for_commit_count or 0
-
-            overall_trend = {
-                "dates": date_labels,
-                "seed_adoption": [
-                    _safe_adoption(date_seed_inc.get(d, 0), date_seed_gen.get(d, 0)) for d in date_labels
-                ],
-                "tc_adoption": [_safe_adoption(date_tc_sel.get(d, 0), date_tc_gen.get(d, 0)) for d in date_labels],
+        # ---- overall ----
+        overall_totals = summarize_usage(rows)[None]
+        overall = {
+            "seed_adoption_rate": _safe_adoption(overall_totals.included_seed_count, overall_totals.generated_seed_count),
+            "tc_adoption_rate": _safe_adoption(overall_totals.selected_tc_count, overall_totals.generated_tc_count),
+            "user_edit_rate": _safe_adoption(overall_totals.edited_item_count, overall_totals.item_count),
+            "ai_generated_ratio": _safe_adoption(overall_totals.ai_item_count, overall_totals.item_count),
+        }
+
+        # ---- overall trend (按 session 建立日) ----
+        overall_trend = {"dates": date_labels, **_trend(by_date, lambda d: d)}
+
+        # ---- by team ----
+        team_ranking_list: List[Dict[str, Any]] = []
+        by_team_trend: List[Dict[str, Any]] = []
+        for tid in sorted(by_team):
+            totals = by_team[tid]
+            entry = {
+                "team_id": tid,
+                "team_name": team_names.get(tid, f"Team #{tid}"),
+                "seed_adoption_rate": _safe_adoption(totals.included_seed_count, totals.generated_seed_count),
+                "tc_adoption_rate": _safe_adoption(totals.selected_tc_count, totals.generated_tc_count),
+                "generated_seed_count": totals.generated_seed_count,
+                "generated_tc_count": totals.generated_tc_count,
+                "sample_count": totals.output_session_count,
             }
-
-            # ---- by team ----
-            team_ss: Dict[int, List] = defaultdict(list)
-            for ss in ss_rows:
-                tid = session_team_map.get(ss.session_id)
-                if tid is not None:
-                    team_ss[tid].append(ss)
-
-            team_td: Dict[int, List] = defaultdict(list)
-            for td in td_rows:
-                tid = session_team_map.get(td.session_id)
-                if tid is not None:
-                    team_td[tid].append(td)
-
-            team_names = await _load_team_names(sess, involved_team_ids)
-
-            team_ranking_list: List[Dict[str, Any]] = []
-            by_team_trend: List[Dict[str, Any]] = []
-
-            for tid in sorted(involved_team_ids):
-                t_ss = team_ss.get(tid, [])
-                t_td = team_td.get(tid, [])
-                g_seed = sum(s.generated_seed_count or 0 for s in t_ss)
-                i_seed = sum(s.included_seed_count or 0 for s in t_ss)
-                g_tc = sum(t.generated_testcase_count or 0 for t in t_td)
-                s_tc = sum(t.selected_for_commit_count or 0 for t in t_td)
-                sample = len({s.session_id for s in t_ss} | {t.session_id for t in t_td})
-
-                entry = {
+            team_ranking_list.append(entry)
+            by_team_trend.append(
+                {
                     "team_id": tid,
-                    "team_name": team_names.get(tid, f"Team #{tid}"),
-                    "seed_adoption_rate": _safe_adoption(i_seed, g_seed),
-                    "tc_adoption_rate": _safe_adoption(s_tc, g_tc),
-                    "generated_seed_count": g_seed,
-                    "generated_tc_count": g_tc,
-                    "sample_count": sample,
+                    "team_name": entry["team_name"],
+                    "seed_adoption_rate": entry["seed_adoption_rate"],
+                    "tc_adoption_rate": entry["tc_adoption_rate"],
+                    "trend": {"dates": date_labels, **_trend(by_team_date, lambda d, tid=tid: (tid, d))},
                 }
-                team_ranking_list.append(entry)
-
-                # team trend
-                t_date_sg: Dict[str, int] = defaultdict(int)
-                t_date_si: Dict[str, int] = defaultdict(int)
-                t_date_tg: Dict[str, int] = defaultdict(int)
-                t_date_ts: Dict[str, int] = defaultdict(int)
-                for ss in t_ss:
-                    d = ss.created_at.date().isoformat() if ss.created_at else None
-                    if d:
-                        t_date_sg[d] += ss.generated_seed_count or 0
-                        t_date_si[d] += ss.included_seed_count or 0
-                for td in t_td:
-                    d = td.created_at.date().isoformat() if td.created_at else None
-                    if d:
-                        t_date_tg[d] += td.generated_testcase_count or 0
-                        t_date_ts[d] += td.selected_for_commit_count or 0
-
-                by_team_trend.append(
-                    {
-                        "team_id": tid,
-                        "team_name": team_names.get(tid, f"Team #{tid}"),
-                        "seed_adoption_rate": entry["seed_adoption_rate"],
-                        "tc_adoption_rate": entry["tc_adoption_rate"],
-                        "trend": {
-                            "dates": date_labels,
-                            "seed_adoption": [
-                                _safe_adoption(t_date_si.get(d, 0), t_date_sg.get(d, 0)) for d in date_labels
-                            ],
-                            "tc_adoption": [
-                                _safe_adoption(t_date_ts.get(d, 0), t_date_tg.get(d, 0)) for d in date_labels
-                            ],
-                        },
-                    }
-                )
-
-            # 排名按 tc_adoption_rate 降序
-            team_ranking_list.sort(key=lambda x: x["tc_adoption_rate"], reverse=True)
-            # trend 只取 Top 10 (按 sample_count 降序選最活躍的)
-            by_team_trend.sort(key=lambda x: x.get("tc_adoption_rate", 0), reverse=True)
-            by_team_trend_top10 = by_team_trend[:10]
-
-            # ---- user ranking (Top 20) ----
-            user_ss: Dict[int, List] = defaultdict(list)
-            for ss in ss_rows:
-                uid = session_user_map.get(ss.session_id)
-                if uid is not None:
-                    user_ss[uid].append(ss)
-
-            user_td: Dict[int, List] = defaultdict(list)
-            for td in td_rows:
-                uid = session_user_map.get(td.session_id)
-                if uid is not None:
-                    user_td[uid].append(td)
-
-            all_user_ids = set(user_ss.keys()) | set(user_td.keys())
-            user_names = await _load_user_names(sess, all_user_ids) if all_user_ids else {}
-            # user -> team 映射（取最常用的 team）
-            user_team: Dict[int, int] = {}
-            for s in all_sessions:
-                if s.created_by_user_id is not None:
-                    user_team.setdefault(s.created_by_user_id, s.team_id)
-
-            user_ranking: List[Dict[str, Any]] = []
-            for uid in all_user_ids:
-                u_ss = user_ss.get(uid, [])
-                u_td = user_td.get(uid, [])
-                g_seed = sum(s.generated_seed_count or 0 for s in u_ss)
-                i_seed = sum(s.included_seed_count or 0 for s in u_ss)
-                g_tc = sum(t.generated_testcase_count or 0 for t in u_td)
-                s_tc = sum(t.selected_for_commit_count or 0 for t in u_td)
-                session_count = len({s.session_id for s in u_ss} | {t.session_id for t in u_td})
-                tid = user_team.get(uid, 0)
-                user_ranking.append(
-                    {
-                        "user_id": uid,
-                        "username": user_names.get(uid, f"user#{uid}"),
-                        "team_name": team_names.get(tid, f"Team #{tid}"),
-                        "seed_adoption_rate": _safe_adoption(i_seed, g_seed),
-                        "tc_adoption_rate": _safe_adoption(s_tc, g_tc),
-                        "session_count": session_count,
-                    }
-                )
-            user_ranking.sort(key=lambda x: x["tc_adoption_rate"], reverse=True)
-            user_ranking = user_ranking[:20]
-
-            return {
-                "overall": overall,
-                "overall_trend": overall_trend,
-                "by_team_trend": by_team_trend_top10,
-                "team_ranking": team_ranking_list,
-                "user_ranking": user_ranking,
-                "date_range": _date_range_payload(sd, ed, range_days),
-            }
+            )
 
-        payload = await main_boundary.run_read(_load)
+        # 排名按 tc_adoption_rate 降序
+        team_ranking_list.sort(key=lambda x: x["tc_adoption_rate"], reverse=True)
+        # trend 只取 Top 10
+        by_team_trend.sort(key=lambda x: x.get("tc_adoption_rate", 0), reverse=True)
+
+        # ---- user ranking (Top 20) ----
+        user_ranking: List[Dict[str, Any]] = []
+        for uid, totals in by_user.items():
+            tid = user_team.get(uid, 0)
+            user_ranking.append(
+                {
+                    "user_id": uid,
+                    "username": user_names.get(uid, f"user#{uid}"),
+                    "team_name": team_names.get(tid, f"Team #{tid}"),
+                    "seed_adoption_rate": _safe_adoption(totals.included_seed_count, totals.generated_seed_count),
+                    "tc_adoption_rate": _safe_adoption(totals.selected_tc_count, totals.generated_tc_count),
+                    "session_count": totals.output_session_count,
+                }
+            )
+        user_ranking.sort(key=lambda x: x["tc_adoption_rate"], reverse=True)
+
+        payload = {
+            "overall": overall,
+            "overall_trend": overall_trend,
+            "by_team_trend": by_team_trend[:10],
+            "team_ranking": team_ranking_list,
+            "user_ranking": user_ranking[:20],
+            "date_range": _date_range_payload(sd, ed, range_days),
+        }
         _set_cached(ck, payload)
         return JSONResponse(payload)
 
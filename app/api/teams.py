@@ -15,9 +15,11 @@ from app.auth.permission_service import permission_service
 from app.models.database_models import User
 from app.models.team import TeamCreate, TeamStatus, TeamUpdate
 from app.models.lark_types import Priority
+from app.services.dashboard_service import invalidate_dashboard_snapshots
 from app.models.database_models import (
     Team as TeamDB,
     TestRunConfig as TestRunConfigDB,
+    TestRunConfigScope as TestRunConfigScopeDB,
     TestRunItem as TestRunItemDB,
     TestRunItemResultHistory as ResultHistoryDB,
     SyncHistory as SyncHistoryDB,
@@ -175,7 +177,10 @@ async def create_team(
             await session.refresh(team_db)
             return team_db_to_model(team_db)
 
-        return await main_boundary.run_write(_create_team)
+        created = await main_boundary.run_write(_create_team)
+        # 團隊清單未經審計事件通知，需主動讓首頁 snapshot 失效
+        invalidate_dashboard_snapshots()
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -279,6 +284,7 @@ async def update_team(
             return team_db_to_model(team_db, test_case_count=count_result.scalar() or 0)
 
         result = await main_boundary.run_write(_update_team)
+        invalidate_dashboard_snapshots()
 
         # A rename strands this team's Jenkins jobs/view + Allure projects (all
         # embed the team name/slug). Re-sync them to the new name in an isolated,
@@ -339,6 +345,13 @@ async def delete_team(
             await session.execute(
                 delete(TestRunItemDB).where(TestRunItemDB.team_id == team_id)
             )
+            await session.execute(
+                delete(TestRunConfigScopeDB).where(
+                    TestRunConfigScopeDB.config_id.in_(
+                        select(TestRunConfigDB.id).where(TestRunConfigDB.team_id == team_id)
+                    )
+                )
+            )
             await session.execute(
                 delete(TestRunConfigDB).where(TestRunConfigDB.team_id == team_id)
             )
@@ -366,6 +379,7 @@ async def delete_team(
             pass
 
         await main_boundary.run_write(_delete_team)
+        invalidate_dashboard_snapshots()
 
         # 嘗試移除磁碟附件資料夾（非致命）
         try:
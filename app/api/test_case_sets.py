@@ -2,25 +2,25 @@
 測試案例集合 (Test Case Set) API 路由
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import csv
-import io
 import json
 import logging
 from datetime import datetime
 
 from ..database import get_db
-from ..db_access.main import create_main_access_boundary_for_session
+from ..db_access.main import create_main_access_boundary_for_session, get_main_access_boundary
 from ..auth.dependencies import get_current_user
 from ..auth.models import User
 from ..models.database_models import (
     TestCaseSet as TestCaseSetDB,
     Team as TeamDB,
     TestCaseLocal,
+    TestCaseSection,
 )
 from ..models.test_case_set import (
     TestCaseSet,
@@ -35,8 +35,13 @@ from ..models.test_case import (
 )
 from ..models.test_run_scope import ImpactPreviewResponse
 from ..services.test_case_set_service import TestCaseSetService
-from ..services.test_case_repo_service import TestCaseRepoService
 from ..services.test_run_scope_service import TestRunScopeService
+from ..services.tabular_export import (
+    EXPORT_MEDIA_TYPES,
+    is_export_format_available,
+    iter_statement_chunks,
+    stream_tabular_export,
+)
 from ..audit import audit_service, ActionType, ResourceType, AuditSeverity
 
 
@@ -60,6 +65,21 @@ TEST_CASE_SET_CSV_COLUMNS = [
     "updated_at",
 ]
 
+# 匯出只讀取需要的欄位，避免載入完整 ORM 物件
+TEST_CASE_SET_EXPORT_FIELDS = (
+    TestCaseLocal.test_case_number,
+    TestCaseLocal.title,
+    TestCaseLocal.priority,
+    TestCaseLocal.test_case_section_id,
+    TestCaseLocal.precondition,
+    TestCaseLocal.steps,
+    TestCaseLocal.expected_result,
+    TestCaseLocal.tcg_json,
+    TestCaseLocal.test_data_json,
+    TestCaseLocal.created_at,
+    TestCaseLocal.updated_at,
+)
+
 
 def _csv_datetime(value) -> str:
     if value is None:
@@ -603,13 +623,18 @@ async def validate_test_case_set_name(
 
 @router.get("/{team_id}/test-case-sets/{set_id}/export-csv")
 async def export_test_case_set_csv(
+    request: Request,
     team_id: int,
     set_id: int,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$", description="匯出格式"),
     current_user: User = Depends(get_current_user),
     team: TeamDB = Depends(verify_team_write_permission),
     db: AsyncSession = Depends(get_db),
 ) -> StreamingResponse:
-    """匯出指定 Test Case Set 內全部 Test Cases 為 CSV"""
+    """匯出指定 Test Case Set 內全部 Test Cases 為 CSV（或 XLSX）
+
+    以 server-side cursor 分批讀取並逐批送出，記憶體用量不隨 Set 大小成長。
+    """
     try:
         service = TestCaseSetService(db)
         set_data = await service.get_by_id(set_id, team_id)
@@ -618,40 +643,42 @@ async def export_test_case_set_csv(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Test Case Set {set_id} not found",
             )
+        if not is_export_format_available(export_format):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"匯出格式 {export_format} 目前不可用",
+            )
 
         main_boundary = create_main_access_boundary_for_session(db)
 
-        def _load_rows(sync_db: Session):
-            rows = (
-                sync_db.query(TestCaseLocal)
-                .filter(
-                    TestCaseLocal.team_id == team_id,
-                    TestCaseLocal.test_case_set_id == set_id,
-                )
-                .order_by(
-                    TestCaseLocal.test_case_number.asc(),
-                    TestCaseLocal.id.asc(),
-                )
+        def _load_section_names(sync_db: Session):
+            return dict(
+                sync_db.query(TestCaseSection.id, TestCaseSection.name)
+                .filter(TestCaseSection.test_case_set_id == set_id)
                 .all()
             )
-            section_lookup = TestCaseRepoService(db)._build_section_lookup(sync_db, rows)
-            return rows, section_lookup
 
-        rows, section_lookup = await main_boundary.run_sync_read(_load_rows)
+        section_names = await main_boundary.run_sync_read(_load_section_names)
 
-        output = io.StringIO(newline="")
-        writer = csv.writer(output)
-        writer.writerow(TEST_CASE_SET_CSV_COLUMNS)
+        statement = (
+            select(*TEST_CASE_SET_EXPORT_FIELDS)
+            .where(
+                TestCaseLocal.team_id == team_id,
+                TestCaseLocal.test_case_set_id == set_id,
+            )
+            .order_by(
+                TestCaseLocal.test_case_number.asc(),
+                TestCaseLocal.id.asc(),
+            )
+        )
 
-        for row in rows:
+        def _build_row(row):
             section_id = row.test_case_section_id
             if section_id is None:
                 section_name = "Unassigned"
             else:
-                section_meta = section_lookup.get(section_id, {})
-                section_name = section_meta.get("name") or ""
-
-            writer.writerow([
+                section_name = section_names.get(section_id) or ""
+            return [
                 _csv_text(row.test_case_number),
                 _csv_text(row.title),
                 _csv_enum(row.priority),
@@ -663,14 +690,25 @@ async def export_test_case_set_csv(
                 _csv_test_data_cell(row.test_data_json),
                 _csv_datetime(row.created_at),
                 _csv_datetime(row.updated_at),
-            ])
-
-        csv_bytes = output.getvalue().encode("utf-8-sig")
-        filename = f"test_case_set_{set_id}_test_cases_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.csv"
+            ]
+
+        # 串流期間 request-scoped session 可能已結束，改用獨立的 boundary session
+        body = stream_tabular_export(
+            export_format,
+            TEST_CASE_SET_CSV_COLUMNS,
+            iter_statement_chunks(get_main_access_boundary(), statement),
+            _build_row,
+            sheet_title=f"Test Case Set {set_id}",
+            is_disconnected=request.is_disconnected,
+        )
+        filename = (
+            f"test_case_set_{set_id}_test_cases_"
+            f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+        )
 
         return StreamingResponse(
-            iter([csv_bytes]),
-            media_type="text/csv; charset=utf-8",
+            body,
+            media_type=EXPORT_MEDIA_TYPES[export_format],
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
 
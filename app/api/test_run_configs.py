@@ -13,7 +13,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.db_access import MainAccessBoundary, get_main_access_boundary
 from app.database import get_db
@@ -185,8 +185,23 @@ def sync_notify_chats_to_db(config_db: TestRunConfigDB, chat_ids: Optional[List[
     config_db.notify_chats_search = search_string
 
 
-def convert_db_to_model(config_db: TestRunConfigDB, db: Optional[Session] = None) -> TestRunConfig:
-    """將資料庫 TestRunConfig 模型轉換為 API 模型"""
+def _config_set_membership_loader():
+    """列表查詢一次載入所屬 Test Run Set，避免逐筆 lazy load"""
+    return selectinload(TestRunConfigDB.set_membership).selectinload(
+        TestRunSetMembershipDB.test_run_set
+    )
+
+
+def convert_db_to_model(
+    config_db: TestRunConfigDB,
+    db: Optional[Session] = None,
+    scope_ids: Optional[List[int]] = None,
+) -> TestRunConfig:
+    """將資料庫 TestRunConfig 模型轉換為 API 模型
+
+    列表端點可先以 ``TestRunScopeService.get_scope_ids_for_configs`` 批次解析範圍並傳入
+    ``scope_ids``，避免每筆配置各自回退查詢。
+    """
     # 反序列化 TP 票號
     related_tp_tickets = deserialize_tp_tickets(config_db.related_tp_tickets_json)
 
@@ -203,8 +218,11 @@ def convert_db_to_model(config_db: TestRunConfigDB, db: Optional[Session] = None
         if config_db.set_membership.test_run_set:
             set_name = config_db.set_membership.test_run_set.name
 
-    test_case_set_ids = TestRunScopeService.parse_scope_ids_json(config_db.test_case_set_ids_json)
-    if not test_case_set_ids and db is not None:
+    if scope_ids is not None:
+        test_case_set_ids = list(scope_ids)
+    else:
+        test_case_set_ids = TestRunScopeService.parse_scope_ids_json(config_db.test_case_set_ids_json)
+    if not test_case_set_ids and scope_ids is None and db is not None:
         test_case_set_ids = TestRunScopeService.get_config_scope_ids(
             db,
             config_db,
@@ -273,9 +291,13 @@ def convert_model_to_db(config: TestRunConfigCreate) -> TestRunConfigDB:
     )
 
 
-def build_config_summary(config_db: TestRunConfigDB, db: Optional[Session] = None) -> TestRunConfigSummary:
+def build_config_summary(
+    config_db: TestRunConfigDB,
+    db: Optional[Session] = None,
+    scope_ids: Optional[List[int]] = None,
+) -> TestRunConfigSummary:
     """建立 TestRunConfig 摘要模型"""
-    config = convert_db_to_model(config_db, db)
+    config = convert_db_to_model(config_db, db, scope_ids=scope_ids)
     return TestRunConfigSummary(
         id=config.id,
         name=config.name,
@@ -524,17 +546,26 @@ async def get_test_run_configs(
     def _list_configs(sync_db: Session):
         verify_team_exists(team_id, sync_db)
 
-        query = sync_db.query(TestRunConfigDB).filter(TestRunConfigDB.team_id == team_id)
+        query = (
+            sync_db.query(TestRunConfigDB)
+            .options(_config_set_membership_loader())
+            .filter(TestRunConfigDB.team_id == team_id)
+        )
 
         if status_filter:
             query = query.filter(TestRunConfigDB.status == status_filter)
 
         configs_db = query.order_by(TestRunConfigDB.created_at.desc()).all()
+        scope_map = TestRunScopeService.get_scope_ids_for_configs(
+            sync_db, [config_db.id for config_db in configs_db]
+        )
 
         # 轉換為摘要格式（execution_rate/pass_rate 由模型方法計算）
         summaries = []
         for config_db in configs_db:
-            summaries.append(build_config_summary(config_db, sync_db))
+            summaries.append(
+                build_config_summary(config_db, sync_db, scope_ids=scope_map.get(config_db.id, []))
+            )
 
         return summaries
 
@@ -1119,7 +1150,7 @@ async def search_configs_by_tp_tickets(
             return []
 
         # 使用 tp_tickets_search 欄位進行模糊搜尋
-        query = sync_db.query(TestRunConfigDB).filter(
+        query = sync_db.query(TestRunConfigDB).options(_config_set_membership_loader()).filter(
             TestRunConfigDB.team_id == team_id,
             TestRunConfigDB.tp_tickets_search.isnot(None),
             TestRunConfigDB.tp_tickets_search.contains(search_query)
@@ -1128,11 +1159,16 @@ async def search_configs_by_tp_tickets(
         ).limit(limit)
 
         configs_db = query.all()
+        scope_map = TestRunScopeService.get_scope_ids_for_configs(
+            sync_db, [config_db.id for config_db in configs_db]
+        )
 
         # 轉換為摘要格式
         summaries = []
         for config_db in configs_db:
-            config = convert_db_to_model(config_db, sync_db)
+            config = convert_db_to_model(
+                config_db, sync_db, scope_ids=scope_map.get(config_db.id, [])
+            )
 
             # 過濾匹配的 TP 票號 (highlight matching tickets)
             matching_tickets = _filter_matching_tp_tickets(config.related_tp_tickets, search_query)
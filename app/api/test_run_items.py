@@ -5,14 +5,16 @@ Local CRUD for test run items stored in SQLite, detached from Lark.
 Items are created by selecting Test Cases and copying necessary fields.
 """
 
+import asyncio
 from datetime import datetime
 import json
 import logging
 from typing import List, Optional, Any, Dict, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import String, and_, cast, or_
+from sqlalchemy import String, and_, cast, exists, func, insert, literal, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, contains_eager, joinedload
 
@@ -25,6 +27,7 @@ from app.models.database_models import (
     TestRunItemResultHistory as ResultHistoryDB,
     TestCaseLocal as TestCaseLocalDB,
     TestCaseSection,
+    TestCaseSet,
     User,
 )
 from app.models.lark_types import Priority, TestResultStatus, coerce_test_result_status
@@ -39,6 +42,20 @@ from app.services.attachment_storage import (
     normalize_attachment_metadata,
     resolve_attachment_metadata_path,
 )
+from app.services.attachment_upload import (
+    STAGING_DIR_NAME,
+    AttachmentTooLargeError,
+    discard_stored_uploads,
+    get_max_upload_bytes,
+    release_deduplicated_blob,
+    store_upload_streaming,
+)
+from app.services.tabular_export import (
+    EXPORT_MEDIA_TYPES,
+    is_export_format_available,
+    iter_statement_chunks,
+    stream_tabular_export,
+)
 from app.services.test_run_scope_service import TestRunScopeService
 from app.services.test_run_assignee import (
     ASSIGNEE_INPUT_FIELDS,
@@ -68,6 +85,19 @@ async def _require_test_run_write_permission(current_user: User, team_id: int) -
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="需要 Test Run 寫入權限")
 
 
+async def _require_test_run_read_permission(current_user: User, team_id: int) -> None:
+    """Guard bulk read paths (export) that hand out the whole item list at once."""
+
+    permission = await permission_service.check_team_permission(
+        current_user.id,
+        team_id,
+        PermissionType.READ,
+        current_user.role,
+    )
+    if not permission.has_permission:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="無權限存取此團隊的 Test Run")
+
+
 @assignee_router.get("/", response_model=List[Dict[str, Any]])
 async def list_test_run_assignee_candidates(
     team_id: int,
@@ -145,7 +175,9 @@ async def upload_test_run_results(
     調整後流程：
     1. 驗證 Test Run Item 存在
     2. 建立存放路徑：attachments/<team_id>/<config_id>/<item_id>/
-    3. 儲存檔案到檔案系統，檔名：{timestamp}-{sanitized-name}
+    3. 串流儲存檔案（off-loop 寫暫存檔、檢查單檔大小上限、同團隊內以 sha256 去重；
+       請求總大小已由 UploadSizeLimitMiddleware 於解析前把關），
+       檔名：{timestamp}-{sanitized-name}
     4. 更新 test_run_items.execution_results_json 與統計欄位
     5. 回傳上傳明細
     """
@@ -190,38 +222,52 @@ async def upload_test_run_results(
         # 使用設定的附件根目錄（未設定則回退到專案 attachments）
         base_dir = get_attachments_root_dir()
         # 將測試結果檔案統一放在 attachments/test-runs/{team_id}/{config_id}/{item_id}/
-        target_dir = base_dir / "test-runs" / str(team_id) / str(config_id) / str(item_id)
-        target_dir.mkdir(parents=True, exist_ok=True)
+        dedup_scope = base_dir / "test-runs" / str(team_id)
+        target_dir = dedup_scope / str(config_id) / str(item_id)
 
         # 既存的結果 JSON
         existing = item_context["existing_results"]
 
         upload_results = []
+        stored_uploads = []
         ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S-%f")
         safe_re = re.compile(r"[^A-Za-z0-9_.\-]+")
+        max_bytes = get_max_upload_bytes()
 
-        for f in files:
-            orig_name = f.filename or "unnamed"
-            name_part = safe_re.sub("_", orig_name)
-            stored_name = f"{ts}-{name_part}"
-            stored_path = target_dir / stored_name
-
-            # 寫檔
-            content = await f.read()
-            with open(stored_path, "wb") as out:
-                out.write(content)
-
-            item_meta = build_attachment_metadata(
-                root_dir=base_dir,
-                stored_path=stored_path,
-                original_name=orig_name,
-                stored_name=stored_name,
-                size=len(content),
-                content_type=f.content_type or "application/octet-stream",
-                uploaded_at=datetime.utcnow().isoformat(),
-            )
-            existing.append(item_meta)
-            upload_results.append(item_meta)
+        try:
+            for f in files:
+                orig_name = f.filename or "unnamed"
+                name_part = safe_re.sub("_", orig_name)
+                stored_name = f"{ts}-{name_part}"
+
+                # 串流寫檔（不整檔載入記憶體，也不在 event loop 上做阻塞 I/O）
+                stored = await store_upload_streaming(
+                    f,
+                    target_dir / stored_name,
+                    staging_dir=base_dir / STAGING_DIR_NAME,
+                    dedup_scope=dedup_scope,
+                    max_bytes=max_bytes,
+                )
+                stored_uploads.append(stored)
+
+                item_meta = build_attachment_metadata(
+                    root_dir=base_dir,
+                    stored_path=stored.path,
+                    original_name=orig_name,
+                    stored_name=stored_name,
+                    size=stored.size,
+                    content_type=f.content_type or "application/octet-stream",
+                    uploaded_at=datetime.utcnow().isoformat(),
+                    sha256=stored.sha256,
+                )
+                existing.append(item_meta)
+                upload_results.append(item_meta)
+        except AttachmentTooLargeError as exc:
+            await asyncio.to_thread(discard_stored_uploads, stored_uploads, dedup_scope)
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+        except BaseException:
+            await asyncio.to_thread(discard_stored_uploads, stored_uploads, dedup_scope)
+            raise
 
         # 追加上傳歷史
         history = item_context["upload_history"]
@@ -391,6 +437,16 @@ class BatchCreateRequest(BaseModel):
     items: List[TestRunItemCreate]
 
 
+class BatchCreateFromScopeRequest(BaseModel):
+    """由伺服器端依 Test Case Set / Section / 篩選條件直接建立 items，不經由 client 傳送案例資料。"""
+
+    test_case_set_id: int
+    section_ids: Optional[List[int]] = Field(None, description="限定 section；預設含子 section")
+    include_subsections: bool = True
+    priority: Optional[Priority] = None
+    search: Optional[str] = Field(None, description="標題/編號模糊搜尋")
+
+
 class BatchCreateResponse(BaseModel):
     success: bool
     created_count: int
@@ -774,6 +830,277 @@ def resolve_filter_batch_matches_sync(
     return q.order_by(TestRunItemDB.id.asc()).limit(cap + 1).all()
 
 
+# 批次建立時 IN 查詢每批的編號數（避開 SQLite 參數上限）
+BULK_CREATE_LOOKUP_CHUNK_SIZE = 500
+
+
+def _chunks(values: List[Any], size: int):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _normalized_attachments_json(
+    attachments: Optional[List[Any]],
+    cache: Dict[str, Union[Optional[str], Exception]],
+) -> Optional[str]:
+    """正規化附件 metadata 並轉為 JSON；相同 payload 只解析一次路徑。"""
+    if not attachments:
+        return None
+    raw = [a.model_dump() for a in attachments]
+    key = json.dumps(raw, sort_keys=True, default=str)
+    if key not in cache:
+        try:
+            normalized = [normalize_attachment_metadata(item) for item in raw]
+            cache[key] = _to_json(normalized) if normalized else None
+        except Exception as exc:  # noqa: BLE001 - 以 per-item 錯誤回報
+            cache[key] = exc
+    cached = cache[key]
+    if isinstance(cached, Exception):
+        raise cached
+    return cached
+
+
+def _resolve_allowed_scope_sync(sync_db: Session, config_db: TestRunConfigDB) -> set:
+    return set(
+        TestRunScopeService.get_config_scope_ids(
+            sync_db,
+            config_db,
+            allow_fallback=True,
+            persist_fallback=False,
+        )
+    )
+
+
+def bulk_create_items_sync(
+    sync_db: Session,
+    *,
+    team_id: int,
+    config_db: TestRunConfigDB,
+    items: List[TestRunItemCreate],
+    resolved_assignees: List[ResolvedAssignee],
+    include_payload_fields: bool = True,
+) -> Dict[str, Any]:
+    """批次建立 Test Run Items（JWT 與 app-token 路徑共用）。
+
+    既有 items 與來源 test cases 以分批 IN 查詢一次預取，附件依不同 payload 只正規化一次，
+    最後以 executemany 一次寫入；同一批內重複的編號與既有項目一樣計為 skipped。
+    ``include_payload_fields`` 為 False 時僅寫入結果與指派欄位（app-token 路徑）。
+    """
+    config_id = config_db.id
+    allowed_scope_ids = _resolve_allowed_scope_sync(sync_db, config_db)
+    numbers = list(dict.fromkeys(item.test_case_number for item in items))
+
+    existing_numbers: set = set()
+    cases_by_number: Dict[str, Any] = {}
+    for chunk in _chunks(numbers, BULK_CREATE_LOOKUP_CHUNK_SIZE):
+        existing_numbers.update(
+            sync_db.execute(
+                select(TestRunItemDB.test_case_number).where(
+                    TestRunItemDB.team_id == team_id,
+                    TestRunItemDB.config_id == config_id,
+                    TestRunItemDB.test_case_number.in_(chunk),
+                )
+            ).scalars()
+        )
+        for row in sync_db.execute(
+            select(
+                TestCaseLocalDB.test_case_number,
+                TestCaseLocalDB.title,
+                TestCaseLocalDB.test_case_set_id,
+            ).where(
+                TestCaseLocalDB.team_id == team_id,
+                TestCaseLocalDB.test_case_number.in_(chunk),
+            )
+        ):
+            cases_by_number.setdefault(row.test_case_number, row)
+
+    skipped = 0
+    errors: List[str] = []
+    created_items: List[Dict[str, Any]] = []
+    auto_scope_ids: List[int] = []
+    rows: List[Dict[str, Any]] = []
+    attachment_cache: Dict[str, Union[Optional[str], Exception]] = {}
+    now = datetime.utcnow()
+
+    for idx, item in enumerate(items):
+        try:
+            if item.test_case_number in existing_numbers:
+                skipped += 1
+                continue
+            test_case = cases_by_number.get(item.test_case_number)
+            if test_case is None:
+                errors.append(f"index {idx}: 找不到測試案例 {item.test_case_number}")
+                continue
+
+            case_set_id = test_case.test_case_set_id
+            if allowed_scope_ids:
+                if case_set_id not in allowed_scope_ids:
+                    errors.append(
+                        f"index {idx}: 測試案例 {item.test_case_number} 不在此 Test Run 允許的 Test Case Set 範圍內"
+                    )
+                    continue
+            elif case_set_id is not None:
+                auto_scope_ids.append(case_set_id)
+
+            row: Dict[str, Any] = {
+                "team_id": team_id,
+                "config_id": config_id,
+                "test_case_number": item.test_case_number,
+                "test_result": item.test_result,
+                "executed_at": item.executed_at,
+                "execution_duration": item.execution_duration,
+                "created_at": now,
+                "updated_at": now,
+            }
+            if include_payload_fields:
+                row.update(
+                    {
+                        "attachments_json": _normalized_attachments_json(item.attachments, attachment_cache),
+                        "execution_results_json": _normalized_attachments_json(
+                            item.execution_results, attachment_cache
+                        ),
+                        "user_story_map_json": _to_json(_normalize_linked_records(item.user_story_map)),
+                        "tcg_json": _to_json(_normalize_linked_records(item.tcg)),
+                        "parent_record_json": _to_json(_normalize_linked_records(item.parent_record)),
+                        "raw_fields_json": _to_json(item.raw_fields) if item.raw_fields else None,
+                    }
+                )
+            resolved = resolved_assignees[idx]
+            if not resolved.preserve:
+                row.update(
+                    {
+                        "assignee_user_id": resolved.assignee_user_id,
+                        "assignee_id": resolved.assignee_id,
+                        "assignee_name": resolved.assignee_name,
+                        "assignee_en_name": resolved.assignee_en_name,
+                        "assignee_email": resolved.assignee_email,
+                        "assignee_json": resolved.assignee_json,
+                    }
+                )
+            rows.append(row)
+            existing_numbers.add(item.test_case_number)
+            created_items.append({"test_case_number": item.test_case_number, "title": test_case.title})
+        except Exception as e:
+            errors.append(f"index {idx}: {e}")
+            continue
+
+    if rows:
+        # 不同 item 可能帶不同欄位組合；補齊為同一組 key 以維持單一 executemany
+        columns = {key for row in rows for key in row}
+        sync_db.execute(insert(TestRunItemDB), [{key: row.get(key) for key in columns} for row in rows])
+
+    if not allowed_scope_ids and auto_scope_ids:
+        inferred_scope = TestRunScopeService.normalize_scope_ids(auto_scope_ids)
+        TestRunScopeService.set_config_scope_ids(config_db, inferred_scope)
+
+    return {
+        "created": len(rows),
+        "skipped": skipped,
+        "errors": errors,
+        "created_items": created_items,
+    }
+
+
+def _collect_section_subtree_ids_sync(sync_db: Session, *, set_id: int, section_ids: List[int]) -> List[int]:
+    rows = sync_db.execute(
+        select(TestCaseSection.id, TestCaseSection.parent_section_id).where(
+            TestCaseSection.test_case_set_id == set_id
+        )
+    ).all()
+    children: Dict[Optional[int], List[int]] = {}
+    for section_id, parent_id in rows:
+        children.setdefault(parent_id, []).append(int(section_id))
+    known = {int(section_id) for section_id, _ in rows}
+    collected: List[int] = []
+    stack = [int(section_id) for section_id in section_ids if int(section_id) in known]
+    while stack:
+        current = stack.pop()
+        if current in collected:
+            continue
+        collected.append(current)
+        stack.extend(children.get(current, []))
+    return collected
+
+
+def create_items_from_scope_sync(
+    sync_db: Session,
+    *,
+    team_id: int,
+    config_db: TestRunConfigDB,
+    request: BatchCreateFromScopeRequest,
+) -> Dict[str, Any]:
+    """依 Test Case Set / Section / 篩選條件以單一 INSERT ... SELECT 建立 items。
+
+    已存在於此 Test Run 的案例會被略過；回傳 created / skipped 數量。
+    """
+    allowed_scope_ids = _resolve_allowed_scope_sync(sync_db, config_db)
+    set_exists = sync_db.execute(
+        select(TestCaseSet.id).where(TestCaseSet.id == request.test_case_set_id, TestCaseSet.team_id == team_id)
+    ).first()
+    if set_exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="找不到 Test Case Set")
+    if allowed_scope_ids and request.test_case_set_id not in allowed_scope_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="此 Test Case Set 不在 Test Run 允許的範圍內",
+        )
+
+    conditions = [
+        TestCaseLocalDB.team_id == team_id,
+        TestCaseLocalDB.test_case_set_id == request.test_case_set_id,
+    ]
+    if request.section_ids is not None:
+        section_ids = (
+            _collect_section_subtree_ids_sync(
+                sync_db, set_id=request.test_case_set_id, section_ids=request.section_ids
+            )
+            if request.include_subsections
+            else list(request.section_ids)
+        )
+        conditions.append(TestCaseLocalDB.test_case_section_id.in_(section_ids))
+    if request.priority is not None:
+        conditions.append(TestCaseLocalDB.priority == request.priority)
+    if request.search:
+        pattern = f"%{request.search}%"
+        conditions.append(or_(TestCaseLocalDB.test_case_number.like(pattern), TestCaseLocalDB.title.like(pattern)))
+
+    matched = sync_db.execute(select(func.count(TestCaseLocalDB.id)).where(*conditions)).scalar() or 0
+    already_linked = exists().where(
+        TestRunItemDB.config_id == config_db.id,
+        TestRunItemDB.test_case_number == TestCaseLocalDB.test_case_number,
+    )
+    now = datetime.utcnow()
+    candidates = select(
+        literal(team_id),
+        literal(config_db.id),
+        TestCaseLocalDB.test_case_number,
+        literal(False),
+        literal(0),
+        literal(now),
+        literal(now),
+    ).where(*conditions, ~already_linked)
+    result = sync_db.execute(
+        insert(TestRunItemDB).from_select(
+            [
+                TestRunItemDB.team_id,
+                TestRunItemDB.config_id,
+                TestRunItemDB.test_case_number,
+                TestRunItemDB.result_files_uploaded,
+                TestRunItemDB.result_files_count,
+                TestRunItemDB.created_at,
+                TestRunItemDB.updated_at,
+            ],
+            candidates,
+        )
+    )
+    created = max(int(result.rowcount or 0), 0)
+
+    if not allowed_scope_ids and created:
+        TestRunScopeService.set_config_scope_ids(config_db, [request.test_case_set_id])
+
+    return {"created": created, "skipped": int(matched) - created, "matched": int(matched)}
+
+
 @router.get("/", response_model=List[TestRunItemResponse])
 async def list_items(
     team_id: int,
@@ -837,6 +1164,131 @@ async def list_items(
     return await main_boundary.run_sync_read(_list)
 
 
+TEST_RUN_ITEM_EXPORT_COLUMNS = [
+    "test_case_number",
+    "title",
+    "priority",
+    "section_name",
+    "test_result",
+    "assignee_name",
+    "executed_at",
+    "execution_duration",
+    "bug_tickets",
+    "created_at",
+    "updated_at",
+]
+
+
+def _export_cell(value) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "value"):
+        return str(value.value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _export_bug_tickets_cell(raw: Optional[str]) -> str:
+    if not raw:
+        return ""
+    try:
+        parsed = json.loads(raw)
+    except (TypeError, ValueError):
+        return raw
+    return json.dumps(parsed, ensure_ascii=False, separators=(",", ":"))
+
+
+def _build_item_export_row(row) -> List[str]:
+    return [
+        _export_cell(row.test_case_number),
+        _export_cell(row.title),
+        _export_cell(row.priority),
+        _export_cell(row.section_name),
+        _export_cell(row.test_result),
+        _export_cell(row.assignee_name),
+        _export_cell(row.executed_at),
+        _export_cell(row.execution_duration),
+        _export_bug_tickets_cell(row.bug_tickets_json),
+        _export_cell(row.created_at),
+        _export_cell(row.updated_at),
+    ]
+
+
+@router.get("/export")
+async def export_items(
+    request: Request,
+    team_id: int,
+    config_id: int,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    main_boundary: MainAccessBoundary = Depends(get_main_access_boundary),
+    current_user: User = Depends(get_current_user),
+    search: Optional[str] = Query(None, description="標題/編號模糊搜尋"),
+    priority_filter: Optional[str] = Query(None),
+    test_result_filter: Optional[str] = Query(None),
+    executed_only: Optional[bool] = Query(None),
+):
+    """串流匯出 Test Run Items（CSV / XLSX），以 server-side cursor 分批讀取"""
+    await _require_test_run_read_permission(current_user, team_id)
+    if not is_export_format_available(export_format):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"匯出格式 {export_format} 目前不可用")
+
+    def _verify(sync_db: Session) -> None:
+        _verify_team_and_config(team_id, config_id, sync_db)
+
+    await main_boundary.run_sync_read(_verify)
+
+    statement = (
+        select(
+            TestRunItemDB.test_case_number,
+            TestCaseLocalDB.title,
+            TestCaseLocalDB.priority,
+            TestCaseSection.name.label("section_name"),
+            TestRunItemDB.test_result,
+            TestRunItemDB.assignee_name,
+            TestRunItemDB.executed_at,
+            TestRunItemDB.execution_duration,
+            TestRunItemDB.bug_tickets_json,
+            TestRunItemDB.created_at,
+            TestRunItemDB.updated_at,
+        )
+        .select_from(TestRunItemDB)
+        .outerjoin(
+            TestCaseLocalDB,
+            and_(
+                TestCaseLocalDB.team_id == TestRunItemDB.team_id,
+                TestCaseLocalDB.test_case_number == TestRunItemDB.test_case_number,
+            ),
+        )
+        .outerjoin(TestCaseSection, TestCaseSection.id == TestCaseLocalDB.test_case_section_id)
+        .where(
+            TestRunItemDB.team_id == team_id,
+            TestRunItemDB.config_id == config_id,
+        )
+    )
+    statement = _apply_item_list_filters(
+        statement,
+        search=search,
+        priority_filter=priority_filter,
+        test_result_filter=test_result_filter,
+        executed_only=executed_only,
+    ).order_by(TestRunItemDB.id.asc())
+
+    filename = f"test_run_{config_id}_items_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        stream_tabular_export(
+            export_format,
+            TEST_RUN_ITEM_EXPORT_COLUMNS,
+            iter_statement_chunks(main_boundary, statement),
+            _build_item_export_row,
+            sheet_title=f"Test Run {config_id}",
+            is_disconnected=request.is_disconnected,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @router.get("/refs", response_model=List[Dict[str, Any]])
 async def list_item_refs(
     team_id: int,
@@ -913,101 +1365,13 @@ async def batch_create_items(
                     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                     detail=f"items[{index}] assignee: {exc}",
                 ) from exc
-        config_scope_ids = TestRunScopeService.get_config_scope_ids(
+        return bulk_create_items_sync(
             sync_db,
-            config_db,
-            allow_fallback=True,
-            persist_fallback=False,
+            team_id=team_id,
+            config_db=config_db,
+            items=payload.items,
+            resolved_assignees=resolved_assignees,
         )
-        allowed_scope_ids = set(config_scope_ids)
-        auto_scope_ids: List[int] = []
-
-        created = 0
-        skipped = 0
-        errors: List[str] = []
-        created_items = []  # 記錄建立的項目，用於 audit log
-
-        for idx, item in enumerate(payload.items):
-            try:
-                # Handle duplicates via unique constraint (config_id, test_case_number)
-                existing = (
-                    sync_db.query(TestRunItemDB)
-                    .filter(
-                        TestRunItemDB.team_id == team_id,
-                        TestRunItemDB.config_id == config_id,
-                        TestRunItemDB.test_case_number == item.test_case_number,
-                    )
-                    .first()
-                )
-                if existing:
-                    skipped += 1
-                    continue
-
-                test_case = (
-                    sync_db.query(TestCaseLocalDB)
-                    .filter(
-                        TestCaseLocalDB.team_id == team_id, TestCaseLocalDB.test_case_number == item.test_case_number
-                    )
-                    .first()
-                )
-                if not test_case:
-                    errors.append(f"index {idx}: 找不到測試案例 {item.test_case_number}")
-                    continue
-
-                case_set_id = getattr(test_case, "test_case_set_id", None)
-                if allowed_scope_ids:
-                    if case_set_id not in allowed_scope_ids:
-                        errors.append(
-                            f"index {idx}: 測試案例 {item.test_case_number} 不在此 Test Run 允許的 Test Case Set 範圍內"
-                        )
-                        continue
-                elif case_set_id is not None:
-                    auto_scope_ids.append(case_set_id)
-
-                attachments_payload = [normalize_attachment_metadata(a.model_dump()) for a in (item.attachments or [])]
-                execution_results_payload = [
-                    normalize_attachment_metadata(a.model_dump()) for a in (item.execution_results or [])
-                ]
-
-                db_item = TestRunItemDB(
-                    team_id=team_id,
-                    config_id=config_id,
-                    test_case_number=item.test_case_number,
-                    test_result=item.test_result,
-                    executed_at=item.executed_at,
-                    execution_duration=item.execution_duration,
-                    attachments_json=_to_json(attachments_payload) if attachments_payload else None,
-                    execution_results_json=_to_json(execution_results_payload) if execution_results_payload else None,
-                    user_story_map_json=_to_json(_normalize_linked_records(item.user_story_map)),
-                    tcg_json=_to_json(_normalize_linked_records(item.tcg)),
-                    parent_record_json=_to_json(_normalize_linked_records(item.parent_record)),
-                    raw_fields_json=_to_json(item.raw_fields) if item.raw_fields else None,
-                )
-                apply_resolved_assignee(db_item, resolved_assignees[idx])
-                sync_db.add(db_item)
-                created += 1
-                # 記錄建立的項目
-                created_items.append(
-                    {
-                        "test_case_number": item.test_case_number,
-                        "title": test_case.title if test_case else None,
-                    }
-                )
-            except Exception as e:
-                errors.append(f"index {idx}: {e}")
-                continue
-
-        if not allowed_scope_ids and auto_scope_ids:
-            inferred_scope = TestRunScopeService.normalize_scope_ids(auto_scope_ids)
-            TestRunScopeService.set_config_scope_ids(config_db, inferred_scope)
-            allowed_scope_ids = set(inferred_scope)
-
-        return {
-            "created": created,
-            "skipped": skipped,
-            "errors": errors,
-            "created_items": created_items,
-        }
 
     result = await main_boundary.run_sync_serialized_write(_create)
 
@@ -1044,6 +1408,49 @@ async def batch_create_items(
     )
 
 
+@router.post("/from-scope", response_model=BatchCreateResponse, status_code=status.HTTP_201_CREATED)
+async def batch_create_items_from_scope(
+    team_id: int,
+    config_id: int,
+    payload: BatchCreateFromScopeRequest,
+    main_boundary: MainAccessBoundary = Depends(get_main_access_boundary),
+    current_user: User = Depends(get_current_user),
+):
+    """依 Test Case Set / Section / 篩選條件於伺服器端建立 items（INSERT ... SELECT）。"""
+
+    def _create(sync_db: Session) -> Dict[str, Any]:
+        TestRunScopeService.lock_scope_mutation(sync_db, team_id, [config_id])
+        config_db = _verify_team_and_config(team_id, config_id, sync_db)
+        return create_items_from_scope_sync(sync_db, team_id=team_id, config_db=config_db, request=payload)
+
+    result = await main_boundary.run_sync_serialized_write(_create)
+
+    if result["created"] > 0:
+        await log_test_run_item_action(
+            action_type=ActionType.CREATE,
+            current_user=current_user,
+            team_id=team_id,
+            resource_id=f"batch_{result['created']}_items",
+            action_brief=(
+                f"{current_user.username} batch created {result['created']} Test Run Items "
+                f"from Test Case Set {payload.test_case_set_id}"
+            ),
+            details={
+                "operation": "batch_create_items_from_scope",
+                "config_id": config_id,
+                "created_count": result["created"],
+                "skipped_count": result["skipped"],
+                "scope": payload.model_dump(mode="json", exclude_none=True),
+            },
+        )
+
+    return BatchCreateResponse(
+        success=True,
+        created_count=result["created"],
+        skipped_duplicates=result["skipped"],
+    )
+
+
 @router.put("/{item_id}", response_model=TestRunItemResponse)
 async def update_item(
     team_id: int,
@@ -2123,6 +2530,7 @@ async def delete_test_result_file(
             # 只允許刪除附件根目錄下的檔案
             if (base_dir in p.parents or base_dir == p.parent) and p.exists():
                 p.unlink()
+                release_deduplicated_blob(base_dir / "test-runs" / str(team_id), files[idx].get("sha256"))
     except Exception:
         pass
 
@@ -29,6 +29,7 @@ from .database import (
     cleanup_audit_database,
     audit_health_check,
     AuditLogTable,
+    AuditUserActivityTable,
     KnowledgeQueryLogTable,
     KnowledgeQuerySource,
     KnowledgeQueryOperation,
@@ -66,6 +67,7 @@ __all__ = [
     'cleanup_audit_database', 
     'audit_health_check',
     'AuditLogTable',
+    'AuditUserActivityTable',
     'KnowledgeQueryLogTable',
     'KnowledgeQuerySource',
     'KnowledgeQueryOperation',
@@ -8,15 +8,20 @@
 import logging
 import json
 import asyncio
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import select, func, and_, desc, asc
+from sqlalchemy import select, func, and_, desc, asc, delete
 
 from .models import (
     AuditLog, AuditLogCreate, AuditLogQuery, AuditLogResponse, AuditLogSummary,
     AuditStatistics, ActionType, ResourceType, AuditSeverity
 )
-from .database import AuditLogTable, audit_db_manager
+from .database import (
+    USER_ACTIVITY_INDEX_DEPTH,
+    AuditLogTable,
+    AuditUserActivityTable,
+    audit_db_manager,
+)
 from ..config import get_settings
 from app.models.database_models import User
 from app.auth.models import UserRole
@@ -24,6 +29,9 @@ from app.services.observability import Impact, Outcome, get_legacy_event_code
 
 logger = logging.getLogger(__name__)
 
+# 寫入事件監聽器簽名：(team_id, user_id)；team_id 為 None 代表系統層級事件
+AuditWriteListener = Callable[[Optional[int], int], None]
+
 
 class AuditService:
     """審計系統核心服務類"""
@@ -33,6 +41,19 @@ class AuditService:
         self._batch_buffer: List[AuditLogCreate] = []
         self._batch_lock = asyncio.Lock()
         self._last_flush = datetime.utcnow()
+        self._write_listeners: List[AuditWriteListener] = []
+
+    def add_write_listener(self, listener: AuditWriteListener) -> None:
+        """註冊寫入事件監聽器（例如 dashboard snapshot 失效），READ 事件不會通知"""
+        if listener not in self._write_listeners:
+            self._write_listeners.append(listener)
+
+    def _notify_write_listeners(self, team_id: Optional[int], user_id: int) -> None:
+        for listener in list(self._write_listeners):
+            try:
+                listener(team_id, user_id)
+            except Exception as e:  # noqa: BLE001 - 監聽器失敗不可影響審計
+                logger.warning(f"審計寫入監聽器執行失敗: {e}")
         
     # ===================== 記錄創建 =====================
     
@@ -56,6 +77,8 @@ class AuditService:
         outcome: Optional[Outcome] = None,
     ) -> None:
         """記錄操作審計 (legacy + event envelope dual-write)"""
+        if action_type != ActionType.READ:
+            self._notify_write_listeners(team_id, user_id)
         if not self.config.enabled:
             return
             
@@ -490,6 +513,31 @@ class AuditService:
             raise
             
     # ===================== 清理維護 =====================
+
+    async def _trim_activity_index(self, session, keys: Set[Tuple[int, int]]) -> None:
+        """將受影響的 (user, team) 活動索引修剪至 USER_ACTIVITY_INDEX_DEPTH 筆（best-effort）"""
+        if not keys:
+            return
+        try:
+            for user_id, team_id in keys:
+                stale_ids = (
+                    await session.execute(
+                        select(AuditUserActivityTable.id)
+                        .where(
+                            AuditUserActivityTable.user_id == user_id,
+                            AuditUserActivityTable.team_id == team_id,
+                        )
+                        .order_by(AuditUserActivityTable.timestamp.desc(), AuditUserActivityTable.id.desc())
+                        .offset(USER_ACTIVITY_INDEX_DEPTH)
+                    )
+                ).scalars().all()
+                if stale_ids:
+                    await session.execute(
+                        delete(AuditUserActivityTable).where(AuditUserActivityTable.id.in_(stale_ids))
+                    )
+            await session.commit()
+        except Exception as e:  # noqa: BLE001 - 索引修剪失敗不影響已寫入的審計記錄
+            logger.warning(f"修剪使用者活動索引失敗: {e}")
     
     async def cleanup_old_records(self) -> int:
         """清理過期記錄"""
@@ -510,10 +558,13 @@ class AuditService:
                 if count_to_delete == 0:
                     return 0
                     
-                # 執行刪除
+                # 執行刪除（活動索引同步套用保留期限）
                 result = await session.execute(
                     AuditLogTable.__table__.delete().where(AuditLogTable.timestamp < cutoff_date)
                 )
+                await session.execute(
+                    delete(AuditUserActivityTable).where(AuditUserActivityTable.timestamp < cutoff_date)
+                )
                 await session.commit()
                 
                 deleted_count = result.rowcount
@@ -566,8 +617,9 @@ class AuditService:
         
         try:
             async with audit_db_manager.get_session() as session:
-                # 轉換為資料表記錄
+                # 轉換為資料表記錄（含使用者近期活動索引）
                 db_records = []
+                activity_keys: Set[Tuple[int, int]] = set()
                 for record in records_to_write:
                     details_json = None
                     if record.details:
@@ -600,11 +652,25 @@ class AuditService:
                         schema_version=record.schema_version,
                     )
                     db_records.append(db_record)
+                    if record.team_id is not None:
+                        db_records.append(
+                            AuditUserActivityTable(
+                                user_id=record.user_id,
+                                team_id=record.team_id,
+                                timestamp=db_record.timestamp,
+                                action_type=_enum_value(record.action_type),
+                                resource_type=_enum_value(record.resource_type),
+                                resource_id=(record.resource_id or "")[:100],
+                            )
+                        )
+                        activity_keys.add((record.user_id, record.team_id))
                     
                 session.add_all(db_records)
                 await session.commit()
                 
-                logger.debug(f"已寫入 {len(db_records)} 筆審計記錄")
+                logger.debug(f"已寫入 {len(records_to_write)} 筆審計記錄")
+
+                await self._trim_activity_index(session, activity_keys)
                 
         except Exception as e:
             logger.error(f"批次寫入審計記錄失敗: {e}", exc_info=True)
@@ -623,6 +689,10 @@ class AuditService:
             self._batch_buffer = merged
 
 
+def _enum_value(value: Any) -> str:
+    return str(getattr(value, "value", value) or "")
+
+
 # 全域審計服務實例
 audit_service = AuditService()
 
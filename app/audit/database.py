@@ -278,6 +278,31 @@ class AuditLogTable(AuditBase):
                 f"action={self.action_type}, resource={self.resource_type}:{self.resource_id})>")
 
 
+# 每位使用者在每個 team 保留的近期活動筆數（dashboard 近期活動與 resume 的讀取上限）
+USER_ACTIVITY_INDEX_DEPTH = 50
+
+
+class AuditUserActivityTable(AuditBase):
+    """使用者近期活動索引
+
+    於審計寫入時同步維護，每個 (user, team) 只保留最近 ``USER_ACTIVITY_INDEX_DEPTH`` 筆，
+    讓 dashboard 不必掃描 audit_logs 即可取得近期活動。僅保存 dashboard 需要的欄位。
+    """
+    __tablename__ = "audit_user_activity"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    team_id = Column(Integer, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+    action_type = Column(String(32), nullable=False)
+    resource_type = Column(String(64), nullable=False)
+    resource_id = Column(String(100), nullable=False)
+
+    def __repr__(self):
+        return (f"<AuditUserActivity(user={self.user_id}, team={self.team_id}, "
+                f"resource={self.resource_type}:{self.resource_id})>")
+
+
 # ---------------------------------------------------------------------------
 # Knowledge graph / RAG query log (openspec: log-knowledge-graph-queries)
 # ---------------------------------------------------------------------------
@@ -430,6 +455,7 @@ Index('idx_audit_username_time', AuditLogTable.username, AuditLogTable.timestamp
 Index('idx_audit_role_time', AuditLogTable.role, AuditLogTable.timestamp)
 Index('idx_audit_action_time', AuditLogTable.action_type, AuditLogTable.timestamp)
 Index('ix_audit_logs_event_code_timestamp', AuditLogTable.event_code, AuditLogTable.timestamp)
+Index('ix_audit_user_activity_user_team_time', AuditUserActivityTable.user_id, AuditUserActivityTable.team_id, AuditUserActivityTable.timestamp)
 
 # Knowledge query log 複合索引：對應 admin /api/admin/knowledge-query-logs 常見查詢模式
 Index('ix_knowledge_query_logs_source_timestamp', KnowledgeQueryLogTable.source, KnowledgeQueryLogTable.timestamp)
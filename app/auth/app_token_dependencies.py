@@ -28,6 +28,11 @@ from app.models.app_token import (
     ALL_APP_TOKEN_SCOPES,
     AppTokenPrincipal,
 )
+from app.services.machine_api_governance import (
+    MachineApiQuotaExceeded,
+    get_machine_api_governor,
+    resolve_endpoint_cost,
+)
 from app.services.observability import Impact, Outcome
 from app.models.database_models import (
     MCPMachineCredential,
@@ -85,6 +90,8 @@ class AppTokenErrorCodes:
     IMPACT_CHANGED = "APP_TOKEN_IMPACT_CHANGED"
     STATE_CHANGED = "APP_TOKEN_STATE_CHANGED"
     INTEGRITY_CONFLICT = "APP_TOKEN_INTEGRITY_CONFLICT"
+    RATE_LIMITED = "APP_TOKEN_RATE_LIMITED"
+    CONCURRENCY_LIMITED = "APP_TOKEN_CONCURRENCY_LIMITED"
 
 
 def generate_app_token() -> tuple[str, str, str]:
@@ -283,19 +290,74 @@ async def get_current_app_token_principal(
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
-                "code": "APP_TOKEN_RATE_LIMITED",
+                "code": AppTokenErrorCodes.RATE_LIMITED,
                 "message": "Too many authentication attempts",
             },
             headers={"Retry-After": str(retry_after)},
         )
 
     try:
-        return await _authenticate_app_token(request, db, credentials)
+        principal = await _authenticate_app_token(request, db, credentials)
     except HTTPException as exc:
         if exc.status_code == status.HTTP_401_UNAUTHORIZED:
             _record_auth_failure(client_ip)
         raise
 
+    await _enforce_machine_api_governance(request, principal)
+    return principal
+
+
+async def _enforce_machine_api_governance(request: Request, principal: AppTokenPrincipal) -> None:
+    """Charge the request against the credential and team buckets, or raise 429.
+
+    The acquired lease is stored on ``request.state`` and returned by
+    ``MachineApiGovernanceMiddleware`` once the response has been sent, so the
+    in-flight cap covers the full handler execution.
+    """
+    if not get_settings().auth.machine_api_governance_enabled:
+        return
+    if getattr(request.state, "machine_api_lease", None) is not None:
+        return
+
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", None) or request.url.path
+    cost = resolve_endpoint_cost(request.method, route_path, request.query_params)
+    team_id = principal.owner_team_id or _extract_team_id(request) or None
+
+    try:
+        lease = await get_machine_api_governor().acquire(
+            credential_id=principal.credential_id,
+            is_legacy=principal.is_legacy,
+            team_id=team_id,
+            cost=cost,
+        )
+    except MachineApiQuotaExceeded as exc:
+        logger.info(
+            "Machine API request throttled: credential=%s bucket=%s reason=%s cost=%.1f path=%s",
+            principal.credential_id,
+            exc.bucket_key,
+            exc.reason,
+            cost,
+            request.url.path,
+        )
+        if exc.reason == "concurrency":
+            code = AppTokenErrorCodes.CONCURRENCY_LIMITED
+            message = "Too many concurrent requests for this app token or team"
+        else:
+            code = AppTokenErrorCodes.RATE_LIMITED
+            message = "App token or team request quota exceeded"
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"code": code, "message": message},
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    except Exception as exc:  # noqa: BLE001
+        # 治理狀態檔異常時 fail-open：限流是保護措施，不應讓 machine API 整體失效。
+        logger.warning("Machine API governance unavailable, allowing request: %s", exc, exc_info=True)
+        return
+
+    request.state.machine_api_lease = lease
+
 
 async def _authenticate_app_token(
     request: Request,
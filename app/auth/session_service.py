@@ -7,8 +7,9 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
 
 from sqlalchemy import and_, delete, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -29,6 +30,20 @@ class SessionService:
         # 純效能快取，DB 是唯一事實來源（is_jti_revoked 永遠有 DB fallback）：
         # 多 worker 部署下各 worker 各自持有一份不影響正確性，頂多多幾次 DB 查詢。
         self._revoked_jtis: Set[str] = set()
+        # 使用者狀態（停用、角色變更、刪除、全部 token 撤銷）最後異動的 monotonic 時間，
+        # 供短 TTL 的 principal 快取（assistant 直接派送）判斷快取是否已失效；同樣只涵蓋本行程
+        self._principal_invalidated_at: Dict[int, float] = {}
+
+    def invalidate_user_principals(self, user_id: int) -> None:
+        """標記使用者的已快取 principal 失效（本行程）。"""
+        self._principal_invalidated_at[user_id] = time.monotonic()
+
+    def is_cached_principal_stale(self, *, jti: str, user_id: int, cached_at: float) -> bool:
+        """不打 DB，只依本行程已知的撤銷 / 使用者異動判斷在 ``cached_at`` 建立的 principal 是否失效。"""
+        if jti in self._revoked_jtis:
+            return True
+        invalidated_at = self._principal_invalidated_at.get(user_id)
+        return invalidated_at is not None and invalidated_at >= cached_at
 
     async def create_session(
         self,
@@ -141,6 +156,7 @@ class SessionService:
                 return revoked_count
 
             revoked_count = await self.main_boundary.run_write(_revoke)
+            self.invalidate_user_principals(user_id)
             logger.info("撤銷使用者 %s 的 %s 個會話", user_id, revoked_count)
             return revoked_count
         except Exception as exc:  # noqa: BLE001
@@ -291,6 +291,28 @@ class InspectionConfig(BaseModel):
     ]
 
 
+class QAAIHelperResponseCacheConfig(BaseModel):
+    """Content-addressed cache of stage LLM responses (opt-in).
+
+    Keyed by stage, model, temperature and prompt hash; stored in the main
+    database with a TTL and an LRU-trimmed entry limit.
+    """
+
+    enabled: bool = False
+    ttl_hours: int = 168
+    max_entries: int = 2000
+
+    @classmethod
+    def from_env(cls, fallback: "QAAIHelperResponseCacheConfig" = None) -> "QAAIHelperResponseCacheConfig":
+        current = fallback or cls()
+        return cls(
+            enabled=os.getenv("QA_AI_HELPER_RESPONSE_CACHE_ENABLED", str(current.enabled)).lower()
+            in ("1", "true", "yes"),
+            ttl_hours=max(1, int(os.getenv("QA_AI_HELPER_RESPONSE_CACHE_TTL_HOURS", str(current.ttl_hours)))),
+            max_entries=max(1, int(os.getenv("QA_AI_HELPER_RESPONSE_CACHE_MAX_ENTRIES", str(current.max_entries)))),
+        )
+
+
 class QAAIHelperConfig(BaseModel):
     enable: bool = True
     prompt_contract_version: str = "qa-ai-helper.prompt.v2"
@@ -302,8 +324,11 @@ class QAAIHelperConfig(BaseModel):
     generation_budget_prompt_tokens: int = 12000
     generation_budget_output_tokens: int = 12000
     max_concurrent_llm_calls: int = 5
+    # 單一 generation batch 的最大嘗試次數（含首次）；失敗的 batch 獨立重試，不影響其他 batch
+    batch_max_attempts: int = 2
     models: QAAIHelperModelsConfig = QAAIHelperModelsConfig()
     inspection: InspectionConfig = InspectionConfig()
+    response_cache: QAAIHelperResponseCacheConfig = QAAIHelperResponseCacheConfig()
 
     @classmethod
     def from_env(cls, fallback: "QAAIHelperConfig" = None) -> "QAAIHelperConfig":
@@ -321,8 +346,12 @@ class QAAIHelperConfig(BaseModel):
             max_concurrent_llm_calls=int(
                 os.getenv("QA_AI_HELPER_MAX_CONCURRENT_LLM_CALLS", str(current.max_concurrent_llm_calls))
             ),
+            batch_max_attempts=max(
+                1, int(os.getenv("QA_AI_HELPER_BATCH_MAX_ATTEMPTS", str(current.batch_max_attempts)))
+            ),
             models=QAAIHelperModelsConfig.from_env(current.models),
             inspection=current.inspection,
+            response_cache=QAAIHelperResponseCacheConfig.from_env(current.response_cache),
         )
 
 
@@ -349,6 +378,18 @@ class AssistantConfig(BaseModel):
     max_iterations: int = 24
     llm_timeout_seconds: int = 60
     tool_timeout_seconds: int = 30
+    # "direct"：read/write 工具在 process 內直接呼叫對應 route handler（預設）；
+    # "loopback"：一律經 ASGI loopback（完整 middleware + JWT 驗證），供除錯比對。
+    tool_dispatch_mode: str = "direct"
+    # LLM 以 SSE 串流回應：文字邊生成邊以 text_delta 事件送出（合併間隔 ms），並記錄 TTFT。
+    llm_streaming: bool = True
+    llm_stream_flush_interval_ms: int = 150
+    # 每個 worker 共用的 LLM HTTP 連線池上限（keep-alive，避免每次呼叫重做 TCP/TLS）。
+    llm_pool_max_connections: int = 16
+    # SSE 事件推播的跨 worker 通知："auto"（PostgreSQL 用 LISTEN/NOTIFY，其餘輪詢 turn 序號水位）、
+    # "poll"（一律水位輪詢）、"local"（僅同行程通知，適用單一 worker 部署）。
+    event_bus_backend: str = "auto"
+    event_bus_poll_interval_ms: int = 500
     turn_timeout_seconds: int = 300
     history_max_chars: int = 480000
     tool_result_max_chars: int = 64000
@@ -404,6 +445,10 @@ class AssistantConfig(BaseModel):
                 return default
             return raw.lower() in ("1", "true", "yes")
 
+        def _choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+            raw = (os.getenv(name) or "").strip().lower()
+            return raw if raw in choices else default
+
         return cls(
             enabled=os.getenv("TCRT_ASSISTANT_ENABLED", str(current.enabled)).lower()
             in ("1", "true", "yes"),
@@ -416,6 +461,26 @@ class AssistantConfig(BaseModel):
             tool_timeout_seconds=_int(
                 "TCRT_ASSISTANT_TOOL_TIMEOUT_SECONDS", current.tool_timeout_seconds, 5, 300
             ),
+            tool_dispatch_mode=_choice(
+                "TCRT_ASSISTANT_TOOL_DISPATCH_MODE",
+                current.tool_dispatch_mode,
+                ("direct", "loopback"),
+            ),
+            llm_streaming=_bool("TCRT_ASSISTANT_LLM_STREAMING", current.llm_streaming),
+            llm_stream_flush_interval_ms=_int(
+                "TCRT_ASSISTANT_LLM_STREAM_FLUSH_INTERVAL_MS", current.llm_stream_flush_interval_ms, 0, 5000
+            ),
+            llm_pool_max_connections=_int(
+                "TCRT_ASSISTANT_LLM_POOL_MAX_CONNECTIONS", current.llm_pool_max_connections, 1, 256
+            ),
+            event_bus_backend=_choice(
+                "TCRT_ASSISTANT_EVENT_BUS_BACKEND",
+                current.event_bus_backend,
+                ("auto", "poll", "local"),
+            ),
+            event_bus_poll_interval_ms=_int(
+                "TCRT_ASSISTANT_EVENT_BUS_POLL_INTERVAL_MS", current.event_bus_poll_interval_ms, 50, 10000
+            ),
             turn_timeout_seconds=_int(
                 "TCRT_ASSISTANT_TURN_TIMEOUT_SECONDS", current.turn_timeout_seconds, 10, 900
             ),
@@ -525,9 +590,84 @@ class AssistantConfig(BaseModel):
         )
 
 
+class LLMSchedulerConfig(BaseModel):
+    """Worker- and cluster-wide scheduling of outbound LLM calls.
+
+    Shared by QA AI Helper and the assistant. Calls queue fairly (interactive
+    before batch, then round-robin across teams and users) behind a worker
+    concurrency cap and tokens-per-minute budget. Setting
+    ``cluster_max_concurrency`` / ``cluster_tokens_per_minute`` coordinates
+    all workers through the main database; 0 disables that tier.
+    """
+
+    enabled: bool = True
+    worker_max_concurrency: int = 8
+    worker_tokens_per_minute: int = 0
+    cluster_max_concurrency: int = 0
+    cluster_tokens_per_minute: int = 0
+    cluster_lease_seconds: int = 300
+    cluster_poll_interval_ms: int = 250
+    rate_limit_max_retries: int = 2
+    rate_limit_backoff_seconds: float = 2.0
+    rate_limit_backoff_max_seconds: float = 60.0
+
+    @classmethod
+    def from_env(cls, fallback: "LLMSchedulerConfig" = None) -> "LLMSchedulerConfig":
+        current = fallback or cls()
+
+        def _int(name: str, default: int, lo: int, hi: int) -> int:
+            try:
+                val = int(os.getenv(name, str(default)))
+            except ValueError:
+                return default
+            return max(lo, min(hi, val))
+
+        def _float(name: str, default: float, lo: float, hi: float) -> float:
+            try:
+                val = float(os.getenv(name, str(default)))
+            except ValueError:
+                return default
+            return max(lo, min(hi, val))
+
+        return cls(
+            enabled=os.getenv("TCRT_LLM_SCHEDULER_ENABLED", str(current.enabled)).lower() in ("1", "true", "yes"),
+            worker_max_concurrency=_int(
+                "TCRT_LLM_SCHEDULER_WORKER_MAX_CONCURRENCY", current.worker_max_concurrency, 1, 1000
+            ),
+            worker_tokens_per_minute=_int(
+                "TCRT_LLM_SCHEDULER_WORKER_TOKENS_PER_MINUTE", current.worker_tokens_per_minute, 0, 100_000_000
+            ),
+            cluster_max_concurrency=_int(
+                "TCRT_LLM_SCHEDULER_CLUSTER_MAX_CONCURRENCY", current.cluster_max_concurrency, 0, 10000
+            ),
+            cluster_tokens_per_minute=_int(
+                "TCRT_LLM_SCHEDULER_CLUSTER_TOKENS_PER_MINUTE", current.cluster_tokens_per_minute, 0, 1_000_000_000
+            ),
+            cluster_lease_seconds=_int(
+                "TCRT_LLM_SCHEDULER_CLUSTER_LEASE_SECONDS", current.cluster_lease_seconds, 10, 3600
+            ),
+            cluster_poll_interval_ms=_int(
+                "TCRT_LLM_SCHEDULER_CLUSTER_POLL_INTERVAL_MS", current.cluster_poll_interval_ms, 20, 10000
+            ),
+            rate_limit_max_retries=_int(
+                "TCRT_LLM_SCHEDULER_RATE_LIMIT_MAX_RETRIES", current.rate_limit_max_retries, 0, 10
+            ),
+            rate_limit_backoff_seconds=_float(
+                "TCRT_LLM_SCHEDULER_RATE_LIMIT_BACKOFF_SECONDS", current.rate_limit_backoff_seconds, 0.0, 60.0
+            ),
+            rate_limit_backoff_max_seconds=_float(
+                "TCRT_LLM_SCHEDULER_RATE_LIMIT_BACKOFF_MAX_SECONDS",
+                current.rate_limit_backoff_max_seconds,
+                0.0,
+                600.0,
+            ),
+        )
+
+
 class AIConfig(BaseModel):
     qa_ai_helper: QAAIHelperConfig = QAAIHelperConfig()
     assistant: AssistantConfig = AssistantConfig()
+    llm_scheduler: LLMSchedulerConfig = LLMSchedulerConfig()
 
     @classmethod
     def from_env(cls, fallback: "AIConfig" = None) -> "AIConfig":
@@ -535,6 +675,7 @@ class AIConfig(BaseModel):
         return cls(
             qa_ai_helper=QAAIHelperConfig.from_env(current.qa_ai_helper),
             assistant=AssistantConfig.from_env(current.assistant),
+            llm_scheduler=LLMSchedulerConfig.from_env(current.llm_scheduler),
         )
 
 
@@ -546,6 +687,8 @@ class AppConfig(BaseModel):
     public_base_url: Optional[str] = None
     base_url: Optional[str] = None  # legacy 欄位，保留向後相容
     lark_dry_run: bool = False
+    # 整組停用（不 import、不掛載）的路由 group，例如 ["assistant", "qa_ai_helper"]；core 不可停用
+    disabled_router_groups: list[str] = []
 
     def get_base_url(self) -> str:
         """
@@ -589,6 +732,11 @@ class AppConfig(BaseModel):
                 "LARK_DRY_RUN", str(getattr(fallback, "lark_dry_run", False)).lower() if fallback else "false"
             ).lower()
             == "true",
+            disabled_router_groups=(
+                [item.strip() for item in os.environ["TCRT_DISABLED_ROUTER_GROUPS"].split(",") if item.strip()]
+                if "TCRT_DISABLED_ROUTER_GROUPS" in os.environ
+                else list(getattr(fallback, "disabled_router_groups", []) or [])
+            ),
         )
 
 
@@ -605,6 +753,17 @@ class AuthConfig(BaseModel):
     # /api/app/* 與 /api/mcp/* 認證「失敗」的 per-IP rate limit（token-bucket）
     app_token_auth_fail_limit: int = 30
     app_token_auth_fail_window_seconds: int = 60
+    # /api/app/* 與 /api/mcp/* 認證「成功」後的 per-credential / per-team 流量治理
+    # （token bucket 以 cost weight 計，另有 in-flight 併發上限；狀態由同機 worker 共用）
+    machine_api_governance_enabled: bool = True
+    machine_api_credential_rate_per_minute: int = 600
+    machine_api_credential_burst: int = 120
+    machine_api_credential_max_in_flight: int = 4
+    machine_api_team_rate_per_minute: int = 1200
+    machine_api_team_burst: int = 240
+    machine_api_team_max_in_flight: int = 8
+    # 留空代表使用 TCRT_RUNTIME_LOCK_DIR（或系統 temp 目錄）下的共用狀態檔
+    machine_api_governance_state_path: str = ""
 
     @classmethod
     def from_env(cls, fallback: "AuthConfig" = None) -> "AuthConfig":
@@ -638,6 +797,51 @@ class AuthConfig(BaseModel):
                     str(fallback.app_token_auth_fail_window_seconds if fallback else 60),
                 )
             ),
+            machine_api_governance_enabled=os.getenv(
+                "MACHINE_API_GOVERNANCE_ENABLED",
+                str(fallback.machine_api_governance_enabled if fallback else True),
+            ).lower()
+            == "true",
+            machine_api_credential_rate_per_minute=int(
+                os.getenv(
+                    "MACHINE_API_CREDENTIAL_RATE_PER_MINUTE",
+                    str(fallback.machine_api_credential_rate_per_minute if fallback else 600),
+                )
+            ),
+            machine_api_credential_burst=int(
+                os.getenv(
+                    "MACHINE_API_CREDENTIAL_BURST",
+                    str(fallback.machine_api_credential_burst if fallback else 120),
+                )
+            ),
+            machine_api_credential_max_in_flight=int(
+                os.getenv(
+                    "MACHINE_API_CREDENTIAL_MAX_IN_FLIGHT",
+                    str(fallback.machine_api_credential_max_in_flight if fallback else 4),
+                )
+            ),
+            machine_api_team_rate_per_minute=int(
+                os.getenv(
+                    "MACHINE_API_TEAM_RATE_PER_MINUTE",
+                    str(fallback.machine_api_team_rate_per_minute if fallback else 1200),
+                )
+            ),
+            machine_api_team_burst=int(
+                os.getenv(
+                    "MACHINE_API_TEAM_BURST",
+                    str(fallback.machine_api_team_burst if fallback else 240),
+                )
+            ),
+            machine_api_team_max_in_flight=int(
+                os.getenv(
+                    "MACHINE_API_TEAM_MAX_IN_FLIGHT",
+                    str(fallback.machine_api_team_max_in_flight if fallback else 8),
+                )
+            ),
+            machine_api_governance_state_path=os.getenv(
+                "MACHINE_API_GOVERNANCE_STATE_PATH",
+                fallback.machine_api_governance_state_path if fallback else "",
+            ),
         )
 
 
@@ -721,17 +925,72 @@ class UsmConfig(BaseModel):
 class AttachmentsConfig(BaseModel):
     # 若留空，則預設使用專案根目錄下的 attachments 子目錄
     root_dir: str = ""
+    # 單一上傳檔案大小上限（MB），從 UploadFile 複製到附件目錄時檢查；<= 0 代表不限制
+    max_upload_mb: int = 1024
+    # 上傳端點單一請求（可含多檔）的 body 上限（MB），由 UploadSizeLimitMiddleware 在解析 multipart
+    # 之前以 Content-Length 檢查、接收中累計；<= 0 代表不限制
+    max_request_mb: int = 2048
 
     @classmethod
     def from_env(cls, fallback: "AttachmentsConfig" = None) -> "AttachmentsConfig":
         env_root = os.getenv("ATTACHMENTS_ROOT_DIR")
-        return cls(root_dir=env_root if env_root else (fallback.root_dir if fallback else ""))
+        return cls(
+            root_dir=env_root if env_root else (fallback.root_dir if fallback else ""),
+            max_upload_mb=int(
+                os.getenv("ATTACHMENTS_MAX_UPLOAD_MB", str(fallback.max_upload_mb if fallback else 1024))
+            ),
+            max_request_mb=int(
+                os.getenv("ATTACHMENTS_MAX_REQUEST_MB", str(fallback.max_request_mb if fallback else 2048))
+            ),
+        )
+
+    @property
+    def max_upload_bytes(self) -> Optional[int]:
+        return self.max_upload_mb * 1024 * 1024 if self.max_upload_mb > 0 else None
+
+    @property
+    def max_request_bytes(self) -> Optional[int]:
+        return self.max_request_mb * 1024 * 1024 if self.max_request_mb > 0 else None
 
     def resolve_root_dir(self, project_root: Optional[Path] = None) -> Path:
         base_root = project_root or PROJECT_ROOT
         return Path(self.root_dir) if self.root_dir else (base_root / "attachments")
 
 
+class BackupConfig(BaseModel):
+    """Runtime 資料庫備份（排程任務 database_backup）設定；與 bootstrap 升版前備份分開。"""
+
+    # 若留空，則預設使用專案根目錄下的 db_backups/runtime 子目錄
+    root_dir: str = ""
+    targets: list[str] = ["main", "audit"]
+    # SQLite online backup 每一步複製的 page 數與步與步之間的休息時間，用來限制對 writer 的影響
+    sqlite_pages_per_step: int = 1024
+    sqlite_step_sleep_ms: int = 20
+    # 距離上一份完整備份超過此天數才重做完整備份，其餘執行只產生增量
+    full_interval_days: int = 7
+    # 保留最近幾條備份鏈（完整備份 + 其後增量）
+    keep_full: int = 2
+    compress_level: int = 6
+
+    @classmethod
+    def from_env(cls, fallback: "BackupConfig" = None) -> "BackupConfig":
+        fb = fallback or cls()
+        env_targets = os.getenv("BACKUP_TARGETS")
+        return cls(
+            root_dir=os.getenv("BACKUP_ROOT_DIR", fb.root_dir),
+            targets=[item.strip() for item in env_targets.split(",") if item.strip()] if env_targets else fb.targets,
+            sqlite_pages_per_step=int(os.getenv("BACKUP_SQLITE_PAGES_PER_STEP", str(fb.sqlite_pages_per_step))),
+            sqlite_step_sleep_ms=int(os.getenv("BACKUP_SQLITE_STEP_SLEEP_MS", str(fb.sqlite_step_sleep_ms))),
+            full_interval_days=int(os.getenv("BACKUP_FULL_INTERVAL_DAYS", str(fb.full_interval_days))),
+            keep_full=int(os.getenv("BACKUP_KEEP_FULL", str(fb.keep_full))),
+            compress_level=int(os.getenv("BACKUP_COMPRESS_LEVEL", str(fb.compress_level))),
+        )
+
+    def resolve_root_dir(self, project_root: Optional[Path] = None) -> Path:
+        base_root = project_root or PROJECT_ROOT
+        return Path(self.root_dir) if self.root_dir else (base_root / "db_backups" / "runtime")
+
+
 class ReportsConfig(BaseModel):
     # 若留空，則預設使用專案根目錄下的 generated_report 子目錄
     root_dir: str = ""
@@ -926,6 +1185,7 @@ class Settings(BaseModel):
     ai: AIConfig = AIConfig()
     attachments: AttachmentsConfig = AttachmentsConfig()
     reports: ReportsConfig = ReportsConfig()
+    backup: BackupConfig = BackupConfig()
     auth: AuthConfig = AuthConfig()
     audit: AuditConfig = AuditConfig()
     usm: UsmConfig = UsmConfig()
@@ -964,6 +1224,7 @@ class Settings(BaseModel):
             ai=AIConfig.from_env(base_settings.ai),
             attachments=AttachmentsConfig.from_env(base_settings.attachments),
             reports=ReportsConfig.from_env(base_settings.reports),
+            backup=BackupConfig.from_env(base_settings.backup),
             auth=AuthConfig.from_env(base_settings.auth),
             audit=AuditConfig.from_env(base_settings.audit),
             usm=UsmConfig.from_env(base_settings.usm),
@@ -1065,6 +1326,7 @@ def create_default_config(config_path: str = "config.yaml") -> None:
                 "generation_budget_prompt_tokens": 12000,
                 "generation_budget_output_tokens": 12000,
                 "max_concurrent_llm_calls": 5,
+                "batch_max_attempts": 2,
                 "models": {
                     "seed": {
                         "model": "google/gemini-3-flash-preview",
@@ -1079,14 +1341,37 @@ def create_default_config(config_path: str = "config.yaml") -> None:
                         "temperature": 0.0,
                     },
                 },
+                "response_cache": {
+                    "enabled": False,
+                    "ttl_hours": 168,
+                    "max_entries": 2000,
+                },
+            },
+            "llm_scheduler": {
+                "enabled": True,
+                "worker_max_concurrency": 8,
+                "worker_tokens_per_minute": 0,
+                "cluster_max_concurrency": 0,
+                "cluster_tokens_per_minute": 0,
             },
         },
         "attachments": {
-            "root_dir": ""  # 留空代表使用專案內 attachments 目錄
+            "root_dir": "",  # 留空代表使用專案內 attachments 目錄
+            "max_upload_mb": 1024,  # 單檔上傳上限（MB），<= 0 不限制
+            "max_request_mb": 2048,  # 上傳請求 body 上限（MB，可含多檔），<= 0 不限制
         },
         "reports": {
             "root_dir": ""  # 留空代表使用專案內 generated_report 目錄
         },
+        "backup": {
+            "root_dir": "",  # 留空代表使用專案內 db_backups/runtime 目錄
+            "targets": ["main", "audit"],
+            "sqlite_pages_per_step": 1024,
+            "sqlite_step_sleep_ms": 20,
+            "full_interval_days": 7,
+            "keep_full": 2,
+            "compress_level": 6,
+        },
         "auth": {
             "enable_auth": True,
             "jwt_secret_key": "${JWT_SECRET_KEY}",  # 必須由環境變數提供
@@ -8,11 +8,13 @@ from pathlib import Path
 import asyncio
 import logging
 import os
+import sys
 from contextlib import asynccontextmanager
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.utils.responses import ORJSONCompatResponse
+from app.utils.startup_profiler import startup_profiler
 
 
 def _import_attr(module_name: str, attribute_name: str):
@@ -22,7 +24,8 @@ def _import_attr(module_name: str, attribute_name: str):
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """FastAPI lifespan handler（取代 deprecated 的 @app.on_event）。"""
-    await _run_startup()
+    with startup_profiler.phase("startup"):
+        await _run_startup()
     try:
         yield
     finally:
@@ -47,11 +50,17 @@ except Exception as _e:
     logging.warning(f"GZipMiddleware 啟用失敗（不影響服務）：{_e}")
 
 AuditMiddleware = _import_attr("app.middlewares", "AuditMiddleware")
+MachineApiGovernanceMiddleware = _import_attr("app.middlewares", "MachineApiGovernanceMiddleware")
+UploadSizeLimitMiddleware = _import_attr("app.middlewares", "UploadSizeLimitMiddleware")
 get_db = _import_attr("app.database", "get_db")
 run_sync = _import_attr("app.database", "run_sync")
 TestCaseLocal = _import_attr("app.models.database_models", "TestCaseLocal")
 
 app.add_middleware(AuditMiddleware)
+# /api/app/*、/api/mcp/* 的 in-flight lease 於回應完成後歸還（需包在 AuditMiddleware 外層）
+app.add_middleware(MachineApiGovernanceMiddleware)
+# 上傳請求的 body 上限需在 multipart 解析（spool 到暫存檔）之前檢查，放在最外層
+app.add_middleware(UploadSizeLimitMiddleware)
 
 # 配置日誌
 logging.basicConfig(level=logging.INFO)
@@ -72,6 +81,11 @@ init_audit_database = _import_attr("app.audit", "init_audit_database")
 cleanup_audit_database = _import_attr("app.audit", "cleanup_audit_database")
 audit_service = _import_attr("app.audit", "audit_service")
 
+# external read 計數快取：於 ORM session 寫入時同步維護 external_read_counts
+_import_attr("app.services.external_read_counts", "install_external_read_count_hooks")()
+# automation coverage 快照：link / script / case 寫入時使對應 team 的快照失效
+_import_attr("app.services.automation.coverage_service", "install_coverage_snapshot_hooks")()
+
 version_service = get_version_service()
 logging.info(f"應用啟動，伺服器版本時間戳: {version_service.get_server_timestamp()}")
 SERVER_VERSION_HEADER = "X-TCRT-Server-Version"
@@ -157,18 +171,14 @@ async def _assistant_error_handler(_request: Request, exc: AssistantError) -> JS
     return JSONResponse(status_code=exc.http_status, content={"detail": {"code": exc.error_code, "message": str(exc)}})
 
 
-# 包含 API 路由
-api_router = _import_attr("app.api", "api_router")
-system_router = _import_attr("app.api.system", "router")
-usm_router = _import_attr("app.api.user_story_maps", "router")
-adhoc_router = _import_attr("app.api.adhoc", "router")
-knowledge_router = _import_attr("app.api.knowledge", "router")
-
-app.include_router(api_router, prefix="/api")
-app.include_router(system_router)
-app.include_router(usm_router, prefix="/api")
-app.include_router(adhoc_router, prefix="/api")
-app.include_router(knowledge_router)
+# 包含 API 路由：依 app.disabled_router_groups 略過整組停用的路由（連模組都不 import）
+_api_package = importlib.import_module("app.api")
+_disabled_router_groups = _app_settings.app.disabled_router_groups
+with startup_profiler.phase("routers"):
+    _api_package.include_api_routers(app, prefix="/api", disabled_groups=_disabled_router_groups)
+    _api_package.include_api_routers(app, _api_package.ROOT_ROUTERS, disabled_groups=_disabled_router_groups)
+if _disabled_router_groups:
+    logging.info("已停用路由 group: %s", ", ".join(_disabled_router_groups))
 
 
 # 前端頁面路由
@@ -383,22 +393,20 @@ async def health_check():
 
 
 # ===================== 背景服務 leader 選舉 =====================
-# 背景服務（排程器 + automation ticker）僅由單一 leader 行程執行，使 web 層可多
+# 背景服務（automation ticker 等）僅由單一 leader 行程執行，使 web 層可多
 # worker / 多副本而不重複扇出。leadership 由 DB advisory lock（SQLite 為檔案鎖）決定。
+# 排程器不在此列：每個 worker 都執行，任務以 per-job 鎖認領（見 app/services/scheduler.py）。
 _background_started = False
 _leader_retry_task: Optional[asyncio.Task] = None
 
 
 async def _start_background_services() -> None:
-    """啟動排程器與 automation ticker（僅 leader 行程呼叫；具冪等性）。"""
+    """啟動 automation ticker 等 leader 專屬背景服務（僅 leader 行程呼叫；具冪等性）。"""
     global _background_started
     if _background_started:
         return
-    from app.services.scheduler import task_scheduler
     from app.services.automation.background import automation_background_manager
 
-    await task_scheduler.initialize()
-    task_scheduler.start()
     try:
         await automation_background_manager.start()
     except Exception as auto_err:  # noqa: BLE001
@@ -477,29 +485,38 @@ async def _run_startup():
         os.makedirs(TMP_REPORT_DIR, exist_ok=True)
         logging.info("報告目錄已就緒: %s", REPORT_DIR)
 
-        await init_audit_database()
+        with startup_profiler.phase("startup.audit_database"):
+            await init_audit_database()
         logging.info("審計資料庫初始化完成")
 
         # 初始化 User Story Map 資料庫
-        from app.models.user_story_map_db import init_usm_db
+        with startup_profiler.phase("startup.usm_database"):
+            from app.models.user_story_map_db import init_usm_db
 
-        await init_usm_db()
+            await init_usm_db()
         logging.info("User Story Map 資料庫初始化完成")
 
         # 初始化密碼加密服務
-        from app.auth.password_encryption import password_encryption_service
+        with startup_profiler.phase("startup.password_encryption"):
+            from app.auth.password_encryption import password_encryption_service
 
-        password_encryption_service.initialize()
+            password_encryption_service.initialize()
         logging.info("密碼加密服務初始化完成")
 
-        # 背景服務（排程器 + automation ticker）僅由單一 leader 行程執行，
+        # 排程器在每個 worker 的 event loop 上運作；同一時段的任務由取得 job 鎖者執行。
+        with startup_profiler.phase("startup.scheduler"):
+            await _start_task_scheduler()
+
+        # automation ticker 等背景服務僅由單一 leader 行程執行，
         # 使 web 層可多 worker / 多副本而不重複扇出。
-        await _try_become_leader_and_start_background()
+        with startup_profiler.phase("startup.background_services"):
+            await _try_become_leader_and_start_background()
 
         # Knowledge graph sync workers — fired on every replica (no
         # leader election) so the user-facing latency for an upsert
         # never depends on which worker handled the API request.
-        await _start_knowledge_graph_sync_workers()
+        with startup_profiler.phase("startup.knowledge_sync_workers"):
+            await _start_knowledge_graph_sync_workers()
 
         # knowledge_query_logs 背景 flush task：buffer 為 process-local，
         # 每個 worker 各跑自己的 flush（不經 leader election），否則 non-leader
@@ -514,6 +531,16 @@ async def _run_startup():
         logging.error(f"啟動服務失敗: {e}")
 
 
+async def _start_task_scheduler() -> None:
+    try:
+        from app.services.scheduler import task_scheduler
+
+        await task_scheduler.initialize()
+        task_scheduler.start()
+    except Exception as e:  # noqa: BLE001
+        logging.error("啟動定時任務調度器失敗: %s", e)
+
+
 async def _start_knowledge_graph_sync_workers() -> None:
     """Start the in-memory knowledge graph sync task queue (no-op if disabled)."""
     try:
@@ -532,7 +559,8 @@ async def _run_shutdown():
         _leader_retry_task.cancel()
         try:
             await _leader_retry_task
-        except Exception:  # noqa: BLE001
+        except (asyncio.CancelledError, Exception):  # noqa: BLE001
+            # 任務在第一次排程前就被取消時，協程內的 except 不會執行，CancelledError 會在此浮出
             pass
         _leader_retry_task = None
 
@@ -540,7 +568,7 @@ async def _run_shutdown():
         # 停止定時任務調度器
         from app.services.scheduler import task_scheduler
 
-        task_scheduler.stop()
+        await task_scheduler.shutdown()
         logging.info("定時任務調度器已停止")
     except Exception as e:
         logging.error(f"停止定時任務調度器失敗: {e}")
@@ -563,6 +591,28 @@ async def _run_shutdown():
     except Exception as e:  # noqa: BLE001
         logging.error(f"停止 Assistant 背景維護 ticker 失敗: {e}")
 
+    try:
+        # LLM client 延後到第一次使用才載入；沒載入過就沒有連線池要關，也不必為此匯入 aiohttp
+        llm_module = sys.modules.get("app.services.assistant.assistant_llm_service")
+        if llm_module is not None:
+            await llm_module.close_llm_http_session()
+    except Exception as e:  # noqa: BLE001
+        logging.error("關閉 Assistant LLM 連線池失敗: %s", e)
+
+    try:
+        from app.services.avatar_proxy_service import close_avatar_proxy_client
+
+        await close_avatar_proxy_client()
+    except Exception as e:  # noqa: BLE001
+        logging.error("關閉頭像代理連線池失敗: %s", e)
+
+    try:
+        from app.services.assistant.event_bus import get_assistant_event_bus
+
+        await get_assistant_event_bus().stop()
+    except Exception as e:  # noqa: BLE001
+        logging.error("停止 Assistant 事件匯流排失敗: %s", e)
+
     try:
         from app.services.knowledge.hooks import stop_sync_workers
 
@@ -1,5 +1,7 @@
 """FastAPI 中介層模組"""
 
 from .audit_middleware import AuditMiddleware
+from .machine_api_governance_middleware import MachineApiGovernanceMiddleware
+from .upload_size_limit_middleware import UploadSizeLimitMiddleware
 
-__all__ = ["AuditMiddleware"]
+__all__ = ["AuditMiddleware", "MachineApiGovernanceMiddleware", "UploadSizeLimitMiddleware"]
@@ -0,0 +1,30 @@
+"""歸還 machine API 治理 lease 的 ASGI Middleware"""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.machine_api_governance import get_machine_api_governor
+
+
+class MachineApiGovernanceMiddleware:
+    """在回應完成後歸還 app token 認證階段取得的 in-flight lease。
+
+    使用純 ASGI 形式（非 ``BaseHTTPMiddleware``），lease 會涵蓋到 response body
+    完整送出為止，StreamingResponse 也不例外。不以路徑前綴過濾：lease 只會由
+    app token 認證 dependency 放進 ``request.state``，其他請求只多一次 dict 查找。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            state = scope.get("state") or {}
+            lease = state.pop("machine_api_lease", None) if isinstance(state, dict) else None
+            if lease is not None:
+                await get_machine_api_governor().release(lease)
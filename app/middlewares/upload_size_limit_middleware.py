@@ -0,0 +1,94 @@
+"""上傳請求 body 大小上限的 ASGI Middleware"""
+
+from typing import Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.attachment_upload import get_max_request_bytes
+
+UPLOAD_PATH_SUFFIXES: Tuple[str, ...] = ("/upload-results",)
+
+
+class _RequestBodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """在 multipart 解析之前擋下超過 ``attachments.max_request_mb`` 的上傳請求。
+
+    endpoint 拿到 ``UploadFile`` 時 Starlette 已把整個 body spool 到暫存檔，因此上限必須在這一層
+    處理：有 Content-Length 時直接回 413、不讀 body；chunked 或謊報長度時在 ``receive`` 累計位元組，
+    超過即中止，app 因此產生的錯誤回應會被丟棄並改回 413。
+    """
+
+    def __init__(self, app: ASGIApp, path_suffixes: Tuple[str, ...] = UPLOAD_PATH_SUFFIXES) -> None:
+        self.app = app
+        self.path_suffixes = path_suffixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope.get("method") != "POST"
+            or not scope.get("path", "").endswith(self.path_suffixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = get_max_request_bytes()
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = _content_length(scope)
+        if content_length is not None and content_length > max_bytes:
+            await _reject(scope, receive, send, max_bytes)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    exceeded = True
+                    raise _RequestBodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _RequestBodyTooLarge:
+            pass
+        if exceeded and not response_started:
+            await _reject(scope, receive, send, max_bytes)
+
+
+def _content_length(scope: Scope) -> Optional[int]:
+    for name, value in scope.get("headers") or []:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, max_bytes: int) -> None:
+    response = JSONResponse(
+        status_code=413,
+        content={"detail": f"上傳請求超過大小上限 {max_bytes} bytes"},
+        headers={"Connection": "close"},
+    )
+    await response(scope, receive, send)
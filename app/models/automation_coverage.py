@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
 
 from pydantic import BaseModel, ConfigDict
 
@@ -59,5 +59,7 @@ class AutomationCoverageResponse(BaseModel):
     by_group: list[AutomationCoverageGroupItem]
     by_format: dict[str, int]
     trend: list[AutomationCoverageTrendPoint]
+    # 物化快照的計算時間（UTC）；即時計算時為回應產生的時間
+    snapshot_computed_at: datetime | None = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -23,3 +23,5 @@ class DashboardResponse(BaseModel):
     current_user: DashboardCurrentUser
     sections: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
     quick_actions: List[DashboardQuickAction] = Field(default_factory=list)
+    section_timings_ms: Dict[str, float] = Field(default_factory=dict)
+    cached: bool = False
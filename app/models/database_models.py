@@ -6,12 +6,15 @@
 """
 
 import hashlib
+import json
 import logging
+from typing import Optional
 
 from sqlalchemy import (
     Column,
     Integer,
     String,
+    Date,
     DateTime,
     ForeignKey,
     Enum,
@@ -24,6 +27,7 @@ from sqlalchemy import (
     func,
     event,
     false,
+    inspect,
 )
 from sqlalchemy.orm import relationship, declarative_base, column_property
 from datetime import datetime
@@ -226,6 +230,74 @@ class TestRunConfig(Base):
     )
 
 
+class TestRunConfigScope(Base):
+    """Test Run Config 的 Test Case Set 範圍（正規化自 test_case_set_ids_json）
+
+    每個 (config_id, set_id) 一列，position 保留 JSON 陣列順序。由下方
+    TestRunConfig 的 mapper event 於寫入時同步，供批次查詢多個 config 的範圍
+    及以 set 反查 config。set_id 不設 FK：既有 JSON 可能引用已刪除的 set。
+    """
+
+    __tablename__ = "test_run_config_scope"
+    __table_args__ = (Index("ix_test_run_config_scope_set_id", "set_id"),)
+
+    config_id = Column(
+        Integer,
+        ForeignKey("test_run_configs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    set_id = Column(Integer, primary_key=True)
+    position = Column(Integer, nullable=False, default=0)
+
+
+def _config_scope_set_ids(raw_json: Optional[str]) -> list[int]:
+    # 與 TestRunScopeService.parse_scope_ids_json 相同規則（避免 models → services import）
+    if not raw_json:
+        return []
+    try:
+        parsed = json.loads(raw_json)
+    except (TypeError, ValueError):
+        return []
+    values = parsed if isinstance(parsed, list) else [parsed]
+    normalized: list[int] = []
+    for raw in values:
+        try:
+            set_id = int(raw)
+        except (TypeError, ValueError):
+            continue
+        if set_id > 0 and set_id not in normalized:
+            normalized.append(set_id)
+    return normalized
+
+
+def _rewrite_test_run_config_scope(connection, target: "TestRunConfig") -> None:
+    scope = TestRunConfigScope.__table__
+    connection.execute(scope.delete().where(scope.c.config_id == target.id))
+    rows = [
+        {"config_id": target.id, "set_id": set_id, "position": position}
+        for position, set_id in enumerate(_config_scope_set_ids(target.test_case_set_ids_json))
+    ]
+    if rows:
+        connection.execute(scope.insert(), rows)
+
+
+@event.listens_for(TestRunConfig, "after_insert")
+def _sync_test_run_config_scope_on_insert(mapper, connection, target: TestRunConfig) -> None:
+    _rewrite_test_run_config_scope(connection, target)
+
+
+@event.listens_for(TestRunConfig, "after_update")
+def _sync_test_run_config_scope_on_update(mapper, connection, target: TestRunConfig) -> None:
+    if inspect(target).attrs.test_case_set_ids_json.history.has_changes():
+        _rewrite_test_run_config_scope(connection, target)
+
+
+@event.listens_for(TestRunConfig, "before_delete")
+def _drop_test_run_config_scope_on_delete(mapper, connection, target: TestRunConfig) -> None:
+    scope = TestRunConfigScope.__table__
+    connection.execute(scope.delete().where(scope.c.config_id == target.id))
+
+
 class TestRunSet(Base):
     """測試執行集合表格"""
 
@@ -555,6 +627,8 @@ class TestCaseLocal(Base):
         Index("ix_test_cases_team_priority", "team_id", "priority"),
         Index("ix_test_cases_number", "test_case_number"),
         Index("ix_test_cases_set_section", "test_case_set_id", "test_case_section_id"),
+        # 外部讀取（MCP / app）清單的 keyset 分頁順序
+        Index("ix_test_cases_team_created", "team_id", "created_at", "id"),
     )
 
 
@@ -1001,6 +1075,87 @@ class QAAIHelperTelemetryEvent(Base):
     user = relationship("User")
 
 
+class QAAIHelperLLMResponseCache(Base):
+    """QA AI Helper stage 回應的內容定址快取（key = stage + model + temperature + prompt hash）。"""
+
+    __tablename__ = "qa_ai_helper_llm_response_cache"
+    __table_args__ = (
+        Index("ix_qa_ai_helper_llm_response_cache_expires_at", "expires_at"),
+        Index("ix_qa_ai_helper_llm_response_cache_last_used_at", "last_used_at"),
+    )
+
+    cache_key = Column(String(64), primary_key=True)
+    stage = Column(String(32), nullable=False)
+    model_name = Column(String(255), nullable=False)
+    temperature = Column(Float, nullable=False, default=0.0)
+    prompt_hash = Column(String(64), nullable=False)
+    content = Column(qa_ai_helper_large_text_type(), nullable=False)
+    finish_reason = Column(String(32), nullable=True)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class LLMSchedulerSlot(Base):
+    """叢集層 LLM 併發 slot；lease 逾時視為釋放（worker 崩潰不會永久佔用）。"""
+
+    __tablename__ = "llm_scheduler_slots"
+
+    slot_no = Column(Integer, primary_key=True, autoincrement=False)
+    lease_key = Column(String(64), nullable=True)
+    stage = Column(String(64), nullable=True)
+    acquired_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+
+
+class LLMSchedulerTokenBucket(Base):
+    """叢集層每分鐘 LLM token 預算 bucket。"""
+
+    __tablename__ = "llm_scheduler_token_buckets"
+    __table_args__ = (
+        UniqueConstraint("bucket_started_at", name="uq_llm_scheduler_token_bucket_started_at"),
+        Index("ix_llm_scheduler_token_buckets_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bucket_started_at = Column(DateTime, nullable=False)
+    used_tokens = Column(Integer, nullable=False, default=0, server_default="0")
+    expires_at = Column(DateTime, nullable=False)
+
+
+class QAAIHelperUsageDailyRollup(Base):
+    """QA AI Helper 每日使用量 rollup（依 session 建立日、團隊、建立者彙總）。"""
+
+    __tablename__ = "qa_ai_helper_usage_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("stat_date", "team_id", "user_id", name="uq_qa_ai_helper_usage_daily_rollup_key"),
+        Index("ix_qa_ai_helper_usage_daily_rollups_team_date", "team_id", "stat_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    stat_date = Column(Date, nullable=False)
+    team_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False, default=0)
+    session_count = Column(Integer, nullable=False, default=0)
+    completed_session_count = Column(Integer, nullable=False, default=0)
+    failed_session_count = Column(Integer, nullable=False, default=0)
+    output_session_count = Column(Integer, nullable=False, default=0)
+    generated_seed_count = Column(Integer, nullable=False, default=0)
+    included_seed_count = Column(Integer, nullable=False, default=0)
+    generated_tc_count = Column(Integer, nullable=False, default=0)
+    selected_tc_count = Column(Integer, nullable=False, default=0)
+    committed_tc_count = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    ai_item_count = Column(Integer, nullable=False, default=0)
+    edited_item_count = Column(Integer, nullable=False, default=0)
+    source_updated_at = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class QAAIHelperTicketSnapshot(Base):
     """Screen-2 readonly ticket snapshot for V3 helper."""
 
@@ -1517,6 +1672,8 @@ class LarkUser(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_sync_at = Column(DateTime, nullable=True)
+    # 同步內容雜湊（排除時間欄位），內容未變動的用戶同步時跳過更新
+    content_hash = Column(String(64), nullable=True)
 
     # 關聯關係
     primary_department = relationship("LarkDepartment", back_populates="users")
@@ -1977,6 +2134,8 @@ class AutomationScript(Base):
             "ix_automation_scripts_team_provider_repo_branch",
             "team_id", "provider_id", "ref_repo", "ref_branch",
         ),
+        # Suite membership 以 (team_id, ref_path) join 回 script（見 AutomationScriptGroupMember）
+        Index("ix_automation_scripts_team_path", "team_id", "ref_path"),
     )
 
     id = Column(Integer, primary_key=True)
@@ -2074,6 +2233,27 @@ class AutomationScriptCaseLink(Base):
     team = relationship("Team")
 
 
+class AutomationCoverageSnapshot(Base):
+    """每個 team 的 automation coverage 物化快照（summary / by_format / by_group / 30 天趨勢）。
+
+    寫入 link、script 或 test case 時由 session hook 遞增 ``source_version``；
+    ``computed_version`` 與之相同且 ``computed_at`` 為當日（UTC）才視為新鮮，
+    否則讀取端以 grouped SQL 重算後寫回。
+    """
+
+    __tablename__ = "automation_coverage_snapshots"
+    __table_args__ = (
+        UniqueConstraint("team_id", name="uq_automation_coverage_snapshots_team"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    source_version = Column(Integer, nullable=False, default=0)
+    computed_version = Column(Integer, nullable=True)
+    payload_json = Column(Text, nullable=True)
+    computed_at = Column(DateTime, nullable=True)
+
+
 class AutomationEnvironment(Base):
     """Per-team, user-defined automation environment catalog (e.g. dev/sit/prod).
 
@@ -2215,6 +2395,87 @@ class AutomationScriptGroup(Base):
     runs = relationship("AutomationRun", back_populates="script_group")
 
 
+class AutomationScriptGroupMember(Base):
+    """Normalized suite → script path membership.
+
+    Mirrors ``AutomationScriptGroup.script_paths_json`` one row per path so
+    listings can resolve members to current script ids with a single indexed
+    join instead of parsing JSON per request. Rows are rewritten by the group's
+    after_insert / after_update / before_delete listeners below.
+    """
+
+    __tablename__ = "automation_script_group_members"
+    __table_args__ = (
+        UniqueConstraint("group_id", "position", name="uq_automation_script_group_member_position"),
+        Index("ix_automation_script_group_members_team_path", "team_id", "ref_path"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(
+        Integer,
+        ForeignKey("automation_script_groups.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)
+    ref_repo = Column(String(255), nullable=False, server_default="")
+    ref_path = Column(String(500), nullable=False)
+
+
+def _script_group_member_paths(script_paths_json: Optional[str]) -> list[str]:
+    # Same parsing rules as script_group_service._load_script_paths (kept local
+    # to avoid a models → services import).
+    if not script_paths_json:
+        return []
+    try:
+        payload = json.loads(script_paths_json)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(payload, list):
+        return []
+    return [str(item) for item in payload if str(item).strip()]
+
+
+def _rewrite_script_group_members(connection, target: "AutomationScriptGroup") -> None:
+    members = AutomationScriptGroupMember.__table__
+    connection.execute(members.delete().where(members.c.group_id == target.id))
+    rows = [
+        {
+            "group_id": target.id,
+            "team_id": target.team_id,
+            "position": position,
+            "ref_repo": target.ref_repo or "",
+            "ref_path": path,
+        }
+        for position, path in enumerate(_script_group_member_paths(target.script_paths_json))
+    ]
+    if rows:
+        connection.execute(members.insert(), rows)
+
+
+@event.listens_for(AutomationScriptGroup, "after_insert")
+def _sync_script_group_members_on_insert(mapper, connection, target: AutomationScriptGroup) -> None:
+    _rewrite_script_group_members(connection, target)
+
+
+@event.listens_for(AutomationScriptGroup, "after_update")
+def _sync_script_group_members_on_update(mapper, connection, target: AutomationScriptGroup) -> None:
+    state = inspect(target)
+    if not any(
+        state.attrs[attr].history.has_changes()
+        for attr in ("script_paths_json", "ref_repo", "team_id")
+    ):
+        return
+    _rewrite_script_group_members(connection, target)
+
+
+@event.listens_for(AutomationScriptGroup, "before_delete")
+def _drop_script_group_members_on_delete(mapper, connection, target: AutomationScriptGroup) -> None:
+    # FK 已設 ON DELETE CASCADE；顯式刪除讓未啟用 FK 的 SQLite 連線也一致
+    members = AutomationScriptGroupMember.__table__
+    connection.execute(members.delete().where(members.c.group_id == target.id))
+
+
 class AutomationRun(Base):
     """Automation run metadata mirrored from external CI"""
 
@@ -2466,6 +2727,32 @@ class AdHocRunItem(Base):
     sheet = relationship("AdHocRunSheet", back_populates="items")
 
 
+class ExternalReadCount(Base):
+    """外部讀取 API 的計數快取（由寫入時的 session hook 增量維護，每日 reconcile 校正）。
+
+    scope:
+    - ``team``：scope_id = team_id，item_count = team 的 test case 總數；此列存在即代表
+      該 team 的 case 計數已具體化（含其所有 ``case_set`` 列）。
+    - ``case_set``：scope_id = test_case_set_id，item_count = set 內的 case 數。
+    - ``adhoc_run``：scope_id = adhoc_run_id，sheet_count / item_count / executed_count。
+    """
+
+    __tablename__ = "external_read_counts"
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_id", name="uq_external_read_counts_scope"),
+        Index("ix_external_read_counts_team_scope", "team_id", "scope"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(16), nullable=False)
+    scope_id = Column(Integer, nullable=False)
+    team_id = Column(Integer, nullable=False)
+    item_count = Column(Integer, nullable=False, default=0)
+    sheet_count = Column(Integer, nullable=False, default=0)
+    executed_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
 class AssistantConversation(Base):
     """全域 AI 助手對話（per-user，team 脈絡可為空）"""
 
@@ -56,6 +56,8 @@ class MCPPageMeta(BaseModel):
     limit: int
     total: int
     has_next: bool
+    # Keyset cursor（id 遞減）；僅支援 cursor 的清單端點會回傳
+    next_cursor: Optional[str] = None
 
 
 class MCPTeamTestCasesResponse(BaseModel):
@@ -275,3 +277,4 @@ class MCPTeamAutomationCoverageResponse(BaseModel):
     summary: MCPAutomationCoverageSummary
     uncovered_sample: List[MCPAutomationCoverageUncoveredCase] = Field(default_factory=list)
     trend: List[MCPAutomationCoverageTrendPoint] = Field(default_factory=list)
+    snapshot_computed_at: Optional[datetime] = None
@@ -329,6 +329,7 @@ class QAAIHelperDraftUpdateRequest(BaseModel):
 
 class QAAIHelperTestcaseGenerateRequest(BaseModel):
     force_regenerate: bool = False
+    bypass_cache: bool = False
 
 
 class QAAIHelperTestcaseDraftUpdateRequest(BaseModel):
@@ -432,6 +433,7 @@ class QAAIHelperGenerateRequest(BaseModel):
     row_group_keys: List[str] = Field(default_factory=list)
     confirm_exhaustive: bool = False
     force_regenerate: bool = False
+    bypass_cache: bool = False
 
 
 class QAAIHelperCheckConditionPayload(BaseModel):
@@ -518,6 +520,7 @@ class QAAIHelperSeedRefineItemRequest(BaseModel):
 
 class QAAIHelperSeedRefineRequest(BaseModel):
     items: List[QAAIHelperSeedRefineItemRequest] = Field(default_factory=list)
+    bypass_cache: bool = False
 
 
 class QAAIHelperSessionResponse(BaseModel):
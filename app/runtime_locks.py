@@ -1,12 +1,14 @@
 """跨引擎執行期鎖。
 
-提供兩種鎖：
+提供三種鎖：
 
 - ``bootstrap_lock()``：短命、阻塞式 context manager，序列化平行啟動下的資料庫
   schema 變更（避免兩個行程同時跑 Alembic upgrade）。
 - ``BackgroundLeaderLock``：長命、非阻塞 try-acquire，選出唯一執行背景服務
-  （排程器 + automation ticker）的 leader 行程，使 web 層可多 worker / 多副本而
+  （automation ticker 等）的 leader 行程，使 web 層可多 worker / 多副本而
   不重複扇出。
+- ``job_lock(name)``：同一機制的 per-job 版本；排程器在每個 worker 上都會運作，
+  每次執行排程任務前先取得該任務的鎖，只有取得者執行。
 
 跨引擎實作：
 
@@ -23,6 +25,7 @@ from __future__ import annotations
 import logging
 import os
 import tempfile
+import zlib
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterator, Optional
@@ -38,6 +41,8 @@ _BOOTSTRAP_LOCK_KEY = 0x54435242  # 'TCRB' → postgres bigint advisory key
 _LEADER_LOCK_KEY = 0x54435254     # 'TCRT'
 _BOOTSTRAP_LOCK_NAME = "tcrt_bootstrap"          # mysql GET_LOCK 名稱 / sqlite 檔名
 _LEADER_LOCK_NAME = "tcrt_background_leader"
+_JOB_LOCK_KEY_BASE = 0x5443524A << 32  # 'TCRJ' 高 32 位元 + 任務名稱 crc32
+_JOB_LOCK_NAME_PREFIX = "tcrt_job_"
 _BOOTSTRAP_LOCK_TIMEOUT_SECONDS = 120
 
 
@@ -160,7 +165,9 @@ def bootstrap_lock() -> Iterator[None]:
 class BackgroundLeaderLock:
     """背景服務 leader 鎖（非阻塞 try-acquire；唯有取得者才執行背景服務）。"""
 
-    def __init__(self) -> None:
+    def __init__(self, name: str = _LEADER_LOCK_NAME, key: int = _LEADER_LOCK_KEY) -> None:
+        self.name = name
+        self.key = key
         self._engine = None
         self._conn = None
         self._file = None
@@ -178,9 +185,9 @@ class BackgroundLeaderLock:
                 engine = create_engine(sync_url, poolclass=NullPool, future=True)
                 conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
                 if backend == "postgresql":
-                    got = bool(conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _LEADER_LOCK_KEY}).scalar())
+                    got = bool(conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": self.key}).scalar())
                 else:
-                    got = conn.execute(text("SELECT GET_LOCK(:n, 0)"), {"n": _LEADER_LOCK_NAME}).scalar() == 1
+                    got = conn.execute(text("SELECT GET_LOCK(:n, 0)"), {"n": self.name}).scalar() == 1
                 if got:
                     self._engine, self._conn, self._backend, self.is_leader = engine, conn, backend, True
                     return True
@@ -191,7 +198,7 @@ class BackgroundLeaderLock:
             # SQLite 及其他：非阻塞檔案鎖
             import portalocker
 
-            handle = open(_lock_file_path(_LEADER_LOCK_NAME), "a+")  # noqa: SIM115
+            handle = open(_lock_file_path(self.name), "a+")  # noqa: SIM115
             try:
                 portalocker.lock(handle, portalocker.LOCK_EX | portalocker.LOCK_NB)
             except portalocker.exceptions.LockException:
@@ -200,7 +207,7 @@ class BackgroundLeaderLock:
             self._file, self._backend, self.is_leader = handle, backend, True
             return True
         except Exception as exc:  # noqa: BLE001
-            logger.warning("嘗試取得背景 leader 鎖失敗：%s", exc)
+            logger.warning("嘗試取得背景 leader 鎖 %s 失敗：%s", self.name, exc)
             return False
 
     def release(self) -> None:
@@ -211,9 +218,9 @@ class BackgroundLeaderLock:
         if self._conn is not None:
             try:
                 if self._backend == "postgresql":
-                    self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _LEADER_LOCK_KEY})
+                    self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": self.key})
                 elif self._backend in ("mysql", "mariadb"):
-                    self._conn.execute(text("SELECT RELEASE_LOCK(:n)"), {"n": _LEADER_LOCK_NAME})
+                    self._conn.execute(text("SELECT RELEASE_LOCK(:n)"), {"n": self.name})
             except Exception:  # noqa: BLE001
                 pass
             finally:
@@ -241,5 +248,11 @@ class BackgroundLeaderLock:
                 self._file = None
 
 
+def job_lock(job_name: str) -> BackgroundLeaderLock:
+    """建立單一排程任務的鎖；PG advisory key 由任務名稱 crc32 推得，跨行程一致。"""
+    name = f"{_JOB_LOCK_NAME_PREFIX}{job_name}"
+    return BackgroundLeaderLock(name=name, key=_JOB_LOCK_KEY_BASE | zlib.crc32(name.encode("utf-8")))
+
+
 # 模組層級 singleton，與 task_scheduler / automation_background_manager 的模式一致
 background_leader_lock = BackgroundLeaderLock()
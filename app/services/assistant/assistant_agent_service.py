@@ -17,6 +17,7 @@ import contextlib
 import json
 import logging
 import re
+import time
 from typing import Optional
 
 from app.auth.models import UserRole
@@ -31,13 +32,14 @@ from app.services.assistant.assistant_llm_service import (
     AssistantLLMContextLengthError,
     AssistantLLMError,
     AssistantLLMService,
+    stream_text_deltas,
 )
 from app.services.assistant.conversation_service import (
     LEASE_SAFETY_MARGIN_SECONDS,
     ConversationService,
 )
 from app.services.assistant.errors import PendingActionNotFoundError
-from app.services.assistant.history_builder import build_llm_messages, drop_oldest_group
+from app.services.assistant.history_builder import drop_oldest_group
 from app.services.assistant.tool_executor import (
     RejectionResult,
     ToolExecutionOutcome,
@@ -45,6 +47,8 @@ from app.services.assistant.tool_executor import (
 )
 from app.services.assistant.content_store import assemble_system_prompt_for_agent
 from app.services.assistant.tool_registry import READ, ToolRegistry
+from app.services.assistant.turn_context import TurnContext
+from app.services.llm_scheduler import llm_request_scope
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +102,43 @@ def _is_stale_preconfirm_prose(text: str) -> bool:
     return bool(_STALE_PRECONFIRM_RE.search(stripped))
 
 
+class _TextDeltaForwarder:
+    """把 LLM 串流中的累積文字轉成 `text_delta` 事件（partial），依間隔合併以控制 DB 寫入量。
+
+    前端對 text_delta 是「以 content 取代目前文字」，因此 partial 事件帶的是累積全文；
+    最終完整回覆仍由既有路徑寫入訊息與最後一個 text_delta。"""
+
+    def __init__(self, conversation_service: ConversationService, *, turn_id: int, interval_seconds: float):
+        self.conversation_service = conversation_service
+        self.turn_id = turn_id
+        self.interval_seconds = interval_seconds
+        self.emitted = False
+        self._last_flush = 0.0
+
+    async def push(self, content: str) -> None:
+        now = time.monotonic()
+        if self.emitted and now - self._last_flush < self.interval_seconds:
+            return
+        self._last_flush = now
+        self.emitted = True
+        await self.conversation_service.append_event(
+            turn_id=self.turn_id, event_type="text_delta", payload={"content": content, "partial": True}
+        )
+
+
+async def _call_llm(
+    llm_service: AssistantLLMService,
+    forwarder: Optional[_TextDeltaForwarder],
+    *,
+    system_prompt: str,
+    messages: list,
+    tools: list,
+):
+    # sink 只包住這一次 call：ContextVar 會被 create_task 複製，不可外溢到背景標題生成等呼叫。
+    with stream_text_deltas(forwarder.push if forwarder is not None else None):
+        return await llm_service.call(system_prompt=system_prompt, messages=messages, tools=tools)
+
+
 async def _renew_or_stop(conversation_service: ConversationService, *, conversation_id: int, turn_key: str, ttl_seconds: int) -> bool:
     return await conversation_service.renew_lease(conversation_id=conversation_id, turn_key=turn_key, ttl_seconds=ttl_seconds)
 
@@ -267,25 +308,88 @@ async def _run_llm_loop(
             )
             create_case_temp_upload_id = None
 
-    if await conversation_service.is_cancel_requested(turn_id=turn.id):
-        await _finish_cancelled(conversation_service, conversation=conversation, turn=turn, user_id=user_id)
-        return
-    if not await _renew_or_stop(
+    # 歷史只在回合開始載入一次，之後每次迭代由 checkpoint 帶回本 turn 的新訊息；
+    # cancel／續租／事件寫入同樣合併進 checkpoint 的單一交易。
+    context = TurnContext(
         conversation_service,
         conversation_id=conversation_id,
+        turn_id=turn.id,
         turn_key=turn_key,
-        ttl_seconds=config.llm_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS,
-    ):
+        config=config,
+        attachments_by_turn=attachments_by_turn,
+    )
+    llm_lease_ttl = config.llm_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS
+    tool_lease_ttl = config.tool_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS
+
+    checkpoint = await context.checkpoint(ttl_seconds=llm_lease_ttl)
+    if checkpoint.cancel_requested:
+        await _finish_cancelled(conversation_service, conversation=conversation, turn=turn, user_id=user_id)
+        return
+    if not checkpoint.lease_held:
         return
-    await conversation_service.append_event(turn_id=turn.id, event_type="message_start", payload=None)
+    await context.load_history()
+    context.queue_event("message_start", None)
 
-    iteration = 0
+    try:
+        # 全域 LLM scheduler 依 team / user 公平排隊；global 對話沒有固定 team
+        with llm_request_scope(team_id=bound_team, user_id=user_id):
+            await _iterate_llm_loop(
+                context,
+                conversation=conversation,
+                turn=turn,
+                user_id=user_id,
+                role=role,
+                jwt=jwt,
+                conversation_service=conversation_service,
+                executor=executor,
+                llm_service=llm_service,
+                registry=registry,
+                config=config,
+                system_prompt=system_prompt,
+                tools_by_name=tools_by_name,
+                llm_tools_schema=llm_tools_schema,
+                create_case_temp_upload_id=create_case_temp_upload_id,
+                suppress_terminal_text=suppress_terminal_text,
+                llm_lease_ttl=llm_lease_ttl,
+                tool_lease_ttl=tool_lease_ttl,
+            )
+    finally:
+        context.log_stats()
+
+
+async def _iterate_llm_loop(
+    context: TurnContext,
+    *,
+    conversation,
+    turn,
+    user_id: int,
+    role: UserRole,
+    jwt: str,
+    conversation_service: ConversationService,
+    executor: ToolExecutor,
+    llm_service: AssistantLLMService,
+    registry: ToolRegistry,
+    config,
+    system_prompt: str,
+    tools_by_name: dict,
+    llm_tools_schema: list,
+    create_case_temp_upload_id: Optional[str],
+    suppress_terminal_text: bool,
+    llm_lease_ttl: int,
+    tool_lease_ttl: int,
+) -> None:
+    conversation_id = conversation.id
+    turn_key = turn.turn_key
     while True:
-        if await conversation_service.is_cancel_requested(turn_id=turn.id):
+        checkpoint = await context.checkpoint(ttl_seconds=llm_lease_ttl, fetch_messages=True)
+        if checkpoint.cancel_requested:
             await _finish_cancelled(conversation_service, conversation=conversation, turn=turn, user_id=user_id)
             return
+        if not checkpoint.lease_held:
+            logger.info("assistant runner lost lease turn_key=%s before LLM call, stopping", turn_key)
+            return
 
-        if iteration >= config.max_iterations:
+        if context.iterations >= config.max_iterations:
             if suppress_terminal_text:
                 await _finish_without_terminal_text(
                     conversation_service, conversation=conversation, turn=turn, user_id=user_id
@@ -298,31 +402,26 @@ async def _run_llm_loop(
             )
             await conversation_service.append_event(turn_id=turn.id, event_type="done", payload=None)
             return
-        iteration += 1
-
-        if not await _renew_or_stop(
-            conversation_service, conversation_id=conversation_id, turn_key=turn_key,
-            ttl_seconds=config.llm_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS,
-        ):
-            logger.info("assistant runner lost lease turn_key=%s before LLM call, stopping", turn_key)
-            return
-
-        rows = await conversation_service.load_conversation_messages(conversation_id=conversation_id)
-        messages = build_llm_messages(
-            rows,
-            max_chars=config.history_max_chars,
-            attachments_by_turn=attachments_by_turn,
-            compact_enabled=config.history_compact_enabled,
-            compact_threshold_ratio=config.history_compact_threshold_ratio,
-            compact_keep_recent_groups=config.history_compact_keep_recent_groups,
-        )
+        context.iterations += 1
+
+        messages = await context.llm_messages()
+        # confirm continuation 需先看完整內容才能過濾 stale pre-confirm 文案，因此不串流
+        forwarder = None
+        if config.llm_streaming and not suppress_terminal_text:
+            forwarder = _TextDeltaForwarder(
+                conversation_service, turn_id=turn.id, interval_seconds=config.llm_stream_flush_interval_ms / 1000
+            )
 
         try:
-            result = await llm_service.call(system_prompt=system_prompt, messages=messages, tools=llm_tools_schema)
+            result = await _call_llm(
+                llm_service, forwarder, system_prompt=system_prompt, messages=messages, tools=llm_tools_schema
+            )
         except AssistantLLMContextLengthError:
             trimmed = drop_oldest_group(messages)
             try:
-                result = await llm_service.call(system_prompt=system_prompt, messages=trimmed, tools=llm_tools_schema)
+                result = await _call_llm(
+                    llm_service, forwarder, system_prompt=system_prompt, messages=trimmed, tools=llm_tools_schema
+                )
             except AssistantLLMError as exc2:
                 logger.warning(
                     "assistant LLM retry failed turn_key=%s error_type=%s",
@@ -359,15 +458,10 @@ async def _run_llm_loop(
                 )
             return
 
-        if not await _renew_or_stop(
-            conversation_service,
-            conversation_id=conversation_id,
-            turn_key=turn_key,
-            ttl_seconds=config.llm_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS,
-        ):
+        checkpoint = await context.checkpoint(ttl_seconds=llm_lease_ttl)
+        if not checkpoint.lease_held:
             return
-
-        if await conversation_service.is_cancel_requested(turn_id=turn.id):
+        if checkpoint.cancel_requested:
             await _finish_cancelled(conversation_service, conversation=conversation, turn=turn, user_id=user_id)
             return
 
@@ -412,10 +506,12 @@ async def _run_llm_loop(
             call.arguments["temp_upload_id"] = create_case_temp_upload_id
         tool = tools_by_name.get(call.name)
 
-        if not await _renew_or_stop(
-            conversation_service, conversation_id=conversation_id, turn_key=turn_key,
-            ttl_seconds=config.tool_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS,
-        ):
+        if forwarder is not None and forwarder.emitted:
+            # 模型串流了前導文字後改呼叫工具：清掉已顯示的文字（它不會進入歷史）
+            context.queue_event("text_delta", {"content": "", "partial": True})
+        if tool is not None:
+            context.queue_event("tool_started", {"tool_name": tool.name})
+        if not (await context.checkpoint(ttl_seconds=tool_lease_ttl)).lease_held:
             logger.info("assistant runner lost lease turn_key=%s before tool call, stopping", turn_key)
             return
 
@@ -427,26 +523,16 @@ async def _run_llm_loop(
                 llm_tool_call_id=llm_tool_call_id, tool_name=call.name, arguments_for_history=call.arguments,
                 synthetic_result=synthetic, terminate_turn=False,
             )
-            await conversation_service.append_event(
-                turn_id=turn.id, event_type="tool_finished",
-                payload={"tool_name": call.name, "ok": False, "code": "unknown_tool"},
-            )
+            context.queue_event("tool_finished", {"tool_name": call.name, "ok": False, "code": "unknown_tool"})
             continue
 
-        await conversation_service.append_event(turn_id=turn.id, event_type="tool_started", payload={"tool_name": tool.name})
-
         if tool.risk_level == READ:
             llm_tool_call_id = ids.generate_llm_tool_call_id()
             read_result = await executor.run_read_tool(
                 tool, call.arguments, conversation=conversation, turn=turn, user_id=user_id, role=role,
                 llm_tool_call_id=llm_tool_call_id, jwt=jwt, conversation_service=conversation_service,
             )
-            if not await _renew_or_stop(
-                conversation_service,
-                conversation_id=conversation_id,
-                turn_key=turn_key,
-                ttl_seconds=config.tool_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS,
-            ):
+            if not (await context.checkpoint(ttl_seconds=tool_lease_ttl)).lease_held:
                 return
             if read_result.rejection is not None:
                 rejection = read_result.rejection
@@ -458,36 +544,30 @@ async def _run_llm_loop(
                 )
                 if not rejection.fixable:
                     return
-                await conversation_service.append_event(
-                    turn_id=turn.id, event_type="tool_finished",
-                    payload={"tool_name": tool.name, "ok": False, "code": rejection.code},
-                )
+                context.queue_event("tool_finished", {"tool_name": tool.name, "ok": False, "code": rejection.code})
                 continue
 
             await conversation_service.append_tool_call_and_result(
                 turn_id=turn.id, llm_tool_call_id=llm_tool_call_id, tool_name=tool.name,
                 arguments_for_history=call.arguments, tool_result_payload=read_result.result_payload,
             )
-            await conversation_service.append_event(
-                turn_id=turn.id, event_type="tool_finished",
-                payload={"tool_name": tool.name, "ok": read_result.ok, "http_status": read_result.http_status},
+            context.queue_event(
+                "tool_finished", {"tool_name": tool.name, "ok": read_result.ok, "http_status": read_result.http_status}
             )
             if tool.name == "plan_batch" and isinstance(read_result.result_payload.get("plan"), dict):
                 plan = read_result.result_payload["plan"]
-                await conversation_service.append_event(
-                    turn_id=turn.id,
-                    event_type=_BATCH_EVENT_PLAN_READY,
-                    payload={
+                context.queue_event(
+                    _BATCH_EVENT_PLAN_READY,
+                    {
                         "batch_job_id": plan.get("batch_job_id"),
                         "total_targets": plan.get("total_targets"),
                         "total_chunks": plan.get("total_chunks"),
                     },
                 )
             if tool.name == "generate_chunk_actions" and isinstance(read_result.result_payload.get("actions"), list):
-                await conversation_service.append_event(
-                    turn_id=turn.id,
-                    event_type=_BATCH_EVENT_CHUNK_GENERATED,
-                    payload={
+                context.queue_event(
+                    _BATCH_EVENT_CHUNK_GENERATED,
+                    {
                         "batch_job_id": call.arguments.get("batch_job_id"),
                         "chunk_id": call.arguments.get("chunk_id"),
                         "action_count": len(read_result.result_payload["actions"]),
@@ -502,12 +582,7 @@ async def _run_llm_loop(
             resolved_file_ref = await _resolve_file_ref(
                 conversation_service, conversation_id=conversation_id, turn=turn, user_id=user_id, raw_file_ref=call.arguments.get("file_ref"),
             )
-            if not await _renew_or_stop(
-                conversation_service,
-                conversation_id=conversation_id,
-                turn_key=turn_key,
-                ttl_seconds=config.tool_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS,
-            ):
+            if not (await context.checkpoint(ttl_seconds=tool_lease_ttl)).lease_held:
                 return
             if resolved_file_ref is None:
                 llm_tool_call_id = ids.generate_llm_tool_call_id()
@@ -517,10 +592,7 @@ async def _run_llm_loop(
                     llm_tool_call_id=llm_tool_call_id, tool_name=tool.name, arguments_for_history=call.arguments,
                     synthetic_result=synthetic, terminate_turn=False,
                 )
-                await conversation_service.append_event(
-                    turn_id=turn.id, event_type="tool_finished",
-                    payload={"tool_name": tool.name, "ok": False, "code": "file_ref_invalid"},
-                )
+                context.queue_event("tool_finished", {"tool_name": tool.name, "ok": False, "code": "file_ref_invalid"})
                 continue
         elif tool.execution_mode == "batch_actions":
             resolved_file_refs = {}
@@ -554,12 +626,7 @@ async def _run_llm_loop(
             tool, call.arguments, conversation=conversation, user_id=user_id, role=role, execution_key=execution_key,
             turn=turn, resolved_file_ref=resolved_file_ref, resolved_file_refs=resolved_file_refs,
         )
-        if not await _renew_or_stop(
-            conversation_service,
-            conversation_id=conversation_id,
-            turn_key=turn_key,
-            ttl_seconds=config.tool_timeout_seconds + LEASE_SAFETY_MARGIN_SECONDS,
-        ):
+        if not (await context.checkpoint(ttl_seconds=tool_lease_ttl)).lease_held:
             return
         if isinstance(prepared, RejectionResult):
             llm_tool_call_id = ids.generate_llm_tool_call_id()
@@ -571,10 +638,7 @@ async def _run_llm_loop(
             )
             if not prepared.fixable:
                 return
-            await conversation_service.append_event(
-                turn_id=turn.id, event_type="tool_finished",
-                payload={"tool_name": tool.name, "ok": False, "code": prepared.code},
-            )
+            context.queue_event("tool_finished", {"tool_name": tool.name, "ok": False, "code": prepared.code})
             continue
 
         # create_pending_action_and_complete_turn 已原子寫入 confirmation_required + done 事件，
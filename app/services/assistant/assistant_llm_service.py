@@ -4,21 +4,48 @@
 - 帶 `tools=`/`tool_choice="auto"`/`parallel_tool_calls=False`（LLM history 正規化，見 design D4）。
 - **無 deterministic fallback**：`settings.openrouter.api_key` 缺失或 `assistant.enabled=False` 時
   直接拋 `AssistantNotConfiguredError`，不像 QA AI Helper 有離線退化模式（design D7：無 fallback）。
+
+串流模式（`llm_streaming`，預設開啟）：以 SSE 逐段解析 content 與 tool-call delta；呼叫端可用
+`stream_text_deltas()` 登記 sink，在模型仍生成時就拿到累積文字。每個 worker 共用一個
+keep-alive 連線池（`close_llm_http_session()` 於 shutdown 釋放），並記錄 TTFT 與 tokens/sec。
+呼叫經 `app.services.llm_scheduler` 與 QA AI Helper 共用併發／token 預算並處理 429 退避。
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Iterator, Optional
 
 import aiohttp
 
 from app.config import AssistantConfig, get_settings
 from app.services.assistant.errors import AssistantNotConfiguredError
+from app.services.llm_scheduler import (
+    LLMRateLimitedError,
+    estimate_prompt_tokens,
+    get_llm_scheduler,
+    parse_retry_after,
+)
+
+logger = logging.getLogger(__name__)
 
 OPENROUTER_CHAT_COMPLETIONS_URL = "https://openrouter.ai/api/v1/chat/completions"
 
+TextDeltaSink = Callable[[str], Awaitable[None]]
+
+# 由 agent loop 以 `stream_text_deltas()` 設定；用 ContextVar 而非 `call()` 參數，
+# 讓既有的 `call(system_prompt=, messages=, tools=)` 介面（含測試替身）維持不變。
+_text_delta_sink: ContextVar[Optional[TextDeltaSink]] = ContextVar("assistant_llm_text_delta_sink", default=None)
+
+_METRICS_WINDOW = 200
+
 
 class AssistantLLMError(RuntimeError):
     """非預期的 OpenRouter 錯誤（非 context-length-exceeded）。"""
@@ -28,6 +55,13 @@ class AssistantLLMContextLengthError(AssistantLLMError):
     """provider 判定 request 超過 context window；agent loop 可裁掉最舊 exchange group 重試一次（design D4）。"""
 
 
+class AssistantLLMRateLimitedError(AssistantLLMError, LLMRateLimitedError):
+    """provider 回 429；由 LLM scheduler 退避重試，重試用盡後同 `AssistantLLMError` 處理。"""
+
+    def __init__(self, message: str, *, retry_after: Optional[float] = None):
+        LLMRateLimitedError.__init__(self, message, retry_after=retry_after)
+
+
 @dataclass
 class ParsedToolCall:
     provider_tool_call_id: Optional[str]
@@ -35,6 +69,15 @@ class ParsedToolCall:
     arguments: dict[str, Any]
 
 
+@dataclass
+class AssistantLLMMetrics:
+    streamed: bool
+    total_ms: float
+    time_to_first_token_ms: Optional[float] = None
+    completion_tokens: Optional[int] = None
+    tokens_per_second: Optional[float] = None
+
+
 @dataclass
 class AssistantLLMResult:
     content: Optional[str]
@@ -42,6 +85,138 @@ class AssistantLLMResult:
     finish_reason: Optional[str] = None
     model_name: Optional[str] = None
     response_id: Optional[str] = None
+    metrics: Optional[AssistantLLMMetrics] = None
+
+
+@contextlib.contextmanager
+def stream_text_deltas(sink: Optional[TextDeltaSink]) -> Iterator[None]:
+    """在此區塊內的串流 `call()` 會把「目前累積的文字」送給 sink；一旦出現 tool-call delta 即停止轉送。"""
+    token = _text_delta_sink.set(sink)
+    try:
+        yield
+    finally:
+        _text_delta_sink.reset(token)
+
+
+class _LLMCallMetricsRecorder:
+    """最近 N 次呼叫的 TTFT / tokens/sec（per worker，供 system metrics 與排查用）。"""
+
+    def __init__(self, window: int = _METRICS_WINDOW):
+        self._samples: deque[AssistantLLMMetrics] = deque(maxlen=window)
+
+    def record(self, metrics: AssistantLLMMetrics) -> None:
+        self._samples.append(metrics)
+
+    def snapshot(self) -> dict[str, Any]:
+        samples = list(self._samples)
+        ttfts = sorted(m.time_to_first_token_ms for m in samples if m.time_to_first_token_ms is not None)
+        rates = [m.tokens_per_second for m in samples if m.tokens_per_second is not None]
+
+        def _pct(values: list[float], fraction: float) -> Optional[float]:
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, int(fraction * len(values)))], 1)
+
+        return {
+            "calls": len(samples),
+            "streamed_calls": sum(1 for m in samples if m.streamed),
+            "ttft_ms_p50": _pct(ttfts, 0.5),
+            "ttft_ms_p95": _pct(ttfts, 0.95),
+            "tokens_per_second_avg": round(sum(rates) / len(rates), 1) if rates else None,
+        }
+
+
+llm_call_metrics = _LLMCallMetricsRecorder()
+
+
+class _PooledSession:
+    """每個 worker（event loop）共用一個 aiohttp session；loop 變更或已關閉時重建。"""
+
+    def __init__(self) -> None:
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self, *, max_connections: int) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=max_connections, keepalive_timeout=60, ttl_dns_cache=300)
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        session, self._session, self._loop = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_pooled_session = _PooledSession()
+
+
+async def close_llm_http_session() -> None:
+    await _pooled_session.close()
+
+
+class _StreamAccumulator:
+    """把 chat.completion.chunk 逐段累積成與非串流回應相同形狀的資料。"""
+
+    def __init__(self) -> None:
+        self.content_parts: list[str] = []
+        self.tool_calls: dict[int, dict[str, Any]] = {}
+        self.finish_reason: Optional[str] = None
+        self.model: Optional[str] = None
+        self.response_id: Optional[str] = None
+        self.usage: Optional[dict[str, Any]] = None
+        self.delta_chunks = 0
+
+    @property
+    def content(self) -> str:
+        return "".join(self.content_parts)
+
+    def feed(self, chunk: dict[str, Any]) -> bool:
+        """回傳此 chunk 是否帶有新的 content 或 tool-call 內容。"""
+        self.model = chunk.get("model") or self.model
+        self.response_id = chunk.get("id") or self.response_id
+        if chunk.get("usage"):
+            self.usage = chunk["usage"]
+        produced = False
+        for choice in chunk.get("choices") or []:
+            delta = choice.get("delta") or {}
+            piece = delta.get("content")
+            if piece:
+                self.content_parts.append(piece)
+                produced = True
+            for raw_call in delta.get("tool_calls") or []:
+                slot = self.tool_calls.setdefault(
+                    raw_call.get("index", len(self.tool_calls)), {"id": None, "name": "", "arguments": []}
+                )
+                if raw_call.get("id"):
+                    slot["id"] = raw_call["id"]
+                fn = raw_call.get("function") or {}
+                if fn.get("name"):
+                    slot["name"] += fn["name"]
+                if fn.get("arguments"):
+                    slot["arguments"].append(fn["arguments"])
+                produced = True
+            if choice.get("finish_reason"):
+                self.finish_reason = choice["finish_reason"]
+        if produced:
+            self.delta_chunks += 1
+        return produced
+
+    def to_response(self) -> dict[str, Any]:
+        message: dict[str, Any] = {"content": self.content if self.content_parts else None}
+        if self.tool_calls:
+            message["tool_calls"] = [
+                {"id": slot["id"], "function": {"name": slot["name"], "arguments": "".join(slot["arguments"]) or "{}"}}
+                for _, slot in sorted(self.tool_calls.items())
+            ]
+        return {
+            "id": self.response_id,
+            "model": self.model,
+            "choices": [{"message": message, "finish_reason": self.finish_reason}],
+        }
 
 
 def _is_context_length_error(status: int, body_text: str) -> bool:
@@ -51,9 +226,61 @@ def _is_context_length_error(status: int, body_text: str) -> bool:
     return "context" in lowered and ("length" in lowered or "too long" in lowered or "maximum" in lowered)
 
 
+def _raise_for_error(status: int, body_text: str, *, retry_after: Optional[str] = None) -> None:
+    if status < 400:
+        return
+    if status == 429:
+        raise AssistantLLMRateLimitedError(
+            f"OpenRouter HTTP 429: {body_text[:500]}", retry_after=parse_retry_after(retry_after)
+        )
+    if _is_context_length_error(status, body_text):
+        raise AssistantLLMContextLengthError(f"OpenRouter context length exceeded: {body_text[:500]}")
+    raise AssistantLLMError(f"OpenRouter HTTP {status}: {body_text[:500]}")
+
+
+def _parse_sse_line(line: bytes) -> Any:
+    """單行 SSE：回傳解析後的 chunk、``"[DONE]"``，或 ``None``（空行／註解／非 data 欄位）。"""
+    line = line.strip()
+    if not line.startswith(b"data:"):
+        return None
+    data = line[5:].strip()
+    if data == b"[DONE]":
+        return "[DONE]"
+    try:
+        chunk = json.loads(data)
+    except ValueError:
+        return None
+    error = chunk.get("error") if isinstance(chunk, dict) else None
+    if error:
+        # 串流中途錯誤：HTTP 狀態已是 200，改由 chunk 內的 error 物件回報
+        message = json.dumps(error, ensure_ascii=False) if not isinstance(error, str) else error
+        code = error.get("code") if isinstance(error, dict) else None
+        _raise_for_error(code if isinstance(code, int) and code >= 400 else 502, message)
+    return chunk if isinstance(chunk, dict) else None
+
+
+def _build_metrics(
+    *, streamed: bool, started: float, first_token_at: Optional[float], completion_tokens: Optional[int]
+) -> AssistantLLMMetrics:
+    finished = time.perf_counter()
+    tokens_per_second = None
+    if completion_tokens:
+        generation_seconds = finished - (first_token_at if first_token_at is not None else started)
+        if generation_seconds > 0:
+            tokens_per_second = round(completion_tokens / generation_seconds, 1)
+    return AssistantLLMMetrics(
+        streamed=streamed,
+        total_ms=round((finished - started) * 1000, 1),
+        time_to_first_token_ms=round((first_token_at - started) * 1000, 1) if first_token_at is not None else None,
+        completion_tokens=completion_tokens,
+        tokens_per_second=tokens_per_second,
+    )
+
+
 class AssistantLLMService:
-    def __init__(self, settings=None):
+    def __init__(self, settings=None, *, endpoint_url: str = OPENROUTER_CHAT_COMPLETIONS_URL):
         self._settings = settings or get_settings()
+        self.endpoint_url = endpoint_url
 
     @property
     def _config(self) -> AssistantConfig:
@@ -80,7 +307,7 @@ class AssistantLLMService:
         messages: list[dict[str, Any]],
         tools: list[dict[str, Any]],
     ) -> AssistantLLMResult:
-        """單次非串流 chat completion（design D4：v1 每次迭代非串流，UX 由 SSE 事件呈現）。"""
+        """單次 chat completion；`llm_streaming` 開啟時以串流接收並轉送文字給 `stream_text_deltas` 的 sink。"""
         if not self.is_configured():
             raise AssistantNotConfiguredError()
 
@@ -97,18 +324,105 @@ class AssistantLLMService:
             payload["tool_choice"] = "auto"
 
         timeout = aiohttp.ClientTimeout(total=self._config.llm_timeout_seconds)
-        async with aiohttp.ClientSession() as session:
+        if self._config.llm_streaming:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+
+        async def _send() -> AssistantLLMResult:
+            session = _pooled_session.get(max_connections=self._config.llm_pool_max_connections)
+            # 計時從取得 scheduler 名額後開始：TTFT 不含排隊時間（排隊另計於 scheduler metrics）
+            started = time.perf_counter()
+            if self._config.llm_streaming:
+                return await self._call_streaming(session, payload, timeout, started)
             async with session.post(
-                OPENROUTER_CHAT_COMPLETIONS_URL, headers=self._headers(), json=payload, timeout=timeout
+                self.endpoint_url, headers=self._headers(), json=payload, timeout=timeout
             ) as response:
                 text_body = await response.text()
-                if response.status >= 400:
-                    if _is_context_length_error(response.status, text_body):
-                        raise AssistantLLMContextLengthError(f"OpenRouter context length exceeded: {text_body[:500]}")
-                    raise AssistantLLMError(f"OpenRouter HTTP {response.status}: {text_body[:500]}")
+                _raise_for_error(response.status, text_body, retry_after=response.headers.get("Retry-After"))
                 data = json.loads(text_body)
+            result = self._parse_response(data)
+            usage = data.get("usage") or {}
+            result.metrics = _build_metrics(
+                streamed=False, started=started, first_token_at=None,
+                completion_tokens=usage.get("completion_tokens"),
+            )
+            return result
+
+        result = await get_llm_scheduler().run(
+            _send,
+            stage="assistant",
+            estimated_tokens=estimate_prompt_tokens(
+                system_prompt, *(str(message.get("content") or "") for message in messages)
+            ),
+        )
 
-        return self._parse_response(data)
+        llm_call_metrics.record(result.metrics)
+        logger.info(
+            "assistant llm call model=%s streamed=%s ttft_ms=%s total_ms=%s tokens_per_second=%s",
+            result.model_name,
+            result.metrics.streamed,
+            result.metrics.time_to_first_token_ms,
+            result.metrics.total_ms,
+            result.metrics.tokens_per_second,
+        )
+        return result
+
+    async def _call_streaming(
+        self, session: aiohttp.ClientSession, payload: dict[str, Any], timeout: aiohttp.ClientTimeout, started: float
+    ) -> AssistantLLMResult:
+        sink = _text_delta_sink.get()
+        accumulator = _StreamAccumulator()
+        first_token_at: Optional[float] = None
+        async with session.post(self.endpoint_url, headers=self._headers(), json=payload, timeout=timeout) as response:
+            if response.status >= 400:
+                _raise_for_error(
+                    response.status, await response.text(), retry_after=response.headers.get("Retry-After")
+                )
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                # provider 忽略 stream 旗標時退回一般 JSON 解析
+                data = json.loads(await response.text())
+                result = self._parse_response(data)
+                result.metrics = _build_metrics(
+                    streamed=False, started=started, first_token_at=None,
+                    completion_tokens=(data.get("usage") or {}).get("completion_tokens"),
+                )
+                return result
+
+            buffer = b""
+            done = False
+            async for raw in response.content.iter_any():
+                buffer += raw
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    chunk = _parse_sse_line(line)
+                    if chunk is None:
+                        continue
+                    if chunk == "[DONE]":
+                        done = True
+                        break
+                    if not accumulator.feed(chunk):
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    if sink is not None and not accumulator.tool_calls and accumulator.content_parts:
+                        await sink(accumulator.content)
+                if done:
+                    break
+            if not done and buffer:
+                chunk = _parse_sse_line(buffer)
+                if isinstance(chunk, dict):
+                    accumulator.feed(chunk)
+
+        result = self._parse_response(accumulator.to_response())
+        completion_tokens = (accumulator.usage or {}).get("completion_tokens")
+        result.metrics = _build_metrics(
+            streamed=True,
+            started=started,
+            first_token_at=first_token_at,
+            # provider 未回 usage 時以 delta chunk 數近似（多數 provider 約一 token 一 chunk）
+            completion_tokens=completion_tokens if completion_tokens is not None else accumulator.delta_chunks,
+        )
+        return result
 
     def _parse_response(self, data: dict[str, Any]) -> AssistantLLMResult:
         choice = data["choices"][0]
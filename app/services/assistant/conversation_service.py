@@ -11,7 +11,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Sequence
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Optional
@@ -230,6 +230,15 @@ class TurnStartResult:
     is_replay: bool
 
 
+@dataclass
+class TurnCheckpoint:
+    """`checkpoint_turn` 的單一交易結果。"""
+
+    cancel_requested: bool
+    lease_held: bool
+    new_messages: list[AssistantMessage]
+
+
 class ConversationService:
     def __init__(self, main_boundary: MainAccessBoundary, config: AssistantConfig):
         self.main_boundary = main_boundary
@@ -617,6 +626,63 @@ class ConversationService:
 
         return await self.main_boundary.run_write(_renew)
 
+    async def checkpoint_turn(
+        self,
+        *,
+        conversation_id: int,
+        turn_id: int,
+        turn_key: str,
+        ttl_seconds: int,
+        events: Sequence[tuple[str, dict[str, Any] | None]] = (),
+        after_message_seq: Optional[int] = None,
+    ) -> TurnCheckpoint:
+        """agent 迴圈每次迭代的 bookkeeping 合併為一個交易：續租 lease、讀 cancel 旗標、
+        寫入待送事件，並（`after_message_seq` 非 None 時）取回本 turn 之後新增的訊息。
+
+        事件只在 lease 仍屬本 runner 時寫入（與先 `renew_lease` 再 `append_event` 相同的 fencing）；
+        cancel 旗標照實回報，由呼叫端決定收尾方式。"""
+
+        async def _checkpoint(session: AsyncSession) -> TurnCheckpoint:
+            turn = await session.get(AssistantTurn, turn_id)
+            if turn is None:
+                raise ValueError(f"turn {turn_id} not found")
+            lease_held = False
+            if turn.status == "running" and turn.turn_key == turn_key:
+                now = await _db_now(session)
+                lease_held = await _acquire_or_renew_lease(
+                    session, conversation_id=conversation_id, owner_key=turn_key, ttl_seconds=ttl_seconds, db_now=now
+                )
+            if lease_held:
+                for event_type, payload in events:
+                    seq = turn.next_event_seq
+                    turn.next_event_seq = seq + 1
+                    session.add(
+                        AssistantEvent(
+                            turn_id=turn_id,
+                            seq=seq,
+                            event_type=event_type,
+                            payload_json=json.dumps(payload, ensure_ascii=False) if payload is not None else None,
+                        )
+                    )
+            new_messages: list[AssistantMessage] = []
+            if after_message_seq is not None:
+                new_messages = list(
+                    (
+                        await session.execute(
+                            select(AssistantMessage)
+                            .where(AssistantMessage.turn_id == turn_id, AssistantMessage.message_seq > after_message_seq)
+                            .order_by(AssistantMessage.message_seq.asc())
+                        )
+                    )
+                    .scalars()
+                    .all()
+                )
+            return TurnCheckpoint(
+                cancel_requested=bool(turn.cancel_requested), lease_held=lease_held, new_messages=new_messages
+            )
+
+        return await self.main_boundary.run_write(_checkpoint)
+
     async def complete_turn_release_lease(
         self, *, conversation_id: int, turn_id: int, turn_key: str, user_id: int, status: str, error_message: str | None = None
     ) -> None:
@@ -0,0 +1,278 @@
+"""工具的 in-process 直接派送（取代 HTTP loopback 的快速路徑）。
+
+loopback 每次工具呼叫都會建立 ``httpx.AsyncClient(ASGITransport)`` 重新進入整個 ASGI app：
+GZip、audit / governance middleware、JWT 驗證（含撤銷查詢）、回應 JSON 編碼後再解析。
+直接派送改為：
+
+- 依 method + path 解析出對應的 ``APIRoute``，沿用 FastAPI 的 dependency 解析
+  （權限檢查、team 驗證、handler 內的審計紀錄都照常執行）；
+- ``get_current_user`` 以預先驗證過的 principal 覆寫（同一 JWT 在短 TTL 內只驗證一次；本行程
+  內的登出、token 撤銷、使用者停用 / 角色變更 / 刪除會立即讓快取失效，其他 worker 上的異動
+  最多延遲 TTL 秒生效）；
+- handler 回傳值經 response_model 序列化為 Python 物件直接交給 projection，不經 bytes。
+
+無法等價處理的情況（multipart 檔案、Form body、非 FastAPI app、找不到 route）回傳 ``None``，
+由呼叫端退回 loopback。全域 middleware 中僅 AuditMiddleware 與本路徑相關，而其
+``AUTO_LOG_RESOURCE_TYPES`` 為空，審計紀錄全由 handler 自行寫入，因此語意一致。
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import logging
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+from fastapi import params as fastapi_params
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute, run_endpoint_function, serialize_response
+from fastapi.dependencies.utils import solve_dependencies
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+from app.auth.auth_service import auth_service
+from app.auth.dependencies import get_current_user
+from app.auth.session_service import session_service
+from app.db_access.main import get_main_access_boundary
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+# 同一 JWT 的 principal 快取時間：其他 worker 上的撤銷 / 停用最多延遲此秒數生效
+# （本行程內的異動由 session_service 立即失效；loopback 為每次呼叫皆查）
+PRINCIPAL_CACHE_TTL_SECONDS = 15.0
+_PRINCIPAL_CACHE_MAX_ENTRIES = 256
+
+# 與 get_current_user 的錯誤回應一致
+_UNAUTHORIZED_PAYLOAD = {
+    "detail": {"code": "INVALID_TOKEN", "message": "無效或過期的存取 Token"}
+}
+_INACTIVE_USER_PAYLOAD = {
+    "detail": {"code": "USER_NOT_FOUND_OR_INACTIVE", "message": "使用者不存在或已停用"}
+}
+
+
+@dataclass
+class _CachedPrincipal:
+    user: Any
+    jti: str
+    cached_at: float
+    expires_at: float
+
+
+class _DependencyOverrides:
+    """``solve_dependencies`` 需要的 provider：app 既有覆寫 + principal 覆寫。"""
+
+    def __init__(self, base: dict, principal_dependency):
+        self.dependency_overrides = {**base, get_current_user: principal_dependency}
+
+
+class DirectToolDispatcher:
+    def __init__(self, app, *, principal_ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.app = app
+        self.principal_ttl_seconds = principal_ttl_seconds
+        self._principals: dict[str, _CachedPrincipal] = {}
+
+    # ------------------------------------------------------------------ #
+    # Route / principal 解析
+    # ------------------------------------------------------------------ #
+
+    def resolve_route(self, scope: dict) -> Optional[tuple[APIRoute, dict]]:
+        router = getattr(self.app, "router", None)
+        routes = getattr(router, "routes", None)
+        if not isinstance(routes, list):
+            return None
+        for route in routes:
+            if not isinstance(route, APIRoute):
+                continue
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, child_scope
+        return None
+
+    async def resolve_principal(self, jwt: str) -> tuple[Any, Optional[dict]]:
+        """回傳 ``(user, None)``，驗證失敗時回傳 ``(None, 401 payload)``（錯誤碼與 get_current_user 相同）。"""
+        now = time.monotonic()
+        cached = self._principals.get(jwt)
+        if cached is not None and cached.expires_at > now:
+            if not session_service.is_cached_principal_stale(
+                jti=cached.jti, user_id=cached.user.id, cached_at=cached.cached_at
+            ):
+                return cached.user, None
+        self._principals.pop(jwt, None)
+
+        token_data = await auth_service.verify_token(jwt)
+        if not token_data:
+            return None, _UNAUTHORIZED_PAYLOAD
+        overrides = getattr(self.app, "dependency_overrides", None) or {}
+        boundary_factory = overrides.get(get_main_access_boundary, get_main_access_boundary)
+        user = await UserService.get_user_by_id(token_data.user_id, main_boundary=boundary_factory())
+        if user is None or not user.is_active:
+            return None, _INACTIVE_USER_PAYLOAD
+
+        if len(self._principals) >= _PRINCIPAL_CACHE_MAX_ENTRIES:
+            self._principals = {
+                key: value for key, value in self._principals.items() if value.expires_at > now
+            }
+        self._principals[jwt] = _CachedPrincipal(
+            user=user, jti=token_data.jti, cached_at=now, expires_at=now + self.principal_ttl_seconds
+        )
+        return user, None
+
+    # ------------------------------------------------------------------ #
+    # 派送
+    # ------------------------------------------------------------------ #
+
+    async def dispatch(
+        self,
+        method: str,
+        path: str,
+        *,
+        query_params: dict,
+        body: Optional[dict],
+        headers: dict[str, str],
+        jwt: str,
+    ) -> Optional[tuple[int, Any]]:
+        """直接執行 route handler；回傳 ``None`` 代表此呼叫需退回 loopback。"""
+        body_bytes = json.dumps(body).encode() if body is not None else b""
+        raw_headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+        if body is not None:
+            raw_headers.append((b"content-type", b"application/json"))
+            raw_headers.append((b"content-length", str(len(body_bytes)).encode()))
+        scope: dict[str, Any] = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "server": ("assistant.internal", 80),
+            "client": ("127.0.0.1", 0),
+            "root_path": "",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": str(httpx.QueryParams(query_params or {})).encode(),
+            "headers": raw_headers,
+            "app": self.app,
+            "state": {},
+        }
+        resolved = self.resolve_route(scope)
+        if resolved is None:
+            return None
+        route, child_scope = resolved
+        if route.body_field is not None and isinstance(route.body_field.field_info, fastapi_params.Form):
+            return None
+        scope.update(child_scope)
+
+        base_overrides = getattr(self.app, "dependency_overrides", None) or {}
+        user = None
+        if get_current_user not in base_overrides:
+            user, error_payload = await self.resolve_principal(jwt)
+            if user is None:
+                return 401, error_payload
+
+        body_sent = False
+
+        async def receive() -> dict:
+            nonlocal body_sent
+            if body_sent:
+                return {"type": "http.disconnect"}
+            body_sent = True
+            return {"type": "http.request", "body": body_bytes, "more_body": False}
+
+        request = Request(scope, receive)
+
+        async def _principal_dependency() -> Any:
+            request.state.current_user = user
+            return user
+
+        # app 已覆寫 get_current_user（測試 / 特殊部署）時沿用該覆寫，與 loopback 行為一致
+        overrides = _DependencyOverrides(
+            base_overrides, _principal_dependency if user is not None else base_overrides.get(get_current_user)
+        )
+        try:
+            return await self._run_route(route, request, body, overrides)
+        except Exception as exc:  # noqa: BLE001
+            handled = await self._handle_exception(request, exc)
+            if handled is None:
+                raise
+            return handled
+
+    async def _run_route(self, route: APIRoute, request: Request, body: Optional[dict], overrides) -> tuple[int, Any]:
+        dependant = route.dependant
+        is_coroutine = dependant.is_coroutine_callable
+        async with AsyncExitStack() as request_stack:
+            request.scope["fastapi_inner_astack"] = request_stack
+            async with AsyncExitStack() as function_stack:
+                request.scope["fastapi_function_astack"] = function_stack
+                solved = await solve_dependencies(
+                    request=request,
+                    dependant=dependant,
+                    body=body if route.body_field is not None else None,
+                    dependency_overrides_provider=overrides,
+                    async_exit_stack=request_stack,
+                    embed_body_fields=route._embed_body_fields,
+                )
+                if solved.errors:
+                    raise RequestValidationError(solved.errors, body=body)
+                raw = await run_endpoint_function(
+                    dependant=dependant, values=solved.values, is_coroutine=is_coroutine
+                )
+                if isinstance(raw, Response):
+                    if raw.background is None:
+                        raw.background = solved.background_tasks
+                    status_code, payload = await _decode_response(raw)
+                    if raw.background is not None:
+                        await raw.background()
+                    return status_code, payload
+
+                content = await serialize_response(
+                    field=route.response_field,
+                    response_content=raw,
+                    include=route.response_model_include,
+                    exclude=route.response_model_exclude,
+                    by_alias=route.response_model_by_alias,
+                    exclude_unset=route.response_model_exclude_unset,
+                    exclude_defaults=route.response_model_exclude_defaults,
+                    exclude_none=route.response_model_exclude_none,
+                    is_coroutine=is_coroutine,
+                )
+                status_code = solved.response.status_code or route.status_code or 200
+        if solved.background_tasks is not None:
+            await solved.background_tasks()
+        if status_code == 204:
+            return status_code, None
+        return status_code, content
+
+    async def _handle_exception(self, request: Request, exc: Exception) -> Optional[tuple[int, Any]]:
+        handlers = getattr(self.app, "exception_handlers", None) or {}
+        for cls in type(exc).__mro__:
+            handler = handlers.get(cls)
+            if handler is None:
+                continue
+            response = handler(request, exc)
+            if inspect.isawaitable(response):
+                response = await response
+            return await _decode_response(response)
+        return None
+
+
+async def _decode_response(response: Response) -> tuple[int, Any]:
+    body_iterator = getattr(response, "body_iterator", None)
+    if body_iterator is not None:
+        parts = []
+        async for part in body_iterator:
+            parts.append(part if isinstance(part, bytes) else part.encode(response.charset))
+        content = b"".join(parts)
+    else:
+        content = response.body or b""
+    if not content:
+        return response.status_code, None
+    try:
+        return response.status_code, json.loads(content)
+    except ValueError:
+        return response.status_code, content.decode(response.charset or "utf-8", errors="replace")
@@ -0,0 +1,266 @@
+"""assistant SSE 事件的推播匯流排（spec assistant-agent-loop「SSE 事件協定」）。
+
+原本每個 SSE 連線各自每 0.5s 查一次 `assistant_events`，閒置的串流也持續打 DB。
+本模組改為「事件寫入即通知」：
+
+- 本行程：SQLAlchemy session 在 flush 時記下新增的 `AssistantEvent`（turn_id → 最大 seq），
+  交易 commit 後才喚醒該 turn 的訂閱者；rollback 則丟棄——訂閱者不會看到未落庫的事件。
+  掛在 `Session` 類別層級，所有寫事件的路徑（`append_event`、`checkpoint_turn`、
+  pending action 收尾…）都不需個別呼叫。
+- 跨 worker：PostgreSQL 在同一交易內 `pg_notify`（commit 時才送出），每個 worker 以一條
+  LISTEN 連線接收；其他資料庫以 `assistant_turns.next_event_seq` 作為每 turn 的序號水位，
+  每個 worker 一個輪詢 task 只查「本 worker 有訂閱者的 turn」——一次查詢涵蓋所有連線。
+
+DB 仍是事件內容的唯一權威：通知只負責喚醒，SSE 端被喚醒後（或重連補播時）才讀 DB。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import threading
+from typing import Iterator, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.database_models import AssistantEvent, AssistantTurn
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "tcrt_assistant_events"
+# 沒有訂閱者後 LISTEN 連線保留的秒數（避免 SSE 重連之間反覆建立連線）；輪詢 watcher 則立即結束
+_WATCHER_IDLE_GRACE_SECONDS = 30.0
+_SESSION_INFO_KEY = "assistant_event_marks"
+
+
+class EventSubscription:
+    """單一 SSE 連線對某 turn 的訂閱；`wait` 於有新事件 commit 或逾時時返回。
+
+    使用順序為 `clear()` → 讀 DB → `wait()`：讀取期間到達的通知會保留在旗標上，不會遺失。"""
+
+    def __init__(self, turn_id: int):
+        self.turn_id = turn_id
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def clear(self) -> None:
+        self._event.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def notify(self) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._event.set()
+            return
+        # commit 發生在其他執行緒／loop（例如同步 session）時轉交回訂閱者的 loop
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._event.set)
+
+
+class AssistantEventBus:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[EventSubscription]] = {}
+        # 每個有訂閱者的 turn 已通知過的最大 seq；本地通知與跨 worker 通知以此去重
+        self._delivered: dict[int, int] = {}
+        self._watcher: Optional[asyncio.Task] = None
+        self._watcher_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher_backend: Optional[str] = None
+        self.backend = "auto"
+        self.poll_interval_seconds = 0.5
+
+    def configure(self, config) -> None:
+        self.backend = config.event_bus_backend
+        self.poll_interval_seconds = max(0.05, config.event_bus_poll_interval_ms / 1000)
+
+    # ------------------------------------------------------------------ #
+    # 訂閱
+    # ------------------------------------------------------------------ #
+
+    @contextlib.contextmanager
+    def subscribe(self, turn_id: int) -> Iterator[EventSubscription]:
+        subscription = EventSubscription(turn_id)
+        with self._lock:
+            self._subscribers.setdefault(turn_id, set()).add(subscription)
+            self._delivered.setdefault(turn_id, -1)
+        self._ensure_watcher()
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(turn_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[turn_id]
+                        self._delivered.pop(turn_id, None)
+                idle = not self._subscribers
+            if idle and self._watcher_backend == "poll" and self._watcher is not None:
+                self._watcher.cancel()
+
+    def subscribed_turn_ids(self) -> list[int]:
+        with self._lock:
+            return list(self._subscribers)
+
+    # ------------------------------------------------------------------ #
+    # 發佈
+    # ------------------------------------------------------------------ #
+
+    def publish(self, turn_id: int, seq: int) -> None:
+        """通知 turn 已有 `seq`（含）以前的事件落庫；同一 seq 重複通知只喚醒一次。"""
+        with self._lock:
+            delivered = self._delivered.get(turn_id)
+            if delivered is None or seq <= delivered:
+                return
+            self._delivered[turn_id] = seq
+            subscribers = list(self._subscribers.get(turn_id, ()))
+        for subscription in subscribers:
+            subscription.notify()
+
+    # ------------------------------------------------------------------ #
+    # 跨 worker watcher
+    # ------------------------------------------------------------------ #
+
+    def _resolve_backend(self) -> str:
+        if self.backend != "auto":
+            return self.backend
+        from app import database as app_database
+
+        dialect = getattr(getattr(app_database.engine, "dialect", None), "name", "")
+        return "postgres" if dialect == "postgresql" else "poll"
+
+    def _ensure_watcher(self) -> None:
+        backend = self._resolve_backend()
+        if backend == "local":
+            return
+        loop = asyncio.get_running_loop()
+        if self._watcher is not None and not self._watcher.done() and self._watcher_loop is loop:
+            return
+        runner = self._listen_postgres if backend == "postgres" else self._poll_watermarks
+        self._watcher_loop = loop
+        self._watcher_backend = backend
+        self._watcher = loop.create_task(runner(), name=f"assistant-event-bus-{backend}")
+
+    def _idle_expired(self, idle_since: Optional[float]) -> tuple[bool, Optional[float]]:
+        if self.subscribed_turn_ids():
+            return False, None
+        now = asyncio.get_running_loop().time()
+        if idle_since is None:
+            return False, now
+        return now - idle_since >= _WATCHER_IDLE_GRACE_SECONDS, idle_since
+
+    async def _poll_watermarks(self) -> None:
+        from app.db_access.main import get_main_access_boundary
+
+        while True:
+            turn_ids = self.subscribed_turn_ids()
+            if not turn_ids:
+                return
+            try:
+                watermarks = await get_main_access_boundary().run_read(
+                    lambda session: _load_watermarks(session, turn_ids)
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("assistant event bus watermark poll failed: %s", exc)
+            else:
+                for turn_id, next_seq in watermarks:
+                    self.publish(turn_id, next_seq - 1)
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _listen_postgres(self) -> None:
+        from app import database as app_database
+
+        def _on_notify(_connection, _pid, _channel, payload: str) -> None:
+            turn_id, _, seq = payload.partition(":")
+            with contextlib.suppress(ValueError):
+                self.publish(int(turn_id), int(seq))
+
+        idle_since: Optional[float] = None
+        try:
+            async with app_database.engine.connect() as connection:
+                raw = await connection.get_raw_connection()
+                driver_connection = raw.driver_connection
+                await driver_connection.add_listener(NOTIFY_CHANNEL, _on_notify)
+                try:
+                    while True:
+                        expired, idle_since = self._idle_expired(idle_since)
+                        if expired:
+                            return
+                        await asyncio.sleep(self.poll_interval_seconds)
+                finally:
+                    with contextlib.suppress(Exception):
+                        await driver_connection.remove_listener(NOTIFY_CHANNEL, _on_notify)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            # LISTEN 連線失敗時退回水位輪詢，SSE 不因此中斷
+            logger.warning("assistant event bus LISTEN failed, falling back to polling: %s", exc)
+            await self._poll_watermarks()
+
+    async def stop(self) -> None:
+        watcher, self._watcher = self._watcher, None
+        if watcher is None or watcher.done():
+            return
+        watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await watcher
+
+
+async def _load_watermarks(session, turn_ids: list[int]) -> list[tuple[int, int]]:
+    rows = await session.execute(
+        select(AssistantTurn.id, AssistantTurn.next_event_seq).where(AssistantTurn.id.in_(turn_ids))
+    )
+    return [(int(turn_id), int(next_seq or 0)) for turn_id, next_seq in rows.all()]
+
+
+_event_bus = AssistantEventBus()
+
+
+def get_assistant_event_bus() -> AssistantEventBus:
+    return _event_bus
+
+
+# ---------------------------------------------------------------------- #
+# Session hooks：flush 記錄、commit 後發佈
+# ---------------------------------------------------------------------- #
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _record_flushed_events(session: Session, _flush_context) -> None:
+    marks: Optional[dict[int, int]] = None
+    for obj in session.new:
+        if not isinstance(obj, AssistantEvent) or obj.turn_id is None or obj.seq is None:
+            continue
+        if marks is None:
+            marks = session.info.setdefault(_SESSION_INFO_KEY, {})
+        if obj.seq > marks.get(obj.turn_id, -1):
+            marks[obj.turn_id] = obj.seq
+            if session.get_bind().dialect.name == "postgresql":
+                # NOTIFY 隨交易提交才送出；rollback 時自動丟棄
+                session.connection().execute(select(func.pg_notify(NOTIFY_CHANNEL, f"{obj.turn_id}:{obj.seq}")))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session) -> None:
+    marks = session.info.pop(_SESSION_INFO_KEY, None)
+    if not marks:
+        return
+    for turn_id, seq in marks.items():
+        _event_bus.publish(turn_id, seq)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
@@ -239,7 +239,9 @@ def _fit_groups_to_hard_budget(
     """Fit groups under hard budget: compact oldest first, then compress/trim recent."""
     if not groups:
         return groups
-    if _groups_size(groups) <= max_chars:
+    sizes = [_group_size(g) for g in groups]
+    total = sum(sizes)
+    if total <= max_chars:
         return groups
 
     keep_recent = max(1, keep_recent)
@@ -248,23 +250,32 @@ def _fit_groups_to_hard_budget(
     # Compact oldest groups beyond keep_recent.
     if len(working) > keep_recent:
         head = working[:-keep_recent]
-        tail = working[-keep_recent:]
         compacted_head = [_compact_group_structurally(g) for g in head]
-        working = compacted_head + tail
-        if _groups_size(working) <= max_chars:
+        working = compacted_head + working[-keep_recent:]
+        sizes = [_group_size(g) for g in compacted_head] + sizes[-keep_recent:]
+        total = sum(sizes)
+        if total <= max_chars:
             return working
         # Drop oldest compacted groups until only recent remain or budget fits.
-        while len(working) > keep_recent and _groups_size(working) > max_chars:
-            working = working[1:]
+        drop = 0
+        while len(working) - drop > keep_recent and total > max_chars:
+            total -= sizes[drop]
+            drop += 1
+        working = working[drop:]
 
     # Recent (or all remaining) still over budget: in-group structural compress.
     working = [_compact_group_structurally(g) for g in working]
-    if _groups_size(working) <= max_chars:
+    sizes = [_group_size(g) for g in working]
+    total = sum(sizes)
+    if total <= max_chars:
         return working
 
     # Drop oldest remaining whole groups (never split pairs — groups are atomic).
-    while len(working) > 1 and _groups_size(working) > max_chars:
-        working = working[1:]
+    drop = 0
+    while len(working) - drop > 1 and total > max_chars:
+        total -= sizes[drop]
+        drop += 1
+    working = working[drop:]
 
     # Last group still too large: already structurally compacted; return it anyway
     # (provider may still 400; caller has drop_oldest_group / context retry).
@@ -304,6 +315,24 @@ def build_llm_messages(
     compact_keep_recent_groups: int = 4,
 ) -> list[dict[str, Any]]:
     groups = build_exchange_groups(rows, attachments_by_turn=attachments_by_turn)
+    return fit_exchange_groups(
+        groups,
+        max_chars=max_chars,
+        compact_enabled=compact_enabled,
+        compact_threshold_ratio=compact_threshold_ratio,
+        compact_keep_recent_groups=compact_keep_recent_groups,
+    )
+
+
+def fit_exchange_groups(
+    groups: list[list[dict[str, Any]]],
+    *,
+    max_chars: int,
+    compact_enabled: bool = True,
+    compact_threshold_ratio: float = 0.75,
+    compact_keep_recent_groups: int = 4,
+) -> list[dict[str, Any]]:
+    """已分組的 history 套用 request-view compact 與最終 hard trim（groups 可由呼叫端快取）。"""
     if compact_enabled:
         groups = compact_exchange_groups(
             groups,
@@ -12,6 +12,7 @@ from typing import Optional
 
 from app.services.assistant.assistant_llm_service import get_assistant_llm_service
 from app.services.assistant.locale_context import append_title_language_line
+from app.services.llm_scheduler import LLMPriority, llm_request_scope
 
 _TITLE_PROMPT_PATH = Path(__file__).resolve().parents[3] / "prompts" / "assistant" / "title.md"
 
@@ -43,11 +44,13 @@ async def generate_title(
     """
     llm_service = get_assistant_llm_service()
     try:
-        result = await llm_service.call(
-            system_prompt=append_title_language_line(_load_title_prompt(), ui_locale),
-            messages=[{"role": "user", "content": f"使用者：{user_text}\n助手：{assistant_text}"}],
-            tools=[],
-        )
+        # 背景標題生成不搶互動回合的名額
+        with llm_request_scope(priority=LLMPriority.BATCH):
+            result = await llm_service.call(
+                system_prompt=append_title_language_line(_load_title_prompt(), ui_locale),
+                messages=[{"role": "user", "content": f"使用者：{user_text}\n助手：{assistant_text}"}],
+                tools=[],
+            )
     except Exception:  # noqa: BLE001 — best-effort 摘要：任何呼叫層例外（未設定、連線、逾時、
         # 非預期回應格式）都必須 fallback，不得讓對話標題永久停留在 NULL。
         return None
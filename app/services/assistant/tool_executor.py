@@ -38,6 +38,7 @@ from app.services.assistant.crypto import (
     encrypt_sensitive_payload,
 )
 from app.services.assistant.ids import compute_confirmation_fingerprint
+from app.services.assistant.direct_dispatch import DirectToolDispatcher
 from app.services.assistant.errors import ConfirmationMetadataUnavailableError
 from app.services.assistant.param_validation import validate_arguments
 from app.services.assistant.projection import project_and_redact, project_error
@@ -230,12 +231,21 @@ def _without_target_selector(
     return clean, selector if isinstance(selector, dict) else None
 
 
+def _assistant_headers(jwt: str, conversation_key: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {jwt}",
+        "X-TCRT-Assistant": "1",
+        "User-Agent": f"TCRT-Assistant/1.0 conversation={conversation_key}",
+    }
+
+
 class ToolExecutor:
     def __init__(self, *, app: Starlette, main_boundary: MainAccessBoundary, config: AssistantConfig, registry: ToolRegistry):
         self.app = app
         self.main_boundary = main_boundary
         self.config = config
         self.registry = registry
+        self._direct_dispatcher = DirectToolDispatcher(app)
 
     # ------------------------------------------------------------------ #
     # 權限 / team / credential 檢查
@@ -1025,7 +1035,7 @@ class ToolExecutor:
         )
 
     # ------------------------------------------------------------------ #
-    # Loopback 執行
+    # 工具執行（direct dispatch / loopback）
     # ------------------------------------------------------------------ #
 
     async def _loopback(
@@ -1039,13 +1049,47 @@ class ToolExecutor:
         jwt: str,
         conversation_key: str,
         files: Optional[dict[str, tuple[str, bytes, str]]] = None,
+    ) -> tuple[int, Any]:
+        """執行工具對應的 API：預設 in-process 直接派送，必要時退回 HTTP loopback。"""
+        if self.config.tool_dispatch_mode == "direct" and not files:
+            path = _build_path(tool, team_id=team_id, path_params=path_params)
+            body = {**tool.fixed_body, **body_params} if (tool.body_schema or tool.fixed_body) else None
+            async with asyncio.timeout(self.config.tool_timeout_seconds):
+                result = await self._direct_dispatcher.dispatch(
+                    tool.method,
+                    path,
+                    query_params=query_params,
+                    body=body,
+                    headers=_assistant_headers(jwt, conversation_key),
+                    jwt=jwt,
+                )
+            if result is not None:
+                return result
+        return await self._http_loopback(
+            tool,
+            team_id=team_id,
+            path_params=path_params,
+            query_params=query_params,
+            body_params=body_params,
+            jwt=jwt,
+            conversation_key=conversation_key,
+            files=files,
+        )
+
+    async def _http_loopback(
+        self,
+        tool: AssistantTool,
+        *,
+        team_id: Optional[int],
+        path_params: dict,
+        query_params: dict,
+        body_params: dict,
+        jwt: str,
+        conversation_key: str,
+        files: Optional[dict[str, tuple[str, bytes, str]]] = None,
     ) -> tuple[int, Any]:
         path = _build_path(tool, team_id=team_id, path_params=path_params)
-        headers = {
-            "Authorization": f"Bearer {jwt}",
-            "X-TCRT-Assistant": "1",
-            "User-Agent": f"TCRT-Assistant/1.0 conversation={conversation_key}",
-        }
+        headers = _assistant_headers(jwt, conversation_key)
         transport = httpx.ASGITransport(app=self.app)
         async with httpx.AsyncClient(transport=transport, base_url="http://assistant.internal") as client:
             body = {**tool.fixed_body, **body_params} if (tool.body_schema or tool.fixed_body) else None
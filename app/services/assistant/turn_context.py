@@ -0,0 +1,141 @@
+"""Agent 迴圈的 per-turn 上下文：歷史增量維護 + bookkeeping 批次化（spec assistant-agent-loop）。
+
+原本每次迭代都重新 join 整個對話的 turns/messages、交給 history_builder 從頭重建，並以多個
+小交易分別續租 lease、查 cancel、寫事件。長對話 × 多次工具迭代即為 O(iterations × history)。
+
+`TurnContext` 改為：
+
+- 回合開始載入一次完整歷史；先前 turn 的 exchange groups 只轉換一次並快取——本 turn 持有
+  conversation lease，先前 turn 的訊息在迴圈期間不會變動；
+- 每次迭代以 `ConversationService.checkpoint_turn` 單一交易完成續租、cancel 檢查、寫入待送事件，
+  並只取回本 turn `message_seq` 之後的新訊息附加在記憶體；
+- 歷史未變動時（例如 context-length 重試）直接重用上次組好的 LLM messages。
+
+DB 仍是唯一權威：新訊息一律由 DB 讀回，不以呼叫端傳入的內容推測。
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from app.models.database_models import AssistantMessage
+from app.services.assistant.conversation_service import ConversationService, TurnCheckpoint
+from app.services.assistant.history_builder import build_exchange_groups, fit_exchange_groups
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TurnContextStats:
+    """本 turn 經由 context 發出的 DB round-trip 與歷史重建統計（回合結束時記錄於 log）。"""
+
+    db_round_trips: int = 0
+    checkpoints: int = 0
+    history_full_loads: int = 0
+    history_delta_rows: int = 0
+    message_builds: int = 0
+    message_build_reuses: int = 0
+
+
+class TurnContext:
+    def __init__(
+        self,
+        conversation_service: ConversationService,
+        *,
+        conversation_id: int,
+        turn_id: int,
+        turn_key: str,
+        config,
+        attachments_by_turn: Optional[dict[int, list[dict[str, Any]]]] = None,
+    ):
+        self.conversation_service = conversation_service
+        self.conversation_id = conversation_id
+        self.turn_id = turn_id
+        self.turn_key = turn_key
+        self.config = config
+        self.attachments_by_turn = attachments_by_turn or {}
+        self.stats = TurnContextStats()
+        self.iterations = 0
+        self._pending_events: list[tuple[str, dict[str, Any] | None]] = []
+        self._prefix_groups: Optional[list[list[dict[str, Any]]]] = None
+        self._turn_rows: list[AssistantMessage] = []
+        self._last_message_seq = -1
+        self._history_version = 0
+        self._built_version: Optional[int] = None
+        self._built_messages: list[dict[str, Any]] = []
+
+    # ------------------------------------------------------------------ #
+    # Bookkeeping
+    # ------------------------------------------------------------------ #
+
+    def queue_event(self, event_type: str, payload: dict[str, Any] | None) -> None:
+        """事件延後到下一次 checkpoint 寫入；只用於緊接著就會 checkpoint 的位置。"""
+        self._pending_events.append((event_type, payload))
+
+    async def checkpoint(self, *, ttl_seconds: int, fetch_messages: bool = False) -> TurnCheckpoint:
+        """續租 + cancel 檢查 + 寫入待送事件（+ 取回新訊息）合併為一個交易。"""
+        result = await self.conversation_service.checkpoint_turn(
+            conversation_id=self.conversation_id,
+            turn_id=self.turn_id,
+            turn_key=self.turn_key,
+            ttl_seconds=ttl_seconds,
+            events=tuple(self._pending_events),
+            after_message_seq=self._last_message_seq if fetch_messages and self._prefix_groups is not None else None,
+        )
+        self.stats.db_round_trips += 1
+        self.stats.checkpoints += 1
+        if result.lease_held:
+            self._pending_events.clear()
+        self.stats.history_delta_rows += len(result.new_messages)
+        self._append_rows(result.new_messages)
+        return result
+
+    # ------------------------------------------------------------------ #
+    # History
+    # ------------------------------------------------------------------ #
+
+    async def load_history(self) -> None:
+        rows = await self.conversation_service.load_conversation_messages(conversation_id=self.conversation_id)
+        self.stats.db_round_trips += 1
+        self.stats.history_full_loads += 1
+        prefix_rows = [row for row in rows if row.turn_id != self.turn_id]
+        self._prefix_groups = build_exchange_groups(prefix_rows, attachments_by_turn=self.attachments_by_turn)
+        self._turn_rows = []
+        self._last_message_seq = -1
+        self._history_version += 1
+        self._append_rows([row for row in rows if row.turn_id == self.turn_id])
+
+    def _append_rows(self, rows: list[AssistantMessage]) -> None:
+        if not rows:
+            return
+        self._turn_rows.extend(rows)
+        self._last_message_seq = max(self._last_message_seq, max(row.message_seq for row in rows))
+        self._history_version += 1
+
+    async def llm_messages(self) -> list[dict[str, Any]]:
+        if self._prefix_groups is None:
+            await self.load_history()
+        if self._built_version == self._history_version:
+            self.stats.message_build_reuses += 1
+            return self._built_messages
+        turn_groups = build_exchange_groups(self._turn_rows, attachments_by_turn=self.attachments_by_turn)
+        self._built_messages = fit_exchange_groups(
+            self._prefix_groups + turn_groups,
+            max_chars=self.config.history_max_chars,
+            compact_enabled=self.config.history_compact_enabled,
+            compact_threshold_ratio=self.config.history_compact_threshold_ratio,
+            compact_keep_recent_groups=self.config.history_compact_keep_recent_groups,
+        )
+        self._built_version = self._history_version
+        self.stats.message_builds += 1
+        return self._built_messages
+
+    def log_stats(self) -> None:
+        logger.info(
+            "assistant turn context turn_key=%s iterations=%s stats=%s",
+            self.turn_key,
+            self.iterations,
+            asdict(self.stats),
+        )
@@ -100,11 +100,12 @@ def build_attachment_metadata(
     size: int,
     content_type: str,
     uploaded_at: str,
+    sha256: Optional[str] = None,
 ) -> dict[str, Any]:
     resolved_root = root_dir.resolve()
     resolved_path = stored_path.resolve()
     ensure_within_root(resolved_path, resolved_root)
-    return {
+    metadata = {
         "name": original_name,
         "stored_name": stored_name,
         "size": int(size),
@@ -112,6 +113,9 @@ def build_attachment_metadata(
         "relative_path": str(resolved_path.relative_to(resolved_root).as_posix()),
         "uploaded_at": uploaded_at,
     }
+    if sha256:
+        metadata["sha256"] = sha256
+    return metadata
 
 
 def normalize_attachment_metadata(
@@ -0,0 +1,191 @@
+"""附件串流上傳
+
+將 ``UploadFile`` 以固定大小的 chunk 串流寫入附件根目錄下的暫存檔，寫檔與雜湊計算都丟到
+worker thread 執行，不在 event loop 上做阻塞 I/O；單檔大小上限在複製過程中即時檢查，超過就中止
+並清掉暫存檔。寫完後以 ``os.replace`` 原子搬移到最終位置。
+
+注意 ``UploadFile`` 到手時 Starlette 已把整個 multipart body 解析並 spool 到它自己的暫存檔，單檔上限
+擋不住超大請求佔用磁碟與 worker；請求層級的上限由 ``UploadSizeLimitMiddleware`` 在解析前處理
+（``get_max_request_bytes``）。
+
+同一 scope（例如某團隊的 test-runs 目錄）下以 sha256 做內容去重：第一次出現的內容會在
+``<scope>/.blobs/<sha256>`` 建立 hard link，之後相同內容的上傳直接 link 到該 blob，
+不再多佔一份磁碟。各項目的檔案仍是獨立路徑，刪除時只減少 link 數；最後一個引用被刪掉後
+由 ``release_deduplicated_blob`` 回收 blob。檔案系統不支援 hard link 時自動退回一般存檔。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Optional
+
+from fastapi import UploadFile
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+BLOB_DIR_NAME = ".blobs"
+STAGING_DIR_NAME = ".staging"
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class AttachmentTooLargeError(ValueError):
+    def __init__(self, filename: str, max_bytes: int):
+        super().__init__(f"檔案 {filename} 超過上傳大小上限 {max_bytes} bytes")
+        self.filename = filename
+        self.max_bytes = max_bytes
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+    deduplicated: bool = False
+
+
+def get_max_upload_bytes() -> Optional[int]:
+    attachments_cfg = getattr(settings, "attachments", None)
+    return attachments_cfg.max_upload_bytes if attachments_cfg else None
+
+
+def get_max_request_bytes() -> Optional[int]:
+    attachments_cfg = getattr(settings, "attachments", None)
+    return attachments_cfg.max_request_bytes if attachments_cfg else None
+
+
+def _open_staging_file(staging_dir: Path) -> tuple[str, BinaryIO]:
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix="upload-", suffix=".part", dir=str(staging_dir))
+    return tmp_name, os.fdopen(fd, "wb")
+
+
+def _write_chunk(out: BinaryIO, hasher: Any, chunk: bytes) -> None:
+    # hashlib 對大 buffer 會釋放 GIL，和 write 一起放在 thread 內執行
+    hasher.update(chunk)
+    out.write(chunk)
+
+
+def _close_quietly(out: BinaryIO) -> None:
+    try:
+        out.close()
+    except OSError:
+        pass
+
+
+def _discard(tmp_name: str) -> None:
+    try:
+        os.unlink(tmp_name)
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("清除上傳暫存檔失敗 %s: %s", tmp_name, exc)
+
+
+def blob_path_for(dedup_scope: Path, sha256: str) -> Path:
+    return dedup_scope / BLOB_DIR_NAME / sha256
+
+
+def _finalize(tmp_name: str, target_path: Path, dedup_scope: Optional[Path], sha256: str, size: int) -> bool:
+    """將暫存檔原子搬移到 target_path，並與 scope 內相同內容的 blob 合併；回傳是否命中去重。"""
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_name, target_path)
+    if dedup_scope is None:
+        return False
+
+    blob = blob_path_for(dedup_scope, sha256)
+    try:
+        blob_stat = blob.stat()
+    except FileNotFoundError:
+        blob_stat = None
+
+    try:
+        if blob_stat is not None and blob_stat.st_size == size:
+            # 先在同目錄建立指向 blob 的 link，再原子覆蓋剛寫好的檔案，過程中 target 永遠存在
+            swap_name = f"{target_path}.dedup"
+            os.link(blob, swap_name)
+            os.replace(swap_name, target_path)
+            return True
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if blob_stat is not None:
+            blob.unlink()
+        os.link(target_path, blob)
+    except FileExistsError:
+        # 並行上傳相同內容時另一個請求先建立了 blob；本次檔案保持獨立即可
+        pass
+    except OSError as exc:
+        logger.debug("附件去重 link 失敗，保留獨立檔案 %s: %s", target_path, exc)
+    return False
+
+
+async def store_upload_streaming(
+    upload: UploadFile,
+    target_path: Path,
+    *,
+    staging_dir: Path,
+    dedup_scope: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> StoredUpload:
+    """串流儲存上傳檔案。
+
+    staging_dir 必須和 target_path 位於同一檔案系統（一般放在附件根目錄下），
+    ``os.replace`` 才能保證原子性。超過 max_bytes 時拋出 AttachmentTooLargeError。
+    """
+    tmp_name, out = await asyncio.to_thread(_open_staging_file, staging_dir)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise AttachmentTooLargeError(upload.filename or "unnamed", max_bytes)
+            await asyncio.to_thread(_write_chunk, out, hasher, chunk)
+        await asyncio.to_thread(out.close)
+        sha256 = hasher.hexdigest()
+        deduplicated = await asyncio.to_thread(_finalize, tmp_name, target_path, dedup_scope, sha256, size)
+    except BaseException:
+        await asyncio.to_thread(_close_quietly, out)
+        await asyncio.to_thread(_discard, tmp_name)
+        raise
+    return StoredUpload(path=target_path, size=size, sha256=sha256, deduplicated=deduplicated)
+
+
+def release_deduplicated_blob(dedup_scope: Path, sha256: Optional[str]) -> None:
+    """刪除附件檔後呼叫：若 blob 已無其他引用（link 數為 1）則一併移除。"""
+    if not sha256 or not _SHA256_RE.match(sha256):
+        return
+    blob = blob_path_for(dedup_scope, sha256)
+    try:
+        if blob.stat().st_nlink <= 1:
+            blob.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("回收附件 blob 失敗 %s: %s", blob, exc)
+
+
+def discard_stored_uploads(stored: Iterable[StoredUpload], dedup_scope: Optional[Path] = None) -> None:
+    """批次上傳中途失敗時，移除本次已落地但尚未寫入 metadata 的檔案。"""
+    for item in stored:
+        try:
+            item.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning("清除未完成上傳檔案失敗 %s: %s", item.path, exc)
+            continue
+        if dedup_scope is not None:
+            release_deduplicated_blob(dedup_scope, item.sha256)
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
-from datetime import datetime, time, timedelta, timezone
-from typing import Any
-
-from sqlalchemy import func, or_, select
+import json
+import weakref
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import case, event, func, inspect as sa_inspect, literal, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.db_access.main import MainAccessBoundary
 from app.models.database_models import (
+    AutomationCoverageSnapshot,
     AutomationScript,
     AutomationScriptCaseLink,
     AutomationScriptLinkType,
     TestCaseLocal,
 )
 
+# 快照內保留的未覆蓋樣本上限（API / MCP 的 uncovered_limit 上限皆不超過此值）
+SNAPSHOT_UNCOVERED_SAMPLE_SIZE = 200
+TREND_DAYS = 30
+
 
 class AutomationCoverageService:
     def __init__(self, session: AsyncSession) -> None:
@@ -24,20 +35,76 @@ class AutomationCoverageService:
         team_id: int,
         uncovered_limit: int = 500,
     ) -> dict[str, Any]:
+        """Live coverage computed with grouped SQL (no snapshot)."""
+        coverage = await self._aggregate_coverage(team_id)
+        coverage["uncovered_sample"] = await self._list_uncovered_cases(team_id, uncovered_limit)
+        return coverage
+
+    async def read_snapshot(self, team_id: int) -> Optional[tuple[dict[str, Any], datetime]]:
+        """Return ``(payload, computed_at)`` when the team's snapshot is fresh, else ``None``."""
+        row = (
+            await self.session.execute(
+                select(
+                    AutomationCoverageSnapshot.source_version,
+                    AutomationCoverageSnapshot.computed_version,
+                    AutomationCoverageSnapshot.payload_json,
+                    AutomationCoverageSnapshot.computed_at,
+                ).where(AutomationCoverageSnapshot.team_id == team_id)
+            )
+        ).first()
+        if (
+            row is None
+            or row.payload_json is None
+            or row.computed_version != row.source_version
+            or row.computed_at is None
+            or row.computed_at.date() != _utcnow().date()
+        ):
+            return None
+        return _decode_snapshot(row.payload_json), row.computed_at
+
+    async def refresh_snapshot(self, team_id: int) -> tuple[dict[str, Any], datetime]:
+        """Recompute and store the team's snapshot; caller owns the (write) transaction.
+
+        The version is read before aggregating: a writer that bumps
+        ``source_version`` meanwhile leaves the stored snapshot stale instead
+        of being overwritten.
+        """
+        version = (
+            await self.session.execute(
+                select(AutomationCoverageSnapshot.source_version).where(
+                    AutomationCoverageSnapshot.team_id == team_id
+                )
+            )
+        ).scalar_one_or_none()
+        if version is None:
+            self.session.add(AutomationCoverageSnapshot(team_id=team_id, source_version=0))
+            await self.session.flush()
+            version = 0
+
+        payload = await self._aggregate_coverage(team_id)
+        payload["uncovered_sample"] = await self._list_uncovered_cases(team_id, SNAPSHOT_UNCOVERED_SAMPLE_SIZE)
+        computed_at = _utcnow()
+        await self.session.execute(
+            update(AutomationCoverageSnapshot)
+            .where(AutomationCoverageSnapshot.team_id == team_id)
+            .values(
+                computed_version=version,
+                payload_json=json.dumps(payload, default=_json_default, ensure_ascii=False),
+                computed_at=computed_at,
+            )
+        )
+        return payload, computed_at
+
+    async def _aggregate_coverage(self, team_id: int) -> dict[str, Any]:
         total_cases = await self._count_total_cases(team_id)
-        with_primary = await self._count_cases_by_link_type(team_id, AutomationScriptLinkType.PRIMARY)
-        with_covers = await self._count_cases_by_link_type(team_id, AutomationScriptLinkType.COVERS)
-        with_any = await self._count_cases_with_coverage(team_id)
-        uncovered_count = max(total_cases - with_any, 0)
-        by_group = await self._build_group_rollup(team_id)
+        with_primary, with_covers, with_any = await self._count_link_coverage(team_id)
         return {
             "total_test_cases": total_cases,
             "with_primary_link": with_primary,
             "with_covers_link": with_covers,
             "with_any_link": with_any,
-            "uncovered_count": uncovered_count,
-            "uncovered_sample": await self._list_uncovered_cases(team_id, uncovered_limit),
-            "by_group": by_group,
+            "uncovered_count": max(total_cases - with_any, 0),
+            "by_group": await self._build_group_rollup(team_id),
             "by_format": await self._count_scripts_by_format(team_id),
             "trend": await self._build_trend(team_id, total_cases),
         }
@@ -51,48 +118,44 @@ class AutomationCoverageService:
         list + links are served by ``list_cases`` (paginated), not here, so the
         summary payload stays small regardless of case count.
         """
-        cases_result = await self.session.execute(
-            select(TestCaseLocal.id, TestCaseLocal.test_case_number).where(TestCaseLocal.team_id == team_id)
+        covering = (
+            select(
+                AutomationScriptCaseLink.test_case_id.label("test_case_id"),
+                func.max(
+                    case((AutomationScriptCaseLink.link_type == AutomationScriptLinkType.PRIMARY, 1), else_=0)
+                ).label("has_primary"),
+            )
+            .where(
+                AutomationScriptCaseLink.team_id == team_id,
+                AutomationScriptCaseLink.link_type.in_(_COVERAGE_LINK_TYPES),
+            )
+            .group_by(AutomationScriptCaseLink.test_case_id)
+            .subquery()
         )
-        cases = cases_result.all()
-
-        covering_types_by_case = await self._covering_types_by_case(team_id)
-
-        groups: dict[str, dict[str, int]] = {}
-        for case in cases:
-            number = case.test_case_number or ""
-            group_key = number.split(".", 1)[0] if number else "(no number)"
-            bucket = groups.setdefault(group_key, {"total": 0, "covered": 0, "primary": 0})
-            bucket["total"] += 1
-            covering = covering_types_by_case.get(int(case.id))
-            if covering:
-                bucket["covered"] += 1
-                if AutomationScriptLinkType.PRIMARY.value in covering:
-                    bucket["primary"] += 1
-
+        group_key = _group_key_expression(self.session.get_bind().dialect.name).label("group_key")
+        result = await self.session.execute(
+            select(
+                group_key,
+                func.count(TestCaseLocal.id).label("total"),
+                func.count(covering.c.test_case_id).label("covered"),
+                func.coalesce(func.sum(covering.c.has_primary), 0).label("primary"),
+            )
+            .select_from(TestCaseLocal)
+            .outerjoin(covering, covering.c.test_case_id == TestCaseLocal.id)
+            .where(TestCaseLocal.team_id == team_id)
+            .group_by(group_key)
+        )
+        # 排序於 Python 端進行，避免各資料庫 collation 不同造成順序差異
         return [
             {
-                "group": key,
-                "total": bucket["total"],
-                "covered": bucket["covered"],
-                "primary": bucket["primary"],
+                "group": row.group_key,
+                "total": int(row.total or 0),
+                "covered": int(row.covered or 0),
+                "primary": int(row.primary or 0),
             }
-            for key, bucket in sorted(groups.items())
+            for row in sorted(result.all(), key=lambda item: item.group_key)
         ]
 
-    async def _covering_types_by_case(self, team_id: int) -> dict[int, set[str]]:
-        """Map case_id → set of coverage link types (PRIMARY/COVERS) present."""
-        result = await self.session.execute(
-            select(AutomationScriptCaseLink.test_case_id, AutomationScriptCaseLink.link_type).where(
-                AutomationScriptCaseLink.team_id == team_id,
-                AutomationScriptCaseLink.link_type.in_(_COVERAGE_LINK_TYPES),
-            )
-        )
-        covering: dict[int, set[str]] = {}
-        for row in result.all():
-            covering.setdefault(int(row.test_case_id), set()).add(_enum_value(row.link_type))
-        return covering
-
     async def list_cases(
         self,
         *,
@@ -239,23 +302,22 @@ class AutomationCoverageService:
         )
         return int(result.scalar_one() or 0)
 
-    async def _count_cases_by_link_type(self, team_id: int, link_type: AutomationScriptLinkType) -> int:
-        result = await self.session.execute(
-            select(func.count(func.distinct(AutomationScriptCaseLink.test_case_id))).where(
-                AutomationScriptCaseLink.team_id == team_id,
-                AutomationScriptCaseLink.link_type == link_type,
-            )
-        )
-        return int(result.scalar_one() or 0)
-
-    async def _count_cases_with_coverage(self, team_id: int) -> int:
+    async def _count_link_coverage(self, team_id: int) -> tuple[int, int, int]:
+        """Distinct covered cases by PRIMARY, by COVERS and by either, in one pass."""
+        case_id = AutomationScriptCaseLink.test_case_id
+        link_type = AutomationScriptCaseLink.link_type
         result = await self.session.execute(
-            select(func.count(func.distinct(AutomationScriptCaseLink.test_case_id))).where(
+            select(
+                func.count(func.distinct(case((link_type == AutomationScriptLinkType.PRIMARY, case_id)))),
+                func.count(func.distinct(case((link_type == AutomationScriptLinkType.COVERS, case_id)))),
+                func.count(func.distinct(case_id)),
+            ).where(
                 AutomationScriptCaseLink.team_id == team_id,
-                AutomationScriptCaseLink.link_type.in_(_COVERAGE_LINK_TYPES),
+                link_type.in_(_COVERAGE_LINK_TYPES),
             )
         )
-        return int(result.scalar_one() or 0)
+        with_primary, with_covers, with_any = result.one()
+        return int(with_primary or 0), int(with_covers or 0), int(with_any or 0)
 
     async def _list_uncovered_cases(self, team_id: int, limit: int) -> list[dict[str, Any]]:
         covered_exists = (
@@ -291,38 +353,42 @@ class AutomationCoverageService:
         return {_enum_value(row.script_format): int(row.script_count or 0) for row in result.all()}
 
     async def _build_trend(self, team_id: int, total_cases: int) -> list[dict[str, Any]]:
+        """Daily covered-case counts for the last ``TREND_DAYS`` days.
+
+        A case counts from the day of its first PRIMARY/COVERS link; every day
+        is one conditional SUM over the per-case first-link subquery.
+        """
         today = _utcnow().date()
-        first_day = today - timedelta(days=29)
-        result = await self.session.execute(
+        first_day = today - timedelta(days=TREND_DAYS - 1)
+        created_at = func.coalesce(AutomationScriptCaseLink.created_at, datetime.combine(first_day, time.min))
+        first_links = (
             select(
-                AutomationScriptCaseLink.test_case_id,
-                AutomationScriptCaseLink.link_type,
-                AutomationScriptCaseLink.created_at,
-            ).where(
+                func.min(created_at).label("first_any"),
+                func.min(
+                    case((AutomationScriptCaseLink.link_type == AutomationScriptLinkType.PRIMARY, created_at))
+                ).label("first_primary"),
+            )
+            .where(
                 AutomationScriptCaseLink.team_id == team_id,
                 AutomationScriptCaseLink.link_type.in_(_COVERAGE_LINK_TYPES),
             )
+            .group_by(AutomationScriptCaseLink.test_case_id)
+            .subquery()
         )
-
-        first_any_by_case: dict[int, datetime] = {}
-        first_primary_by_case: dict[int, datetime] = {}
-        for row in result.all():
-            created_at = row.created_at or datetime.combine(first_day, time.min)
-            case_id = int(row.test_case_id)
-            current_any = first_any_by_case.get(case_id)
-            if current_any is None or created_at < current_any:
-                first_any_by_case[case_id] = created_at
-            if _enum_value(row.link_type) == AutomationScriptLinkType.PRIMARY.value:
-                current_primary = first_primary_by_case.get(case_id)
-                if current_primary is None or created_at < current_primary:
-                    first_primary_by_case[case_id] = created_at
+        days = [first_day + timedelta(days=offset) for offset in range(TREND_DAYS)]
+        columns = []
+        for day in days:
+            end_of_day = datetime.combine(day, time.max)
+            columns.append(func.coalesce(func.sum(case((first_links.c.first_any <= end_of_day, 1), else_=0)), 0))
+            columns.append(
+                func.coalesce(func.sum(case((first_links.c.first_primary <= end_of_day, 1), else_=0)), 0)
+            )
+        counts = (await self.session.execute(select(*columns).select_from(first_links))).one()
 
         trend = []
-        for offset in range(30):
-            day = first_day + timedelta(days=offset)
-            end_of_day = datetime.combine(day, time.max)
-            with_any = sum(1 for created_at in first_any_by_case.values() if created_at <= end_of_day)
-            with_primary = sum(1 for created_at in first_primary_by_case.values() if created_at <= end_of_day)
+        for index, day in enumerate(days):
+            with_any = int(counts[index * 2] or 0)
+            with_primary = int(counts[index * 2 + 1] or 0)
             trend.append(
                 {
                     "date": day,
@@ -335,6 +401,136 @@ class AutomationCoverageService:
         return trend
 
 
+async def load_team_coverage(
+    main_boundary: MainAccessBoundary,
+    team_id: int,
+    *,
+    uncovered_limit: int,
+) -> dict[str, Any]:
+    """Snapshot-backed coverage read; recomputes and stores the snapshot when stale.
+
+    ``snapshot_computed_at`` in the result tells callers how fresh the numbers are.
+    """
+
+    async def _read(session: AsyncSession) -> Optional[tuple[dict[str, Any], datetime]]:
+        return await AutomationCoverageService(session).read_snapshot(team_id)
+
+    async def _refresh(session: AsyncSession) -> tuple[dict[str, Any], datetime]:
+        return await AutomationCoverageService(session).refresh_snapshot(team_id)
+
+    snapshot = await main_boundary.run_read(_read)
+    if snapshot is None:
+        try:
+            snapshot = await main_boundary.run_write(_refresh)
+        except IntegrityError:
+            # 另一個請求同時建立了快照列；直接讀取對方的結果
+            snapshot = await main_boundary.run_read(_read)
+    if snapshot is None:
+        async def _live(session: AsyncSession) -> dict[str, Any]:
+            return await AutomationCoverageService(session).compute_coverage(
+                team_id=team_id, uncovered_limit=uncovered_limit
+            )
+
+        return {**await main_boundary.run_read(_live), "snapshot_computed_at": _utcnow()}
+
+    payload, computed_at = snapshot
+    result = {**payload, "snapshot_computed_at": computed_at}
+    if uncovered_limit <= SNAPSHOT_UNCOVERED_SAMPLE_SIZE:
+        result["uncovered_sample"] = payload["uncovered_sample"][:uncovered_limit]
+    else:
+        async def _sample(session: AsyncSession) -> list[dict[str, Any]]:
+            return await AutomationCoverageService(session)._list_uncovered_cases(team_id, uncovered_limit)
+
+        result["uncovered_sample"] = await main_boundary.run_read(_sample)
+    return result
+
+
+# ---------------------------------------------------------------------- #
+# Snapshot invalidation hooks
+# ---------------------------------------------------------------------- #
+
+# 會影響 coverage 結果的欄位；其他欄位（例如 script 同步時間）變動不需使快照失效
+_CASE_COVERAGE_KEYS = ("team_id", "test_case_number", "title")
+_SCRIPT_COVERAGE_KEYS = ("team_id", "script_format")
+_LINK_COVERAGE_KEYS = ("team_id", "test_case_id", "link_type", "created_at")
+_COVERAGE_SOURCES: dict[type, tuple[str, ...]] = {
+    TestCaseLocal: _CASE_COVERAGE_KEYS,
+    AutomationScript: _SCRIPT_COVERAGE_KEYS,
+    AutomationScriptCaseLink: _LINK_COVERAGE_KEYS,
+}
+_SNAPSHOT_ENGINES: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def install_coverage_snapshot_hooks() -> None:
+    """Register the snapshot invalidation hooks once per process (idempotent)."""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+    if not event.contains(Session, "do_orm_execute", _on_orm_execute):
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+
+
+def _after_flush(session: Session, _flush_context) -> None:
+    team_ids: set[int] = set()
+    for obj in (*session.new, *session.deleted):
+        if type(obj) in _COVERAGE_SOURCES:
+            # 已刪除物件不可再觸發 lazy load，只讀取已載入的值
+            team_id = sa_inspect(obj).dict.get("team_id")
+            if team_id is not None:
+                team_ids.add(int(team_id))
+    for obj in session.dirty:
+        keys = _COVERAGE_SOURCES.get(type(obj))
+        if keys is None:
+            continue
+        attrs = sa_inspect(obj).attrs
+        if not any(attrs[key].history.has_changes() for key in keys):
+            continue
+        if obj.team_id is not None:
+            team_ids.add(int(obj.team_id))
+        team_ids.update(int(previous) for previous in attrs.team_id.history.deleted if previous is not None)
+    if team_ids:
+        _bump_source_versions(session.connection(), team_ids)
+
+
+def _on_orm_execute(state) -> None:
+    if state.is_select or not (state.is_insert or state.is_update or state.is_delete):
+        return
+    keys = _COVERAGE_SOURCES.get(getattr(state.bind_mapper, "class_", None))
+    if keys is None:
+        return
+    if state.is_update:
+        parameters = state.parameters
+        assigned = {getattr(key, "key", key) for key in (getattr(state.statement, "_values", None) or {})}
+        if isinstance(parameters, list):
+            assigned.update(key for row in parameters for key in row)
+        elif parameters:
+            assigned.update(parameters)
+        if assigned and not assigned.intersection(keys):
+            return
+    # 批次敘述無法便宜地得知受影響的 team，保守地讓所有快照失效
+    _bump_source_versions(state.session.connection(), None)
+
+
+def _bump_source_versions(connection: Connection, team_ids: Optional[set[int]]) -> None:
+    if not _snapshot_table_available(connection):
+        return
+    stmt = update(AutomationCoverageSnapshot).values(
+        source_version=AutomationCoverageSnapshot.source_version + 1
+    )
+    if team_ids is not None:
+        stmt = stmt.where(AutomationCoverageSnapshot.team_id.in_(sorted(team_ids)))
+    connection.execute(stmt)
+
+
+def _snapshot_table_available(connection: Connection) -> bool:
+    engine = connection.engine
+    if engine in _SNAPSHOT_ENGINES:
+        return True
+    if not sa_inspect(connection).has_table(AutomationCoverageSnapshot.__tablename__):
+        return False
+    _SNAPSHOT_ENGINES.add(engine)
+    return True
+
+
 _COVERAGE_LINK_TYPES = (
     AutomationScriptLinkType.PRIMARY,
     AutomationScriptLinkType.COVERS,
@@ -348,3 +544,29 @@ def _utcnow() -> datetime:
 
 def _enum_value(value: Any) -> str:
     return value.value if hasattr(value, "value") else str(value)
+
+
+def _group_key_expression(dialect_name: str) -> Any:
+    """SQL for the ticket-group key: prefix before the first dot, ``(no number)`` when empty."""
+    number = TestCaseLocal.test_case_number
+    if dialect_name == "mysql":
+        prefix = func.substring_index(number, ".", 1)
+    elif dialect_name == "postgresql":
+        prefix = func.split_part(number, ".", 1)
+    else:
+        dot = func.instr(number, ".")
+        prefix = case((dot > 0, func.substr(number, 1, dot - 1)), else_=number)
+    return case((func.coalesce(number, "") == "", literal("(no number)")), else_=prefix)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_snapshot(payload_json: str) -> dict[str, Any]:
+    payload = json.loads(payload_json)
+    for point in payload.get("trend") or []:
+        point["date"] = date.fromisoformat(point["date"])
+    return payload
@@ -1,16 +1,35 @@
-"""Avatar proxy: fetch upstream avatars server-side with short-lived cache.
+"""Avatar proxy: fetch upstream avatars server-side behind a two-tier cache.
 
 Browsers never contact Feishu CDN / Gravatar directly. On upstream failure the
 service returns a locally generated SVG initials placeholder.
+
+Cache tiers:
+
+- memory: per-worker LRU bounded by total bytes (``MEMORY_CACHE_MAX_BYTES``);
+- disk: content-addressed blobs (``blobs/<sha256>``) plus one small JSON index
+  per logical key (``keys/<sha256(key)>.json``) holding the upstream URL,
+  content type, expiry and upstream validators. It survives worker restarts
+  and is shared by all workers on the host.
+
+Expired disk entries are revalidated with ``If-None-Match`` /
+``If-Modified-Since``; when the upstream is down a stale copy is served rather
+than a placeholder. Concurrent misses for one key share a single fetch, and all
+fetches go through one pooled ``httpx`` client per event loop.
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import json
 import logging
+import os
+import tempfile
 import time
-from dataclasses import dataclass
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Optional
 from xml.sax.saxutils import escape
 
 import httpx
@@ -20,6 +39,13 @@ logger = logging.getLogger(__name__)
 CACHE_TTL_SECONDS = 3600
 FETCH_TIMEOUT_SECONDS = 8.0
 MAX_AVATAR_BYTES = 2 * 1024 * 1024
+MEMORY_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Upstream down during revalidation: serve the stale copy, retry after this long.
+STALE_RETRY_SECONDS = 300
+# Disk entries not refreshed for this long are pruned (every ``_PRUNE_EVERY_WRITES`` writes).
+DISK_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+UPSTREAM_MAX_CONNECTIONS = 20
+_PRUNE_EVERY_WRITES = 256
 
 # Soft allowlist: only fetch known avatar upstream hosts (SSRF guard).
 _ALLOWED_HOST_SUFFIXES = (
@@ -36,20 +62,204 @@ class AvatarPayload:
     body: bytes
     content_type: str
     cache_hit: bool = False
+    # Strong validator for browsers (content hash, quoted per RFC 9110).
+    etag: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.etag:
+            self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
 
 
 @dataclass
 class _CacheEntry:
-    body: bytes
-    content_type: str
+    payload: AvatarPayload
+    source_url: Optional[str]
     expires_at: float
 
 
+@dataclass
+class _UpstreamResult:
+    payload: Optional[AvatarPayload] = None
+    not_modified: bool = False
+    validators: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class AvatarCacheMetrics:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    upstream_fetches: int = 0
+    upstream_failures: int = 0
+    revalidated: int = 0
+    stale_served: int = 0
+    evictions: int = 0
+    disk_writes: int = 0
+    disk_pruned: int = 0
+
+
+class _MemoryLRU:
+    """LRU bounded by the total body bytes held."""
+
+    def __init__(self, max_bytes: int, metrics: AvatarCacheMetrics) -> None:
+        self.max_bytes = max_bytes
+        self._metrics = metrics
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: _CacheEntry) -> None:
+        self.pop(key)
+        size = len(entry.payload.body)
+        if size > self.max_bytes:
+            return
+        while self._entries and self.total_bytes + size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= len(evicted.payload.body)
+            self._metrics.evictions += 1
+        self._entries[key] = entry
+        self.total_bytes += size
+
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= len(entry.payload.body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+
+
+class _DiskCache:
+    """Content-addressed on-disk tier; every method is blocking (run via ``asyncio.to_thread``)."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.keys_dir = root / "keys"
+        self.blobs_dir = root / "blobs"
+
+    def _index_path(self, key: str) -> Path:
+        return self.keys_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest
+
+    def read(self, key: str) -> Optional[tuple[dict[str, Any], bytes]]:
+        try:
+            meta = json.loads(self._index_path(key).read_text(encoding="utf-8"))
+            body = self._blob_path(meta["digest"]).read_bytes()
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if hashlib.sha256(body).hexdigest() != meta["digest"]:
+            return None
+        return meta, body
+
+    def write(self, key: str, meta: dict[str, Any], body: Optional[bytes]) -> None:
+        """Write the index for ``key``; ``body=None`` only refreshes the index (revalidation)."""
+        if body is not None:
+            blob = self._blob_path(meta["digest"])
+            if not blob.exists():
+                _atomic_write(blob, body)
+        _atomic_write(self._index_path(key), json.dumps(meta).encode("utf-8"))
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Drop index files not refreshed within ``max_age_seconds`` and unreferenced blobs."""
+        cutoff = time.time() - max_age_seconds
+        referenced: set[str] = set()
+        removed = 0
+        for index in self.keys_dir.glob("*.json"):
+            try:
+                if index.stat().st_mtime < cutoff:
+                    index.unlink()
+                    removed += 1
+                    continue
+                referenced.add(json.loads(index.read_text(encoding="utf-8"))["digest"])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        for blob in self.blobs_dir.glob("*/*"):
+            if blob.name not in referenced:
+                try:
+                    blob.unlink()
+                except OSError:
+                    continue
+        return removed
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class _PooledClient:
+    """One ``httpx.AsyncClient`` per event loop; rebuilt when the loop changes or it was closed."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=FETCH_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=UPSTREAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=UPSTREAM_MAX_CONNECTIONS,
+                ),
+                transport=self._transport,
+            )
+            self._loop = loop
+        return self._client
+
+    async def close(self) -> None:
+        client, self._client, self._loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+
 class AvatarProxyService:
-    """In-process short-lived avatar cache + upstream fetch + SVG fallback."""
+    """Two-tier avatar cache + single-flight upstream fetch + SVG fallback."""
 
-    def __init__(self) -> None:
-        self._cache: dict[str, _CacheEntry] = {}
+    def __init__(
+        self,
+        *,
+        disk_dir: Optional[Path] = None,
+        memory_max_bytes: int = MEMORY_CACHE_MAX_BYTES,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        # Wall clock for the disk tier's expires_at (shared across workers and restarts).
+        self._clock = clock
+        self.metrics = AvatarCacheMetrics()
+        self._memory = _MemoryLRU(memory_max_bytes, self.metrics)
+        self._disk = _DiskCache(Path(disk_dir)) if disk_dir else None
+        self._client = _PooledClient(transport)
+        self._inflight: dict[str, asyncio.Future] = {}
 
     def user_proxy_url(self, user_id: int) -> str:
         return f"/api/avatars/users/{int(user_id)}"
@@ -58,24 +268,21 @@ class AvatarProxyService:
         return f"/api/avatars/lark/{lark_user_id}"
 
     def clear_cache(self) -> None:
-        self._cache.clear()
-
-    def _get_cached(self, key: str) -> Optional[AvatarPayload]:
-        entry = self._cache.get(key)
-        if not entry:
-            return None
-        if entry.expires_at < time.monotonic():
-            self._cache.pop(key, None)
-            return None
-        return AvatarPayload(body=entry.body, content_type=entry.content_type, cache_hit=True)
-
-    def _store(self, key: str, body: bytes, content_type: str) -> AvatarPayload:
-        self._cache[key] = _CacheEntry(
-            body=body,
-            content_type=content_type,
-            expires_at=time.monotonic() + CACHE_TTL_SECONDS,
-        )
-        return AvatarPayload(body=body, content_type=content_type, cache_hit=False)
+        """Clear the memory tier (the disk tier is shared by other workers)."""
+        self._memory.clear()
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
+    def metrics_snapshot(self) -> dict[str, Any]:
+        return {
+            **vars(self.metrics),
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory.total_bytes,
+            "memory_max_bytes": self._memory.max_bytes,
+            "disk_enabled": self._disk is not None,
+            "inflight": len(self._inflight),
+        }
 
     @staticmethod
     def _host_allowed(url: str) -> bool:
@@ -89,36 +296,60 @@ class AvatarProxyService:
             return False
         return any(host == suffix or host.endswith(f".{suffix}") for suffix in _ALLOWED_HOST_SUFFIXES)
 
-    async def fetch_upstream(self, url: Optional[str]) -> Optional[AvatarPayload]:
+    @staticmethod
+    def _normalize_upstream(url: Optional[str]) -> Optional[str]:
         if not url or not str(url).strip().startswith("http"):
             return None
-        url = str(url).strip()
-        if not self._host_allowed(url):
-            logger.warning("Avatar upstream host rejected: %s", url[:120])
-            return None
+        return str(url).strip()
 
-        cache_key = f"url:{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
+    async def fetch_upstream(self, url: Optional[str]) -> Optional[AvatarPayload]:
+        """Fetch one avatar from the upstream (uncached)."""
+        return (await self._fetch(url)).payload
 
+    async def _fetch(self, url: Optional[str], validators: Optional[dict[str, str]] = None) -> _UpstreamResult:
+        url = self._normalize_upstream(url)
+        if url is None:
+            return _UpstreamResult()
+        if not self._host_allowed(url):
+            logger.warning("Avatar upstream host rejected: %s", url[:120])
+            return _UpstreamResult()
+
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        self.metrics.upstream_fetches += 1
         try:
-            async with httpx.AsyncClient(follow_redirects=True, timeout=FETCH_TIMEOUT_SECONDS) as client:
-                response = await client.get(url)
+            response = await self._client.get().get(url, headers=headers)
+            if response.status_code == 304 and validators:
+                return _UpstreamResult(not_modified=True, validators=validators)
             if response.status_code != 200:
                 logger.info("Avatar upstream HTTP %s for %s", response.status_code, url[:120])
-                return None
+                self.metrics.upstream_failures += 1
+                return _UpstreamResult()
             content_type = (response.headers.get("content-type") or "image/jpeg").split(";")[0].strip()
             if not content_type.startswith("image/"):
                 logger.info("Avatar upstream non-image content-type %s", content_type)
-                return None
+                self.metrics.upstream_failures += 1
+                return _UpstreamResult()
             body = response.content
             if not body or len(body) > MAX_AVATAR_BYTES:
-                return None
-            return self._store(cache_key, body, content_type)
+                self.metrics.upstream_failures += 1
+                return _UpstreamResult()
+            upstream_validators = {
+                "etag": response.headers.get("etag") or "",
+                "last_modified": response.headers.get("last-modified") or "",
+            }
+            return _UpstreamResult(
+                payload=AvatarPayload(body=body, content_type=content_type),
+                validators=upstream_validators,
+            )
         except Exception as exc:  # noqa: BLE001
             logger.info("Avatar upstream fetch failed: %s", exc)
-            return None
+            self.metrics.upstream_failures += 1
+            return _UpstreamResult()
 
     @staticmethod
     def initials_for(name: Optional[str], fallback: str = "?") -> str:
@@ -154,18 +385,134 @@ class AvatarProxyService:
         display_name: Optional[str],
         seed: str,
     ) -> AvatarPayload:
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
-
-        upstream = await self.fetch_upstream(upstream_url)
-        if upstream:
-            # Re-key under the logical cache key as well.
-            return self._store(cache_key, upstream.body, upstream.content_type)
+        upstream_url = self._normalize_upstream(upstream_url)
+        entry = self._memory.get(cache_key)
+        # A changed upstream URL (user replaced the avatar) invalidates the entry.
+        if entry is not None and entry.source_url == upstream_url:
+            self.metrics.memory_hits += 1
+            return replace(entry.payload, cache_hit=True)
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None and inflight.get_loop() is loop:
+            self.metrics.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        task = loop.create_task(self._load(cache_key, upstream_url, display_name, seed))
+        self._inflight[cache_key] = task
+        task.add_done_callback(
+            lambda done: self._inflight.pop(cache_key) if self._inflight.get(cache_key) is done else None
+        )
+        # shield: a cancelled requester must not cancel the fetch other waiters share.
+        return await asyncio.shield(task)
 
+    async def _load(
+        self,
+        cache_key: str,
+        upstream_url: Optional[str],
+        display_name: Optional[str],
+        seed: str,
+    ) -> AvatarPayload:
+        if upstream_url is None:
+            self.metrics.misses += 1
+            return self._remember_placeholder(cache_key, upstream_url, display_name, seed)
+
+        cached = await self._disk_read(cache_key)
+        if cached is not None and cached[0].get("url") == upstream_url:
+            meta, body = cached
+            payload = AvatarPayload(body=body, content_type=meta["content_type"], cache_hit=True)
+            if float(meta.get("expires_at", 0)) > self._clock():
+                self.metrics.disk_hits += 1
+                self._remember(cache_key, upstream_url, payload, CACHE_TTL_SECONDS)
+                return payload
+
+            result = await self._fetch(upstream_url, meta.get("validators") or {})
+            if result.not_modified:
+                self.metrics.revalidated += 1
+                await self._disk_write(cache_key, upstream_url, payload, result.validators, body_changed=False)
+                self._remember(cache_key, upstream_url, payload, CACHE_TTL_SECONDS)
+                return payload
+            if result.payload is None:
+                self.metrics.stale_served += 1
+                self._remember(cache_key, upstream_url, payload, STALE_RETRY_SECONDS)
+                return payload
+            return await self._store_fetched(cache_key, upstream_url, result)
+
+        self.metrics.misses += 1
+        result = await self._fetch(upstream_url)
+        if result.payload is None:
+            return self._remember_placeholder(cache_key, upstream_url, display_name, seed)
+        return await self._store_fetched(cache_key, upstream_url, result)
+
+    async def _store_fetched(self, cache_key: str, upstream_url: str, result: _UpstreamResult) -> AvatarPayload:
+        payload = result.payload
+        await self._disk_write(cache_key, upstream_url, payload, result.validators, body_changed=True)
+        self._remember(cache_key, upstream_url, payload, CACHE_TTL_SECONDS)
+        return payload
+
+    def _remember_placeholder(
+        self,
+        cache_key: str,
+        upstream_url: Optional[str],
+        display_name: Optional[str],
+        seed: str,
+    ) -> AvatarPayload:
         placeholder = self.placeholder_svg(name=display_name, seed=seed)
-        # Cache placeholders briefly too, to avoid hammering a dead upstream.
-        return self._store(cache_key, placeholder.body, placeholder.content_type)
+        # Placeholders stay in memory only (briefly), to avoid hammering a dead
+        # upstream without persisting the failure across restarts.
+        self._remember(cache_key, upstream_url, placeholder, CACHE_TTL_SECONDS)
+        return placeholder
+
+    def _remember(self, cache_key: str, upstream_url: Optional[str], payload: AvatarPayload, ttl: float) -> None:
+        self._memory.put(
+            cache_key,
+            _CacheEntry(
+                payload=replace(payload, cache_hit=False),
+                source_url=upstream_url,
+                expires_at=time.monotonic() + ttl,
+            ),
+        )
+
+    async def _disk_read(self, cache_key: str) -> Optional[tuple[dict[str, Any], bytes]]:
+        if self._disk is None:
+            return None
+        return await asyncio.to_thread(self._disk.read, cache_key)
+
+    async def _disk_write(
+        self,
+        cache_key: str,
+        upstream_url: str,
+        payload: AvatarPayload,
+        validators: dict[str, str],
+        *,
+        body_changed: bool,
+    ) -> None:
+        if self._disk is None:
+            return
+        meta = {
+            "url": upstream_url,
+            "digest": hashlib.sha256(payload.body).hexdigest(),
+            "content_type": payload.content_type,
+            "expires_at": self._clock() + CACHE_TTL_SECONDS,
+            "validators": validators,
+        }
+        try:
+            await asyncio.to_thread(self._disk.write, cache_key, meta, payload.body if body_changed else None)
+        except OSError as exc:
+            logger.warning("Avatar disk cache write failed: %s", exc)
+            return
+        self.metrics.disk_writes += 1
+        if self.metrics.disk_writes % _PRUNE_EVERY_WRITES == 0:
+            try:
+                self.metrics.disk_pruned += await asyncio.to_thread(self._disk.prune, DISK_CACHE_MAX_AGE_SECONDS)
+            except OSError as exc:
+                logger.warning("Avatar disk cache prune failed: %s", exc)
+
+
+def default_avatar_cache_dir() -> Path:
+    """``AVATAR_CACHE_DIR`` or a per-host temp directory (never under the public attachments mount)."""
+    configured = (os.getenv("AVATAR_CACHE_DIR") or "").strip()
+    return Path(configured) if configured else Path(tempfile.gettempdir()) / "tcrt_avatar_cache"
 
 
 _avatar_proxy_service: Optional[AvatarProxyService] = None
@@ -174,5 +521,10 @@ _avatar_proxy_service: Optional[AvatarProxyService] = None
 def get_avatar_proxy_service() -> AvatarProxyService:
     global _avatar_proxy_service
     if _avatar_proxy_service is None:
-        _avatar_proxy_service = AvatarProxyService()
+        _avatar_proxy_service = AvatarProxyService(disk_dir=default_avatar_cache_dir())
     return _avatar_proxy_service
+
+
+async def close_avatar_proxy_client() -> None:
+    if _avatar_proxy_service is not None:
+        await _avatar_proxy_service.aclose()
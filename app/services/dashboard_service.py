@@ -2,18 +2,22 @@
 
 from __future__ import annotations
 
-from collections import Counter
+import asyncio
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
-from typing import Any, Optional
+import threading
+import time
+from typing import Any, Awaitable, Hashable, Optional, TypeVar
 from urllib.parse import quote
 
 from sqlalchemy import String, and_, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.audit import ActionType, ResourceType
-from app.audit.database import AuditLogTable
+from app.audit import ActionType, ResourceType, audit_service
+from app.audit.database import USER_ACTIVITY_INDEX_DEPTH, AuditUserActivityTable
 from app.auth.models import UserRole
 from app.db_access import (
     AuditAccessBoundary,
@@ -81,8 +85,115 @@ _MAX_ASSIGNED_PREVIEW = 5
 _MAX_RESUME = 10
 _MAX_ACTIVITY = 20
 _MAX_AUDIT = 10
-_MAX_AUDIT_SCAN = 50
+# The per-user activity index keeps exactly this many rows per (user, team),
+# so reading it with the same limit matches the former audit_logs scan.
+_MAX_AUDIT_SCAN = USER_ACTIVITY_INDEX_DEPTH
 _MAX_HISTORY = 250
+_SNAPSHOT_TTL_SECONDS = 30.0
+_SNAPSHOT_MAX_ENTRIES = 1024
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class _Snapshot:
+    response: DashboardResponse
+    expires_at: float
+    global_generation: int
+    team_generations: dict[int, int]
+
+
+class DashboardSnapshotCache:
+    """Short-lived per-user dashboard snapshots invalidated by write events.
+
+    Each snapshot remembers the generation of every team it was built from plus
+    a global generation. Audited writes bump the team's generation (or the
+    global one when the event has no team), so the next read rebuilds instead
+    of waiting for the TTL.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = _SNAPSHOT_TTL_SECONDS,
+        max_entries: int = _SNAPSHOT_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, _Snapshot] = OrderedDict()
+        self._global_generation = 0
+        self._team_generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[DashboardResponse]:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None:
+                return None
+            if snapshot.expires_at <= now or self._is_stale(snapshot):
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return snapshot.response
+
+    def generation_token(self, team_ids: list[int]) -> tuple[int, dict[int, int]]:
+        """Capture generations before building so writes during the build win."""
+        with self._lock:
+            return (
+                self._global_generation,
+                {team_id: self._team_generations.get(team_id, 0) for team_id in team_ids},
+            )
+
+    def put(
+        self,
+        key: Hashable,
+        response: DashboardResponse,
+        token: tuple[int, dict[int, int]],
+    ) -> None:
+        global_generation, team_generations = token
+        with self._lock:
+            self._entries[key] = _Snapshot(
+                response=response,
+                expires_at=time.monotonic() + self.ttl_seconds,
+                global_generation=global_generation,
+                team_generations=team_generations,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, team_id: Optional[int] = None) -> None:
+        with self._lock:
+            if team_id is None:
+                self._global_generation += 1
+            else:
+                self._team_generations[team_id] = self._team_generations.get(team_id, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _is_stale(self, snapshot: _Snapshot) -> bool:
+        if snapshot.global_generation != self._global_generation:
+            return True
+        return any(
+            self._team_generations.get(team_id, 0) != generation
+            for team_id, generation in snapshot.team_generations.items()
+        )
+
+
+dashboard_snapshot_cache = DashboardSnapshotCache()
+
+
+def invalidate_dashboard_snapshots(team_id: Optional[int] = None) -> None:
+    """Drop cached dashboards touching ``team_id`` (all dashboards when None)."""
+
+    dashboard_snapshot_cache.invalidate(team_id)
+
+
+audit_service.add_write_listener(
+    lambda team_id, _user_id: invalidate_dashboard_snapshots(team_id)
+)
 
 
 class DashboardService:
@@ -102,24 +213,43 @@ class DashboardService:
         return await self._build_personal(current_user)
 
     async def _build_personal(self, current_user: User) -> DashboardResponse:
-        payload = await self.main_boundary.run_sync_read(
-            lambda session: _build_personal_main(session, current_user)
+        cache_key = ("personal", current_user.id, _role_value(current_user))
+        cached = dashboard_snapshot_cache.get(cache_key)
+        if cached is not None:
+            return cached.model_copy(update={"cached": True})
+
+        timings: dict[str, float] = {}
+        teams = await _timed(
+            timings,
+            "teams",
+            self.main_boundary.run_sync_read(
+                lambda session: _load_visible_active_teams(session, current_user)
+            ),
         )
-        try:
-            automation_hub_enabled = await self.main_boundary.run_read(
-                _read_automation_hub_entry_enabled
-            )
-        except Exception:  # noqa: BLE001 - match the existing fail-open entry toggle
-            logger.warning("Dashboard Automation Hub entry setting unavailable", exc_info=True)
-            automation_hub_enabled = True
-        audit_payload = await self._build_audit_fallback(
-            current_user.id,
-            payload.pop("visible_team_ids", []),
-            {
-                int(team["id"]): str(team.get("name") or "")
-                for team in payload.get("teams", {}).get("items", [])
-            },
+        visible_team_ids = [team["id"] for team in teams]
+        token = dashboard_snapshot_cache.generation_token(visible_team_ids)
+        # Main sections, the hub toggle and the audit index live on separate
+        # boundaries (each opens its own session), so they are read concurrently.
+        payload, automation_hub_enabled, audit_payload = await asyncio.gather(
+            _timed(
+                timings,
+                "main",
+                self.main_boundary.run_sync_read(
+                    lambda session: _build_personal_main(session, current_user, teams)
+                ),
+            ),
+            _timed(timings, "automation_hub", self._read_automation_hub_enabled()),
+            _timed(
+                timings,
+                "audit",
+                self._build_audit_fallback(
+                    current_user.id,
+                    visible_team_ids,
+                    {int(team["id"]): str(team.get("name") or "") for team in teams},
+                ),
+            ),
         )
+        payload.pop("visible_team_ids", None)
         audit_resume_items = audit_payload.pop("resume_items", [])
         payload["audit"] = audit_payload
         if _is_write_capable(current_user):
@@ -161,12 +291,22 @@ class DashboardService:
             )
         if _role_value(current_user) == UserRole.ADMIN.value:
             quick_actions.append(_app_token_quick_action())
-        return DashboardResponse(
+        response = DashboardResponse(
             dashboard_type="personal",
             current_user=_current_user_projection(current_user),
             sections=payload,
             quick_actions=quick_actions,
+            section_timings_ms=timings,
         )
+        _store_snapshot(cache_key, response, token)
+        return response
+
+    async def _read_automation_hub_enabled(self) -> bool:
+        try:
+            return await self.main_boundary.run_read(_read_automation_hub_entry_enabled)
+        except Exception:  # noqa: BLE001 - match the existing fail-open entry toggle
+            logger.warning("Dashboard Automation Hub entry setting unavailable", exc_info=True)
+            return True
 
     async def _build_audit_fallback(
         self,
@@ -179,20 +319,24 @@ class DashboardService:
         visible_team_names = team_names or {}
         try:
             async def _read(session: AsyncSession) -> dict[str, Any]:
+                # Served from the write-time activity index instead of scanning audit_logs.
                 result = await session.execute(
                     select(
-                        AuditLogTable.id,
-                        AuditLogTable.timestamp,
-                        cast(AuditLogTable.action_type, String).label("action_type"),
-                        cast(AuditLogTable.resource_type, String).label("resource_type"),
-                        AuditLogTable.resource_id,
-                        AuditLogTable.team_id,
+                        AuditUserActivityTable.id,
+                        AuditUserActivityTable.timestamp,
+                        AuditUserActivityTable.action_type,
+                        AuditUserActivityTable.resource_type,
+                        AuditUserActivityTable.resource_id,
+                        AuditUserActivityTable.team_id,
                     )
                     .where(
-                        AuditLogTable.user_id == user_id,
-                        AuditLogTable.team_id.in_(visible_team_ids),
+                        AuditUserActivityTable.user_id == user_id,
+                        AuditUserActivityTable.team_id.in_(visible_team_ids),
+                    )
+                    .order_by(
+                        AuditUserActivityTable.timestamp.desc(),
+                        AuditUserActivityTable.id.desc(),
                     )
-                    .order_by(AuditLogTable.timestamp.desc(), AuditLogTable.id.desc())
                     .limit(_MAX_AUDIT_SCAN)
                 )
                 rows = list(result)
@@ -222,8 +366,19 @@ class DashboardService:
             return {"state": "unavailable", "items": [], "resume_items": []}
 
     async def _build_system(self, current_user: User) -> DashboardResponse:
-        sections = await self.main_boundary.run_sync_read(_build_system_main)
-        return DashboardResponse(
+        cache_key = ("system", current_user.id)
+        cached = dashboard_snapshot_cache.get(cache_key)
+        if cached is not None:
+            return cached.model_copy(update={"cached": True})
+
+        timings: dict[str, float] = {}
+        token = dashboard_snapshot_cache.generation_token([])
+        sections = await _timed(
+            timings,
+            "system",
+            self.main_boundary.run_sync_read(_build_system_main),
+        )
+        response = DashboardResponse(
             dashboard_type="system_administration",
             current_user=_current_user_projection(current_user),
             sections=sections,
@@ -250,11 +405,41 @@ class DashboardService:
                 ),
                 _app_token_quick_action(),
             ],
+            section_timings_ms=timings,
         )
+        _store_snapshot(cache_key, response, token)
+        return response
 
 
-def _build_personal_main(sync_db: Session, current_user: User) -> dict[str, Any]:
-    teams = _load_visible_active_teams(sync_db, current_user)
+async def _timed(timings: dict[str, float], section: str, awaitable: Awaitable[_T]) -> _T:
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[section] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def _store_snapshot(
+    cache_key: Hashable,
+    response: DashboardResponse,
+    token: tuple[int, dict[int, int]],
+) -> None:
+    # Degraded snapshots are not pinned: the next request retries the failed section.
+    if any(
+        isinstance(section, dict) and section.get("state") == "unavailable"
+        for section in response.sections.values()
+    ):
+        return
+    dashboard_snapshot_cache.put(cache_key, response, token)
+
+
+def _build_personal_main(
+    sync_db: Session,
+    current_user: User,
+    teams: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    if teams is None:
+        teams = _load_visible_active_teams(sync_db, current_user)
     team_ids = [team["id"] for team in teams]
     sections: dict[str, Any] = {
         "teams": {"state": "ready", "items": teams},
@@ -0,0 +1,794 @@
+"""Runtime 資料庫備份服務（排程任務 database_backup）
+
+與 ``app/db_backup.py``（bootstrap 升版前備份，只供 database_init 使用）分開：本模組在 web
+runtime 由 scheduler 觸發，所有阻塞 I/O 都在 worker thread 執行。
+
+- SQLite：以 online backup API 分段複製（每步 ``sqlite_pages_per_step`` 個 page，步與步之間
+  休息 ``sqlite_step_sleep_ms``），每一步結束都會釋放來源的讀鎖，writer 不會被整段備份卡住。
+  備份鏈的第一份是完整快照（gzip）；之後每次只比對 page 雜湊，把有變動的 page 寫成增量檔。
+- MySQL / PostgreSQL：``mysqldump`` 輸出經 gzip 串流、``pg_dump -Fc`` 直接串流寫入目的檔，
+  不落地暫存檔。append-only 的 table（例如 audit_logs）在兩次完整備份之間以 watermark 匯出
+  新增的資料列（gzip JSON lines）；每次都回頭重讀 watermark 以下一段安全區間，涵蓋晚 commit 的
+  自增 id，重複的列在還原時依主鍵略過。
+
+每次執行都會記錄讀寫位元組、耗時與吞吐量，供 /admin/system_metrics 查詢。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import struct
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+from sqlalchemy import MetaData, Table, create_engine, func, insert, select
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.pool import NullPool
+
+from app.config import BackupConfig, settings
+from app.db_url import normalize_sync_database_url
+
+logger = logging.getLogger(__name__)
+
+# 只有 insert（與依保留天數整批刪除舊資料）的 table，可用遞增欄位當 watermark 做增量匯出
+APPEND_ONLY_TABLES: dict[str, dict[str, str]] = {
+    "audit": {"audit_logs": "id"},
+}
+
+# 精確到微秒，同一秒內連續執行（例如手動觸發後緊接排程）也不會覆蓋彼此的快照
+_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%fZ"
+_STATE_NAME = "state.json"
+_PAGE_HASHES_NAME = "page_hashes.bin"
+_WORK_DIR_NAME = ".work"
+_PAGE_DIGEST_SIZE = 8
+_PAGE_DELTA_MAGIC = b"TCRTPGD1"
+_STREAM_CHUNK_SIZE = 1024 * 1024
+_ROW_EXPORT_BATCH = 5000
+# MySQL / PostgreSQL 的自增 id 依取號順序配發、依 commit 順序可見：id 較小的交易可能在匯出後才
+# commit。每次匯出都往回重讀這麼多個 id；晚於此區間才 commit 的列仍會漏掉（需靠下一次完整備份）
+_WATERMARK_SAFETY_WINDOW = 1000
+
+_FULL_EXTENSIONS = {
+    "sqlite": "sqlite3.gz",
+    "mysql": "sql.gz",
+    "postgresql": "pgdump",
+}
+
+
+class DatabaseBackupError(RuntimeError):
+    """Runtime 備份失敗（缺 dump client、dump 失敗、路徑不可寫等）。"""
+
+
+@dataclass
+class BackupRunMetrics:
+    target: str
+    engine: str
+    kind: str
+    path: Optional[str] = None
+    started_at: Optional[str] = None
+    duration_s: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    throughput_mb_s: float = 0.0
+    pages_total: int = 0
+    pages_changed: int = 0
+    rows_exported: int = 0
+    skipped: bool = False
+    message: str = ""
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def finish(self, started: float) -> None:
+        self.duration_s = round(time.perf_counter() - started, 3)
+        if self.duration_s > 0:
+            self.throughput_mb_s = round(self.bytes_read / (1024 * 1024) / self.duration_s, 2)
+
+
+def resolve_backup_database_url(target_name: str) -> str:
+    if target_name == "main":
+        from app.database import SYNC_DATABASE_URL
+
+        return SYNC_DATABASE_URL
+    if target_name == "audit":
+        return normalize_sync_database_url(settings.audit.database_url)
+    if target_name == "usm":
+        return normalize_sync_database_url(settings.usm.database_url)
+    raise DatabaseBackupError(f"不支援的備份 target: {target_name}")
+
+
+def engine_key_for_url(database_url: str) -> str:
+    backend = make_url(database_url).get_backend_name().lower()
+    if backend in ("mysql", "mariadb"):
+        return "mysql"
+    if backend == "postgresql":
+        return "postgresql"
+    return "sqlite"
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_name(path.name + ".meta.json")
+
+
+def _write_json_atomic(path: Path, payload: dict[str, Any]) -> None:
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+class _CountingReader:
+    """包住 dump 程序的 stdout，累計讀取位元組。"""
+
+    def __init__(self, stream: IO[bytes]):
+        self._stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+# ---------------------------------------------------------------------------
+# SQLite：分段 online backup 與 page 增量
+# ---------------------------------------------------------------------------
+
+
+def _sqlite_path(database_url: str) -> Path:
+    database = make_url(database_url).database
+    if not database or database == ":memory:":
+        raise DatabaseBackupError(f"SQLite URL 沒有實體檔案路徑，無法備份：{database_url}")
+    return Path(database)
+
+
+def paged_sqlite_backup(
+    source_path: Path,
+    destination_path: Path,
+    *,
+    pages_per_step: int,
+    step_sleep_seconds: float,
+) -> dict[str, int]:
+    """以 online backup API 分段複製 SQLite；每一步之後休息，讓 writer 有機會取得鎖。"""
+    progress: dict[str, int] = {"steps": 0, "page_count": 0}
+
+    def _on_step(_status: int, remaining: int, total: int) -> None:
+        progress["steps"] += 1
+        progress["page_count"] = total
+        if remaining and step_sleep_seconds > 0:
+            time.sleep(step_sleep_seconds)
+
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    try:
+        destination = sqlite3.connect(str(destination_path))
+        try:
+            source.backup(destination, pages=max(1, pages_per_step), progress=_on_step)
+        finally:
+            destination.close()
+    finally:
+        source.close()
+    return progress
+
+
+def _sqlite_page_size(path: Path) -> int:
+    with path.open("rb") as handle:
+        header = handle.read(100)
+    if len(header) < 100 or not header.startswith(b"SQLite format 3\x00"):
+        raise DatabaseBackupError(f"不是有效的 SQLite 檔案：{path}")
+    page_size = struct.unpack(">H", header[16:18])[0]
+    return 65536 if page_size == 1 else page_size
+
+
+def _iter_pages(path: Path, page_size: int) -> Iterator[bytes]:
+    with path.open("rb") as handle:
+        while True:
+            page = handle.read(page_size)
+            if not page:
+                return
+            yield page
+
+
+def _page_digest(page: bytes) -> bytes:
+    return hashlib.blake2b(page, digest_size=_PAGE_DIGEST_SIZE).digest()
+
+
+def write_full_sqlite_snapshot(
+    working_copy: Path,
+    destination: Path,
+    *,
+    compress_level: int,
+) -> tuple[bytes, int, int]:
+    """把工作副本壓縮成完整快照，同時計算每個 page 的雜湊；回傳 (page 雜湊, page_size, page_count)。"""
+    page_size = _sqlite_page_size(working_copy)
+    digests = bytearray()
+    page_count = 0
+    with gzip.open(destination, "wb", compresslevel=compress_level) as out:
+        for page in _iter_pages(working_copy, page_size):
+            digests += _page_digest(page)
+            out.write(page)
+            page_count += 1
+    return bytes(digests), page_size, page_count
+
+
+def write_sqlite_page_delta(
+    working_copy: Path,
+    destination: Path,
+    previous_digests: bytes,
+    *,
+    compress_level: int,
+) -> tuple[bytes, int, int, int]:
+    """只把與上一份快照雜湊不同的 page 寫進增量檔。
+
+    格式（gzip 內）：magic、page_size（u32）、page_count（u32），接著重複 (page_no u32, page bytes)。
+    回傳 (新 page 雜湊, page_size, page_count, 變動 page 數)。
+    """
+    page_size = _sqlite_page_size(working_copy)
+    digests = bytearray()
+    changed = 0
+    page_count = working_copy.stat().st_size // page_size
+    with gzip.open(destination, "wb", compresslevel=compress_level) as out:
+        out.write(_PAGE_DELTA_MAGIC + struct.pack(">II", page_size, page_count))
+        for page_no, page in enumerate(_iter_pages(working_copy, page_size)):
+            digest = _page_digest(page)
+            digests += digest
+            offset = page_no * _PAGE_DIGEST_SIZE
+            if previous_digests[offset : offset + _PAGE_DIGEST_SIZE] != digest:
+                out.write(struct.pack(">I", page_no))
+                out.write(page)
+                changed += 1
+    return bytes(digests), page_size, page_count, changed
+
+
+def apply_sqlite_page_delta(database_path: Path, delta_path: Path) -> int:
+    with gzip.open(delta_path, "rb") as delta, database_path.open("r+b") as target:
+        header = delta.read(len(_PAGE_DELTA_MAGIC) + 8)
+        if not header.startswith(_PAGE_DELTA_MAGIC):
+            raise DatabaseBackupError(f"不是有效的 page 增量檔：{delta_path}")
+        page_size, page_count = struct.unpack(">II", header[len(_PAGE_DELTA_MAGIC) :])
+        applied = 0
+        while True:
+            page_no_raw = delta.read(4)
+            if not page_no_raw:
+                break
+            page = delta.read(page_size)
+            if len(page) != page_size:
+                raise DatabaseBackupError(f"page 增量檔不完整：{delta_path}")
+            target.seek(struct.unpack(">I", page_no_raw)[0] * page_size)
+            target.write(page)
+            applied += 1
+        target.truncate(page_count * page_size)
+    return applied
+
+
+def restore_sqlite_chain(target_dir: Path, destination: Path, *, until: Optional[str] = None) -> dict[str, Any]:
+    """以最新（或 until 之前最新）的完整快照加上其後的 page 增量重建 SQLite 檔案。"""
+    snapshots = list_snapshots(target_dir)
+    if until:
+        snapshots = [item for item in snapshots if item["created_at"] <= until]
+    fulls = [item for item in snapshots if item["kind"] == "full"]
+    if not fulls:
+        raise DatabaseBackupError(f"{target_dir} 沒有可用的完整快照")
+    chain_id = fulls[-1]["chain_id"]
+    chain = [item for item in snapshots if item["chain_id"] == chain_id]
+
+    temp_path = destination.with_name(destination.name + ".restoring")
+    with gzip.open(target_dir / chain[0]["file"], "rb") as source, temp_path.open("wb") as out:
+        shutil.copyfileobj(source, out, _STREAM_CHUNK_SIZE)
+    applied_deltas = 0
+    for item in chain[1:]:
+        if item["kind"] == "pages":
+            apply_sqlite_page_delta(temp_path, target_dir / item["file"])
+            applied_deltas += 1
+    os.replace(temp_path, destination)
+    return {"chain_id": chain_id, "full": chain[0]["file"], "applied_deltas": applied_deltas}
+
+
+# ---------------------------------------------------------------------------
+# MySQL / PostgreSQL：串流 dump 與 watermark 增量
+# ---------------------------------------------------------------------------
+
+
+def _dump_command(url: URL, engine_key: str, compress_level: int) -> tuple[list[str], dict[str, str]]:
+    env = dict(os.environ)
+    if engine_key == "mysql":
+        if shutil.which("mysqldump") is None:
+            raise DatabaseBackupError("找不到 mysqldump，無法備份 MySQL/MariaDB；請於 image 安裝 mysql client 工具")
+        args = ["mysqldump", "--single-transaction", "--quick", "--no-tablespaces", "--routines"]
+        if url.host:
+            args += ["--host", url.host]
+        if url.port:
+            args += ["--port", str(url.port)]
+        if url.username:
+            args += ["--user", url.username]
+        if url.password:
+            env["MYSQL_PWD"] = url.password
+        return [*args, url.database], env
+
+    if shutil.which("pg_dump") is None:
+        raise DatabaseBackupError("找不到 pg_dump，無法備份 PostgreSQL；請於 image 安裝 postgresql-client 工具")
+    args = ["pg_dump", "--format=custom", f"--compress={compress_level}"]
+    if url.host:
+        args += ["--host", url.host]
+    if url.port:
+        args += ["--port", str(url.port)]
+    if url.username:
+        args += ["--username", url.username]
+    if url.password:
+        env["PGPASSWORD"] = url.password
+    return [*args, url.database], env
+
+
+def stream_server_dump(
+    database_url: str,
+    destination: Path,
+    *,
+    engine_key: str,
+    compress_level: int,
+) -> tuple[int, int]:
+    """把 dump 程序的 stdout 直接串流到目的檔（MySQL 經 gzip；pg_dump -Fc 自帶壓縮）。
+
+    先寫 ``<name>.part`` 再 rename，失敗時不會留下看似完整的備份。回傳 (讀取位元組, 寫入位元組)。
+    """
+    url = make_url(database_url)
+    if not url.database:
+        raise DatabaseBackupError(f"資料庫 URL 缺少 database 名稱，無法備份：{url.render_as_string()}")
+    command, env = _dump_command(url, engine_key, compress_level)
+    part_path = destination.with_name(destination.name + ".part")
+    # stderr 寫到暫存檔而非 PIPE：只讀 stdout 時，大量 warning 塞滿 stderr pipe 會讓 dump 卡死
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file, env=env)
+    reader = _CountingReader(process.stdout)
+    try:
+        if engine_key == "mysql":
+            with gzip.open(part_path, "wb", compresslevel=compress_level) as out:
+                shutil.copyfileobj(reader, out, _STREAM_CHUNK_SIZE)
+        else:
+            with part_path.open("wb") as out:
+                shutil.copyfileobj(reader, out, _STREAM_CHUNK_SIZE)
+        returncode = process.wait()
+        stderr_file.seek(0)
+        stderr_output = stderr_file.read(64 * 1024)
+    except BaseException:
+        process.kill()
+        process.wait()
+        part_path.unlink(missing_ok=True)
+        raise
+    finally:
+        if process.stdout:
+            process.stdout.close()
+        stderr_file.close()
+    if returncode != 0:
+        part_path.unlink(missing_ok=True)
+        raise DatabaseBackupError(
+            f"{command[0]} 失敗（exit={returncode}）：{stderr_output.decode(errors='replace')[:2000]}"
+        )
+    os.replace(part_path, destination)
+    return reader.bytes_read, destination.stat().st_size
+
+
+def _current_watermarks(database_url: str, tables: dict[str, str]) -> dict[str, Any]:
+    engine = create_engine(database_url, poolclass=NullPool, future=True)
+    try:
+        metadata = MetaData()
+        watermarks: dict[str, Any] = {}
+        with engine.connect() as connection:
+            for table_name, column_name in tables.items():
+                table = Table(table_name, metadata, autoload_with=connection)
+                watermarks[table_name] = connection.execute(select(func.max(table.c[column_name]))).scalar()
+        return watermarks
+    finally:
+        engine.dispose()
+
+
+def export_rows_since_watermark(
+    database_url: str,
+    destination: Path,
+    tables: dict[str, str],
+    watermarks: dict[str, Any],
+    *,
+    compress_level: int,
+    safety_window: int = 0,
+) -> tuple[dict[str, Any], int, int]:
+    """匯出 watermark 之後新增的資料列（gzip JSON lines），回傳 (新 watermark, 列數, 讀取位元組估計)。
+
+    ``safety_window`` > 0 時，整數 watermark 會往回多讀這麼多個 id，與上一份增量重疊的列由
+    ``apply_row_delta`` 略過。每個 table 先寫一行 header（``{"table", "column", "from", "columns"}``），
+    之後每列一行 JSON 陣列。
+    """
+    engine = create_engine(database_url, poolclass=NullPool, future=True)
+    new_watermarks = dict(watermarks)
+    exported = 0
+    bytes_read = 0
+    try:
+        metadata = MetaData()
+        with engine.connect() as connection, gzip.open(destination, "wt", encoding="utf-8",
+                                                       compresslevel=compress_level) as out:
+            for table_name, column_name in tables.items():
+                table = Table(table_name, metadata, autoload_with=connection)
+                watermark_column = table.c[column_name]
+                previous = watermarks.get(table_name)
+                lower_bound = previous
+                if safety_window and isinstance(previous, int):
+                    lower_bound = previous - safety_window
+                query = select(table).order_by(watermark_column)
+                if lower_bound is not None:
+                    query = query.where(watermark_column > lower_bound)
+                columns = list(table.c.keys())
+                out.write(json.dumps({"table": table_name, "column": column_name, "from": lower_bound,
+                                      "columns": columns}, default=str) + "\n")
+                result = connection.execution_options(yield_per=_ROW_EXPORT_BATCH).execute(query)
+                for row in result:
+                    line = json.dumps(list(row), ensure_ascii=False, default=str)
+                    out.write(line + "\n")
+                    bytes_read += len(line)
+                    exported += 1
+                    value = row._mapping[column_name]
+                    if previous is None or value > previous:
+                        new_watermarks[table_name] = value
+    finally:
+        engine.dispose()
+    return new_watermarks, exported, bytes_read
+
+
+def _decode_row_value(column: Any, value: Any) -> Any:
+    # 匯出時以 str() 序列化日期時間，insert 回去前轉回 datetime
+    if isinstance(value, str):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            return value
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+    return value
+
+
+def _insert_ignoring_duplicates(connection: Any, table: Table, batch: list[dict[str, Any]]) -> int:
+    """insert 一批資料列，主鍵已存在的列略過；回傳實際新增的列數。
+
+    完整 dump 與第一份增量、相鄰兩份增量（safety window）都可能含有同一列，還原時必須冪等。
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(table).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        statement = dialect_insert(table).on_conflict_do_nothing()
+    elif dialect in ("mysql", "mariadb"):
+        statement = insert(table).prefix_with("IGNORE")
+    else:
+        statement = insert(table)
+    result = connection.execute(statement, batch)
+    return result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(batch)
+
+
+def apply_row_delta(database_url: str, delta_path: Path, *, batch_size: int = 1000) -> int:
+    """把 watermark 增量檔的資料列 insert 回目標資料庫（還原時接在完整 dump 之後執行）。
+
+    已存在的列（主鍵衝突）會略過，回傳實際新增的列數。
+    """
+    engine = create_engine(database_url, poolclass=NullPool, future=True)
+    inserted = 0
+    try:
+        metadata = MetaData()
+        with engine.begin() as connection, gzip.open(delta_path, "rt", encoding="utf-8") as source:
+            table = None
+            columns: list[str] = []
+            batch: list[dict[str, Any]] = []
+            for line in source:
+                payload = json.loads(line)
+                if isinstance(payload, dict):
+                    if table is not None and batch:
+                        inserted += _insert_ignoring_duplicates(connection, table, batch)
+                        batch = []
+                    table = Table(payload["table"], metadata, autoload_with=connection)
+                    columns = payload["columns"]
+                    continue
+                batch.append({name: _decode_row_value(table.c[name], value) for name, value in zip(columns, payload)})
+                if len(batch) >= batch_size:
+                    inserted += _insert_ignoring_duplicates(connection, table, batch)
+                    batch = []
+            if table is not None and batch:
+                inserted += _insert_ignoring_duplicates(connection, table, batch)
+    finally:
+        engine.dispose()
+    return inserted
+
+
+# ---------------------------------------------------------------------------
+# 備份鏈與排程入口
+# ---------------------------------------------------------------------------
+
+
+def list_snapshots(target_dir: Path) -> list[dict[str, Any]]:
+    """依建立時間列出 target 目錄下所有快照（以 sidecar meta 為準）。"""
+    if not target_dir.exists():
+        return []
+    items: list[dict[str, Any]] = []
+    for meta_file in target_dir.glob("*.meta.json"):
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        if (target_dir / str(meta.get("file") or "")).exists():
+            items.append(meta)
+    items.sort(key=lambda item: (item["created_at"], item["kind"] != "full"))
+    return items
+
+
+class DatabaseBackupService:
+    def __init__(self, config: Optional[BackupConfig] = None, *, root_dir: Optional[Path] = None):
+        self.config = config or settings.backup
+        self.root_dir = root_dir or self.config.resolve_root_dir()
+        self._lock = asyncio.Lock()
+        self._last_runs: dict[str, dict[str, Any]] = {}
+        self._totals = {"runs": 0, "failures": 0, "bytes_read": 0, "bytes_written": 0}
+
+    async def run_scheduled_backups(self, *, force_full: bool = False) -> dict[str, Any]:
+        async with self._lock:
+            results: list[dict[str, Any]] = []
+            errors: list[str] = []
+            for target_name in self.config.targets:
+                try:
+                    database_url = resolve_backup_database_url(target_name)
+                    metrics = await asyncio.to_thread(
+                        self.backup_target, target_name, database_url, force_full=force_full
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    logger.error("資料庫備份失敗 target=%s: %s", target_name, exc, exc_info=True)
+                    self._totals["failures"] += 1
+                    errors.append(f"{target_name}: {exc}")
+                    continue
+                results.append(asdict(metrics))
+            return {
+                "success": not errors,
+                "message": "；".join(errors) if errors else self._summarize(results),
+                "results": results,
+            }
+
+    def backup_target(self, target_name: str, database_url: str, *, force_full: bool = False) -> BackupRunMetrics:
+        """同步執行單一 target 的備份（由 worker thread 呼叫）；依備份鏈狀態決定完整或增量。"""
+        engine_key = engine_key_for_url(database_url)
+        target_dir = self.root_dir / target_name
+        target_dir.mkdir(parents=True, exist_ok=True)
+        state = self._load_state(target_dir)
+        now = _utc_now()
+        needs_full = force_full or self._full_backup_due(state, engine_key, now)
+
+        metrics = BackupRunMetrics(
+            target=target_name,
+            engine=engine_key,
+            kind="full" if needs_full else ("pages" if engine_key == "sqlite" else "rows"),
+            started_at=now.isoformat(),
+        )
+        started = time.perf_counter()
+        timestamp = now.strftime(_TIMESTAMP_FORMAT)
+        if engine_key == "sqlite":
+            state = self._backup_sqlite(target_dir, database_url, state, timestamp, needs_full, metrics)
+        elif needs_full or not APPEND_ONLY_TABLES.get(target_name):
+            metrics.kind = "full"
+            state = self._backup_server_full(target_name, target_dir, database_url, engine_key, timestamp, metrics)
+        else:
+            state = self._backup_server_rows(target_name, target_dir, database_url, state, timestamp, metrics)
+        metrics.finish(started)
+
+        if not metrics.skipped:
+            snapshot_file = Path(metrics.path).name if metrics.path else None
+            state["last_snapshot_at"] = now.isoformat()
+            _write_json_atomic(
+                _meta_path(target_dir / snapshot_file),
+                {
+                    "file": snapshot_file,
+                    "target": target_name,
+                    "engine": engine_key,
+                    "kind": metrics.kind,
+                    "chain_id": state["chain_id"],
+                    "created_at": timestamp,
+                    "metrics": asdict(metrics),
+                },
+            )
+            _write_json_atomic(target_dir / _STATE_NAME, state)
+            self.apply_retention(target_dir)
+
+        self._record(metrics)
+        logger.info(
+            "資料庫備份完成 target=%s kind=%s 讀取 %.1f MB、寫入 %.1f MB，耗時 %.2fs（%.1f MB/s）",
+            target_name,
+            metrics.kind,
+            metrics.bytes_read / (1024 * 1024),
+            metrics.bytes_written / (1024 * 1024),
+            metrics.duration_s,
+            metrics.throughput_mb_s,
+        )
+        return metrics
+
+    def _full_backup_due(self, state: dict[str, Any], engine_key: str, now: datetime) -> bool:
+        if not state or state.get("engine") != engine_key or not state.get("chain_started_at"):
+            return True
+        chain_started = datetime.fromisoformat(state["chain_started_at"])
+        return now - chain_started >= timedelta(days=max(0, self.config.full_interval_days))
+
+    def _backup_sqlite(
+        self,
+        target_dir: Path,
+        database_url: str,
+        state: dict[str, Any],
+        timestamp: str,
+        needs_full: bool,
+        metrics: BackupRunMetrics,
+    ) -> dict[str, Any]:
+        source_path = _sqlite_path(database_url)
+        work_dir = target_dir / _WORK_DIR_NAME
+        work_dir.mkdir(parents=True, exist_ok=True)
+        working_copy = work_dir / f"{timestamp}.sqlite3"
+        hashes_path = target_dir / _PAGE_HASHES_NAME
+        try:
+            progress = paged_sqlite_backup(
+                source_path,
+                working_copy,
+                pages_per_step=self.config.sqlite_pages_per_step,
+                step_sleep_seconds=max(0, self.config.sqlite_step_sleep_ms) / 1000,
+            )
+            metrics.bytes_read = working_copy.stat().st_size
+            metrics.extra["backup_steps"] = progress["steps"]
+
+            previous_digests = hashes_path.read_bytes() if hashes_path.exists() else b""
+            if not needs_full and (
+                not previous_digests or _sqlite_page_size(working_copy) != state.get("page_size")
+            ):
+                needs_full = True
+                metrics.kind = "full"
+
+            if needs_full:
+                destination = target_dir / f"{timestamp}__full.{_FULL_EXTENSIONS['sqlite']}"
+                digests, page_size, page_count = write_full_sqlite_snapshot(
+                    working_copy, destination, compress_level=self.config.compress_level
+                )
+                metrics.pages_changed = page_count
+                state = {"engine": "sqlite", "chain_id": timestamp, "chain_started_at": _utc_now().isoformat()}
+            else:
+                destination = target_dir / f"{timestamp}__pages.delta.gz"
+                digests, page_size, page_count, changed = write_sqlite_page_delta(
+                    working_copy, destination, previous_digests, compress_level=self.config.compress_level
+                )
+                metrics.pages_changed = changed
+            metrics.pages_total = page_count
+            metrics.path = str(destination)
+            metrics.bytes_written = destination.stat().st_size
+            state.update({"page_size": page_size, "page_count": page_count})
+            temp_hashes = hashes_path.with_name(hashes_path.name + ".tmp")
+            temp_hashes.write_bytes(digests)
+            os.replace(temp_hashes, hashes_path)
+            return state
+        finally:
+            working_copy.unlink(missing_ok=True)
+
+    def _backup_server_full(
+        self,
+        target_name: str,
+        target_dir: Path,
+        database_url: str,
+        engine_key: str,
+        timestamp: str,
+        metrics: BackupRunMetrics,
+    ) -> dict[str, Any]:
+        tables = APPEND_ONLY_TABLES.get(target_name, {})
+        # 先取 watermark 再 dump：dump 期間新增的列會同時出現在 dump 與下一次增量，
+        # apply_row_delta 以主鍵衝突略過，不會遺漏也不會讓還原失敗
+        watermarks = _current_watermarks(database_url, tables) if tables else {}
+        destination = target_dir / f"{timestamp}__full.{_FULL_EXTENSIONS[engine_key]}"
+        metrics.bytes_read, metrics.bytes_written = stream_server_dump(
+            database_url, destination, engine_key=engine_key, compress_level=self.config.compress_level
+        )
+        metrics.path = str(destination)
+        return {
+            "engine": engine_key,
+            "chain_id": timestamp,
+            "chain_started_at": _utc_now().isoformat(),
+            "watermarks": watermarks,
+        }
+
+    def _backup_server_rows(
+        self,
+        target_name: str,
+        target_dir: Path,
+        database_url: str,
+        state: dict[str, Any],
+        timestamp: str,
+        metrics: BackupRunMetrics,
+    ) -> dict[str, Any]:
+        tables = APPEND_ONLY_TABLES[target_name]
+        watermarks = dict(state.get("watermarks") or {})
+        destination = target_dir / f"{timestamp}__rows.jsonl.gz"
+        new_watermarks, exported, bytes_read = export_rows_since_watermark(
+            database_url,
+            destination,
+            tables,
+            watermarks,
+            compress_level=self.config.compress_level,
+            safety_window=_WATERMARK_SAFETY_WINDOW,
+        )
+        # 只重讀到 safety window 內的舊列、watermark 沒有前進時不保留這份增量
+        if not exported or new_watermarks == watermarks:
+            destination.unlink(missing_ok=True)
+            metrics.skipped = True
+            metrics.message = "自上次備份後沒有新增資料列"
+            return state
+        metrics.rows_exported = exported
+        metrics.bytes_read = bytes_read
+        metrics.bytes_written = destination.stat().st_size
+        metrics.path = str(destination)
+        return {**state, "watermarks": new_watermarks}
+
+    def apply_retention(self, target_dir: Path) -> list[str]:
+        """保留最近 keep_full 條備份鏈，刪除更舊的完整快照與其增量。"""
+        snapshots = list_snapshots(target_dir)
+        chain_ids = sorted({item["chain_id"] for item in snapshots})
+        expired = set(chain_ids[: max(0, len(chain_ids) - max(1, self.config.keep_full))])
+        removed: list[str] = []
+        for item in snapshots:
+            if item["chain_id"] not in expired:
+                continue
+            path = target_dir / item["file"]
+            path.unlink(missing_ok=True)
+            _meta_path(path).unlink(missing_ok=True)
+            removed.append(item["file"])
+        return removed
+
+    @staticmethod
+    def _load_state(target_dir: Path) -> dict[str, Any]:
+        path = target_dir / _STATE_NAME
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _record(self, metrics: BackupRunMetrics) -> None:
+        self._last_runs[metrics.target] = asdict(metrics)
+        self._totals["runs"] += 1
+        self._totals["bytes_read"] += metrics.bytes_read
+        self._totals["bytes_written"] += metrics.bytes_written
+
+    @staticmethod
+    def _summarize(results: list[dict[str, Any]]) -> str:
+        parts = [
+            f"{item['target']}={'略過' if item['skipped'] else item['kind']}"
+            f"（{item['duration_s']}s, {item['throughput_mb_s']} MB/s）"
+            for item in results
+        ]
+        return "資料庫備份完成：" + ("、".join(parts) if parts else "沒有設定任何 target")
+
+    def metrics_snapshot(self) -> dict[str, Any]:
+        return {
+            "root_dir": str(self.root_dir),
+            "targets": list(self.config.targets),
+            **self._totals,
+            "last_runs": dict(self._last_runs),
+        }
+
+
+_database_backup_service: Optional[DatabaseBackupService] = None
+
+
+def get_database_backup_service() -> DatabaseBackupService:
+    global _database_backup_service
+    if _database_backup_service is None:
+        _database_backup_service = DatabaseBackupService()
+    return _database_backup_service
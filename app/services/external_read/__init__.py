@@ -8,11 +8,14 @@ commit/rollback, no mutation, no HTTPException.
 from __future__ import annotations
 
 from app.services.external_read.counts import (
+    get_adhoc_run_counts,
+    get_cached_case_counts,
     get_section_case_counts,
     get_team_case_counts,
 )
 from app.services.external_read.errors import (
     ExternalReadError,
+    InvalidCursorError,
     MissingLookupFilterError,
     TestCaseNotFoundError,
     TestCaseSetNotFoundError,
@@ -66,6 +69,8 @@ __all__ = [
     "apply_archive_and_status",
     # counts
     "get_team_case_counts",
+    "get_cached_case_counts",
+    "get_adhoc_run_counts",
     "get_section_case_counts",
     # queries
     "ensure_team_exists",
@@ -77,6 +82,7 @@ __all__ = [
     "list_team_test_runs_read",
     # errors
     "ExternalReadError",
+    "InvalidCursorError",
     "TeamNotFoundError",
     "TestCaseSetNotFoundError",
     "TestCaseNotFoundError",
@@ -1,23 +1,141 @@
 """Aggregation/count helpers for the shared external read surface.
 
-Moved verbatim from ``app/api/mcp.py`` (Phase 2).
+Moved verbatim from ``app/api/mcp.py`` (Phase 2). Counts are served from the
+``external_read_counts`` cache (maintained by
+``app.services.external_read_counts``); scopes without a cached row fall back
+to live aggregation so a missing or not-yet-reconciled row never yields a
+wrong count.
 """
 
 from __future__ import annotations
 
+from typing import Iterable, Optional
+
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.database_models import TestCaseLocal as TestCaseLocalDB
+from app.models.database_models import (
+    AdHocRunItem,
+    AdHocRunSheet,
+    ExternalReadCount,
+    TestCaseLocal as TestCaseLocalDB,
+)
+from app.services.external_read_counts import CASE_SCOPES, SCOPE_ADHOC_RUN, SCOPE_TEAM
+
+
+async def get_team_case_counts(
+    db: AsyncSession,
+    team_ids: Optional[Iterable[int]] = None,
+) -> dict[int, int]:
+    """回傳 {team_id: 該 team 的 test case 總數}；`Team.test_case_count` 欄位無人維護，勿使用。
+
+    指定 ``team_ids`` 時優先讀計數快取，只對沒有快取列的 team 即時計算。
+    """
+    if team_ids is None:
+        rows = await db.execute(
+            select(TestCaseLocalDB.team_id, func.count(TestCaseLocalDB.id))
+            .group_by(TestCaseLocalDB.team_id)
+        )
+        return {team_id: int(count or 0) for team_id, count in rows.all()}
+
+    wanted = sorted({int(team_id) for team_id in team_ids})
+    if not wanted:
+        return {}
+    cached_rows = await db.execute(
+        select(ExternalReadCount.scope_id, ExternalReadCount.item_count).where(
+            ExternalReadCount.scope == SCOPE_TEAM,
+            ExternalReadCount.scope_id.in_(wanted),
+        )
+    )
+    counts = {int(team_id): int(count or 0) for team_id, count in cached_rows.all()}
+    missing = [team_id for team_id in wanted if team_id not in counts]
+    if missing:
+        live_rows = await db.execute(
+            select(TestCaseLocalDB.team_id, func.count(TestCaseLocalDB.id))
+            .where(TestCaseLocalDB.team_id.in_(missing))
+            .group_by(TestCaseLocalDB.team_id)
+        )
+        counts.update({team_id: int(count or 0) for team_id, count in live_rows.all()})
+    return counts
+
 
+async def get_cached_case_counts(
+    db: AsyncSession, team_id: int
+) -> Optional[tuple[int, dict[int, int]]]:
+    """回傳 (team case 總數, {set_id: case 數})；team 尚未具體化時回傳 None。"""
+    rows = (
+        await db.execute(
+            select(
+                ExternalReadCount.scope,
+                ExternalReadCount.scope_id,
+                ExternalReadCount.item_count,
+            ).where(
+                ExternalReadCount.team_id == team_id,
+                ExternalReadCount.scope.in_(CASE_SCOPES),
+            )
+        )
+    ).all()
+    team_total: Optional[int] = None
+    set_counts: dict[int, int] = {}
+    for scope, scope_id, count in rows:
+        if scope == SCOPE_TEAM:
+            if int(scope_id) == team_id:
+                team_total = int(count or 0)
+        else:
+            set_counts[int(scope_id)] = int(count or 0)
+    if team_total is None:
+        return None
+    return team_total, set_counts
 
-async def get_team_case_counts(db: AsyncSession) -> dict[int, int]:
-    """回傳 {team_id: 該 team 的 test case 總數}；`Team.test_case_count` 欄位無人維護，勿使用。"""
+
+async def get_live_set_case_counts(db: AsyncSession, team_id: int) -> dict[int, int]:
+    """回傳 {set_id: case 數}（即時 GROUP BY，快取缺漏時使用）。"""
     rows = await db.execute(
-        select(TestCaseLocalDB.team_id, func.count(TestCaseLocalDB.id))
-        .group_by(TestCaseLocalDB.team_id)
+        select(TestCaseLocalDB.test_case_set_id, func.count(TestCaseLocalDB.id))
+        .where(TestCaseLocalDB.team_id == team_id)
+        .group_by(TestCaseLocalDB.test_case_set_id)
+    )
+    return {set_id: int(count or 0) for set_id, count in rows.all()}
+
+
+async def get_adhoc_run_counts(
+    db: AsyncSession, run_ids: Iterable[int]
+) -> dict[int, tuple[int, int]]:
+    """回傳 {adhoc_run_id: (item 總數, 已執行數)}；沒有快取列的 run 以一次 GROUP BY 即時計算。"""
+    wanted = sorted({int(run_id) for run_id in run_ids})
+    if not wanted:
+        return {}
+    cached_rows = await db.execute(
+        select(
+            ExternalReadCount.scope_id,
+            ExternalReadCount.item_count,
+            ExternalReadCount.executed_count,
+        ).where(
+            ExternalReadCount.scope == SCOPE_ADHOC_RUN,
+            ExternalReadCount.scope_id.in_(wanted),
+        )
     )
-    return {team_id: int(count or 0) for team_id, count in rows.all()}
+    counts = {
+        int(run_id): (int(items or 0), int(executed or 0))
+        for run_id, items, executed in cached_rows.all()
+    }
+    missing = [run_id for run_id in wanted if run_id not in counts]
+    if missing:
+        live_rows = await db.execute(
+            select(
+                AdHocRunSheet.adhoc_run_id,
+                func.count(AdHocRunItem.id),
+                func.count(AdHocRunItem.test_result),
+            )
+            .join(AdHocRunItem, AdHocRunItem.sheet_id == AdHocRunSheet.id)
+            .where(AdHocRunSheet.adhoc_run_id.in_(missing))
+            .group_by(AdHocRunSheet.adhoc_run_id)
+        )
+        for run_id, items, executed in live_rows.all():
+            counts[int(run_id)] = (int(items or 0), int(executed or 0))
+        for run_id in missing:
+            counts.setdefault(run_id, (0, 0))
+    return counts
 
 
 async def get_section_case_counts(
@@ -53,3 +53,10 @@ class UnknownRunTypeError(ExternalReadError):
     def __init__(self, unknown_values: Iterable[str]) -> None:
         self.unknown_values: list[str] = sorted(unknown_values)
         super().__init__(f"run_type 不支援的值: {', '.join(self.unknown_values)}")
+
+
+class InvalidCursorError(ExternalReadError):
+    """Raised when a keyset ``cursor`` cannot be decoded."""
+
+    def __init__(self) -> None:
+        super().__init__("cursor 格式無效，請使用上一頁回傳的 page.next_cursor")
@@ -9,15 +9,17 @@ Compare with "is None" and "len(...)==0" only — never "if not allowed_team_ids
 
 from __future__ import annotations
 
+import base64
+import binascii
+from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.models.database_models import (
     AdHocRun,
-    AdHocRunSheet,
     Team as TeamDB,
     TestCaseLocal as TestCaseLocalDB,
     TestCaseSection as TestCaseSectionDB,
@@ -44,10 +46,14 @@ from app.models.mcp import (
 from app.models.test_run_set import TestRunSetStatus
 from app.services.automation.linkage_service import AutomationLinkageService
 from app.services.external_read.counts import (
+    get_adhoc_run_counts,
+    get_cached_case_counts,
+    get_live_set_case_counts,
     get_section_case_counts,
     get_team_case_counts,
 )
 from app.services.external_read.errors import (
+    InvalidCursorError,
     MissingLookupFilterError,
     TestCaseNotFoundError,
     TestCaseSetNotFoundError,
@@ -70,6 +76,41 @@ from app.services.external_read.payloads import (
 from app.services.test_run_set_status import resolve_status_for_response
 
 
+def encode_case_cursor(created_at: Optional[datetime], case_id: int) -> str:
+    """Opaque keyset cursor for the (created_at DESC, id DESC) case ordering."""
+    raw = f"{created_at.isoformat() if created_at else ''}|{case_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_case_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, _, id_raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").partition("|")
+        return (datetime.fromisoformat(created_raw) if created_raw else None), int(id_raw)
+    except (ValueError, binascii.Error, UnicodeError) as exc:
+        raise InvalidCursorError() from exc
+
+
+# created_at 為 NULL 的舊資料一律排在最後。PostgreSQL 的 DESC 預設 NULLS FIRST、MySQL 不支援
+# NULLS LAST 語法，改以 ``IS NULL`` 當第一排序鍵（false 先於 true），各引擎順序一致
+_CASE_PAGE_ORDER = (
+    TestCaseLocalDB.created_at.is_(None),
+    TestCaseLocalDB.created_at.desc(),
+    TestCaseLocalDB.id.desc(),
+)
+
+
+def _case_keyset_condition(created_at: Optional[datetime], case_id: int) -> Any:
+    # 與 _CASE_PAGE_ORDER 對應：NULL 區段只依 id 往下翻
+    if created_at is None:
+        return and_(TestCaseLocalDB.created_at.is_(None), TestCaseLocalDB.id < case_id)
+    return or_(
+        TestCaseLocalDB.created_at < created_at,
+        and_(TestCaseLocalDB.created_at == created_at, TestCaseLocalDB.id < case_id),
+        TestCaseLocalDB.created_at.is_(None),
+    )
+
+
 async def ensure_team_exists(db: AsyncSession, team_id: int) -> None:
     result = await db.execute(select(TeamDB.id).where(TeamDB.id == team_id))
     if result.scalar_one_or_none() is None:
@@ -89,7 +130,7 @@ async def list_teams_read(
         stmt = stmt.where(TeamDB.id.in_(allowed_team_ids))
 
     teams = (await db.execute(stmt)).scalars().all()
-    team_case_counts = await get_team_case_counts(db)
+    team_case_counts = await get_team_case_counts(db, [team.id for team in teams])
     items = [
         MCPTeamItem(
             id=team.id,
@@ -125,7 +166,16 @@ async def list_team_test_cases_read(
     include_test_data: bool = False,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> MCPTeamTestCasesResponse:
+    """List a team's cases with set counts.
+
+    Counts come from the ``external_read_counts`` cache; when only set / team
+    scoping is applied the page total is also a cache lookup. ``cursor`` (the
+    previous ``page.next_cursor``) switches to keyset pagination and ``skip``
+    is ignored.
+    """
+    keyset = decode_case_cursor(cursor) if cursor else None
     set_not_found = False
     resolved_set_id: Optional[int] = set_id
     if set_id is not None:
@@ -141,18 +191,21 @@ async def list_team_test_cases_read(
             set_not_found = True
             resolved_set_id = None
 
-    set_count_rows = await db.execute(
-        select(TestCaseLocalDB.test_case_set_id, func.count(TestCaseLocalDB.id))
-        .where(TestCaseLocalDB.team_id == team_id)
-        .group_by(TestCaseLocalDB.test_case_set_id)
-    )
-    set_count_map = {sid: count for sid, count in set_count_rows.all()}
+    set_rows = (
+        await db.execute(
+            select(TestCaseSetDB)
+            .where(TestCaseSetDB.team_id == team_id)
+            .order_by(TestCaseSetDB.created_at.desc(), TestCaseSetDB.id.desc())
+        )
+    ).scalars().all()
+    cached_counts = await get_cached_case_counts(db, team_id)
+    if cached_counts is not None and all(case_set.id in cached_counts[1] for case_set in set_rows):
+        team_case_total: Optional[int] = cached_counts[0]
+        set_count_map: Dict[Any, int] = cached_counts[1]
+    else:
+        team_case_total = None
+        set_count_map = await get_live_set_case_counts(db, team_id)
 
-    set_rows = await db.execute(
-        select(TestCaseSetDB)
-        .where(TestCaseSetDB.team_id == team_id)
-        .order_by(TestCaseSetDB.created_at.desc(), TestCaseSetDB.id.desc())
-    )
     set_items = [
         MCPTestCaseSetItem(
             id=case_set.id,
@@ -163,12 +216,13 @@ async def list_team_test_cases_read(
             created_at=case_set.created_at,
             updated_at=case_set.updated_at,
         )
-        for case_set in set_rows.scalars().all()
+        for case_set in set_rows
     ]
 
     conditions: list[Any] = [TestCaseLocalDB.team_id == team_id]
     if resolved_set_id is not None:
         conditions.append(TestCaseLocalDB.test_case_set_id == resolved_set_id)
+    scope_only = len(conditions)
     if section_id is not None:
         conditions.append(TestCaseLocalDB.test_case_section_id == section_id)
     if search and search.strip():
@@ -200,20 +254,30 @@ async def list_team_test_cases_read(
                 or_(*[TestCaseLocalDB.tcg_json.ilike(f"%{value}%") for value in tcg_filters])
             )
 
-    total = (
-        await db.execute(select(func.count(TestCaseLocalDB.id)).where(*conditions))
-    ).scalar_one()
-    has_next = bool(total > skip + limit)
-
-    rows = (
+    total: Optional[int] = None
+    if len(conditions) == scope_only and team_case_total is not None:
+        # 只有 team / set 範圍時，總數直接取自計數快取
+        total = team_case_total if resolved_set_id is None else set_count_map.get(resolved_set_id, 0)
+    if total is None:
+        total = (
+            await db.execute(select(func.count(TestCaseLocalDB.id)).where(*conditions))
+        ).scalar_one()
+
+    page_stmt = select(TestCaseLocalDB).where(*conditions)
+    if keyset is not None:
+        page_stmt = page_stmt.where(_case_keyset_condition(*keyset))
+    else:
+        page_stmt = page_stmt.offset(skip)
+    window = (
         await db.execute(
-            select(TestCaseLocalDB)
-            .where(*conditions)
-            .order_by(TestCaseLocalDB.created_at.desc(), TestCaseLocalDB.id.desc())
-            .offset(skip)
-            .limit(limit)
+            page_stmt
+            .order_by(*_CASE_PAGE_ORDER)
+            .limit(limit + 1)
         )
     ).scalars().all()
+    has_next = len(window) > limit
+    rows = window[:limit]
+    next_cursor = encode_case_cursor(rows[-1].created_at, rows[-1].id) if has_next and rows else None
 
     cases: list[Dict[str, Any]] = [
         build_case_payload(
@@ -243,7 +307,13 @@ async def list_team_test_cases_read(
         },
         sets=set_items,
         test_cases=cases,
-        page=MCPPageMeta(skip=skip, limit=limit, total=int(total), has_next=has_next),
+        page=MCPPageMeta(
+            skip=skip,
+            limit=limit,
+            total=int(total),
+            has_next=has_next,
+            next_cursor=next_cursor,
+        ),
     )
 
 
@@ -596,10 +666,9 @@ async def list_team_test_runs_read(
             await db.execute(
                 select(AdHocRun)
                 .where(AdHocRun.team_id == team_id)
-                .options(joinedload(AdHocRun.sheets).joinedload(AdHocRunSheet.items))
                 .order_by(AdHocRun.updated_at.desc(), AdHocRun.id.desc())
             )
-        ).scalars().unique().all()
+        ).scalars().all()
 
         filtered_adhoc = apply_archive_and_status(
             adhoc_rows,
@@ -607,18 +676,12 @@ async def list_team_test_runs_read(
             include_archived=include_archived,
         )
 
-        def _adhoc_counts(run: AdHocRun) -> tuple[int, int]:
-            total = 0
-            executed = 0
-            for sheet in run.sheets or []:
-                items = sheet.items or []
-                total += len(items)
-                executed += sum(1 for item in items if getattr(item, "test_result", None))
-            return total, executed
+        # sheet / item 計數取自計數快取，不再載入整個 run 的 sheets 與 items
+        adhoc_counts = await get_adhoc_run_counts(db, [run.id for run in filtered_adhoc])
 
         adhoc_payloads = []
         for run in filtered_adhoc:
-            total_test_cases, executed_cases = _adhoc_counts(run)
+            total_test_cases, executed_cases = adhoc_counts.get(run.id, (0, 0))
             adhoc_payloads.append(
                 MCPAdhocRunItem(
                     id=run.id,
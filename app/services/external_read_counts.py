@@ -0,0 +1,577 @@
+"""Write-side maintenance of the external read counts cache.
+
+``external_read_counts`` backs the MCP / app read APIs: per-team and per-set
+test case counts, and sheet / item / executed counts per ad-hoc run. Rows are
+kept current inside the writer's own transaction:
+
+- ORM flushes apply exact deltas (``after_flush``).
+- Bulk ORM statements (``session.execute(insert/update/delete(...))``) turn
+  their parameters into deltas, or recount the affected teams in place when a
+  delta cannot be derived from the statement.
+- ``reconcile_external_read_counts`` (daily scheduled service) inserts rows for
+  scopes created outside the ORM, drops orphans and recounts everything.
+
+Hooks never delete-and-reinsert an existing row, so concurrent writers cannot
+collide on the ``(scope, scope_id)`` unique key; only rows for scopes created
+in the same flush are inserted.
+"""
+
+from __future__ import annotations
+
+import logging
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import and_, delete, event, exists, func, insert, literal, select, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.database_models import (
+    AdHocRun,
+    AdHocRunItem,
+    AdHocRunSheet,
+    ExternalReadCount,
+    Team,
+    TestCaseLocal,
+    TestCaseSet,
+)
+
+logger = logging.getLogger(__name__)
+
+SCOPE_TEAM = "team"
+SCOPE_CASE_SET = "case_set"
+SCOPE_ADHOC_RUN = "adhoc_run"
+CASE_SCOPES = (SCOPE_TEAM, SCOPE_CASE_SET)
+
+_COUNTS = ExternalReadCount.__table__
+_ROW_COLUMNS = ["scope", "scope_id", "team_id", "item_count", "sheet_count", "executed_count", "updated_at"]
+_CASE_PLACEMENT_KEYS = frozenset({"team_id", "test_case_set_id"})
+_UNKNOWN = object()
+# 已確認具備計數表的 engine；只快取正向結果，遷移補上表後即可生效
+_ENABLED_ENGINES: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+@dataclass
+class _PendingCounts:
+    """One flush / bulk statement worth of count changes."""
+
+    new_teams: set[int] = field(default_factory=set)
+    new_sets: dict[int, int] = field(default_factory=dict)
+    new_runs: dict[int, int] = field(default_factory=dict)
+    team_deltas: Counter = field(default_factory=Counter)
+    set_deltas: Counter = field(default_factory=Counter)
+    set_teams: dict[int, int] = field(default_factory=dict)
+    sheet_item_deltas: Counter = field(default_factory=Counter)
+    sheet_executed_deltas: Counter = field(default_factory=Counter)
+    run_sheet_deltas: Counter = field(default_factory=Counter)
+    known_sheet_runs: dict[int, int] = field(default_factory=dict)
+    refresh_teams: set[int] = field(default_factory=set)
+    refresh_all_cases: bool = False
+    refresh_sheets: set[int] = field(default_factory=set)
+    refresh_runs: set[int] = field(default_factory=set)
+    dropped_teams: set[int] = field(default_factory=set)
+    dropped_sets: set[int] = field(default_factory=set)
+    dropped_runs: set[int] = field(default_factory=set)
+
+    def add_case(self, team_id: Any, set_id: Any, sign: int) -> None:
+        if team_id is None:
+            self.refresh_all_cases = True
+            return
+        self.team_deltas[int(team_id)] += sign
+        if set_id is not None:
+            self.set_deltas[int(set_id)] += sign
+            self.set_teams[int(set_id)] = int(team_id)
+
+    def add_item(self, sheet_id: Any, executed: bool, sign: int) -> None:
+        if sheet_id is None:
+            return
+        self.sheet_item_deltas[int(sheet_id)] += sign
+        if executed:
+            self.sheet_executed_deltas[int(sheet_id)] += sign
+
+    def is_empty(self) -> bool:
+        return not any(
+            (
+                self.new_teams,
+                self.new_sets,
+                self.new_runs,
+                self.team_deltas,
+                self.set_deltas,
+                self.sheet_item_deltas,
+                self.sheet_executed_deltas,
+                self.run_sheet_deltas,
+                self.refresh_teams,
+                self.refresh_all_cases,
+                self.refresh_sheets,
+                self.refresh_runs,
+                self.dropped_teams,
+                self.dropped_sets,
+                self.dropped_runs,
+            )
+        )
+
+
+def install_external_read_count_hooks() -> None:
+    """Register the session hooks once per process (idempotent)."""
+
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+    if not event.contains(Session, "do_orm_execute", _on_orm_execute):
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+
+
+# ---------------------------------------------------------------------- #
+# In-place recount (safe under concurrent writers: UPDATE only)
+# ---------------------------------------------------------------------- #
+
+
+def refresh_case_counts(connection: Connection, team_ids: Optional[Iterable[int]] = None) -> None:
+    """Recount existing ``team`` / ``case_set`` rows; ``team_ids=None`` recounts all teams."""
+
+    conditions: list[Any] = []
+    if team_ids is not None:
+        scoped = sorted({int(team_id) for team_id in team_ids})
+        if not scoped:
+            return
+        conditions.append(_COUNTS.c.team_id.in_(scoped))
+    now = datetime.utcnow()
+    team_total = (
+        select(func.count(TestCaseLocal.id))
+        .where(TestCaseLocal.team_id == _COUNTS.c.scope_id)
+        .scalar_subquery()
+    )
+    set_total = (
+        select(func.count(TestCaseLocal.id))
+        .where(
+            TestCaseLocal.test_case_set_id == _COUNTS.c.scope_id,
+            TestCaseLocal.team_id == _COUNTS.c.team_id,
+        )
+        .scalar_subquery()
+    )
+    connection.execute(
+        update(_COUNTS)
+        .where(_COUNTS.c.scope == SCOPE_TEAM, *conditions)
+        .values(item_count=team_total, updated_at=now)
+    )
+    connection.execute(
+        update(_COUNTS)
+        .where(_COUNTS.c.scope == SCOPE_CASE_SET, *conditions)
+        .values(item_count=set_total, updated_at=now)
+    )
+
+
+def refresh_adhoc_run_counts(connection: Connection, run_ids: Optional[Iterable[int]] = None) -> None:
+    """Recount existing ``adhoc_run`` rows; ``run_ids=None`` recounts every run."""
+
+    conditions: list[Any] = [_COUNTS.c.scope == SCOPE_ADHOC_RUN]
+    if run_ids is not None:
+        scoped = sorted({int(run_id) for run_id in run_ids})
+        if not scoped:
+            return
+        conditions.append(_COUNTS.c.scope_id.in_(scoped))
+    sheet_total = (
+        select(func.count(AdHocRunSheet.id))
+        .where(AdHocRunSheet.adhoc_run_id == _COUNTS.c.scope_id)
+        .scalar_subquery()
+    )
+    run_items = (
+        select(func.count(AdHocRunItem.id))
+        .join(AdHocRunSheet, AdHocRunSheet.id == AdHocRunItem.sheet_id)
+        .where(AdHocRunSheet.adhoc_run_id == _COUNTS.c.scope_id)
+    )
+    connection.execute(
+        update(_COUNTS)
+        .where(*conditions)
+        .values(
+            sheet_count=sheet_total,
+            item_count=run_items.scalar_subquery(),
+            executed_count=run_items.where(AdHocRunItem.test_result.is_not(None)).scalar_subquery(),
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
+def reconcile_external_read_counts(sync_db: Session) -> dict[str, int]:
+    """Rebuild the counts cache: add missing rows, drop orphans, recount everything."""
+
+    connection = sync_db.connection()
+    now = literal(datetime.utcnow())
+    zero = literal(0)
+    deleted = 0
+    for scope, source in (
+        (SCOPE_TEAM, Team.id),
+        (SCOPE_CASE_SET, TestCaseSet.id),
+        (SCOPE_ADHOC_RUN, AdHocRun.id),
+    ):
+        deleted += connection.execute(
+            delete(_COUNTS).where(
+                _COUNTS.c.scope == scope,
+                ~exists().where(source == _COUNTS.c.scope_id),
+            )
+        ).rowcount or 0
+
+    inserted = 0
+    for scope, source_id, source_team_id in (
+        (SCOPE_TEAM, Team.id, Team.id),
+        (SCOPE_CASE_SET, TestCaseSet.id, TestCaseSet.team_id),
+        (SCOPE_ADHOC_RUN, AdHocRun.id, AdHocRun.team_id),
+    ):
+        missing = select(
+            literal(scope), source_id, source_team_id, zero, zero, zero, now
+        ).where(
+            ~exists().where(_COUNTS.c.scope == scope, _COUNTS.c.scope_id == source_id)
+        )
+        inserted += connection.execute(insert(_COUNTS).from_select(_ROW_COLUMNS, missing)).rowcount or 0
+
+    refresh_case_counts(connection)
+    refresh_adhoc_run_counts(connection)
+    return {"inserted": inserted, "deleted": deleted}
+
+
+# ---------------------------------------------------------------------- #
+# Session hooks
+# ---------------------------------------------------------------------- #
+
+
+def _counts_table_available(connection: Connection) -> bool:
+    """Partial schemas (scripts, narrow test fixtures) may lack the cache table."""
+    engine = connection.engine
+    if engine in _ENABLED_ENGINES:
+        return True
+    if not sa_inspect(connection).has_table(_COUNTS.name):
+        return False
+    _ENABLED_ENGINES.add(engine)
+    return True
+
+
+def _after_flush(session: Session, _flush_context) -> None:
+    pending = _collect_flush_changes(session)
+    if pending is None or pending.is_empty():
+        return
+    connection = session.connection()
+    if _counts_table_available(connection):
+        _apply_pending(connection, pending)
+
+
+def _on_orm_execute(state) -> Any:
+    if state.is_select or not (state.is_insert or state.is_update or state.is_delete):
+        return None
+    mapper = state.bind_mapper
+    target = getattr(mapper, "class_", None)
+    if target not in (TestCaseLocal, AdHocRunSheet, AdHocRunItem, AdHocRun):
+        return None
+    if not _counts_table_available(state.session.connection()):
+        return None
+    if target is TestCaseLocal:
+        return _execute_case_statement(state)
+    if target in (AdHocRunSheet, AdHocRunItem, AdHocRun):
+        # 目前沒有對 ad-hoc 表的批次敘述；保守地在執行後全量重算 run 計數
+        result = state.invoke_statement()
+        refresh_adhoc_run_counts(state.session.connection())
+        return result
+    return None
+
+
+def _collect_flush_changes(session: Session) -> Optional[_PendingCounts]:
+    pending: Optional[_PendingCounts] = None
+
+    def _pending() -> _PendingCounts:
+        nonlocal pending
+        if pending is None:
+            pending = _PendingCounts()
+        return pending
+
+    for obj in session.new:
+        if isinstance(obj, TestCaseLocal):
+            _pending().add_case(obj.team_id, obj.test_case_set_id, 1)
+        elif isinstance(obj, AdHocRunItem):
+            _pending().add_item(obj.sheet_id, obj.test_result is not None, 1)
+        elif isinstance(obj, AdHocRunSheet):
+            _pending().run_sheet_deltas[obj.adhoc_run_id] += 1
+        elif isinstance(obj, TestCaseSet):
+            _pending().new_sets[obj.id] = obj.team_id
+        elif isinstance(obj, AdHocRun):
+            _pending().new_runs[obj.id] = obj.team_id
+        elif isinstance(obj, Team):
+            _pending().new_teams.add(obj.id)
+
+    for obj in session.deleted:
+        if isinstance(obj, TestCaseLocal):
+            _pending().add_case(obj.team_id, obj.test_case_set_id, -1)
+        elif isinstance(obj, AdHocRunItem):
+            _pending().add_item(obj.sheet_id, obj.test_result is not None, -1)
+        elif isinstance(obj, AdHocRunSheet):
+            _pending().run_sheet_deltas[obj.adhoc_run_id] -= 1
+            _pending().known_sheet_runs[obj.id] = obj.adhoc_run_id
+        elif isinstance(obj, TestCaseSet):
+            _pending().dropped_sets.add(obj.id)
+        elif isinstance(obj, AdHocRun):
+            _pending().dropped_runs.add(obj.id)
+        elif isinstance(obj, Team):
+            _pending().dropped_teams.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, TestCaseLocal):
+            _collect_moved_case(obj, _pending)
+        elif isinstance(obj, AdHocRunItem):
+            _collect_changed_item(obj, _pending)
+        elif isinstance(obj, AdHocRunSheet):
+            history = sa_inspect(obj).attrs.adhoc_run_id.history
+            if history.has_changes():
+                # sheet 連同 items 搬到另一個 run：新舊 run 都重算
+                pending_counts = _pending()
+                pending_counts.refresh_runs.add(obj.adhoc_run_id)
+                previous_run = _previous_value(history)
+                if previous_run is not _UNKNOWN and previous_run is not None:
+                    pending_counts.refresh_runs.add(previous_run)
+    return pending
+
+
+def _collect_moved_case(obj: TestCaseLocal, get_pending) -> None:
+    attrs = sa_inspect(obj).attrs
+    team_history = attrs.team_id.history
+    set_history = attrs.test_case_set_id.history
+    if not (team_history.has_changes() or set_history.has_changes()):
+        return
+    pending = get_pending()
+    previous_team = _previous_value(team_history) if team_history.has_changes() else obj.team_id
+    previous_set = _previous_value(set_history) if set_history.has_changes() else obj.test_case_set_id
+    if previous_team is _UNKNOWN:
+        pending.refresh_all_cases = True
+        return
+    if previous_set is _UNKNOWN:
+        pending.refresh_teams.update({previous_team, obj.team_id})
+        return
+    pending.add_case(previous_team, previous_set, -1)
+    pending.add_case(obj.team_id, obj.test_case_set_id, 1)
+
+
+def _collect_changed_item(obj: AdHocRunItem, get_pending) -> None:
+    attrs = sa_inspect(obj).attrs
+    sheet_history = attrs.sheet_id.history
+    result_history = attrs.test_result.history
+    if sheet_history.has_changes():
+        pending = get_pending()
+        pending.refresh_sheets.add(obj.sheet_id)
+        previous_sheet = _previous_value(sheet_history)
+        if previous_sheet is not _UNKNOWN and previous_sheet is not None:
+            pending.refresh_sheets.add(previous_sheet)
+        return
+    if not result_history.has_changes():
+        return
+    previous_result = _previous_value(result_history)
+    pending = get_pending()
+    if previous_result is _UNKNOWN:
+        pending.refresh_sheets.add(obj.sheet_id)
+        return
+    delta = int(obj.test_result is not None) - int(previous_result is not None)
+    if delta and obj.sheet_id is not None:
+        pending.sheet_executed_deltas[int(obj.sheet_id)] += delta
+
+
+def _previous_value(history) -> Any:
+    # 屬性在修改前未載入時 history.deleted 為空，無法得知舊值
+    return history.deleted[0] if history.deleted else _UNKNOWN
+
+
+def _execute_case_statement(state) -> Any:
+    statement = state.statement
+    parameters = state.parameters
+    rows: list[dict[str, Any]] = []
+    if isinstance(parameters, list):
+        rows = [dict(row) for row in parameters]
+    elif parameters:
+        rows = [dict(parameters)]
+
+    if state.is_insert:
+        if rows and all(_CASE_PLACEMENT_KEYS <= row.keys() for row in rows):
+            result = state.invoke_statement()
+            pending = _PendingCounts()
+            for row in rows:
+                pending.add_case(row["team_id"], row["test_case_set_id"], 1)
+            _apply_pending(state.session.connection(), pending)
+            return result
+        result = state.invoke_statement()
+        refresh_case_counts(state.session.connection())
+        return result
+
+    connection = state.session.connection()
+    if state.is_update and statement.whereclause is None:
+        # bulk UPDATE by primary key：只有搬移 team / set 才影響計數
+        if not any(_CASE_PLACEMENT_KEYS & row.keys() for row in rows):
+            return None
+        ids = [row["id"] for row in rows if row.get("id") is not None]
+        team_ids = _case_team_ids(connection, TestCaseLocal.id.in_(ids)) if ids else set()
+        team_ids.update(int(row["team_id"]) for row in rows if row.get("team_id") is not None)
+        result = state.invoke_statement()
+        refresh_case_counts(connection, team_ids)
+        return result
+
+    assigned = {getattr(key, "key", key) for key in (getattr(statement, "_values", None) or {})}
+    if state.is_update and assigned and not (_CASE_PLACEMENT_KEYS & assigned):
+        return None
+    if statement.whereclause is None or "team_id" in assigned:
+        result = state.invoke_statement()
+        refresh_case_counts(connection)
+        return result
+    team_ids = _case_team_ids(connection, statement.whereclause)
+    result = state.invoke_statement()
+    refresh_case_counts(connection, team_ids)
+    return result
+
+
+def _case_team_ids(connection: Connection, condition: Any) -> set[int]:
+    rows = connection.execute(select(TestCaseLocal.team_id).where(condition).distinct())
+    return {int(team_id) for (team_id,) in rows if team_id is not None}
+
+
+def _apply_pending(connection: Connection, pending: _PendingCounts) -> None:
+    now = datetime.utcnow()
+
+    if pending.new_teams:
+        _replace_rows(connection, SCOPE_TEAM, {team_id: team_id for team_id in pending.new_teams}, now)
+    if pending.new_sets:
+        materialized = _materialized_teams(connection, set(pending.new_sets.values()))
+        _replace_rows(
+            connection,
+            SCOPE_CASE_SET,
+            {set_id: team_id for set_id, team_id in pending.new_sets.items() if team_id in materialized},
+            now,
+        )
+    if pending.new_runs:
+        _replace_rows(connection, SCOPE_ADHOC_RUN, pending.new_runs, now)
+
+    for team_id, delta in pending.team_deltas.items():
+        if delta:
+            connection.execute(
+                update(_COUNTS)
+                .where(_COUNTS.c.scope == SCOPE_TEAM, _COUNTS.c.scope_id == team_id)
+                .values(item_count=_COUNTS.c.item_count + delta, updated_at=now)
+            )
+    for set_id, delta in pending.set_deltas.items():
+        if not delta:
+            continue
+        result = connection.execute(
+            update(_COUNTS)
+            .where(_COUNTS.c.scope == SCOPE_CASE_SET, _COUNTS.c.scope_id == set_id)
+            .values(item_count=_COUNTS.c.item_count + delta, updated_at=now)
+        )
+        if not result.rowcount:
+            # set 列缺漏（team 尚未具體化時為正常情況）；讀取端偵測缺漏後退回即時計算
+            pending.refresh_teams.add(pending.set_teams[set_id])
+
+    _apply_run_deltas(connection, pending, now)
+
+    if pending.refresh_all_cases:
+        refresh_case_counts(connection)
+    elif pending.refresh_teams:
+        refresh_case_counts(connection, pending.refresh_teams)
+
+    if pending.dropped_sets:
+        connection.execute(
+            delete(_COUNTS).where(
+                _COUNTS.c.scope == SCOPE_CASE_SET,
+                _COUNTS.c.scope_id.in_(sorted(pending.dropped_sets)),
+            )
+        )
+    if pending.dropped_runs:
+        connection.execute(
+            delete(_COUNTS).where(
+                _COUNTS.c.scope == SCOPE_ADHOC_RUN,
+                _COUNTS.c.scope_id.in_(sorted(pending.dropped_runs)),
+            )
+        )
+    if pending.dropped_teams:
+        connection.execute(delete(_COUNTS).where(_COUNTS.c.team_id.in_(sorted(pending.dropped_teams))))
+
+
+def _apply_run_deltas(connection: Connection, pending: _PendingCounts, now: datetime) -> None:
+    sheet_ids = (
+        set(pending.sheet_item_deltas)
+        | set(pending.sheet_executed_deltas)
+        | pending.refresh_sheets
+    )
+    sheet_runs = dict(pending.known_sheet_runs)
+    unresolved = sorted(sheet_id for sheet_id in sheet_ids if sheet_id not in sheet_runs)
+    if unresolved:
+        sheet_runs.update(
+            connection.execute(
+                select(AdHocRunSheet.id, AdHocRunSheet.adhoc_run_id).where(AdHocRunSheet.id.in_(unresolved))
+            ).all()
+        )
+
+    item_deltas: Counter = Counter()
+    executed_deltas: Counter = Counter()
+    refresh_runs: set[int] = {run_id for run_id in pending.refresh_runs if run_id is not None}
+    for sheet_id in sheet_ids:
+        run_id = sheet_runs.get(sheet_id)
+        if run_id is None:
+            # sheet 已不存在且不在本次 flush 中：無從歸屬，改由 reconcile 校正
+            continue
+        if sheet_id in pending.refresh_sheets:
+            refresh_runs.add(run_id)
+            continue
+        item_deltas[run_id] += pending.sheet_item_deltas.get(sheet_id, 0)
+        executed_deltas[run_id] += pending.sheet_executed_deltas.get(sheet_id, 0)
+
+    run_ids = set(pending.run_sheet_deltas) | set(item_deltas) | set(executed_deltas)
+    for run_id in sorted(run_ids - refresh_runs - pending.dropped_runs):
+        sheet_delta = pending.run_sheet_deltas.get(run_id, 0)
+        item_delta = item_deltas.get(run_id, 0)
+        executed_delta = executed_deltas.get(run_id, 0)
+        if not (sheet_delta or item_delta or executed_delta):
+            continue
+        connection.execute(
+            update(_COUNTS)
+            .where(_COUNTS.c.scope == SCOPE_ADHOC_RUN, _COUNTS.c.scope_id == run_id)
+            .values(
+                sheet_count=_COUNTS.c.sheet_count + sheet_delta,
+                item_count=_COUNTS.c.item_count + item_delta,
+                executed_count=_COUNTS.c.executed_count + executed_delta,
+                updated_at=now,
+            )
+        )
+    if refresh_runs - pending.dropped_runs:
+        refresh_adhoc_run_counts(connection, refresh_runs - pending.dropped_runs)
+
+
+def _replace_rows(connection: Connection, scope: str, team_by_scope_id: dict[int, int], now: datetime) -> None:
+    """Insert zeroed rows for scopes created in this flush (ids are new to this transaction)."""
+
+    if not team_by_scope_id:
+        return
+    scope_ids = sorted(team_by_scope_id)
+    # SQLite 可能重用已刪除的 id；先清掉殘留列再插入
+    connection.execute(
+        delete(_COUNTS).where(_COUNTS.c.scope == scope, _COUNTS.c.scope_id.in_(scope_ids))
+    )
+    connection.execute(
+        insert(_COUNTS),
+        [
+            {
+                "scope": scope,
+                "scope_id": scope_id,
+                "team_id": team_by_scope_id[scope_id],
+                "item_count": 0,
+                "sheet_count": 0,
+                "executed_count": 0,
+                "updated_at": now,
+            }
+            for scope_id in scope_ids
+        ],
+    )
+
+
+def _materialized_teams(connection: Connection, team_ids: set[int]) -> set[int]:
+    if not team_ids:
+        return set()
+    rows = connection.execute(
+        select(_COUNTS.c.scope_id).where(
+            and_(_COUNTS.c.scope == SCOPE_TEAM, _COUNTS.c.scope_id.in_(sorted(team_ids)))
+        )
+    )
+    return {int(team_id) for (team_id,) in rows}
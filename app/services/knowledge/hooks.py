@@ -10,6 +10,8 @@ helper is a no-op.
 Public API:
 - ``enqueue_test_case_sync(test_case_number, operation='upsert')``
 - ``enqueue_usm_node_sync(map_id, node_id, operation='upsert')``
+- ``enqueue_test_case_batch_sync(batch_key, entities)`` — one task that
+  embeds and upserts a whole batch of test cases (bulk commits)
 - ``start_sync_workers()`` / ``stop_sync_workers()`` — lifecycle hooks
   to be wired into FastAPI ``app.on_event("startup")`` /
   ``"shutdown"`` so the background worker is up while the app serves
@@ -70,6 +72,37 @@ async def enqueue_test_case_sync(
         return False
 
 
+async def enqueue_test_case_batch_sync(
+    batch_key: str,
+    entities: list[dict[str, Any]],
+) -> bool:
+    """Trigger one Qdrant sync task for a batch of test cases.
+
+    Used by bulk writers (e.g. the QA AI helper commit) so a commit of N
+    cases costs one queue slot and one batched embedding call instead of
+    N single-entity tasks.  ``batch_key`` identifies the batch for queue
+    dedup; each entity must carry ``test_case_number``.
+
+    Returns True if enqueued, False if empty, deduped or feature disabled.
+    """
+    entities = [entity for entity in entities if entity.get("test_case_number")]
+    if not batch_key or not entities:
+        return False
+    queue = _resolve_queue()
+    try:
+        return await queue.enqueue(
+            entity_type="test_case_batch",
+            entity_id=batch_key,
+            payload={"operation": "upsert", "entity": {"entities": entities}},
+        )
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.warning(
+            "enqueue_test_case_batch_sync(%s, %d cases) failed: %s",
+            batch_key, len(entities), exc,
+        )
+        return False
+
+
 async def enqueue_usm_node_sync(
     map_id: int,
     node_id: str,
@@ -198,6 +198,25 @@ class KnowledgeWriteService:
         collection = self._config.qdrant.collection_test_cases
         await self._qdrant.upsert_points(collection, [point])
 
+    async def write_test_cases(self, tcs: list[dict[str, Any]]) -> int:
+        """Write a batch of test cases to Qdrant with one batched embedding.
+
+        Entities are expected to carry their embeddable fields; unlike
+        ``write_test_case`` there is no per-item DB fallback.  Returns the
+        number of points upserted.
+        """
+        if not tcs or not await self._ensure_collections():
+            return 0
+        written, _ = await self._process_batch(
+            tcs,
+            collection=self._config.qdrant.collection_test_cases,
+            text_builder=self._test_case_embedding_text,
+            entity_key_builder=lambda tc: tc.get("test_case_number", ""),
+            point_id_builder=lambda tc: self._test_case_point_id(tc["test_case_number"]),
+            payload_builder=self._build_test_case_payload,
+        )
+        return written
+
     async def write_usm_node(self, node: dict[str, Any]) -> None:
         if not await self._ensure_collections():
             return
@@ -297,6 +316,8 @@ class KnowledgeWriteService:
         if entity_type == "test_cases":
             data = payload or {"test_case_number": entity_id}
             await self.write_test_case(data)
+        elif entity_type == "test_case_batch":
+            await self.write_test_cases(list((payload or {}).get("entities") or []))
         elif entity_type == "usm_nodes":
             data = dict(payload or {})
             identity = self._resolve_usm_identity(entity_id, data)
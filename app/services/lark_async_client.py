@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Lark Open API 非同步客戶端
+
+供組織同步等大量讀取場景使用：
+- 共用 httpx.AsyncClient 連線池（keep-alive）
+- 以 semaphore + 最小請求間隔限制並行數與速率
+- 429 / 5xx / 連線錯誤自動退避重試
+- 多個部門的分頁資料並行抓取
+
+單一資源的分頁依賴前一頁回傳的 page_token，因此同一資源內仍是逐頁抓取；
+並行發生在不同資源（例如不同部門）之間。
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+DEFAULT_LARK_BASE_URL = "https://open.larksuite.com/open-apis"
+
+_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncLarkClient:
+    """Lark Open API 非同步客戶端（連線重用、限速並行）"""
+
+    def __init__(
+        self,
+        auth_manager,
+        *,
+        base_url: str = DEFAULT_LARK_BASE_URL,
+        max_concurrency: int = 8,
+        rate_per_second: float = 20.0,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 1.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.auth_manager = auth_manager
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate_per_second = float(rate_per_second)
+        self.max_retries = max(1, int(max_retries))
+        self.retry_backoff_seconds = float(retry_backoff_seconds)
+        self.logger = logging.getLogger(f"{__name__}.AsyncLarkClient")
+
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._rate_lock = asyncio.Lock()
+        self._next_request_at = 0.0
+
+        self.stats = {
+            'api_calls': 0,
+            'retries': 0,
+            'errors': 0,
+        }
+
+    async def __aenter__(self) -> "AsyncLarkClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _get_token(self) -> Optional[str]:
+        # LarkAuthManager 以 requests 取得並快取 token，丟到 thread 避免阻塞 event loop
+        return await asyncio.to_thread(self.auth_manager.get_tenant_access_token)
+
+    async def _throttle(self) -> None:
+        """以最小請求間隔實作速率限制（rate_per_second <= 0 表示不限速）"""
+        if self.rate_per_second <= 0:
+            return
+        interval = 1.0 / self.rate_per_second
+        async with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
+        """GET 單一 API，成功時回傳 ``data`` 物件，失敗回傳 None"""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+
+        for attempt in range(1, self.max_retries + 1):
+            token = await self._get_token()
+            if not token:
+                self.logger.error("無法取得 Access Token")
+                self.stats['errors'] += 1
+                return None
+
+            retry = False
+            async with self._semaphore:
+                await self._throttle()
+                self.stats['api_calls'] += 1
+                try:
+                    response = await self._client.get(
+                        url,
+                        params=params,
+                        headers={
+                            'Authorization': f'Bearer {token}',
+                            'Content-Type': 'application/json',
+                        },
+                    )
+                except httpx.TransportError as exc:
+                    self.logger.warning(f"API 請求異常 (第 {attempt}/{self.max_retries} 次): {exc}")
+                    retry = True
+                else:
+                    if response.status_code == 200:
+                        result = response.json()
+                        if result.get('code') == 0:
+                            return result.get('data') or {}
+                        self.logger.warning(f"API 返回錯誤: {result.get('code')} {result.get('msg')}")
+                        self.stats['errors'] += 1
+                        return None
+                    self.logger.error(f"HTTP 請求失敗: {response.status_code} - {response.text[:200]}")
+                    retry = response.status_code in _RETRYABLE_STATUS_CODES
+
+            if not retry or attempt >= self.max_retries:
+                break
+            # 退避時釋放 semaphore，讓其他資源的請求繼續進行
+            self.stats['retries'] += 1
+            await asyncio.sleep(min(2 ** attempt, 5) * self.retry_backoff_seconds)
+
+        self.stats['errors'] += 1
+        return None
+
+    async def get_paginated(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        page_size: int = 50,
+    ) -> Optional[List[Dict]]:
+        """依 page_token 逐頁取得資源的全部 items；任一頁失敗回傳 None"""
+        items: List[Dict] = []
+        page_token: Optional[str] = None
+
+        while True:
+            page_params = dict(params or {})
+            page_params['page_size'] = page_size
+            if page_token:
+                page_params['page_token'] = page_token
+
+            data = await self.get_json(path, page_params)
+            if data is None:
+                return None
+
+            items.extend(data.get('items') or [])
+            page_token = data.get('page_token')
+            if not page_token or not data.get('has_more', False):
+                return items
+
+    async def find_users_by_department(self, department_id: str, page_size: int = 50) -> Optional[List[Dict]]:
+        """取得部門直屬用戶（user_id 作為主要標識）"""
+        return await self.get_paginated(
+            "contact/v3/users/find_by_department",
+            {
+                'department_id': department_id,
+                'department_id_type': 'open_department_id',
+                'user_id_type': 'user_id',
+            },
+            page_size=page_size,
+        )
+
+    async def find_users_by_departments(
+        self,
+        department_ids: Iterable[str],
+        page_size: int = 50,
+    ) -> Dict[str, Optional[List[Dict]]]:
+        """並行取得多個部門的直屬用戶，回傳順序與輸入一致"""
+        department_ids = list(department_ids)
+        results = await asyncio.gather(
+            *(self.find_users_by_department(dept_id, page_size) for dept_id in department_ids)
+        )
+        return dict(zip(department_ids, results))
+
+    async def get_all_records(self, obj_token: str, table_id: str, page_size: int = 500) -> List[Dict]:
+        """取得 Bitable 表格所有記錄（與 LarkRecordManager.get_all_records 相同語意）"""
+        records = await self.get_paginated(
+            f"bitable/v1/apps/{obj_token}/tables/{table_id}/records",
+            {'automatic_fields': 'true'},
+            page_size=page_size,
+        )
+        return records or []
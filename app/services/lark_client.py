@@ -212,6 +212,9 @@ class LarkRecordManager:
         self.timeout = 60
         self.max_page_size = 500
         self.max_retries = 3
+
+        # 共用 Session 以重用連線（全表掃描逐頁請求時避免每頁重新握手）
+        self._http = requests.Session()
     
     def _make_request(self, method: str, url: str, **kwargs) -> Optional[Dict]:
         """統一的 HTTP 請求方法（帶重試與退避機制）"""
@@ -230,7 +233,7 @@ class LarkRecordManager:
                     'Content-Type': 'application/json'
                 })
 
-                response = requests.request(
+                response = self._http.request(
                     method,
                     url,
                     headers=headers,
@@ -7,15 +7,16 @@ Lark 用戶收集服務
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import requests
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
+from sqlalchemy import func, insert, select, update
 
 from app.db_access.main import (
     MainAccessBoundary,
@@ -23,8 +24,45 @@ from app.db_access.main import (
     get_main_access_boundary,
 )
 from app.models.database_models import LarkUser, LarkDepartment
+from app.services.lark_async_client import AsyncLarkClient
 from app.services.lark_client import LarkAuthManager
 
+# 批次寫入每批筆數（同時作為 IN 查詢的分塊大小）
+USER_SYNC_BATCH_SIZE = 500
+
+# 不納入內容雜湊的欄位：時間欄位每次同步都會變動
+_CONTENT_HASH_EXCLUDED_FIELDS = {'last_sync_at', 'created_at', 'updated_at', 'content_hash'}
+
+
+def compute_user_content_hash(user_data: Dict[str, Any]) -> str:
+    """計算用戶同步內容的雜湊（排除時間欄位）"""
+    payload = {
+        key: value
+        for key, value in user_data.items()
+        if key not in _CONTENT_HASH_EXCLUDED_FIELDS
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _merge_department_ids(existing_json: Optional[str], new_json: Optional[str]) -> List[str]:
+    """合併部門列表（保留既有順序，再附加新部門）"""
+    merged: List[str] = []
+    for raw in (existing_json, new_json):
+        try:
+            dept_ids = json.loads(raw or '[]')
+        except (TypeError, ValueError):
+            dept_ids = []
+        for dept_id in dept_ids if isinstance(dept_ids, list) else []:
+            if dept_id not in merged:
+                merged.append(dept_id)
+    return merged
+
+
+def _chunks(items: List[Any], size: int = USER_SYNC_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class LarkUserService:
     """Lark 用戶收集服務"""
@@ -44,6 +82,7 @@ class LarkUserService:
             'users_discovered': 0,
             'users_created': 0,
             'users_updated': 0,
+            'users_unchanged': 0,  # 內容雜湊相同，僅更新 last_sync_at
             'users_duplicated': 0,  # 同一用戶在多個部門
             'api_calls': 0,
             'errors': 0,
@@ -55,6 +94,11 @@ class LarkUserService:
         self.processed_users = set()  # user_id 集合
         self.user_dept_mapping = {}   # user_id -> [dept_ids] 映射
 
+        # 同步用的非同步客戶端工廠（測試 / benchmark 可替換為指向 fake server 的客戶端）
+        self.async_client_factory: Callable[[], AsyncLarkClient] = (
+            lambda: AsyncLarkClient(self.auth_manager, base_url=self.base_url, timeout=self.timeout)
+        )
+
     def _resolve_main_boundary(self, db: AsyncSession) -> MainAccessBoundary:
         return create_main_access_boundary_for_session(db)
         
@@ -271,6 +315,103 @@ class LarkUserService:
             self.stats['errors'] += 1
             return False
     
+    def stage_department_users(
+        self,
+        staged_users: Dict[str, Dict[str, Any]],
+        users_data: List[Dict],
+        department_id: str,
+    ) -> None:
+        """將部門用戶轉換後暫存；同一用戶以第一次遇到的部門作為主部門"""
+        for user_data in users_data:
+            self.stats['users_discovered'] += 1
+            processed_data = self.process_user_data(user_data, department_id)
+            if not processed_data:
+                self.logger.warning(f"處理用戶數據失敗: {user_data}")
+                continue
+            user_id = processed_data['user_id']
+            if user_id in staged_users:
+                staged_users[user_id]['department_ids_json'] = processed_data['department_ids_json']
+            else:
+                staged_users[user_id] = processed_data
+
+    async def apply_staged_users(self, db: AsyncSession, staged_users: Dict[str, Dict[str, Any]]) -> None:
+        """以 user_id 為鍵批次 upsert 暫存用戶，內容雜湊相同者只更新 last_sync_at"""
+        if not staged_users:
+            return
+
+        def _apply(sync_db: Session) -> None:
+            now = datetime.utcnow()
+            user_ids = list(staged_users)
+
+            existing: Dict[str, tuple] = {}
+            for chunk in _chunks(user_ids):
+                rows = sync_db.execute(
+                    select(LarkUser.user_id, LarkUser.content_hash, LarkUser.department_ids_json)
+                    .where(LarkUser.user_id.in_(chunk))
+                )
+                for user_id, content_hash, department_ids_json in rows:
+                    existing[user_id] = (content_hash, department_ids_json)
+
+            inserts: List[Dict[str, Any]] = []
+            updates: List[Dict[str, Any]] = []
+            unchanged: List[str] = []
+            for user_id, user_data in staged_users.items():
+                row = dict(user_data)
+                row['last_sync_at'] = now
+                prior = existing.get(user_id)
+                if prior is not None:
+                    row['department_ids_json'] = json.dumps(
+                        _merge_department_ids(prior[1], row.get('department_ids_json')),
+                        ensure_ascii=False,
+                    )
+                row['content_hash'] = compute_user_content_hash(row)
+
+                if prior is None:
+                    row['created_at'] = now
+                    row['updated_at'] = now
+                    inserts.append(row)
+                elif prior[0] == row['content_hash']:
+                    unchanged.append(user_id)
+                else:
+                    row['updated_at'] = now
+                    updates.append(row)
+
+            for chunk in _chunks(inserts):
+                self.stats['users_created'] += self._execute_user_batch(sync_db, insert(LarkUser), chunk)
+            for chunk in _chunks(updates):
+                self.stats['users_updated'] += self._execute_user_batch(sync_db, update(LarkUser), chunk)
+            for chunk in _chunks(unchanged):
+                sync_db.execute(
+                    update(LarkUser)
+                    .where(LarkUser.user_id.in_(chunk))
+                    .values(last_sync_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            self.stats['users_unchanged'] += len(unchanged)
+            sync_db.flush()
+
+        await self._resolve_main_boundary(db).run_sync_write(_apply)
+
+    def _execute_user_batch(self, sync_db: Session, statement, rows: List[Dict[str, Any]]) -> int:
+        """執行一批 ORM bulk insert / update；整批違反唯一約束時退回逐筆寫入"""
+        try:
+            with sync_db.begin_nested():
+                sync_db.execute(statement, rows)
+            return len(rows)
+        except IntegrityError as e:
+            self.logger.warning(f"批次寫入用戶違反完整性約束，改為逐筆寫入: {e}")
+
+        written = 0
+        for row in rows:
+            try:
+                with sync_db.begin_nested():
+                    sync_db.execute(statement, [row])
+                written += 1
+            except IntegrityError as e:
+                self.logger.error(f"保存用戶時數據庫完整性錯誤: {row.get('user_id')} {e}")
+                self.stats['errors'] += 1
+        return written
+
     async def sync_all_users(self, db: AsyncSession) -> Dict[str, Any]:
         """同步所有用戶數據（從已同步的部門中收集）"""
         self.logger.info("開始 Lark 用戶同步...")
@@ -279,8 +420,8 @@ class LarkUserService:
         # 重置統計和狀態
         self.processed_users.clear()
         self.user_dept_mapping.clear()
-        for key in ['departments_processed', 'users_discovered', 'users_created', 
-                   'users_updated', 'users_duplicated', 'api_calls', 'errors']:
+        for key in ['departments_processed', 'users_discovered', 'users_created',
+                   'users_updated', 'users_unchanged', 'users_duplicated', 'api_calls', 'errors']:
             self.stats[key] = 0
         
         try:
@@ -304,13 +445,24 @@ class LarkUserService:
             
             self.logger.info(f"找到 {len(departments)} 個活躍部門，開始收集用戶...")
             
+            # 並行抓取各部門用戶，暫存於記憶體後一次批次寫入
+            async with self.async_client_factory() as client:
+                users_by_department = await client.find_users_by_departments(departments)
+                self.stats['api_calls'] += client.stats['api_calls']
+
             success_count = 0
+            staged_users: Dict[str, Dict[str, Any]] = {}
             for department_id in departments:
-                if await self.collect_users_from_department(db, department_id):
-                    success_count += 1
-                    self.stats['departments_processed'] += 1
-                else:
+                users_data = users_by_department.get(department_id)
+                if users_data is None:
                     self.logger.error(f"部門 {department_id} 用戶收集失敗")
+                    self.stats['errors'] += 1
+                    continue
+                self.stage_department_users(staged_users, users_data, department_id)
+                success_count += 1
+                self.stats['departments_processed'] += 1
+
+            await self.apply_staged_users(db, staged_users)
             
             self.stats['end_time'] = datetime.utcnow()
             duration = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
@@ -329,6 +481,7 @@ class LarkUserService:
             self.logger.info(f"統計: 發現 {self.stats['users_discovered']} 個用戶，"
                            f"新增 {self.stats['users_created']} 個，"
                            f"更新 {self.stats['users_updated']} 個，"
+                           f"未變動 {self.stats['users_unchanged']} 個，"
                            f"重複 {self.stats['users_duplicated']} 個，"
                            f"API 調用 {self.stats['api_calls']} 次，"
                            f"錯誤 {self.stats['errors']} 個")
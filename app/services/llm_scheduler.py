@@ -0,0 +1,647 @@
+"""跨 session / 跨 worker 的 LLM 呼叫排程（QA AI Helper 與 assistant 共用）。
+
+每個對外 LLM 呼叫都經 ``LLMScheduler.run()`` 取得執行名額：
+
+- worker 層：全域併發上限與 tokens-per-minute 預算（60 秒滑動視窗，先以估算值保留，完成後以實際用量校正）；
+- 叢集層（選用）：主資料庫的 ``llm_scheduler_slots``（帶逾時的 lease）與每分鐘 token bucket，
+  以條件式 UPDATE 原子保留名額，多個 worker 共用同一份上限；
+- 公平排隊：先依優先級（interactive 優先於 batch），同優先級內依 team、再依 user 輪替，
+  單一使用者大量 batch 不會餓死其他人；team / user 由 ``llm_request_scope()`` 以 ContextVar 帶入；
+- provider 回 429（``LLMRateLimitedError``）時依 Retry-After 或指數退避暫停派發，
+  並將有效併發上限減半，之後每次成功逐步加回（AIMD）；
+- 排隊等待時間、佇列深度與 429 次數經 ``snapshot()`` 輸出至 admin system_metrics。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import LLMSchedulerConfig, get_settings
+from app.db_access.main import get_main_access_boundary
+from app.models.database_models import LLMSchedulerSlot, LLMSchedulerTokenBucket
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_WAIT_METRICS_WINDOW = 500
+# 等待超過此毫秒數時記錄 log，方便對照 provider 端延遲
+_SLOW_WAIT_LOG_MS = 5000.0
+
+
+class LLMPriority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class LLMRateLimitedError(RuntimeError):
+    """provider 回 HTTP 429；``retry_after`` 為 provider 建議的等待秒數（可能為 None）。"""
+
+    def __init__(self, message: str, *, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After header（秒數或 HTTP-date）。"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        target = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.now(target.tzinfo) if target.tzinfo else datetime.utcnow()
+    return max(0.0, (target - now).total_seconds())
+
+
+@dataclass(frozen=True)
+class LLMRequestScope:
+    team_id: Optional[int] = None
+    user_id: Optional[int] = None
+    priority: Optional[LLMPriority] = None
+
+
+_request_scope: ContextVar[LLMRequestScope] = ContextVar("llm_request_scope", default=LLMRequestScope())
+
+
+@contextlib.contextmanager
+def llm_request_scope(
+    *,
+    team_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    priority: Optional[LLMPriority] = None,
+) -> Iterator[None]:
+    """標記此區塊內 LLM 呼叫所屬的 team / user / 優先級；未指定的欄位沿用外層。"""
+    token = _request_scope.set(bind_llm_request_scope(team_id=team_id, user_id=user_id, priority=priority))
+    try:
+        yield
+    finally:
+        _request_scope.reset(token)
+
+
+def bind_llm_request_scope(
+    *,
+    team_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    priority: Optional[LLMPriority] = None,
+) -> LLMRequestScope:
+    """回傳合併後的 scope（不 reset）；供 request dependency 於整個 request 期間使用。"""
+    current = _request_scope.get()
+    merged = replace(
+        current,
+        team_id=team_id if team_id is not None else current.team_id,
+        user_id=user_id if user_id is not None else current.user_id,
+        priority=priority if priority is not None else current.priority,
+    )
+    _request_scope.set(merged)
+    return merged
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    priority: LLMPriority
+    team_key: str
+    user_key: str
+    estimated_tokens: int
+    enqueued_at: float
+    token_entry: Optional[List[float]] = None
+
+
+@dataclass
+class _Grant:
+    """已取得的執行名額；呼叫端可填入實際 token 用量以校正預算。"""
+
+    stage: str
+    estimated_tokens: int
+    actual_tokens: Optional[int] = None
+    wait_ms: float = 0.0
+    cluster_slot: Optional[int] = None
+    cluster_lease_key: Optional[str] = None
+    cluster_bucket: Optional[datetime] = None
+
+
+@dataclass
+class _WaitSample:
+    priority: LLMPriority
+    wait_ms: float
+
+
+@dataclass
+class _SchedulerMetrics:
+    waits: Deque[_WaitSample] = field(default_factory=lambda: deque(maxlen=_WAIT_METRICS_WINDOW))
+    granted_total: int = 0
+    rate_limited_total: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        def _pct(values: List[float], fraction: float) -> Optional[float]:
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, int(fraction * len(values)))], 1)
+
+        by_priority: Dict[str, Any] = {}
+        for priority in LLMPriority:
+            values = sorted(sample.wait_ms for sample in self.waits if sample.priority == priority)
+            by_priority[priority.name.lower()] = {
+                "samples": len(values),
+                "wait_ms_p50": _pct(values, 0.5),
+                "wait_ms_p95": _pct(values, 0.95),
+                "wait_ms_max": round(values[-1], 1) if values else None,
+            }
+        return {
+            "granted_total": self.granted_total,
+            "rate_limited_total": self.rate_limited_total,
+            "queue_wait": by_priority,
+        }
+
+
+class LLMScheduler:
+    # 測試可縮短視窗；正式環境固定 60 秒（tokens-per-minute）
+    _TOKEN_WINDOW_SECONDS = 60.0
+
+    def __init__(
+        self,
+        *,
+        config_provider: Optional[Callable[[], LLMSchedulerConfig]] = None,
+        main_boundary_provider: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self._config_provider = config_provider or (lambda: get_settings().ai.llm_scheduler)
+        self._main_boundary_provider = main_boundary_provider or get_main_access_boundary
+        self.metrics = _SchedulerMetrics()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        # priority -> team -> user -> FIFO；OrderedDict 順序即輪替順序
+        self._queues: Dict[LLMPriority, "OrderedDict[str, OrderedDict[str, Deque[_Waiter]]]"] = {
+            priority: OrderedDict() for priority in LLMPriority
+        }
+        self._in_flight = 0
+        self._limit: Optional[float] = None
+        self._token_window: Deque[List[float]] = deque()
+        self._paused_until = 0.0
+        self._consecutive_rate_limits = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline = 0.0
+
+    @property
+    def config(self) -> LLMSchedulerConfig:
+        return self._config_provider()
+
+    def _bind_loop(self) -> None:
+        # Future 綁定 event loop；loop 更換（測試、worker 重啟）時捨棄舊狀態
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._reset_state()
+
+    # ---- public API ----
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        stage: str,
+        priority: Optional[LLMPriority] = None,
+        estimated_tokens: int = 0,
+        usage_of: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """取得名額後執行 ``call``；遇 ``LLMRateLimitedError`` 會退避後重新排隊重試。"""
+        config = self.config
+        if not config.enabled:
+            return await call()
+        scope = _request_scope.get()
+        if priority is None:
+            priority = scope.priority if scope.priority is not None else LLMPriority.INTERACTIVE
+        attempts = max(0, int(config.rate_limit_max_retries)) + 1
+        for attempt in range(1, attempts + 1):
+            async with self._slot(
+                stage=stage,
+                priority=priority,
+                scope=scope,
+                estimated_tokens=max(0, int(estimated_tokens)),
+            ) as grant:
+                try:
+                    result = await call()
+                except LLMRateLimitedError as exc:
+                    self._note_rate_limited(exc.retry_after)
+                    logger.warning(
+                        "llm scheduler: provider rate limited stage=%s attempt=%s/%s retry_after=%s",
+                        stage,
+                        attempt,
+                        attempts,
+                        exc.retry_after,
+                    )
+                    if attempt >= attempts:
+                        raise
+                    continue
+                self._note_success()
+                if usage_of is not None:
+                    grant.actual_tokens = usage_of(result)
+                return result
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def snapshot(self) -> Dict[str, Any]:
+        config = self.config
+        queued = {
+            priority.name.lower(): sum(len(q) for users in self._queues[priority].values() for q in users.values())
+            for priority in LLMPriority
+        }
+        return {
+            "enabled": config.enabled,
+            "in_flight": self._in_flight,
+            "effective_concurrency": self._effective_limit(config),
+            "max_concurrency": config.worker_max_concurrency,
+            "queued": queued,
+            "tokens_in_window": self._tokens_in_window(time.monotonic()),
+            "tokens_per_minute": config.worker_tokens_per_minute,
+            "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            **self.metrics.snapshot(),
+        }
+
+    # ---- worker 層排隊 ----
+
+    @contextlib.asynccontextmanager
+    async def _slot(
+        self,
+        *,
+        stage: str,
+        priority: LLMPriority,
+        scope: LLMRequestScope,
+        estimated_tokens: int,
+    ) -> AsyncIterator[_Grant]:
+        self._bind_loop()
+        waiter = _Waiter(
+            future=asyncio.get_running_loop().create_future(),
+            priority=priority,
+            team_key=f"team:{scope.team_id}" if scope.team_id is not None else "team:-",
+            user_key=f"user:{scope.user_id}" if scope.user_id is not None else "user:-",
+            estimated_tokens=estimated_tokens,
+            enqueued_at=time.monotonic(),
+        )
+        self._enqueue(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release_local(waiter, None)
+            else:
+                self._remove_waiter(waiter)
+            self._dispatch()
+            raise
+
+        grant = _Grant(stage=stage, estimated_tokens=estimated_tokens)
+        try:
+            if self._cluster_enabled():
+                await self._acquire_cluster(grant)
+            grant.wait_ms = (time.monotonic() - waiter.enqueued_at) * 1000
+            self.metrics.waits.append(_WaitSample(priority=priority, wait_ms=grant.wait_ms))
+            self.metrics.granted_total += 1
+            if grant.wait_ms >= _SLOW_WAIT_LOG_MS:
+                logger.info(
+                    "llm scheduler: stage=%s priority=%s waited %.0fms (in_flight=%s)",
+                    stage,
+                    priority.name.lower(),
+                    grant.wait_ms,
+                    self._in_flight,
+                )
+            yield grant
+        finally:
+            self._release_local(waiter, grant.actual_tokens)
+            self._dispatch()
+            if grant.cluster_lease_key is not None:
+                await self._release_cluster(grant)
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        teams = self._queues[waiter.priority]
+        users = teams.setdefault(waiter.team_key, OrderedDict())
+        users.setdefault(waiter.user_key, deque()).append(waiter)
+
+    def _remove_waiter(self, waiter: _Waiter) -> None:
+        teams = self._queues[waiter.priority]
+        users = teams.get(waiter.team_key)
+        if users is None:
+            return
+        queue = users.get(waiter.user_key)
+        if queue is not None:
+            with contextlib.suppress(ValueError):
+                queue.remove(waiter)
+            if not queue:
+                del users[waiter.user_key]
+        if not users:
+            del teams[waiter.team_key]
+
+    def _peek_next(self) -> Optional[_Waiter]:
+        for priority in LLMPriority:
+            teams = self._queues[priority]
+            for users in teams.values():
+                for queue in users.values():
+                    if queue:
+                        return queue[0]
+        return None
+
+    def _pop(self, waiter: _Waiter) -> None:
+        teams = self._queues[waiter.priority]
+        users = teams[waiter.team_key]
+        queue = users[waiter.user_key]
+        queue.popleft()
+        # 輪替：剛被服務的 user / team 移到隊尾
+        if queue:
+            users.move_to_end(waiter.user_key)
+        else:
+            del users[waiter.user_key]
+        if users:
+            teams.move_to_end(waiter.team_key)
+        else:
+            del teams[waiter.team_key]
+
+    def _effective_limit(self, config: LLMSchedulerConfig) -> int:
+        maximum = max(1, int(config.worker_max_concurrency))
+        if self._limit is None or self._limit > maximum:
+            self._limit = float(maximum)
+        return max(1, int(math.floor(self._limit)))
+
+    def _tokens_in_window(self, now: float) -> int:
+        horizon = now - self._TOKEN_WINDOW_SECONDS
+        while self._token_window and self._token_window[0][0] <= horizon:
+            self._token_window.popleft()
+        return int(sum(entry[1] for entry in self._token_window))
+
+    def _dispatch(self) -> None:
+        if self._loop is None:
+            return
+        config = self.config
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._schedule_dispatch(self._paused_until - now)
+            return
+        limit = self._effective_limit(config)
+        tokens_per_minute = max(0, int(config.worker_tokens_per_minute))
+        while self._in_flight < limit:
+            waiter = self._peek_next()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                self._pop(waiter)
+                continue
+            if tokens_per_minute:
+                used = self._tokens_in_window(now)
+                # 視窗內已有用量且加上此請求會超出預算：等最舊的保留過期再派發
+                if used > 0 and used + waiter.estimated_tokens > tokens_per_minute:
+                    oldest = self._token_window[0][0]
+                    self._schedule_dispatch(oldest + self._TOKEN_WINDOW_SECONDS - now)
+                    return
+            self._pop(waiter)
+            self._in_flight += 1
+            entry = [now, float(waiter.estimated_tokens)]
+            self._token_window.append(entry)
+            waiter.token_entry = entry
+            waiter.future.set_result(None)
+
+    def _schedule_dispatch(self, delay: float) -> None:
+        deadline = time.monotonic() + max(0.0, delay)
+        if self._timer is not None and self._timer_deadline <= deadline:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_deadline = deadline
+        self._timer = self._loop.call_later(max(0.0, delay) + 0.001, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._timer_deadline = 0.0
+        self._dispatch()
+
+    def _release_local(self, waiter: _Waiter, actual_tokens: Optional[int]) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        if waiter.token_entry is not None and actual_tokens is not None:
+            waiter.token_entry[1] = float(max(0, actual_tokens))
+
+    def _note_rate_limited(self, retry_after: Optional[float]) -> None:
+        config = self.config
+        self.metrics.rate_limited_total += 1
+        self._consecutive_rate_limits += 1
+        backoff = config.rate_limit_backoff_seconds * (2 ** (self._consecutive_rate_limits - 1))
+        delay = retry_after if retry_after is not None else backoff
+        delay = min(float(config.rate_limit_backoff_max_seconds), max(0.0, delay))
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._effective_limit(config)
+        self._limit = max(1.0, self._limit / 2)
+
+    def _note_success(self) -> None:
+        config = self.config
+        self._consecutive_rate_limits = 0
+        maximum = float(max(1, int(config.worker_max_concurrency)))
+        if self._limit is not None and self._limit < maximum:
+            self._limit = min(maximum, self._limit + 1.0 / max(1.0, self._limit))
+
+    # ---- 叢集層（主資料庫協調）----
+
+    def _cluster_enabled(self) -> bool:
+        config = self.config
+        return config.cluster_max_concurrency > 0 or config.cluster_tokens_per_minute > 0
+
+    async def _acquire_cluster(self, grant: _Grant) -> None:
+        config = self.config
+        lease_key = uuid.uuid4().hex
+        poll_seconds = max(0.02, config.cluster_poll_interval_ms / 1000)
+        boundary = self._main_boundary_provider()
+        while True:
+            try:
+                acquired = await boundary.run_write(
+                    lambda session: self._try_acquire_cluster(session, grant=grant, lease_key=lease_key)
+                )
+            except _ClusterBusy:
+                acquired = False
+            if acquired:
+                return
+            await asyncio.sleep(poll_seconds)
+
+    async def _try_acquire_cluster(self, session: AsyncSession, *, grant: _Grant, lease_key: str) -> bool:
+        config = self.config
+        now = datetime.utcnow()
+        if config.cluster_max_concurrency > 0:
+            slot_no = await _claim_slot(
+                session,
+                slot_count=config.cluster_max_concurrency,
+                lease_key=lease_key,
+                stage=grant.stage,
+                now=now,
+                lease_seconds=config.cluster_lease_seconds,
+            )
+            if slot_no is None:
+                raise _ClusterBusy()
+            grant.cluster_slot = slot_no
+        if config.cluster_tokens_per_minute > 0:
+            bucket = now.replace(second=0, microsecond=0)
+            if not await _reserve_bucket_tokens(
+                session,
+                bucket_started_at=bucket,
+                tokens=grant.estimated_tokens,
+                limit=config.cluster_tokens_per_minute,
+            ):
+                # 整筆交易 rollback，已佔用的 slot 一併釋放
+                grant.cluster_slot = None
+                raise _ClusterBusy()
+            grant.cluster_bucket = bucket
+        grant.cluster_lease_key = lease_key
+        return True
+
+    async def _release_cluster(self, grant: _Grant) -> None:
+        async def _release(session: AsyncSession) -> None:
+            if grant.cluster_slot is not None:
+                await session.execute(
+                    update(LLMSchedulerSlot)
+                    .where(
+                        LLMSchedulerSlot.slot_no == grant.cluster_slot,
+                        LLMSchedulerSlot.lease_key == grant.cluster_lease_key,
+                    )
+                    .values(lease_key=None, stage=None, acquired_at=None, expires_at=None)
+                )
+            if grant.cluster_bucket is not None and grant.actual_tokens is not None:
+                delta = int(grant.actual_tokens) - int(grant.estimated_tokens)
+                if delta:
+                    await session.execute(
+                        update(LLMSchedulerTokenBucket)
+                        .where(LLMSchedulerTokenBucket.bucket_started_at == grant.cluster_bucket)
+                        .values(used_tokens=LLMSchedulerTokenBucket.used_tokens + delta)
+                    )
+
+        try:
+            await self._main_boundary_provider().run_write(_release)
+        except Exception:  # noqa: BLE001
+            # 釋放失敗時 slot 於 lease 逾時後自動回收
+            logger.exception("llm scheduler: failed to release cluster slot %s", grant.cluster_slot)
+
+
+class _ClusterBusy(Exception):
+    """叢集名額不足；由 ``_acquire_cluster`` 攔下後輪詢重試（並使交易 rollback）。"""
+
+
+async def _claim_slot(
+    session: AsyncSession,
+    *,
+    slot_count: int,
+    lease_key: str,
+    stage: str,
+    now: datetime,
+    lease_seconds: int,
+) -> Optional[int]:
+    existing = set((await session.execute(select(LLMSchedulerSlot.slot_no))).scalars().all())
+    missing = [slot_no for slot_no in range(slot_count) if slot_no not in existing]
+    for slot_no in missing:
+        try:
+            async with session.begin_nested():
+                session.add(LLMSchedulerSlot(slot_no=slot_no))
+        except IntegrityError:
+            pass  # 其他 worker 同時建立
+
+    free_slots = (
+        await session.execute(
+            select(LLMSchedulerSlot.slot_no)
+            .where(
+                LLMSchedulerSlot.slot_no < slot_count,
+                or_(LLMSchedulerSlot.lease_key.is_(None), LLMSchedulerSlot.expires_at <= now),
+            )
+            .order_by(LLMSchedulerSlot.slot_no.asc())
+        )
+    ).scalars().all()
+    for slot_no in free_slots:
+        result = await session.execute(
+            update(LLMSchedulerSlot)
+            .where(
+                LLMSchedulerSlot.slot_no == slot_no,
+                or_(LLMSchedulerSlot.lease_key.is_(None), LLMSchedulerSlot.expires_at <= now),
+            )
+            .values(
+                lease_key=lease_key,
+                stage=stage[:64],
+                acquired_at=now,
+                expires_at=now + timedelta(seconds=lease_seconds),
+            )
+        )
+        if result.rowcount > 0:
+            return slot_no
+    return None
+
+
+async def _reserve_bucket_tokens(
+    session: AsyncSession, *, bucket_started_at: datetime, tokens: int, limit: int
+) -> bool:
+    """每分鐘 token bucket 原子保留額度；savepoint insert + unique-race fallback。
+
+    bucket 為空時一律放行，避免單一超過預算的請求永遠無法執行。
+    """
+    condition = or_(
+        LLMSchedulerTokenBucket.used_tokens <= 0,
+        LLMSchedulerTokenBucket.used_tokens + tokens <= limit,
+    )
+    statement = (
+        update(LLMSchedulerTokenBucket)
+        .where(LLMSchedulerTokenBucket.bucket_started_at == bucket_started_at, condition)
+        .values(used_tokens=LLMSchedulerTokenBucket.used_tokens + tokens)
+    )
+    result = await session.execute(statement)
+    if result.rowcount > 0:
+        return True
+    existing = (
+        await session.execute(
+            select(LLMSchedulerTokenBucket.id).where(LLMSchedulerTokenBucket.bucket_started_at == bucket_started_at)
+        )
+    ).scalar_one_or_none()
+    if existing is not None:
+        return False
+    try:
+        async with session.begin_nested():
+            session.add(
+                LLMSchedulerTokenBucket(
+                    bucket_started_at=bucket_started_at,
+                    used_tokens=tokens,
+                    expires_at=bucket_started_at + timedelta(minutes=10),
+                )
+            )
+    except IntegrityError:
+        result = await session.execute(statement)
+        return result.rowcount > 0
+    # 新 bucket 建立時順手清掉過期 bucket
+    await session.execute(
+        delete(LLMSchedulerTokenBucket).where(LLMSchedulerTokenBucket.expires_at <= bucket_started_at)
+    )
+    return True
+
+
+def estimate_prompt_tokens(*texts: Optional[str], completion_allowance: int = 1024) -> int:
+    """以字元數粗估 token（約 4 字元一 token）加上輸出預留；僅用於預算保留，完成後以實際用量校正。"""
+    return sum(len(text or "") for text in texts) // 4 + completion_allowance
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,414 @@
+"""Machine API（/api/app/*、/api/mcp/*）per-principal 流量治理。
+
+App token 與 MCP 路由和互動使用者共用同一組 worker 與 DB 連線池；單一 CI job
+大量打 ``lookup_test_cases(limit=200, include_test_data)``、batch 建立或報告產生就會
+把連線池吃滿。本模組在認證成功後對每個請求做兩層控管：
+
+- **Token bucket**：per-credential 與 per-team 兩個 bucket，每個請求依端點扣除
+  cost weight（見 ``ENDPOINT_COST_WEIGHTS``），額度不足 → 429 + ``Retry-After``。
+- **In-flight 上限**：同一 credential / team 同時執行中的請求數上限；每個放行的請求
+  取得一個 lease，回應結束時由 ``MachineApiGovernanceMiddleware`` 歸還。
+
+狀態存在本機 SQLite 檔（WAL，預設位於 ``TCRT_RUNTIME_LOCK_DIR`` / 系統 temp 目錄），
+同一台機器上的所有 ``WEB_CONCURRENCY`` worker 共用，不佔用主 DB 連線池、也不需外部
+服務。Lease 帶 TTL，worker 當掉時殘留的 in-flight 計數會自動過期。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_STATE_FILE_NAME = "tcrt_machine_api_governance.sqlite3"
+MEMORY_STATE_PATH = ":memory:"
+
+# 單一 lease 的最長存活時間；正常情況下請求結束即歸還，TTL 只用來回收當掉 worker 的殘留。
+LEASE_TTL_SECONDS = 600
+# 併發上限被打滿時建議 client 的重試間隔（秒）。
+CONCURRENCY_RETRY_AFTER_SECONDS = 1
+
+# (HTTP method, route path 正規式, cost weight)；依序比對、第一個命中者生效。
+# 比對對象是 FastAPI route 的 path template（例如 ``/api/app/teams/{team_id}/...``）。
+ENDPOINT_COST_WEIGHTS: tuple[tuple[str, re.Pattern[str], float], ...] = (
+    ("POST", re.compile(r"/generate-report$"), 10.0),
+    ("POST", re.compile(r"/test-cases/(batch|batch-operations|bulk-clone)$"), 5.0),
+    ("POST", re.compile(r"/test-run-configs/\{config_id\}/items$"), 5.0),
+    ("POST", re.compile(r"/items/batch-update-results$"), 5.0),
+    ("POST", re.compile(r"/run-automation$"), 5.0),
+    ("POST", re.compile(r"/members/batch-move$"), 3.0),
+    ("POST", re.compile(r"/attachments$"), 3.0),
+    ("POST", re.compile(r"/upload-results$"), 3.0),
+    ("GET", re.compile(r"/test-cases/lookup$"), 2.0),
+    ("GET", re.compile(r"/automation/coverage$"), 3.0),
+    ("GET", re.compile(r"/report$"), 2.0),
+)
+DEFAULT_READ_COST = 1.0
+DEFAULT_WRITE_COST = 2.0
+# 大分頁 / 含 test data 的讀取會放大 DB 與序列化成本，按比例加權。
+LARGE_PAGE_THRESHOLD = 100
+LARGE_PAGE_MULTIPLIER = 2.0
+INCLUDE_TEST_DATA_MULTIPLIER = 2.0
+
+
+@dataclass(frozen=True)
+class GovernanceLimits:
+    """單一 bucket 的限制：每分鐘補充量、bucket 容量（burst）與 in-flight 上限。"""
+
+    rate_per_minute: float
+    burst: float
+    max_in_flight: int
+
+    @property
+    def refill_per_second(self) -> float:
+        return max(self.rate_per_minute, 0.0) / 60.0
+
+
+@dataclass(frozen=True)
+class GovernanceLease:
+    lease_id: str
+    bucket_keys: tuple[str, ...]
+    cost: float
+
+
+class MachineApiQuotaExceeded(Exception):
+    """Bucket 額度或 in-flight 上限不足。``reason`` 為 ``rate`` 或 ``concurrency``。"""
+
+    def __init__(self, *, bucket_key: str, reason: str, retry_after: int) -> None:
+        super().__init__(f"machine API quota exceeded ({reason}) for {bucket_key}")
+        self.bucket_key = bucket_key
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def resolve_state_path() -> str:
+    """狀態檔路徑：auth 設定優先，否則落在 runtime lock 目錄（與 ``runtime_locks`` 一致）。
+
+    設為 ``:memory:`` 時狀態只存在單一 process，僅適用單 worker 開發環境與測試。
+    """
+    explicit = get_settings().auth.machine_api_governance_state_path
+    if explicit:
+        return explicit
+    lock_root = os.getenv("TCRT_RUNTIME_LOCK_DIR")
+    root = Path(lock_root) if lock_root else Path(tempfile.gettempdir())
+    root.mkdir(parents=True, exist_ok=True)
+    return str(root / _STATE_FILE_NAME)
+
+
+def resolve_endpoint_cost(method: str, route_path: str, query_params: Any = None) -> float:
+    """依 route template 與 query 參數計算本次請求的 cost weight。"""
+    normalized_method = (method or "").upper()
+    cost: Optional[float] = None
+    for weight_method, pattern, weight in ENDPOINT_COST_WEIGHTS:
+        if weight_method == normalized_method and pattern.search(route_path or ""):
+            cost = weight
+            break
+    if cost is None:
+        cost = DEFAULT_READ_COST if normalized_method in ("GET", "HEAD") else DEFAULT_WRITE_COST
+
+    if query_params is not None:
+        include_test_data = str(query_params.get("include_test_data") or "").lower()
+        if include_test_data in ("1", "true", "yes", "on"):
+            cost *= INCLUDE_TEST_DATA_MULTIPLIER
+        try:
+            limit = int(query_params.get("limit") or 0)
+        except (TypeError, ValueError):
+            limit = 0
+        if limit > LARGE_PAGE_THRESHOLD:
+            cost *= LARGE_PAGE_MULTIPLIER
+    return cost
+
+
+class MachineApiGovernanceStore:
+    """以本機 SQLite 保存 bucket / lease / usage，所有 worker 共用同一個檔案。
+
+    每次 acquire 在單一 ``BEGIN IMMEDIATE`` 交易內完成「回收過期 lease → 補充 token →
+    檢查 in-flight → 扣額度 / 記錄拒絕」，確保跨 process 的一致性。
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        if path != MEMORY_STATE_PATH:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        if path != MEMORY_STATE_PATH:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS machine_api_buckets (
+                bucket_key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS machine_api_leases (
+                lease_id TEXT NOT NULL,
+                bucket_key TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (lease_id, bucket_key)
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_machine_api_leases_bucket ON machine_api_leases(bucket_key, expires_at)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS machine_api_usage (
+                bucket_key TEXT PRIMARY KEY,
+                requests_allowed INTEGER NOT NULL DEFAULT 0,
+                requests_rate_limited INTEGER NOT NULL DEFAULT 0,
+                requests_concurrency_limited INTEGER NOT NULL DEFAULT 0,
+                cost_consumed REAL NOT NULL DEFAULT 0,
+                last_seen_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def try_acquire(
+        self,
+        buckets: list[tuple[str, GovernanceLimits]],
+        cost: float,
+        *,
+        now: Optional[float] = None,
+    ) -> GovernanceLease:
+        now = time.time() if now is None else now
+        lease_id = uuid.uuid4().hex
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM machine_api_leases WHERE expires_at < ?", (now,))
+                refilled: dict[str, float] = {}
+                rejection: Optional[MachineApiQuotaExceeded] = None
+                for bucket_key, limits in buckets:
+                    in_flight = conn.execute(
+                        "SELECT COUNT(*) FROM machine_api_leases WHERE bucket_key = ?",
+                        (bucket_key,),
+                    ).fetchone()[0]
+                    row = conn.execute(
+                        "SELECT tokens, updated_at FROM machine_api_buckets WHERE bucket_key = ?",
+                        (bucket_key,),
+                    ).fetchone()
+                    capacity = max(float(limits.burst), 1.0)
+                    if row is None:
+                        tokens = capacity
+                    else:
+                        elapsed = max(now - float(row[1]), 0.0)
+                        tokens = min(capacity, float(row[0]) + elapsed * limits.refill_per_second)
+                    refilled[bucket_key] = tokens
+
+                    if rejection is not None:
+                        continue
+                    if limits.max_in_flight > 0 and in_flight >= limits.max_in_flight:
+                        rejection = MachineApiQuotaExceeded(
+                            bucket_key=bucket_key,
+                            reason="concurrency",
+                            retry_after=CONCURRENCY_RETRY_AFTER_SECONDS,
+                        )
+                    elif tokens < min(cost, capacity):
+                        # cost 高於容量時以「bucket 全滿」為門檻，避免重量級端點永遠無法通過。
+                        deficit = min(cost, capacity) - tokens
+                        refill = limits.refill_per_second
+                        retry_after = math.ceil(deficit / refill) if refill > 0 else 60
+                        rejection = MachineApiQuotaExceeded(
+                            bucket_key=bucket_key,
+                            reason="rate",
+                            retry_after=max(1, retry_after),
+                        )
+
+                if rejection is not None:
+                    column = (
+                        "requests_concurrency_limited"
+                        if rejection.reason == "concurrency"
+                        else "requests_rate_limited"
+                    )
+                    for bucket_key, tokens in refilled.items():
+                        self._upsert_bucket(conn, bucket_key, tokens, now)
+                    self._bump_usage(conn, rejection.bucket_key, column, 0.0, now)
+                    conn.execute("COMMIT")
+                    raise rejection
+
+                for bucket_key, tokens in refilled.items():
+                    self._upsert_bucket(conn, bucket_key, max(tokens - cost, 0.0), now)
+                    conn.execute(
+                        "INSERT INTO machine_api_leases (lease_id, bucket_key, expires_at) VALUES (?, ?, ?)",
+                        (lease_id, bucket_key, now + LEASE_TTL_SECONDS),
+                    )
+                    self._bump_usage(conn, bucket_key, "requests_allowed", cost, now)
+                conn.execute("COMMIT")
+            except MachineApiQuotaExceeded:
+                raise
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return GovernanceLease(lease_id=lease_id, bucket_keys=tuple(refilled), cost=cost)
+
+    def release(self, lease: GovernanceLease) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM machine_api_leases WHERE lease_id = ?", (lease.lease_id,))
+
+    def usage_snapshot(self, *, now: Optional[float] = None) -> list[dict[str, Any]]:
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT u.bucket_key,
+                       u.requests_allowed,
+                       u.requests_rate_limited,
+                       u.requests_concurrency_limited,
+                       u.cost_consumed,
+                       u.last_seen_at,
+                       b.tokens,
+                       (SELECT COUNT(*) FROM machine_api_leases l
+                         WHERE l.bucket_key = u.bucket_key AND l.expires_at >= ?) AS in_flight
+                FROM machine_api_usage u
+                LEFT JOIN machine_api_buckets b ON b.bucket_key = u.bucket_key
+                ORDER BY u.cost_consumed DESC, u.bucket_key
+                """,
+                (now,),
+            ).fetchall()
+        return [
+            {
+                "bucket_key": row[0],
+                "requests_allowed": int(row[1]),
+                "requests_rate_limited": int(row[2]),
+                "requests_concurrency_limited": int(row[3]),
+                "cost_consumed": round(float(row[4]), 3),
+                "last_seen_at": float(row[5]),
+                "tokens_remaining": round(float(row[6]), 3) if row[6] is not None else None,
+                "in_flight": int(row[7]),
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _upsert_bucket(conn: sqlite3.Connection, bucket_key: str, tokens: float, now: float) -> None:
+        conn.execute(
+            """
+            INSERT INTO machine_api_buckets (bucket_key, tokens, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(bucket_key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+            """,
+            (bucket_key, tokens, now),
+        )
+
+    @staticmethod
+    def _bump_usage(conn: sqlite3.Connection, bucket_key: str, column: str, cost: float, now: float) -> None:
+        conn.execute(
+            f"""
+            INSERT INTO machine_api_usage (bucket_key, {column}, cost_consumed, last_seen_at)
+            VALUES (?, 1, ?, ?)
+            ON CONFLICT(bucket_key) DO UPDATE SET
+                {column} = {column} + 1,
+                cost_consumed = cost_consumed + excluded.cost_consumed,
+                last_seen_at = excluded.last_seen_at
+            """,
+            (bucket_key, cost, now),
+        )
+
+
+class MachineApiGovernor:
+    """把 principal 對應到 credential / team bucket，並以 thread 執行 SQLite 操作。"""
+
+    def __init__(self, store: MachineApiGovernanceStore) -> None:
+        self.store = store
+
+    @staticmethod
+    def credential_limits() -> GovernanceLimits:
+        auth_cfg = get_settings().auth
+        return GovernanceLimits(
+            rate_per_minute=float(auth_cfg.machine_api_credential_rate_per_minute),
+            burst=float(auth_cfg.machine_api_credential_burst),
+            max_in_flight=int(auth_cfg.machine_api_credential_max_in_flight),
+        )
+
+    @staticmethod
+    def team_limits() -> GovernanceLimits:
+        auth_cfg = get_settings().auth
+        return GovernanceLimits(
+            rate_per_minute=float(auth_cfg.machine_api_team_rate_per_minute),
+            burst=float(auth_cfg.machine_api_team_burst),
+            max_in_flight=int(auth_cfg.machine_api_team_max_in_flight),
+        )
+
+    @staticmethod
+    def credential_bucket_key(credential_id: int, *, is_legacy: bool) -> str:
+        kind = "legacy" if is_legacy else "app"
+        return f"credential:{kind}:{credential_id}"
+
+    @staticmethod
+    def team_bucket_key(team_id: int) -> str:
+        return f"team:{team_id}"
+
+    async def acquire(
+        self,
+        *,
+        credential_id: int,
+        is_legacy: bool,
+        team_id: Optional[int],
+        cost: float,
+    ) -> GovernanceLease:
+        buckets = [(self.credential_bucket_key(credential_id, is_legacy=is_legacy), self.credential_limits())]
+        if team_id:
+            buckets.append((self.team_bucket_key(team_id), self.team_limits()))
+        return await asyncio.to_thread(self.store.try_acquire, buckets, cost)
+
+    async def release(self, lease: GovernanceLease) -> None:
+        try:
+            await asyncio.to_thread(self.store.release, lease)
+        except Exception as exc:  # noqa: BLE001
+            # 歸還失敗不影響回應；lease 會在 TTL 到期後被回收。
+            logger.warning("Machine API lease 歸還失敗（將於 TTL 後回收）：%s", exc)
+
+    async def usage_snapshot(self) -> list[dict[str, Any]]:
+        return await asyncio.to_thread(self.store.usage_snapshot)
+
+
+_governor: Optional[MachineApiGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_machine_api_governor() -> MachineApiGovernor:
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = MachineApiGovernor(MachineApiGovernanceStore(resolve_state_path()))
+    return _governor
+
+
+def reset_machine_api_governor() -> None:
+    """關閉並丟棄 process 內的 governor（測試與設定熱切換用）。"""
+    global _governor
+    with _governor_lock:
+        if _governor is not None:
+            try:
+                _governor.store.close()
+            except Exception:  # noqa: BLE001
+                pass
+        _governor = None
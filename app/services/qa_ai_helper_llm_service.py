@@ -3,6 +3,7 @@
 設計目標：
 - 支援 seed / seed_refine / testcase stage，並暫時保留 legacy repair alias
 - 若未設定 OpenRouter key，提供 deterministic local fallback
+- 對外呼叫一律經 ``app.services.llm_scheduler`` 排隊（跨 session 併發與 token 預算、429 退避）
 """
 
 from __future__ import annotations
@@ -15,6 +16,13 @@ from typing import Any, Dict, List, Literal, Optional
 import aiohttp
 
 from app.config import get_settings
+from app.services.llm_scheduler import (
+    LLMPriority,
+    LLMRateLimitedError,
+    estimate_prompt_tokens,
+    get_llm_scheduler,
+    parse_retry_after,
+)
 from app.services.qa_ai_helper_title_utils import build_testcase_title_summary
 
 QAAIHelperLLMStage = Literal[
@@ -28,6 +36,9 @@ QAAIHelperLLMStage = Literal[
     "inspection_consolidation",
 ]
 
+# 多 batch 並行的生成類 stage 排在互動類（refine、inspection）之後
+_BATCH_STAGES = {"seed", "testcase", "repair"}
+
 logger = logging.getLogger(__name__)
 OPENROUTER_CHAT_COMPLETIONS_URL = "https://openrouter.ai/api/v1/chat/completions"
 
@@ -41,6 +52,7 @@ class QAAIHelperLLMResult:
     model_name: Optional[str] = None
     response_id: Optional[str] = None
     finish_reason: Optional[str] = None
+    cache_hit: bool = False
 
 
 class QAAIHelperLLMService:
@@ -78,6 +90,9 @@ class QAAIHelperLLMService:
         stage_cfg = self._stage_config(stage)
         return str(stage_cfg.model or "").strip()
 
+    def resolve_stage_temperature(self, stage: QAAIHelperLLMStage) -> float:
+        return float(self._stage_config(stage).temperature)
+
     def _base_headers(self) -> Dict[str, str]:
         if not self._openrouter_key:
             raise RuntimeError("OpenRouter API key 未設定")
@@ -147,36 +162,68 @@ class QAAIHelperLLMService:
             "temperature": float(self._stage_config(stage).temperature),
             "response_format": {"type": "json_object"},
         }
+        result = await self._request_completion(
+            stage=stage,
+            payload=payload,
+            timeout_seconds=90,
+            error_label=f"qa_ai_helper {stage} 模型呼叫失敗",
+        )
+        if result.finish_reason == "length":
+            logger.warning(
+                "qa_ai_helper %s output truncated (finish_reason=length, content_len=%d)",
+                stage,
+                len(result.content),
+            )
+        return result
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                OPENROUTER_CHAT_COMPLETIONS_URL,
-                headers=self._base_headers(),
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=90),
-            ) as response:
-                text_body = await response.text()
-                if response.status >= 400:
-                    raise RuntimeError(f"qa_ai_helper {stage} 模型呼叫失敗: HTTP {response.status} {text_body}")
-                data = json.loads(text_body)
-                choices = data.get("choices") or []
-                finish_reason = choices[0].get("finish_reason") if choices and isinstance(choices[0], dict) else None
-                content = self._extract_content(data)
-                if finish_reason == "length":
-                    logger.warning(
-                        "qa_ai_helper %s output truncated (finish_reason=length, content_len=%d)",
-                        stage,
-                        len(content),
-                    )
-                return QAAIHelperLLMResult(
-                    content=content,
-                    usage=self._extract_usage(data),
-                    cost=float(data.get("cost") or data.get("total_cost") or 0.0),
-                    cost_note="",
-                    model_name=model_name,
-                    response_id=data.get("id"),
-                    finish_reason=finish_reason,
-                )
+    async def _request_completion(
+        self,
+        *,
+        stage: QAAIHelperLLMStage,
+        payload: Dict[str, Any],
+        timeout_seconds: int,
+        error_label: str,
+    ) -> QAAIHelperLLMResult:
+        """經全域 LLM scheduler 取得名額後送出 chat completion；429 交由 scheduler 退避重試。"""
+        model_name = payload["model"]
+        prompt_text = "".join(str(message.get("content") or "") for message in payload.get("messages", []))
+
+        async def _post() -> QAAIHelperLLMResult:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    OPENROUTER_CHAT_COMPLETIONS_URL,
+                    headers=self._base_headers(),
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=timeout_seconds),
+                ) as response:
+                    text_body = await response.text()
+                    if response.status == 429:
+                        raise LLMRateLimitedError(
+                            f"{error_label}: HTTP 429 {text_body}",
+                            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                        )
+                    if response.status >= 400:
+                        raise RuntimeError(f"{error_label}: HTTP {response.status} {text_body}")
+                    data = json.loads(text_body)
+            choices = data.get("choices") or []
+            finish_reason = choices[0].get("finish_reason") if choices and isinstance(choices[0], dict) else None
+            return QAAIHelperLLMResult(
+                content=self._extract_content(data),
+                usage=self._extract_usage(data),
+                cost=float(data.get("cost") or data.get("total_cost") or 0.0),
+                cost_note="",
+                model_name=model_name,
+                response_id=data.get("id"),
+                finish_reason=finish_reason,
+            )
+
+        return await get_llm_scheduler().run(
+            _post,
+            stage=f"qa_ai_helper.{stage}",
+            priority=LLMPriority.BATCH if stage in _BATCH_STAGES else LLMPriority.INTERACTIVE,
+            estimated_tokens=estimate_prompt_tokens(prompt_text),
+            usage_of=lambda result: (result.usage or {}).get("total_tokens") or None,
+        )
 
     # ---- MAGI Inspection 專用呼叫方法 ----
 
@@ -205,34 +252,12 @@ class QAAIHelperLLMService:
             "messages": [{"role": "user", "content": prompt}],
             "temperature": float(self._stage_config(stage).temperature),
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                OPENROUTER_CHAT_COMPLETIONS_URL,
-                headers=self._base_headers(),
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=120),
-            ) as response:
-                text_body = await response.text()
-                if response.status >= 400:
-                    raise RuntimeError(
-                        f"qa_ai_helper inspection extraction ({role_label}) 呼叫失敗: "
-                        f"HTTP {response.status} {text_body}"
-                    )
-                data = json.loads(text_body)
-                content = self._extract_content(data)
-                finish_reason = None
-                choices = data.get("choices") or []
-                if choices and isinstance(choices[0], dict):
-                    finish_reason = choices[0].get("finish_reason")
-                return QAAIHelperLLMResult(
-                    content=content,
-                    usage=self._extract_usage(data),
-                    cost=float(data.get("cost") or data.get("total_cost") or 0.0),
-                    cost_note="",
-                    model_name=model_name,
-                    response_id=data.get("id"),
-                    finish_reason=finish_reason,
-                )
+        return await self._request_completion(
+            stage=stage,
+            payload=payload,
+            timeout_seconds=120,
+            error_label=f"qa_ai_helper inspection extraction ({role_label}) 呼叫失敗",
+        )
 
     async def call_inspection_consolidation(
         self,
@@ -251,34 +276,12 @@ class QAAIHelperLLMService:
             "temperature": float(self._stage_config(stage).temperature),
             "response_format": {"type": "json_object"},
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                OPENROUTER_CHAT_COMPLETIONS_URL,
-                headers=self._base_headers(),
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=300),
-            ) as response:
-                text_body = await response.text()
-                if response.status >= 400:
-                    raise RuntimeError(
-                        f"qa_ai_helper inspection consolidation 呼叫失敗: "
-                        f"HTTP {response.status} {text_body}"
-                    )
-                data = json.loads(text_body)
-                content = self._extract_content(data)
-                finish_reason = None
-                choices = data.get("choices") or []
-                if choices and isinstance(choices[0], dict):
-                    finish_reason = choices[0].get("finish_reason")
-                return QAAIHelperLLMResult(
-                    content=content,
-                    usage=self._extract_usage(data),
-                    cost=float(data.get("cost") or data.get("total_cost") or 0.0),
-                    cost_note="",
-                    model_name=model_name,
-                    response_id=data.get("id"),
-                    finish_reason=finish_reason,
-                )
+        return await self._request_completion(
+            stage=stage,
+            payload=payload,
+            timeout_seconds=300,
+            error_label="qa_ai_helper inspection consolidation 呼叫失敗",
+        )
 
     def _fallback_result(
         self,
@@ -0,0 +1,225 @@
+"""QA AI Helper stage 回應的持久化快取（內容定址，opt-in）。
+
+seed / seed_refine / testcase / inspection 各 stage 的 prompt 皆由結構化資料完整 render，
+重啟、重開 session 或單一 batch 失敗後重試時，大部分 batch 的 prompt 逐位元組相同。
+快取以 ``(stage, model, temperature, response_format, sha256(prompt))`` 為 key 存在主資料庫：
+
+- 只快取「可重用」的回應：非 fallback、非截斷（finish_reason=length）、JSON stage 須可解析；
+- 命中時回傳的 usage 為 0（本次未花 token），省下的 token 記在 ``ResponseCacheStats``；
+- TTL 到期不再命中；寫入時順手清除過期項目，並以 LRU（last_used_at）維持 ``max_entries`` 上限。
+
+batch 各自成功即各自寫入，因此部分失敗後重試只會真正重打失敗的 batch。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.config import QAAIHelperResponseCacheConfig
+from app.db_access.main import MainAccessBoundary
+from app.models.database_models import QAAIHelperLLMResponseCache
+from app.services.qa_ai_helper_llm_service import QAAIHelperLLMResult
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+@dataclass
+class ResponseCacheStats:
+    """單次操作（一次 generate / inspection）的快取統計，寫入既有 telemetry payload。"""
+
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    saved_prompt_tokens: int = 0
+    saved_completion_tokens: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "saved_prompt_tokens": self.saved_prompt_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+            "saved_total_tokens": self.saved_prompt_tokens + self.saved_completion_tokens,
+        }
+
+
+def build_cache_key(
+    *,
+    stage: str,
+    model_name: str,
+    temperature: float,
+    prompt: str,
+    json_output: bool,
+) -> tuple[str, str]:
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    identity = "\x1f".join(
+        [stage, model_name, f"{float(temperature):.4f}", "json" if json_output else "text", prompt_hash]
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest(), prompt_hash
+
+
+def _is_reusable(result: QAAIHelperLLMResult, *, json_output: bool) -> bool:
+    if result.cost_note == "fallback" or result.finish_reason == "length":
+        return False
+    content = (result.content or "").strip()
+    if not content:
+        return False
+    if json_output:
+        try:
+            json.loads(content)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+class QAAIHelperResponseCache:
+    def __init__(self, main_boundary: MainAccessBoundary, config: QAAIHelperResponseCacheConfig) -> None:
+        self.main_boundary = main_boundary
+        self.config = config
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.enabled)
+
+    async def call(
+        self,
+        *,
+        stage: str,
+        model_name: str,
+        temperature: float,
+        prompt: str,
+        invoke: Callable[[], Awaitable[QAAIHelperLLMResult]],
+        stats: ResponseCacheStats,
+        bypass: bool = False,
+        json_output: bool = True,
+    ) -> QAAIHelperLLMResult:
+        """先查快取，未命中才呼叫 ``invoke``；bypass 時仍會以新結果覆寫快取。"""
+        if not self.enabled:
+            return await invoke()
+
+        cache_key, prompt_hash = build_cache_key(
+            stage=stage, model_name=model_name, temperature=temperature, prompt=prompt, json_output=json_output
+        )
+        if bypass:
+            stats.bypassed += 1
+        else:
+            cached = await self._lookup(cache_key)
+            if cached is not None:
+                stats.hits += 1
+                stats.saved_prompt_tokens += cached.prompt_tokens
+                stats.saved_completion_tokens += cached.completion_tokens
+                return QAAIHelperLLMResult(
+                    content=cached.content,
+                    usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                    cost=0.0,
+                    cost_note="cache",
+                    model_name=cached.model_name,
+                    response_id=None,
+                    finish_reason=cached.finish_reason,
+                    cache_hit=True,
+                )
+            stats.misses += 1
+
+        result = await invoke()
+        if _is_reusable(result, json_output=json_output):
+            try:
+                await self._store(
+                    cache_key=cache_key,
+                    prompt_hash=prompt_hash,
+                    stage=stage,
+                    model_name=model_name,
+                    temperature=temperature,
+                    result=result,
+                )
+            except Exception:  # noqa: BLE001
+                # 快取寫入失敗不影響生成流程
+                logger.exception("qa_ai_helper response cache store failed: stage=%s", stage)
+        return result
+
+    async def _lookup(self, cache_key: str) -> Optional[QAAIHelperLLMResponseCache]:
+        def _do(sync_db: Session) -> Optional[QAAIHelperLLMResponseCache]:
+            row = sync_db.get(QAAIHelperLLMResponseCache, cache_key)
+            now = _now()
+            if row is None or row.expires_at <= now:
+                return None
+            row.hit_count = int(row.hit_count or 0) + 1
+            row.last_used_at = now
+            sync_db.flush()
+            sync_db.expunge(row)
+            return row
+
+        try:
+            return await self.main_boundary.run_sync_write(_do)
+        except Exception:  # noqa: BLE001
+            logger.exception("qa_ai_helper response cache lookup failed")
+            return None
+
+    async def _store(
+        self,
+        *,
+        cache_key: str,
+        prompt_hash: str,
+        stage: str,
+        model_name: str,
+        temperature: float,
+        result: QAAIHelperLLMResult,
+    ) -> None:
+        usage = result.usage or {}
+        ttl = timedelta(hours=max(1, int(self.config.ttl_hours)))
+        max_entries = max(1, int(self.config.max_entries))
+
+        def _do(sync_db: Session) -> None:
+            now = _now()
+            row = sync_db.get(QAAIHelperLLMResponseCache, cache_key)
+            if row is None:
+                row = QAAIHelperLLMResponseCache(cache_key=cache_key, hit_count=0, created_at=now)
+                sync_db.add(row)
+            row.stage = stage
+            row.model_name = model_name
+            row.temperature = float(temperature)
+            row.prompt_hash = prompt_hash
+            row.content = result.content
+            row.finish_reason = result.finish_reason
+            row.prompt_tokens = int(usage.get("prompt_tokens") or 0)
+            row.completion_tokens = int(usage.get("completion_tokens") or 0)
+            row.total_tokens = int(usage.get("total_tokens") or 0)
+            row.last_used_at = now
+            row.expires_at = now + ttl
+            sync_db.flush()
+
+            sync_db.execute(
+                delete(QAAIHelperLLMResponseCache).where(QAAIHelperLLMResponseCache.expires_at <= now)
+            )
+            total = sync_db.execute(select(func.count()).select_from(QAAIHelperLLMResponseCache)).scalar_one()
+            if total > max_entries:
+                evict_keys = [
+                    key
+                    for (key,) in sync_db.execute(
+                        select(QAAIHelperLLMResponseCache.cache_key)
+                        .order_by(QAAIHelperLLMResponseCache.last_used_at.asc())
+                        .limit(total - max_entries)
+                    )
+                ]
+                sync_db.execute(
+                    delete(QAAIHelperLLMResponseCache).where(QAAIHelperLLMResponseCache.cache_key.in_(evict_keys))
+                )
+
+        await self.main_boundary.run_sync_write(_do)
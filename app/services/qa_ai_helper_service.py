@@ -10,8 +10,9 @@ import re
 import uuid
 from copy import deepcopy
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
 
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
@@ -103,11 +104,14 @@ from app.models.qa_ai_helper import (
     QAAIHelperWorkspaceResponse,
 )
 from app.services.jira_client import JiraClient
+from app.services.knowledge.hooks import enqueue_test_case_batch_sync
 from app.services.qa_ai_helper_llm_service import (
     QAAIHelperLLMResult,
     get_qa_ai_helper_llm_service,
 )
 from app.services.qa_ai_helper_preclean_service import parse_ticket_to_requirement_payload
+from app.services.qa_ai_helper_response_cache import QAAIHelperResponseCache, ResponseCacheStats
+from app.services.qa_ai_helper_usage_stats import invalidate_qa_ai_helper_stats_cache
 from scripts.qa_ai_helper_preclean import remove_jira_strikethrough
 from app.services.qa_ai_helper_planner import QAAIHelperPlanner
 from app.services.qa_ai_helper_prompt_service import get_qa_ai_helper_prompt_service
@@ -180,6 +184,11 @@ _QA_AI_HELPER_LLM_STAGES = {
     "inspection_extraction_a", "inspection_extraction_b", "inspection_extraction_c",
     "inspection_consolidation",
 }
+# batch 失敗後重試前的等待秒數（乘上已嘗試次數）
+_BATCH_RETRY_BACKOFF_SECONDS = 0.5
+# bulk commit 以 IN 查詢解析既有編號時每批的編號數（避開 SQLite 參數上限）
+_COMMIT_LOOKUP_CHUNK_SIZE = 500
+BatchEventCallback = Callable[[str, Dict[str, Any]], None]
 
 
 def _now() -> datetime:
@@ -662,6 +671,9 @@ class QAAIHelperService:
         self.planner = planner or QAAIHelperPlanner()
         self.prompt_service = get_qa_ai_helper_prompt_service()
         self.llm_service = get_qa_ai_helper_llm_service()
+        self.response_cache = QAAIHelperResponseCache(
+            self.main_boundary, self.settings.ai.qa_ai_helper.response_cache
+        )
         self.jira_client_factory = jira_client_factory
 
     def _require_main_boundary(self) -> MainAccessBoundary:
@@ -675,6 +687,141 @@ class QAAIHelperService:
     async def _run_write(self, operation: Callable[[Session], T]) -> T:
         return await self._require_main_boundary().run_sync_write(operation)
 
+    async def _call_stage_cached(
+        self,
+        *,
+        stage: str,
+        prompt: str,
+        cache_stats: ResponseCacheStats,
+        bypass_cache: bool = False,
+        invoke: Optional[Callable[[], Any]] = None,
+        json_output: bool = True,
+    ) -> QAAIHelperLLMResult:
+        """經 response cache 呼叫 stage 模型；未啟用快取時等同直接呼叫。"""
+        return await self.response_cache.call(
+            stage=stage,
+            model_name=self.llm_service.resolve_stage_model_id(stage),
+            temperature=self.llm_service.resolve_stage_temperature(stage),
+            prompt=prompt,
+            invoke=invoke or (lambda: self.llm_service.call_stage(stage=stage, prompt=prompt)),
+            stats=cache_stats,
+            bypass=bypass_cache,
+            json_output=json_output,
+        )
+
+    def _with_cache_stats(self, payload: Dict[str, Any], cache_stats: ResponseCacheStats) -> Dict[str, Any]:
+        if self.response_cache.enabled:
+            payload["response_cache"] = cache_stats.to_payload()
+        return payload
+
+    @staticmethod
+    def _response_cache_telemetry_record(stage: str, cache_stats: ResponseCacheStats) -> Dict[str, Any]:
+        return {
+            "stage": stage,
+            "event_name": "response_cache",
+            "status": QAAIHelperRunStatus.SUCCEEDED.value,
+            "model_name": None,
+            "usage": {},
+            "duration_ms": 0,
+            "payload": cache_stats.to_payload(),
+            "error_message": None,
+        }
+
+    async def _run_batches_with_retry(
+        self,
+        batches: Sequence[Any],
+        *,
+        call_batch: Callable[[Any], Awaitable[Any]],
+        max_concurrent: int,
+        on_batch_done: Optional[Callable[[int, Any, Any], Awaitable[Optional[Dict[str, Any]]]]] = None,
+        on_event: Optional[BatchEventCallback] = None,
+    ) -> List[Dict[str, Any]]:
+        """並行執行各 batch；單一 batch 失敗時獨立重試，不牽連其他 batch。
+
+        batch 一完成即呼叫 ``on_batch_done``（以 lock 序列化，避免同時寫入），並經 ``on_event``
+        推送 ``batch_complete`` / ``batch_retry`` / ``batch_failed``。回傳與 ``batches`` 同序的結果：
+        ``{"status": "succeeded", "result": ...}`` 或 ``{"status": "failed", "error": exc}``。
+        """
+        max_attempts = max(1, int(self.settings.ai.qa_ai_helper.batch_max_attempts))
+        sem = asyncio.Semaphore(max(1, max_concurrent))
+        persist_lock = asyncio.Lock()
+        outcomes: List[Dict[str, Any]] = [{} for _ in batches]
+        progress = {"completed": 0, "failed": 0}
+        total = len(batches)
+
+        def _emit(event_type: str, data: Dict[str, Any]) -> None:
+            if on_event is not None:
+                on_event(event_type, data)
+
+        async def _run(batch_index: int, batch: Any) -> None:
+            result: Any = None
+            last_error: Optional[Exception] = None
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    async with sem:
+                        result = await call_batch(batch)
+                    last_error = None
+                    break
+                except Exception as exc:  # noqa: BLE001
+                    last_error = exc
+                    logger.warning(
+                        "qa_ai_helper batch failed: batch=%s attempt=%s/%s error=%s",
+                        batch_index,
+                        attempt,
+                        max_attempts,
+                        exc,
+                    )
+                    if attempt < max_attempts:
+                        _emit(
+                            "batch_retry",
+                            {
+                                "batch_index": batch_index,
+                                "attempt": attempt,
+                                "max_attempts": max_attempts,
+                                "error": str(exc),
+                            },
+                        )
+                        await asyncio.sleep(_BATCH_RETRY_BACKOFF_SECONDS * attempt)
+
+            extra: Optional[Dict[str, Any]] = None
+            if last_error is None and on_batch_done is not None:
+                try:
+                    async with persist_lock:
+                        extra = await on_batch_done(batch_index, batch, result)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("qa_ai_helper batch persist failed: batch=%s", batch_index)
+                    last_error = exc
+
+            if last_error is not None:
+                outcomes[batch_index] = {"status": "failed", "error": last_error}
+                progress["failed"] += 1
+                _emit(
+                    "batch_failed",
+                    {
+                        "batch_index": batch_index,
+                        "completed": progress["completed"],
+                        "failed": progress["failed"],
+                        "total": total,
+                        "error": str(last_error),
+                    },
+                )
+                return
+            outcomes[batch_index] = {"status": "succeeded", "result": result}
+            progress["completed"] += 1
+            _emit(
+                "batch_complete",
+                {
+                    "batch_index": batch_index,
+                    "completed": progress["completed"],
+                    "failed": progress["failed"],
+                    "total": total,
+                    **(extra or {}),
+                },
+            )
+
+        await asyncio.gather(*[_run(index, batch) for index, batch in enumerate(batches)])
+        return outcomes
+
     def _persistable_plan_json(self, plan: Dict[str, Any]) -> str:
         return json_storage_dumps(self.planner.build_persistable_plan(plan)) or "{}"
 
@@ -1758,6 +1905,7 @@ class QAAIHelperService:
         session: QAAIHelperSession,
         ticket_snapshot: QAAIHelperTicketSnapshot,
         on_event: Optional[Callable[..., Any]] = None,
+        bypass_cache: bool = False,
     ) -> Dict[str, Any]:
         """Run MAGI inspection: Phase 1 parallel extraction + Phase 2 consolidation.
 
@@ -1787,6 +1935,7 @@ class QAAIHelperService:
         extraction_results: Dict[str, Dict[int, str]] = {}  # role_label -> {scenario_idx: content}
         extraction_errors: List[Dict[str, Any]] = []
         _telemetry_records: List[Dict[str, Any]] = []  # 收集所有 LLM 呼叫的遙測資料
+        cache_stats = ResponseCacheStats()
 
         async def _extract(role, scenario_idx, scenario):
             scenario_data = scenario.get("Scenario") if isinstance(scenario, dict) else None
@@ -1814,9 +1963,16 @@ class QAAIHelperService:
             t0 = time.monotonic()
             async with sem:
                 try:
-                    result = await llm_svc.call_inspection_extraction(
-                        role_label=role.label,
+                    result = await self._call_stage_cached(
+                        stage=stage,
                         prompt=prompt,
+                        cache_stats=cache_stats,
+                        bypass_cache=bypass_cache,
+                        invoke=lambda: llm_svc.call_inspection_extraction(
+                            role_label=role.label,
+                            prompt=prompt,
+                        ),
+                        json_output=False,
                     )
                     duration_ms = int((time.monotonic() - t0) * 1000)
                     extraction_results.setdefault(role.label, {})[scenario_idx] = result.content
@@ -1827,7 +1983,11 @@ class QAAIHelperService:
                         "model_name": result.model_name,
                         "usage": result.usage or {},
                         "duration_ms": duration_ms,
-                        "payload": {"role_label": role.label, "scenario_index": scenario_idx},
+                        "payload": {
+                            "role_label": role.label,
+                            "scenario_index": scenario_idx,
+                            "cache_hit": result.cache_hit,
+                        },
                         "error_message": None,
                     })
                     _emit(
@@ -1885,7 +2045,7 @@ class QAAIHelperService:
         total_extraction_calls = len(roles) * len(scenarios)
         if len(extraction_errors) >= total_extraction_calls and total_extraction_calls > 0:
             _emit("done", {"success": False, "error": "All extraction calls failed"})
-            await self._persist_inspection_telemetry(session, _telemetry_records)
+            await self._persist_inspection_telemetry(session, _telemetry_records, cache_stats=cache_stats)
             return {"success": False, "error": "All extraction calls failed", "sections_payload": []}
 
         # ── Phase 2: Consolidation ──
@@ -1918,8 +2078,14 @@ class QAAIHelperService:
 
         try:
             t0 = time.monotonic()
-            consolidation_result = await llm_svc.call_inspection_consolidation(
+            consolidation_result = await self._call_stage_cached(
+                stage="inspection_consolidation",
                 prompt=consolidation_prompt,
+                cache_stats=cache_stats,
+                bypass_cache=bypass_cache,
+                invoke=lambda: llm_svc.call_inspection_consolidation(
+                    prompt=consolidation_prompt,
+                ),
             )
             duration_ms = int((time.monotonic() - t0) * 1000)
             _telemetry_records.append({
@@ -1929,7 +2095,7 @@ class QAAIHelperService:
                 "model_name": consolidation_result.model_name,
                 "usage": consolidation_result.usage or {},
                 "duration_ms": duration_ms,
-                "payload": None,
+                "payload": {"cache_hit": consolidation_result.cache_hit},
                 "error_message": None,
             })
         except Exception as exc:
@@ -1947,7 +2113,7 @@ class QAAIHelperService:
             logger.error("MAGI consolidation failed: %s", exc)
             _emit("consolidation_error", {"error": str(exc)})
             _emit("done", {"success": False, "error": f"Consolidation failed: {exc}"})
-            await self._persist_inspection_telemetry(session, _telemetry_records)
+            await self._persist_inspection_telemetry(session, _telemetry_records, cache_stats=cache_stats)
             return {"success": False, "error": f"Consolidation failed: {exc}", "sections_payload": []}
 
         # Parse and validate JSON
@@ -1990,7 +2156,7 @@ class QAAIHelperService:
                 error_msg = f"Consolidation schema invalid after repair: {validation_error}"
                 _emit("consolidation_error", {"error": error_msg})
                 _emit("done", {"success": False, "error": error_msg})
-                await self._persist_inspection_telemetry(session, _telemetry_records)
+                await self._persist_inspection_telemetry(session, _telemetry_records, cache_stats=cache_stats)
                 return {"success": False, "error": error_msg, "sections_payload": []}
 
         sections_payload = self._transform_inspection_to_sections_payload(consolidation_data)
@@ -2006,7 +2172,7 @@ class QAAIHelperService:
             },
         )
         _emit("done", {"success": True})
-        await self._persist_inspection_telemetry(session, _telemetry_records)
+        await self._persist_inspection_telemetry(session, _telemetry_records, cache_stats=cache_stats)
         return {"success": True, "sections_payload": sections_payload}
 
     async def apply_council_inspection_results(
@@ -2682,10 +2848,18 @@ class QAAIHelperService:
         self,
         session: QAAIHelperSession,
         records: List[Dict[str, Any]],
+        *,
+        cache_stats: Optional[ResponseCacheStats] = None,
     ) -> None:
-        """Persist collected council inspection telemetry records in a single write transaction."""
+        """Persist collected council inspection telemetry records in a single write transaction.
+
+        When the response cache is enabled, a ``response_cache`` summary record
+        (hit rate, saved tokens) is appended alongside the per-call records.
+        """
         if not records:
             return
+        if cache_stats is not None and self.response_cache.enabled:
+            records = [*records, self._response_cache_telemetry_record("inspection", cache_stats)]
         session_id = session.id
 
         def _do(sync_db: Session) -> None:
@@ -2815,6 +2989,118 @@ class QAAIHelperService:
         sync_db.flush()
         return section
 
+    def _ensure_commit_sections_bulk_sync(
+        self,
+        sync_db: Session,
+        *,
+        set_id: int,
+        parent_section_id: int,
+        names: Sequence[str],
+    ) -> Dict[str, int]:
+        """一次確保多個 commit section 存在，回傳 normalized name → section id。
+
+        既有 section 以單一查詢取得，缺少的以 executemany 一次建立並延續 sort_order。
+        """
+        normalized_names = list(dict.fromkeys((name or "Generated").strip()[:100] for name in names))
+        if not normalized_names:
+            return {}
+
+        def _load_existing() -> Dict[str, int]:
+            rows = sync_db.execute(
+                select(TestCaseSection.id, TestCaseSection.name)
+                .where(
+                    TestCaseSection.test_case_set_id == set_id,
+                    TestCaseSection.parent_section_id == parent_section_id,
+                    TestCaseSection.name.in_(normalized_names),
+                )
+                .order_by(TestCaseSection.id.desc())
+            ).all()
+            # 同名 section 以最早建立者為準，與 _ensure_commit_section_sync 行為一致
+            return {str(name): int(section_id) for section_id, name in rows}
+
+        section_ids = _load_existing()
+        missing = [name for name in normalized_names if name not in section_ids]
+        if missing:
+            max_sort = sync_db.execute(
+                select(func.max(TestCaseSection.sort_order)).where(
+                    TestCaseSection.test_case_set_id == set_id,
+                    TestCaseSection.parent_section_id == parent_section_id,
+                )
+            ).scalar()
+            next_sort = (int(max_sort) + 1) if max_sort is not None else 0
+            now = _now()
+            sync_db.execute(
+                insert(TestCaseSection),
+                [
+                    {
+                        "test_case_set_id": set_id,
+                        "name": name,
+                        "description": None,
+                        "parent_section_id": parent_section_id,
+                        "level": 2,
+                        "sort_order": next_sort + offset,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for offset, name in enumerate(missing)
+                ],
+            )
+            section_ids = _load_existing()
+        return section_ids
+
+    @staticmethod
+    def _test_case_ids_by_number_sync(
+        sync_db: Session,
+        *,
+        team_id: int,
+        numbers: Sequence[str],
+    ) -> Dict[str, int]:
+        """以分批 IN 查詢解析 test case 編號 → id，避免逐筆查詢。"""
+        resolved: Dict[str, int] = {}
+        unique_numbers = list(dict.fromkeys(str(number) for number in numbers if number))
+        for start in range(0, len(unique_numbers), _COMMIT_LOOKUP_CHUNK_SIZE):
+            chunk = unique_numbers[start : start + _COMMIT_LOOKUP_CHUNK_SIZE]
+            rows = sync_db.execute(
+                select(TestCaseLocal.id, TestCaseLocal.test_case_number).where(
+                    TestCaseLocal.team_id == team_id,
+                    TestCaseLocal.test_case_number.in_(chunk),
+                )
+            ).all()
+            for case_id, number in rows:
+                resolved.setdefault(str(number), int(case_id))
+        return resolved
+
+    @staticmethod
+    def _commit_case_fields(body: Dict[str, Any], *, ticket_key: Optional[str]) -> Dict[str, Any]:
+        """將 draft body 轉為 TestCaseLocal 欄位（不含編號、歸屬與時間戳）。"""
+        return {
+            "title": body.get("title"),
+            "priority": _priority_from_text(body.get("priority") or "Medium"),
+            "precondition": _join_lines(body.get("preconditions") or []),
+            "steps": _join_lines(body.get("steps") or [], numbered=True),
+            "expected_result": _join_lines(body.get("expected_results") or []),
+            "tcg_json": json_compact_dumps_nullable([ticket_key] if ticket_key else []),
+            "sync_status": SyncStatus.SYNCED,
+        }
+
+    @staticmethod
+    def _knowledge_entity_from_case_row(row: Dict[str, Any], *, test_case_id: int) -> Dict[str, Any]:
+        """由 bulk insert/update 的欄位組出 knowledge sync 所需的 test case entity。"""
+        priority = row.get("priority")
+        return {
+            "test_case_id": test_case_id,
+            "test_case_number": row["test_case_number"],
+            "title": row.get("title") or "",
+            "priority": getattr(priority, "value", priority),
+            "precondition": row.get("precondition") or "",
+            "steps": row.get("steps") or "",
+            "expected_result": row.get("expected_result") or "",
+            "team_id": row.get("team_id"),
+            "section_id": row.get("test_case_section_id"),
+            "test_case_set_id": row.get("test_case_set_id"),
+            "jira_tickets": json_storage_loads(row.get("tcg_json"), []) or [],
+        }
+
     def _create_test_case_set_sync(
         self,
         sync_db: Session,
@@ -3455,6 +3741,7 @@ class QAAIHelperService:
         session_id: int,
         user_id: int,
         force_regenerate: bool = False,
+        bypass_cache: bool = False,
     ) -> QAAIHelperWorkspaceResponse:
         read_snapshot = await self.get_workspace(team_id=team_id, session_id=session_id)
         requirement_plan = read_snapshot.requirement_plan
@@ -3497,80 +3784,34 @@ class QAAIHelperService:
         if not generation_items:
             raise ValueError("沒有可生成的驗證項目")
 
-        output_locale = (
-            read_snapshot.session.output_locale.value
-            if hasattr(read_snapshot.session.output_locale, "value")
-            else str(read_snapshot.session.output_locale)
-        )
-        section_summary_json = json_compact_dumps_nullable(self._seed_section_summary(requirement_plan))
-        requirement_plan_json = json_compact_dumps_nullable(requirement_plan.model_dump(mode="json"))
+        prompt_context = self._seed_prompt_context(read_snapshot)
         generation_batches = self._iter_seed_generation_batches(generation_items)
-        max_concurrent = min(max(1, self.settings.ai.qa_ai_helper.max_concurrent_llm_calls), 5)
-        sem = asyncio.Semaphore(max_concurrent)
+        cache_stats = ResponseCacheStats()
         generation_started_at = time.perf_counter()
 
-        async def _call_seed_batch(
-            batch_items: List[Dict[str, Any]],
-        ) -> tuple[QAAIHelperLLMResult, List[Dict[str, Any]]]:
-            prompt = self.prompt_service.render_stage_prompt(
-                "seed",
-                {
-                    "output_language": output_locale,
-                    "section_summary_json": section_summary_json,
-                    "requirement_plan_json": requirement_plan_json,
-                    "generation_items_json": json_compact_dumps_nullable(batch_items),
-                },
+        async def _call_seed_batch(batch_items: List[Dict[str, Any]]) -> tuple:
+            return await self._call_seed_generation_batch(
+                prompt_context, batch_items, cache_stats=cache_stats, bypass_cache=bypass_cache
             )
-            async with sem:
-                result = await self.llm_service.call_stage(
-                    stage="seed",
-                    prompt=prompt,
-                )
-            return result, batch_items
 
-        llm_results = await asyncio.gather(
-            *[_call_seed_batch(batch_items) for batch_items in generation_batches],
-            return_exceptions=True,
+        outcomes = await self._run_batches_with_retry(
+            generation_batches,
+            call_batch=_call_seed_batch,
+            max_concurrent=min(max(1, self.settings.ai.qa_ai_helper.max_concurrent_llm_calls), 5),
         )
+        for outcome in outcomes:
+            if outcome["status"] == "failed":
+                raise outcome["error"]
 
         normalized_outputs_by_ref: Dict[str, Dict[str, Any]] = {}
         model_name = ""
         usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-        for result_tuple in llm_results:
-            if isinstance(result_tuple, Exception):
-                raise result_tuple
-            llm_result, batch_items = result_tuple
+        for outcome in outcomes:
+            llm_result, batch_outputs = outcome["result"]
             if not model_name and llm_result.model_name:
                 model_name = llm_result.model_name
             usage = _merge_token_usage(usage, llm_result.usage)
-            try:
-                output_payload = json.loads(llm_result.content or "{}")
-            except json.JSONDecodeError as exc:
-                raise RuntimeError(f"seed 模型輸出非 JSON: {exc}") from exc
-            model_outputs = (
-                output_payload.get("outputs") or []
-                if isinstance(output_payload, dict)
-                else output_payload
-                if isinstance(output_payload, list)
-                else []
-            )
-            outputs_by_ref = {
-                str(item.get("seed_reference_key") or "").strip(): item
-                for item in model_outputs
-                if isinstance(item, dict) and str(item.get("seed_reference_key") or "").strip()
-            }
-            outputs_by_index = {
-                int(item.get("item_index")): item
-                for item in model_outputs
-                if isinstance(item, dict) and str(item.get("item_index") or "").strip().isdigit()
-            }
-            for generation_item in batch_items:
-                normalized_outputs_by_ref[generation_item["seed_reference_key"]] = self._normalize_seed_output(
-                    generation_item,
-                    outputs_by_ref.get(generation_item["seed_reference_key"])
-                    or outputs_by_index.get(generation_item["item_index"])
-                    or {},
-                )
+            normalized_outputs_by_ref.update(batch_outputs)
 
         normalized_outputs = [
             normalized_outputs_by_ref.get(generation_item["seed_reference_key"])
@@ -3580,81 +3821,173 @@ class QAAIHelperService:
         duration_ms = int((time.perf_counter() - generation_started_at) * 1000)
 
         def _persist(sync_db: Session) -> QAAIHelperWorkspaceResponse:
-            session = (
-                sync_db.query(QAAIHelperSession)
-                .filter(QAAIHelperSession.id == session_id, QAAIHelperSession.team_id == team_id)
-                .first()
+            session, _seed_set = self._create_seed_set_sync(
+                sync_db,
+                team_id=team_id,
+                session_id=session_id,
+                requirement_plan_id=requirement_plan.id,
+                user_id=user_id,
+                model_name=model_name,
+                generation_items=generation_items,
+                normalized_outputs=normalized_outputs,
             )
-            if session is None:
-                raise ValueError("找不到 qa_ai_helper session")
-            requirement_plan_row = (
-                sync_db.query(QAAIHelperRequirementPlan)
-                .filter(
-                    QAAIHelperRequirementPlan.id == requirement_plan.id,
-                    QAAIHelperRequirementPlan.session_id == session.id,
-                )
-                .first()
+            self._persist_telemetry_sync(
+                sync_db,
+                session=session,
+                planned_revision_id=session.active_planned_revision_id,
+                draft_set_id=None,
+                user_id=user_id,
+                stage="seed",
+                event_name="generate",
+                status=QAAIHelperRunStatus.SUCCEEDED.value,
+                model_name=model_name,
+                usage=usage,
+                duration_ms=duration_ms,
+                payload=self._with_cache_stats(
+                    {
+                        "batch_count": len(generation_batches),
+                        "item_count": len(generation_items),
+                    },
+                    cache_stats,
+                ),
             )
-            if requirement_plan_row is None:
-                raise ValueError("找不到 requirement plan")
-            if requirement_plan_row.status != QAAIHelperRequirementPlanStatus.LOCKED.value:
-                raise ValueError("需求尚未鎖定，無法產生 Test Case 種子")
+            return self._load_workspace_sync(sync_db, team_id=team_id, session_id=session.id)
 
-            self._mark_active_seed_sets_superseded_sync(sync_db, session=session)
-            self._mark_active_testcase_draft_sets_superseded_sync(sync_db, session=session)
+        return await self._run_write(_persist)
 
-            latest_round = (
-                sync_db.query(QAAIHelperSeedSet.generation_round)
-                .filter(QAAIHelperSeedSet.session_id == session.id)
-                .order_by(QAAIHelperSeedSet.generation_round.desc())
-                .first()
+    async def generate_seed_set_stream(
+        self,
+        *,
+        team_id: int,
+        session_id: int,
+        user_id: int,
+        on_event: BatchEventCallback,
+        bypass_cache: bool = False,
+    ) -> None:
+        """串流版 seed 生成：先建立佔位 seed set，各 batch 完成即寫入並推送進度。
+
+        事件順序：``seed_set_created`` → 逐 batch 的 ``batch_complete`` / ``batch_retry`` /
+        ``batch_failed`` → ``done``。收到 ``seed_set_created`` 後即可開始 review；
+        使用者已編輯或留言的 seed 不會被較晚完成的 batch 覆寫，seed set 若已鎖定或失效則停止寫入。
+        失敗的 batch 保留預設內容，並記錄於 ``done`` 事件與 telemetry。
+        """
+        read_snapshot = await self.get_workspace(team_id=team_id, session_id=session_id)
+        requirement_plan = read_snapshot.requirement_plan
+        if requirement_plan is None:
+            raise ValueError("尚未建立 requirement plan")
+        if requirement_plan.status != QAAIHelperRequirementPlanStatus.LOCKED:
+            raise ValueError("需求尚未鎖定，無法產生 Test Case 種子")
+        generation_items = self._seed_generation_items_from_plan(requirement_plan)
+        if not generation_items:
+            raise ValueError("沒有可生成的驗證項目")
+
+        prompt_context = self._seed_prompt_context(read_snapshot)
+        generation_batches = self._iter_seed_generation_batches(generation_items)
+        cache_stats = ResponseCacheStats()
+        generation_started_at = time.perf_counter()
+
+        def _create(sync_db: Session) -> tuple[int, QAAIHelperWorkspaceResponse]:
+            session, seed_set = self._create_seed_set_sync(
+                sync_db,
+                team_id=team_id,
+                session_id=session_id,
+                requirement_plan_id=requirement_plan.id,
+                user_id=user_id,
+                model_name="",
+                generation_items=generation_items,
+                normalized_outputs=[self._default_seed_output(item) for item in generation_items],
             )
-            seed_set = QAAIHelperSeedSet(
-                session_id=session.id,
-                requirement_plan_id=requirement_plan_row.id,
-                status=QAAIHelperSeedSetStatus.DRAFT.value,
-                generation_round=(latest_round[0] if latest_round and latest_round[0] is not None else 0) + 1,
-                source_type="initial",
-                model_name=model_name,
-                generated_seed_count=0,
-                included_seed_count=0,
-                adoption_rate=0.0,
-                created_by_user_id=user_id,
-                created_at=_now(),
-                updated_at=_now(),
+            return seed_set.id, self._load_workspace_sync(sync_db, team_id=team_id, session_id=session.id)
+
+        seed_set_id, workspace = await self._run_write(_create)
+        on_event(
+            "seed_set_created",
+            {
+                "seed_set_id": seed_set_id,
+                "batch_count": len(generation_batches),
+                "item_count": len(generation_items),
+                "workspace": workspace.model_dump(mode="json"),
+            },
+        )
+
+        async def _call_seed_batch(batch_items: List[Dict[str, Any]]) -> tuple:
+            return await self._call_seed_generation_batch(
+                prompt_context, batch_items, cache_stats=cache_stats, bypass_cache=bypass_cache
             )
-            sync_db.add(seed_set)
-            sync_db.flush()
 
-            for generation_item, normalized_output in zip(generation_items, normalized_outputs):
-                sync_db.add(
-                    QAAIHelperSeedItem(
-                        seed_set_id=seed_set.id,
-                        plan_section_id=generation_item.get("plan_section_id"),
-                        verification_item_id=generation_item.get("verification_item_id"),
-                        check_condition_refs_json=json_storage_dumps(
-                            normalized_output.get("check_condition_ids") or []
-                        ),
-                        coverage_tags_json=json_storage_dumps(normalized_output.get("coverage_tags") or []),
-                        seed_reference_key=normalized_output["seed_reference_key"],
-                        seed_summary=normalized_output["seed_summary"],
-                        seed_body_json=json_storage_dumps(
-                            {
-                                "text": normalized_output["seed_body"],
-                                "test_data_suggestions": normalized_output.get("test_data_suggestions") or [],
-                            }
-                        ),
-                        comment_text=None,
-                        is_ai_generated=True,
-                        user_edited=False,
-                        included_for_testcase_generation=True,
-                        created_at=_now(),
-                        updated_at=_now(),
+        async def _persist_batch(
+            _batch_index: int,
+            _batch_items: List[Dict[str, Any]],
+            batch_result: tuple,
+        ) -> Dict[str, Any]:
+            llm_result, batch_outputs = batch_result
+
+            def _apply(sync_db: Session) -> Optional[QAAIHelperWorkspaceResponse]:
+                seed_set = sync_db.query(QAAIHelperSeedSet).filter(QAAIHelperSeedSet.id == seed_set_id).first()
+                if seed_set is None or seed_set.status != QAAIHelperSeedSetStatus.DRAFT.value:
+                    return None
+                seed_items = (
+                    sync_db.query(QAAIHelperSeedItem)
+                    .filter(
+                        QAAIHelperSeedItem.seed_set_id == seed_set.id,
+                        QAAIHelperSeedItem.seed_reference_key.in_(list(batch_outputs)),
                     )
+                    .all()
                 )
-            sync_db.flush()
-            sync_db.expire(seed_set, ["seed_items"])
-            self._refresh_seed_adoption_summary_sync(seed_set)
+                for seed_item in seed_items:
+                    if seed_item.user_edited or seed_item.comment_text:
+                        continue
+                    for field, value in self._seed_item_content_fields(
+                        batch_outputs[seed_item.seed_reference_key]
+                    ).items():
+                        setattr(seed_item, field, value)
+                    seed_item.updated_at = _now()
+                if not seed_set.model_name and llm_result.model_name:
+                    seed_set.model_name = llm_result.model_name
+                seed_set.updated_at = _now()
+                sync_db.flush()
+                sync_db.expire(seed_set, ["seed_items"])
+                self._refresh_seed_adoption_summary_sync(seed_set)
+                return self._load_workspace_sync(sync_db, team_id=team_id, session_id=session_id)
+
+            batch_workspace = await self._run_write(_apply)
+            return {
+                "seed_reference_keys": list(batch_outputs),
+                "cache_hit": llm_result.cache_hit,
+                "workspace": batch_workspace.model_dump(mode="json") if batch_workspace is not None else None,
+            }
+
+        outcomes = await self._run_batches_with_retry(
+            generation_batches,
+            call_batch=_call_seed_batch,
+            max_concurrent=min(max(1, self.settings.ai.qa_ai_helper.max_concurrent_llm_calls), 5),
+            on_batch_done=_persist_batch,
+            on_event=on_event,
+        )
+
+        failed_batches = [
+            {"batch_index": index, "error": str(outcome["error"])}
+            for index, outcome in enumerate(outcomes)
+            if outcome["status"] == "failed"
+        ]
+        model_name = ""
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        for outcome in outcomes:
+            if outcome["status"] != "succeeded":
+                continue
+            llm_result, _batch_outputs = outcome["result"]
+            model_name = model_name or llm_result.model_name or ""
+            usage = _merge_token_usage(usage, llm_result.usage)
+        duration_ms = int((time.perf_counter() - generation_started_at) * 1000)
+
+        def _finish(sync_db: Session) -> QAAIHelperWorkspaceResponse:
+            session = (
+                sync_db.query(QAAIHelperSession)
+                .filter(QAAIHelperSession.id == session_id, QAAIHelperSession.team_id == team_id)
+                .first()
+            )
+            if session is None:
+                raise ValueError("找不到 qa_ai_helper session")
             self._persist_telemetry_sync(
                 sync_db,
                 session=session,
@@ -3663,26 +3996,199 @@ class QAAIHelperService:
                 user_id=user_id,
                 stage="seed",
                 event_name="generate",
-                status=QAAIHelperRunStatus.SUCCEEDED.value,
+                status=(
+                    QAAIHelperRunStatus.FAILED.value if failed_batches else QAAIHelperRunStatus.SUCCEEDED.value
+                ),
                 model_name=model_name,
                 usage=usage,
                 duration_ms=duration_ms,
-                payload={
-                    "batch_count": len(generation_batches),
-                    "item_count": len(generation_items),
-                },
-            )
-            session.active_seed_set_id = seed_set.id
-            self._set_session_screen(
-                session,
-                QAAIHelperSessionScreen.SEED_REVIEW.value,
-                allow_same=True,
-                force=True,
+                payload=self._with_cache_stats(
+                    {
+                        "batch_count": len(generation_batches),
+                        "item_count": len(generation_items),
+                        "failed_batch_count": len(failed_batches),
+                        "streamed": True,
+                    },
+                    cache_stats,
+                ),
+                error_message="; ".join(item["error"] for item in failed_batches)[:1000] or None,
             )
-            session.updated_at = _now()
             return self._load_workspace_sync(sync_db, team_id=team_id, session_id=session.id)
 
-        return await self._run_write(_persist)
+        workspace = await self._run_write(_finish)
+        on_event(
+            "done",
+            {
+                "success": not failed_batches,
+                "seed_set_id": seed_set_id,
+                "failed_batches": failed_batches,
+                "workspace": workspace.model_dump(mode="json"),
+            },
+        )
+
+    def _seed_prompt_context(self, workspace: QAAIHelperWorkspaceResponse) -> Dict[str, str]:
+        output_locale = workspace.session.output_locale
+        return {
+            "output_language": output_locale.value if hasattr(output_locale, "value") else str(output_locale),
+            "section_summary_json": json_compact_dumps_nullable(
+                self._seed_section_summary(workspace.requirement_plan)
+            ),
+            "requirement_plan_json": json_compact_dumps_nullable(workspace.requirement_plan.model_dump(mode="json")),
+        }
+
+    async def _call_seed_generation_batch(
+        self,
+        prompt_context: Dict[str, str],
+        batch_items: List[Dict[str, Any]],
+        *,
+        cache_stats: ResponseCacheStats,
+        bypass_cache: bool,
+    ) -> tuple[QAAIHelperLLMResult, Dict[str, Dict[str, Any]]]:
+        """呼叫單一 seed batch 並正規化輸出；非 JSON 輸出視為此 batch 失敗（可重試）。"""
+        prompt = self.prompt_service.render_stage_prompt(
+            "seed",
+            {
+                **prompt_context,
+                "generation_items_json": json_compact_dumps_nullable(batch_items),
+            },
+        )
+        llm_result = await self._call_stage_cached(
+            stage="seed",
+            prompt=prompt,
+            cache_stats=cache_stats,
+            bypass_cache=bypass_cache,
+        )
+        try:
+            output_payload = json.loads(llm_result.content or "{}")
+        except json.JSONDecodeError as exc:
+            raise RuntimeError(f"seed 模型輸出非 JSON: {exc}") from exc
+        model_outputs = (
+            output_payload.get("outputs") or []
+            if isinstance(output_payload, dict)
+            else output_payload
+            if isinstance(output_payload, list)
+            else []
+        )
+        outputs_by_ref = {
+            str(item.get("seed_reference_key") or "").strip(): item
+            for item in model_outputs
+            if isinstance(item, dict) and str(item.get("seed_reference_key") or "").strip()
+        }
+        outputs_by_index = {
+            int(item.get("item_index")): item
+            for item in model_outputs
+            if isinstance(item, dict) and str(item.get("item_index") or "").strip().isdigit()
+        }
+        return llm_result, {
+            generation_item["seed_reference_key"]: self._normalize_seed_output(
+                generation_item,
+                outputs_by_ref.get(generation_item["seed_reference_key"])
+                or outputs_by_index.get(generation_item["item_index"])
+                or {},
+            )
+            for generation_item in batch_items
+        }
+
+    @staticmethod
+    def _seed_item_content_fields(normalized_output: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "check_condition_refs_json": json_storage_dumps(normalized_output.get("check_condition_ids") or []),
+            "coverage_tags_json": json_storage_dumps(normalized_output.get("coverage_tags") or []),
+            "seed_summary": normalized_output["seed_summary"],
+            "seed_body_json": json_storage_dumps(
+                {
+                    "text": normalized_output["seed_body"],
+                    "test_data_suggestions": normalized_output.get("test_data_suggestions") or [],
+                }
+            ),
+        }
+
+    def _create_seed_set_sync(
+        self,
+        sync_db: Session,
+        *,
+        team_id: int,
+        session_id: int,
+        requirement_plan_id: int,
+        user_id: int,
+        model_name: str,
+        generation_items: List[Dict[str, Any]],
+        normalized_outputs: List[Dict[str, Any]],
+    ) -> tuple[QAAIHelperSession, QAAIHelperSeedSet]:
+        session = (
+            sync_db.query(QAAIHelperSession)
+            .filter(QAAIHelperSession.id == session_id, QAAIHelperSession.team_id == team_id)
+            .first()
+        )
+        if session is None:
+            raise ValueError("找不到 qa_ai_helper session")
+        requirement_plan_row = (
+            sync_db.query(QAAIHelperRequirementPlan)
+            .filter(
+                QAAIHelperRequirementPlan.id == requirement_plan_id,
+                QAAIHelperRequirementPlan.session_id == session.id,
+            )
+            .first()
+        )
+        if requirement_plan_row is None:
+            raise ValueError("找不到 requirement plan")
+        if requirement_plan_row.status != QAAIHelperRequirementPlanStatus.LOCKED.value:
+            raise ValueError("需求尚未鎖定，無法產生 Test Case 種子")
+
+        self._mark_active_seed_sets_superseded_sync(sync_db, session=session)
+        self._mark_active_testcase_draft_sets_superseded_sync(sync_db, session=session)
+
+        latest_round = (
+            sync_db.query(QAAIHelperSeedSet.generation_round)
+            .filter(QAAIHelperSeedSet.session_id == session.id)
+            .order_by(QAAIHelperSeedSet.generation_round.desc())
+            .first()
+        )
+        seed_set = QAAIHelperSeedSet(
+            session_id=session.id,
+            requirement_plan_id=requirement_plan_row.id,
+            status=QAAIHelperSeedSetStatus.DRAFT.value,
+            generation_round=(latest_round[0] if latest_round and latest_round[0] is not None else 0) + 1,
+            source_type="initial",
+            model_name=model_name,
+            generated_seed_count=0,
+            included_seed_count=0,
+            adoption_rate=0.0,
+            created_by_user_id=user_id,
+            created_at=_now(),
+            updated_at=_now(),
+        )
+        sync_db.add(seed_set)
+        sync_db.flush()
+
+        for generation_item, normalized_output in zip(generation_items, normalized_outputs):
+            sync_db.add(
+                QAAIHelperSeedItem(
+                    seed_set_id=seed_set.id,
+                    plan_section_id=generation_item.get("plan_section_id"),
+                    verification_item_id=generation_item.get("verification_item_id"),
+                    seed_reference_key=normalized_output["seed_reference_key"],
+                    comment_text=None,
+                    is_ai_generated=True,
+                    user_edited=False,
+                    included_for_testcase_generation=True,
+                    created_at=_now(),
+                    updated_at=_now(),
+                    **self._seed_item_content_fields(normalized_output),
+                )
+            )
+        sync_db.flush()
+        sync_db.expire(seed_set, ["seed_items"])
+        self._refresh_seed_adoption_summary_sync(seed_set)
+        session.active_seed_set_id = seed_set.id
+        self._set_session_screen(
+            session,
+            QAAIHelperSessionScreen.SEED_REVIEW.value,
+            allow_same=True,
+            force=True,
+        )
+        session.updated_at = _now()
+        return session, seed_set
 
     async def update_seed_item_review(
         self,
@@ -3881,9 +4387,12 @@ class QAAIHelperService:
             },
         )
         refine_started_at = time.perf_counter()
-        llm_result = await self.llm_service.call_stage(
+        cache_stats = ResponseCacheStats()
+        llm_result = await self._call_stage_cached(
             stage="seed_refine",
             prompt=prompt,
+            cache_stats=cache_stats,
+            bypass_cache=request.bypass_cache,
         )
         duration_ms = int((time.perf_counter() - refine_started_at) * 1000)
         try:
@@ -3976,7 +4485,7 @@ class QAAIHelperService:
                 model_name=llm_result.model_name,
                 usage=llm_result.usage,
                 duration_ms=duration_ms,
-                payload={"dirty_seed_count": len(dirty_seed_items)},
+                payload=self._with_cache_stats({"dirty_seed_count": len(dirty_seed_items)}, cache_stats),
             )
             return self._load_workspace_sync(sync_db, team_id=team_id, session_id=session.id)
 
@@ -4146,9 +4655,12 @@ class QAAIHelperService:
             },
         )
         testcase_started_at = time.perf_counter()
-        llm_result = await self.llm_service.call_stage(
+        cache_stats = ResponseCacheStats()
+        llm_result = await self._call_stage_cached(
             stage="testcase",
             prompt=prompt,
+            cache_stats=cache_stats,
+            bypass_cache=request.bypass_cache,
         )
         duration_ms = int((time.perf_counter() - testcase_started_at) * 1000)
         try:
@@ -4256,10 +4768,13 @@ class QAAIHelperService:
                 model_name=llm_result.model_name,
                 usage=llm_result.usage,
                 duration_ms=duration_ms,
-                payload={
-                    "item_count": len(generation_items),
-                    "testcase_draft_set_id": draft_set.id,
-                },
+                payload=self._with_cache_stats(
+                    {
+                        "item_count": len(generation_items),
+                        "testcase_draft_set_id": draft_set.id,
+                    },
+                    cache_stats,
+                ),
             )
             session.active_testcase_draft_set_id = draft_set.id
             self._set_session_screen(
@@ -4556,7 +5071,11 @@ class QAAIHelperService:
         request: QAAIHelperCommitRequest,
         user_id: int,
     ) -> QAAIHelperWorkspaceResponse:
+        knowledge_entities: List[Dict[str, Any]] = []
+
         def _commit(sync_db: Session) -> QAAIHelperWorkspaceResponse:
+            started_at = time.perf_counter()
+            knowledge_entities.clear()
             session = (
                 sync_db.query(QAAIHelperSession)
                 .filter(QAAIHelperSession.id == session_id, QAAIHelperSession.team_id == team_id)
@@ -4618,6 +5137,7 @@ class QAAIHelperService:
             created_count = 0
             failed_count = 0
             skipped_count = 0
+            candidates: List[tuple] = []
 
             for draft_id in requested_ids:
                 draft = draft_by_id.get(draft_id)
@@ -4675,88 +5195,104 @@ class QAAIHelperService:
                     )
                     continue
 
-                existing_case = (
-                    sync_db.query(TestCaseLocal)
-                    .filter(
-                        TestCaseLocal.team_id == team_id,
-                        TestCaseLocal.test_case_number == draft.assigned_testcase_id,
-                    )
-                    .first()
-                )
-                if existing_case is not None:
-                    failed_count += 1
-                    draft_results.append(
-                        {
-                            "testcase_draft_id": draft.id,
-                            "seed_item_id": draft.seed_item_id,
-                            "seed_reference_key": draft.seed_reference_key,
-                            "assigned_testcase_id": draft.assigned_testcase_id,
-                            "status": "failed",
-                            "reason": f"Test Case 編號已存在: {draft.assigned_testcase_id}",
-                            "test_case_id": existing_case.id,
-                        }
-                    )
-                    continue
-
                 plan_section = getattr(draft.seed_item, "plan_section", None)
                 section_name = "Generated"
                 if plan_section is not None:
                     section_name = (
                         f"{plan_section.section_id or ''} {plan_section.section_title or ''}".strip() or "Generated"
                     )
-                commit_section = self._ensure_commit_section_sync(
-                    sync_db,
-                    set_id=target_set.id,
-                    parent_section_id=root_section.id,
-                    name=section_name,
-                )
+                draft_result = {
+                    "testcase_draft_id": draft.id,
+                    "seed_item_id": draft.seed_item_id,
+                    "seed_reference_key": draft.seed_reference_key,
+                    "assigned_testcase_id": draft.assigned_testcase_id,
+                    "status": "created",
+                }
+                draft_results.append(draft_result)
+                candidates.append((draft, body, section_name, draft_result))
+
+            # 一次解析既有編號；同批重複的編號只保留第一筆，其餘視為已存在
+            existing_ids = self._test_case_ids_by_number_sync(
+                sync_db,
+                team_id=team_id,
+                numbers=[draft.assigned_testcase_id for draft, _, _, _ in candidates],
+            )
+            accepted: List[tuple] = []
+            duplicates: List[Dict[str, Any]] = []
+            claimed_numbers: set[str] = set()
+            for draft, body, section_name, draft_result in candidates:
+                number = draft.assigned_testcase_id
+                if number in existing_ids or number in claimed_numbers:
+                    failed_count += 1
+                    draft_result["status"] = "failed"
+                    draft_result["reason"] = f"Test Case 編號已存在: {number}"
+                    draft_result["test_case_id"] = existing_ids.get(number)
+                    if number not in existing_ids:
+                        duplicates.append(draft_result)
+                    continue
+                claimed_numbers.add(number)
+                accepted.append((draft, body, section_name, draft_result))
+
+            section_ids = self._ensure_commit_sections_bulk_sync(
+                sync_db,
+                set_id=target_set.id,
+                parent_section_id=root_section.id,
+                names=[section_name for _, _, section_name, _ in accepted],
+            )
+            now = _now()
+            case_rows: List[Dict[str, Any]] = []
+            for draft, body, section_name, _ in accepted:
                 draft_test_data = body.get("test_data") or []
                 if not isinstance(draft_test_data, list):
                     draft_test_data = []
                 test_data_for_persist = self._normalize_test_data_items(draft_test_data)
-                test_case = TestCaseLocal(
-                    team_id=team_id,
-                    test_case_set_id=target_set.id,
-                    test_case_section_id=commit_section.id,
-                    test_case_number=draft.assigned_testcase_id,
-                    title=body.get("title") or draft.assigned_testcase_id,
-                    priority=_priority_from_text(body.get("priority") or "Medium"),
-                    precondition=_join_lines(body.get("preconditions") or []),
-                    steps=_join_lines(body.get("steps") or [], numbered=True),
-                    expected_result=_join_lines(body.get("expected_results") or []),
-                    tcg_json=json_compact_dumps_nullable([session.ticket_key] if session.ticket_key else []),
-                    test_data_json=json_storage_dumps(test_data_for_persist) if test_data_for_persist else None,
-                    sync_status=SyncStatus.SYNCED,
-                    created_at=_now(),
-                    updated_at=_now(),
-                )
-                sync_db.add(test_case)
-                sync_db.flush()
-                sync_db.add(
-                    QAAIHelperCommitLink(
-                        session_id=session.id,
-                        testcase_draft_set_id=draft_set.id,
-                        testcase_draft_id=draft.id,
-                        seed_item_id=draft.seed_item_id,
-                        test_case_id=test_case.id,
-                        test_case_set_id=target_set.id,
-                        is_ai_generated=draft.is_ai_generated,
-                        selected_for_commit=True,
-                        committed_at=_now(),
-                    )
+                row = self._commit_case_fields(body, ticket_key=session.ticket_key)
+                row.update(
+                    {
+                        "team_id": team_id,
+                        "test_case_set_id": target_set.id,
+                        "test_case_section_id": section_ids[(section_name or "Generated").strip()[:100]],
+                        "test_case_number": draft.assigned_testcase_id,
+                        "title": row["title"] or draft.assigned_testcase_id,
+                        "test_data_json": (
+                            json_storage_dumps(test_data_for_persist) if test_data_for_persist else None
+                        ),
+                        "created_at": now,
+                        "updated_at": now,
+                    }
                 )
-                created_count += 1
-                created_ids.append(draft.assigned_testcase_id)
-                draft_results.append(
+                case_rows.append(row)
+            if case_rows:
+                sync_db.execute(insert(TestCaseLocal), case_rows)
+            case_ids = self._test_case_ids_by_number_sync(
+                sync_db,
+                team_id=team_id,
+                numbers=[row["test_case_number"] for row in case_rows],
+            )
+            link_rows: List[Dict[str, Any]] = []
+            for (draft, _, _, draft_result), row in zip(accepted, case_rows):
+                test_case_id = case_ids[row["test_case_number"]]
+                draft_result["test_case_id"] = test_case_id
+                link_rows.append(
                     {
+                        "session_id": session.id,
+                        "testcase_draft_set_id": draft_set.id,
                         "testcase_draft_id": draft.id,
                         "seed_item_id": draft.seed_item_id,
-                        "seed_reference_key": draft.seed_reference_key,
-                        "assigned_testcase_id": draft.assigned_testcase_id,
-                        "status": "created",
-                        "test_case_id": test_case.id,
+                        "test_case_id": test_case_id,
+                        "test_case_set_id": target_set.id,
+                        "is_ai_generated": draft.is_ai_generated,
+                        "selected_for_commit": True,
+                        "committed_at": now,
                     }
                 )
+                created_count += 1
+                created_ids.append(draft.assigned_testcase_id)
+                knowledge_entities.append(self._knowledge_entity_from_case_row(row, test_case_id=test_case_id))
+            if link_rows:
+                sync_db.execute(insert(QAAIHelperCommitLink), link_rows)
+            for draft_result in duplicates:
+                draft_result["test_case_id"] = case_ids.get(draft_result["assigned_testcase_id"])
 
             draft_set.status = QAAIHelperTestcaseDraftSetStatus.COMMITTED.value
             draft_set.committed_at = _now()
@@ -4784,6 +5320,13 @@ class QAAIHelperService:
                 "draft_results": draft_results,
                 "target_set_link": f"/test-case-management?set_id={target_set.id}&team_id={team_id}",
             }
+            duration_ms = int((time.perf_counter() - started_at) * 1000)
+            result_payload["throughput"] = {
+                "committed_count": created_count,
+                "section_count": len(section_ids),
+                "duration_ms": duration_ms,
+                "cases_per_second": round(created_count * 1000 / max(duration_ms, 1), 1),
+            }
             self._persist_telemetry_sync(
                 sync_db,
                 session=session,
@@ -4799,13 +5342,19 @@ class QAAIHelperService:
                 ),
                 model_name=draft_set.model_name,
                 usage={},
-                duration_ms=0,
+                duration_ms=duration_ms,
                 payload=result_payload,
             )
             sync_db.flush()
             return self._load_workspace_sync(sync_db, team_id=team_id, session_id=session.id)
 
-        return await self._run_write(_commit)
+        workspace = await self._run_write(_commit)
+        invalidate_qa_ai_helper_stats_cache()
+        await enqueue_test_case_batch_sync(
+            f"qa_ai_helper_commit:{request.testcase_draft_set_id}",
+            knowledge_entities,
+        )
+        return workspace
 
     async def fetch_ticket(
         self,
@@ -5709,33 +6258,35 @@ class QAAIHelperService:
                     }
                 )
 
-        # --- 併發送出 LLM 呼叫 ---
-        max_concurrent = max(1, self.settings.ai.qa_ai_helper.max_concurrent_llm_calls)
-        sem = asyncio.Semaphore(max_concurrent)
+        # --- 併發送出 LLM 呼叫（各 batch 失敗時獨立重試）---
+        cache_stats = ResponseCacheStats()
 
-        async def _call_llm_with_sem(
-            task: Dict[str, Any],
-        ) -> tuple:
-            async with sem:
-                start_ts = time.perf_counter()
-                result = await self.llm_service.call_stage(
+        async def _call_llm(task: Dict[str, Any]) -> tuple:
+            start_ts = time.perf_counter()
+            result = await self._call_stage_cached(
+                stage="testcase",
+                prompt=task["prompt"],
+                cache_stats=cache_stats,
+                bypass_cache=request.bypass_cache,
+                invoke=lambda: self.llm_service.call_stage(
                     stage="testcase",
                     prompt=task["prompt"],
                     max_tokens=task["max_tokens"],
-                )
-                duration_ms = int((time.perf_counter() - start_ts) * 1000)
-            return result, duration_ms
+                ),
+            )
+            return result, int((time.perf_counter() - start_ts) * 1000)
 
-        llm_results = await asyncio.gather(
-            *[_call_llm_with_sem(task) for task in llm_tasks],
-            return_exceptions=True,
+        outcomes = await self._run_batches_with_retry(
+            llm_tasks,
+            call_batch=_call_llm,
+            max_concurrent=self.settings.ai.qa_ai_helper.max_concurrent_llm_calls,
         )
 
         # --- 處理結果 ---
-        for task, result_tuple in zip(llm_tasks, llm_results):
-            if isinstance(result_tuple, Exception):
-                raise result_tuple
-            llm_result, duration_ms = result_tuple
+        for task, outcome in zip(llm_tasks, outcomes):
+            if outcome["status"] == "failed":
+                raise outcome["error"]
+            llm_result, duration_ms = outcome["result"]
             model_name = llm_result.model_name or model_name
             telemetry_records.append(
                 {
@@ -5748,6 +6299,7 @@ class QAAIHelperService:
                     "payload": {
                         "section_id": task["section_id"],
                         "batch_size": len(task["batch"].get("generation_items", [])),
+                        "cache_hit": llm_result.cache_hit,
                     },
                 }
             )
@@ -5768,6 +6320,8 @@ class QAAIHelperService:
                 selected_references=task["section_references"],
             )
             all_merged_drafts.extend(merged_batch)
+        if self.response_cache.enabled:
+            telemetry_records.append(self._response_cache_telemetry_record("testcase", cache_stats))
 
         expected_generation_items = [
             item
@@ -6083,6 +6637,8 @@ class QAAIHelperService:
         session_id: int,
         draft_set_id: int,
     ) -> QAAIHelperCommitResponse:
+        knowledge_entities: List[Dict[str, Any]] = []
+
         def _commit(sync_db: Session) -> QAAIHelperCommitResponse:
             session = (
                 sync_db.query(QAAIHelperSession)
@@ -6122,58 +6678,77 @@ class QAAIHelperService:
                 set_id=target_set.id,
                 ticket_key=session.ticket_key or "",
             )
-            created_count = 0
-            updated_count = 0
+            prepared: List[tuple] = []
             for draft in draft_set.drafts:
                 body = json_storage_loads(draft.body_json, {})
                 trace = json_storage_loads(draft.trace_json, {})
                 section_name = f"{trace.get('section_id', '')} {trace.get('scenario_title', 'Generated')}".strip()
-                section = self._ensure_commit_section_sync(
-                    sync_db,
-                    set_id=target_set.id,
-                    parent_section_id=root_section.id,
-                    name=section_name,
+                prepared.append((draft, body, section_name))
+            section_ids = self._ensure_commit_sections_bulk_sync(
+                sync_db,
+                set_id=target_set.id,
+                parent_section_id=root_section.id,
+                names=[section_name for _, _, section_name in prepared],
+            )
+            existing_ids = self._test_case_ids_by_number_sync(
+                sync_db,
+                team_id=team_id,
+                numbers=[draft.testcase_id for draft, _, _ in prepared],
+            )
+
+            # 同一編號在 draft set 內出現多次時，以最後一筆為準並計為更新
+            now = _now()
+            insert_rows: Dict[str, Dict[str, Any]] = {}
+            update_rows: Dict[str, Dict[str, Any]] = {}
+            created_count = 0
+            updated_count = 0
+            for draft, body, section_name in prepared:
+                number = draft.testcase_id
+                row = self._commit_case_fields(body, ticket_key=session.ticket_key)
+                row.update(
+                    {
+                        "test_case_set_id": target_set.id,
+                        "test_case_section_id": section_ids[(section_name or "Generated").strip()[:100]],
+                        "updated_at": now,
+                    }
                 )
-                existing_case = (
-                    sync_db.query(TestCaseLocal)
-                    .filter(
-                        TestCaseLocal.team_id == team_id,
-                        TestCaseLocal.test_case_number == draft.testcase_id,
-                    )
-                    .first()
+                if number in existing_ids:
+                    if not row["title"]:
+                        row.pop("title")
+                    update_rows[number] = {"id": existing_ids[number], **row}
+                    updated_count += 1
+                    continue
+                row.update(
+                    {
+                        "team_id": team_id,
+                        "test_case_number": number,
+                        "title": row["title"] or number,
+                        "created_at": now,
+                    }
                 )
-                if existing_case is None:
-                    existing_case = TestCaseLocal(
-                        team_id=team_id,
-                        test_case_set_id=target_set.id,
-                        test_case_section_id=section.id,
-                        test_case_number=draft.testcase_id,
-                        title=body.get("title") or draft.testcase_id,
-                        priority=_priority_from_text(body.get("priority") or "Medium"),
-                        precondition=_join_lines(body.get("preconditions") or []),
-                        steps=_join_lines(body.get("steps") or [], numbered=True),
-                        expected_result=_join_lines(body.get("expected_results") or []),
-                        tcg_json=json_compact_dumps_nullable([session.ticket_key] if session.ticket_key else []),
-                        sync_status=SyncStatus.SYNCED,
-                        created_at=_now(),
-                        updated_at=_now(),
-                    )
-                    sync_db.add(existing_case)
-                    created_count += 1
-                else:
-                    existing_case.test_case_set_id = target_set.id
-                    existing_case.test_case_section_id = section.id
-                    existing_case.title = body.get("title") or existing_case.title
-                    existing_case.priority = _priority_from_text(body.get("priority") or "Medium")
-                    existing_case.precondition = _join_lines(body.get("preconditions") or [])
-                    existing_case.steps = _join_lines(body.get("steps") or [], numbered=True)
-                    existing_case.expected_result = _join_lines(body.get("expected_results") or [])
-                    existing_case.tcg_json = json_compact_dumps_nullable(
-                        [session.ticket_key] if session.ticket_key else []
-                    )
-                    existing_case.sync_status = SyncStatus.SYNCED
-                    existing_case.updated_at = _now()
+                if number in insert_rows:
                     updated_count += 1
+                else:
+                    created_count += 1
+                insert_rows[number] = row
+            if update_rows:
+                # 缺 title 的列不更新 title；依欄位組合分組，確保每次 executemany 的參數一致
+                for has_title in (True, False):
+                    group = [row for row in update_rows.values() if ("title" in row) is has_title]
+                    if group:
+                        sync_db.execute(update(TestCaseLocal), group)
+            if insert_rows:
+                sync_db.execute(insert(TestCaseLocal), list(insert_rows.values()))
+            case_ids = {
+                **{number: row["id"] for number, row in update_rows.items()},
+                **self._test_case_ids_by_number_sync(sync_db, team_id=team_id, numbers=list(insert_rows)),
+            }
+            knowledge_entities.clear()
+            for number, row in list(update_rows.items()) + list(insert_rows.items()):
+                entity_row = {"team_id": team_id, "test_case_number": number, **row}
+                knowledge_entities.append(
+                    self._knowledge_entity_from_case_row(entity_row, test_case_id=case_ids[number])
+                )
             draft_set.status = QAAIHelperDraftSetStatus.COMMITTED.value
             draft_set.committed_at = _now()
             draft_set.updated_at = _now()
@@ -6186,4 +6761,7 @@ class QAAIHelperService:
                 committed_draft_set_id=draft_set.id,
             )
 
-        return await self._run_write(_commit)
+        result = await self._run_write(_commit)
+        invalidate_qa_ai_helper_stats_cache()
+        await enqueue_test_case_batch_sync(f"qa_ai_helper_legacy_commit:{draft_set_id}", knowledge_entities)
+        return result
@@ -0,0 +1,400 @@
+"""QA AI Helper 使用量每日 rollup 與團隊統計回應快取。
+
+團隊統計的 overview / adoption 需要依團隊、日期、使用者彙總 session 與 seed / testcase 產出。
+逐筆載入區間內所有 session、set 與 item 再於 Python 加總，90 天 × 多團隊時會掃描並持有大量資料列，因此：
+
+- 以 grouped SQL 依 (session 建立日, team, user) 彙總，資料庫只回傳彙總列；
+- 已過去的完整日期寫入 ``qa_ai_helper_usage_daily_rollups``，之後直接讀 rollup。每日以
+  「session 數 + max(updated_at)」作為來源指紋，session 有異動或被刪除時指紋不符即重算該日；
+- 今日與區間頭尾不完整的日期一律即時彙總；rollup 重算失敗時該日也退回即時彙總；
+- 統計端點的回應快取為有界 LRU（含 TTL），session commit 後清除（僅限本 worker，其他 worker 依 TTL 過期）。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.db_access.main import MainAccessBoundary
+from app.models.database_models import (
+    QAAIHelperCommitLink,
+    QAAIHelperSeedItem,
+    QAAIHelperSeedSet,
+    QAAIHelperSession,
+    QAAIHelperTestcaseDraft,
+    QAAIHelperTestcaseDraftSet,
+    QAAIHelperUsageDailyRollup,
+)
+
+logger = logging.getLogger(__name__)
+
+_ONE_DAY = timedelta(days=1)
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+@dataclass
+class UsageTotals:
+    session_count: int = 0
+    completed_session_count: int = 0
+    failed_session_count: int = 0
+    # 至少產生過 seed set 或 testcase draft set 的 session 數（adoption 的 sample / session_count）
+    output_session_count: int = 0
+    generated_seed_count: int = 0
+    included_seed_count: int = 0
+    generated_tc_count: int = 0
+    selected_tc_count: int = 0
+    committed_tc_count: int = 0
+    # seed item 與 testcase draft 合計（user edit rate / AI generated ratio）
+    item_count: int = 0
+    ai_item_count: int = 0
+    edited_item_count: int = 0
+
+    def add(self, other: "UsageTotals") -> None:
+        for name in USAGE_METRICS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+USAGE_METRICS: Tuple[str, ...] = tuple(item.name for item in fields(UsageTotals))
+
+
+@dataclass
+class UsageRow:
+    stat_date: date
+    team_id: int
+    user_id: Optional[int]
+    totals: UsageTotals = field(default_factory=UsageTotals)
+    source_updated_at: Optional[datetime] = None
+
+
+def summarize_usage(
+    rows: Iterable[UsageRow],
+    key: Optional[Callable[[UsageRow], Hashable]] = None,
+) -> Dict[Hashable, UsageTotals]:
+    """依 ``key`` 分組加總；未給 key 時回傳 ``{None: 全部合計}``。"""
+    grouped: Dict[Hashable, UsageTotals] = defaultdict(UsageTotals)
+    for row in rows:
+        grouped[key(row) if key else None].add(row.totals)
+    return dict(grouped)
+
+
+# ---------------------------------------------------------------------------
+# grouped SQL 彙總
+# ---------------------------------------------------------------------------
+
+
+def _to_date(value: Any) -> date:
+    # SQLite 的 date() 回傳字串，PostgreSQL / MySQL 回傳 date
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _session_conditions(start: datetime, end: datetime, team_ids: Sequence[int]) -> list:
+    conditions = [QAAIHelperSession.created_at >= start, QAAIHelperSession.created_at < end]
+    if team_ids:
+        conditions.append(QAAIHelperSession.team_id.in_(list(team_ids)))
+    return conditions
+
+
+def _sum_flag(column) -> Any:
+    return func.sum(case((column, 1), else_=0))
+
+
+def aggregate_usage_sync(
+    sync_db: Session,
+    *,
+    start: datetime,
+    end: datetime,
+    team_ids: Sequence[int] = (),
+) -> Dict[Tuple[date, int, Optional[int]], UsageRow]:
+    """即時彙總 ``[start, end)`` 內建立的 session，依 (建立日, team, user) 分組。"""
+    day = func.date(QAAIHelperSession.created_at)
+    group_keys = (day, QAAIHelperSession.team_id, QAAIHelperSession.created_by_user_id)
+    conditions = _session_conditions(start, end, team_ids)
+    rows: Dict[Tuple[date, int, Optional[int]], UsageRow] = {}
+
+    def _row(raw_day: Any, team_id: int, user_id: Optional[int]) -> UsageRow:
+        key = (_to_date(raw_day), int(team_id), int(user_id) if user_id is not None else None)
+        if key not in rows:
+            rows[key] = UsageRow(stat_date=key[0], team_id=key[1], user_id=key[2])
+        return rows[key]
+
+    def _grouped(*columns: Any, join: Sequence[Tuple[Any, Any]] = (), extra: Sequence[Any] = ()):
+        stmt = select(*group_keys, *columns).select_from(QAAIHelperSession)
+        for target, onclause in join:
+            stmt = stmt.join(target, onclause)
+        return sync_db.execute(stmt.where(*conditions, *extra).group_by(*group_keys)).all()
+
+    for raw_day, team_id, user_id, total, completed, failed, latest in _grouped(
+        func.count(QAAIHelperSession.id),
+        _sum_flag(QAAIHelperSession.status == "completed"),
+        _sum_flag(QAAIHelperSession.status == "failed"),
+        func.max(QAAIHelperSession.updated_at),
+    ):
+        row = _row(raw_day, team_id, user_id)
+        row.totals.session_count = int(total or 0)
+        row.totals.completed_session_count = int(completed or 0)
+        row.totals.failed_session_count = int(failed or 0)
+        row.source_updated_at = latest
+
+    has_output = or_(
+        exists().where(QAAIHelperSeedSet.session_id == QAAIHelperSession.id),
+        exists().where(QAAIHelperTestcaseDraftSet.session_id == QAAIHelperSession.id),
+    )
+    for raw_day, team_id, user_id, count in _grouped(func.count(QAAIHelperSession.id), extra=[has_output]):
+        _row(raw_day, team_id, user_id).totals.output_session_count = int(count or 0)
+
+    for raw_day, team_id, user_id, generated, included in _grouped(
+        func.sum(QAAIHelperSeedSet.generated_seed_count),
+        func.sum(QAAIHelperSeedSet.included_seed_count),
+        join=[(QAAIHelperSeedSet, QAAIHelperSeedSet.session_id == QAAIHelperSession.id)],
+    ):
+        totals = _row(raw_day, team_id, user_id).totals
+        totals.generated_seed_count = int(generated or 0)
+        totals.included_seed_count = int(included or 0)
+
+    for raw_day, team_id, user_id, generated, selected in _grouped(
+        func.sum(QAAIHelperTestcaseDraftSet.generated_testcase_count),
+        func.sum(QAAIHelperTestcaseDraftSet.selected_for_commit_count),
+        join=[(QAAIHelperTestcaseDraftSet, QAAIHelperTestcaseDraftSet.session_id == QAAIHelperSession.id)],
+    ):
+        totals = _row(raw_day, team_id, user_id).totals
+        totals.generated_tc_count = int(generated or 0)
+        totals.selected_tc_count = int(selected or 0)
+
+    for raw_day, team_id, user_id, count in _grouped(
+        func.count(QAAIHelperCommitLink.id),
+        join=[(QAAIHelperCommitLink, QAAIHelperCommitLink.session_id == QAAIHelperSession.id)],
+    ):
+        _row(raw_day, team_id, user_id).totals.committed_tc_count = int(count or 0)
+
+    item_sources = (
+        (
+            QAAIHelperSeedItem,
+            [
+                (QAAIHelperSeedSet, QAAIHelperSeedSet.session_id == QAAIHelperSession.id),
+                (QAAIHelperSeedItem, QAAIHelperSeedItem.seed_set_id == QAAIHelperSeedSet.id),
+            ],
+        ),
+        (
+            QAAIHelperTestcaseDraft,
+            [
+                (QAAIHelperTestcaseDraftSet, QAAIHelperTestcaseDraftSet.session_id == QAAIHelperSession.id),
+                (
+                    QAAIHelperTestcaseDraft,
+                    QAAIHelperTestcaseDraft.testcase_draft_set_id == QAAIHelperTestcaseDraftSet.id,
+                ),
+            ],
+        ),
+    )
+    for model, join in item_sources:
+        for raw_day, team_id, user_id, count, ai_count, edited_count in _grouped(
+            func.count(model.id),
+            _sum_flag(model.is_ai_generated),
+            _sum_flag(model.user_edited),
+            join=join,
+        ):
+            totals = _row(raw_day, team_id, user_id).totals
+            totals.item_count += int(count or 0)
+            totals.ai_item_count += int(ai_count or 0)
+            totals.edited_item_count += int(edited_count or 0)
+
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# 每日 rollup
+# ---------------------------------------------------------------------------
+
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, dt_time.min)
+    return start, start + _ONE_DAY
+
+
+def _complete_days(start: datetime, end: datetime, *, today: date) -> List[date]:
+    """``[start, end)`` 完整涵蓋、且早於今日的日期。"""
+    first = start.date() if start.time() == dt_time.min else start.date() + _ONE_DAY
+    last = min(end.date() - _ONE_DAY, today - _ONE_DAY)
+    days: List[date] = []
+    cursor = first
+    while cursor <= last:
+        days.append(cursor)
+        cursor += _ONE_DAY
+    return days
+
+
+def _live_intervals(start: datetime, end: datetime, served_days: Sequence[date]) -> Iterator[Tuple[datetime, datetime]]:
+    cursor = start
+    for day in sorted(served_days):
+        day_start, day_end = _day_bounds(day)
+        if day_start > cursor:
+            yield cursor, day_start
+        cursor = max(cursor, day_end)
+    if cursor < end:
+        yield cursor, end
+
+
+def _stale_days_sync(sync_db: Session, days: Sequence[date], team_ids: Sequence[int]) -> List[date]:
+    range_start, _ = _day_bounds(days[0])
+    _, range_end = _day_bounds(days[-1])
+    day = func.date(QAAIHelperSession.created_at)
+    live = {
+        _to_date(raw_day): (int(count or 0), latest)
+        for raw_day, count, latest in sync_db.execute(
+            select(day, func.count(QAAIHelperSession.id), func.max(QAAIHelperSession.updated_at))
+            .where(*_session_conditions(range_start, range_end, team_ids))
+            .group_by(day)
+        )
+    }
+    rollup_stmt = (
+        select(
+            QAAIHelperUsageDailyRollup.stat_date,
+            func.sum(QAAIHelperUsageDailyRollup.session_count),
+            func.max(QAAIHelperUsageDailyRollup.source_updated_at),
+        )
+        .where(QAAIHelperUsageDailyRollup.stat_date.in_(list(days)))
+        .group_by(QAAIHelperUsageDailyRollup.stat_date)
+    )
+    if team_ids:
+        rollup_stmt = rollup_stmt.where(QAAIHelperUsageDailyRollup.team_id.in_(list(team_ids)))
+    stored = {
+        _to_date(raw_day): (int(count or 0), latest) for raw_day, count, latest in sync_db.execute(rollup_stmt)
+    }
+    return [day_value for day_value in days if live.get(day_value) != stored.get(day_value)]
+
+
+def refresh_daily_rollups_sync(sync_db: Session, days: Iterable[date]) -> None:
+    """重算指定日期（全部團隊）的 rollup；先刪後寫，整批在同一交易內。"""
+    refreshed_at = _now()
+    for day in sorted(set(days)):
+        day_start, day_end = _day_bounds(day)
+        sync_db.execute(delete(QAAIHelperUsageDailyRollup).where(QAAIHelperUsageDailyRollup.stat_date == day))
+        sync_db.add_all(
+            [
+                QAAIHelperUsageDailyRollup(
+                    stat_date=row.stat_date,
+                    team_id=row.team_id,
+                    # user_id 屬唯一鍵的一部分，建立者已刪除的 session 以 0 表示
+                    user_id=row.user_id or 0,
+                    source_updated_at=row.source_updated_at,
+                    refreshed_at=refreshed_at,
+                    **{name: getattr(row.totals, name) for name in USAGE_METRICS},
+                )
+                for row in aggregate_usage_sync(sync_db, start=day_start, end=day_end).values()
+            ]
+        )
+    sync_db.flush()
+
+
+def _read_rollups_sync(sync_db: Session, days: Sequence[date], team_ids: Sequence[int]) -> List[UsageRow]:
+    stmt = select(QAAIHelperUsageDailyRollup).where(QAAIHelperUsageDailyRollup.stat_date.in_(list(days)))
+    if team_ids:
+        stmt = stmt.where(QAAIHelperUsageDailyRollup.team_id.in_(list(team_ids)))
+    return [
+        UsageRow(
+            stat_date=_to_date(record.stat_date),
+            team_id=int(record.team_id),
+            user_id=int(record.user_id) or None,
+            totals=UsageTotals(**{name: int(getattr(record, name) or 0) for name in USAGE_METRICS}),
+            source_updated_at=record.source_updated_at,
+        )
+        for record in sync_db.execute(stmt).scalars()
+    ]
+
+
+async def load_daily_usage(
+    main_boundary: MainAccessBoundary,
+    *,
+    start_dt: datetime,
+    end_dt: datetime,
+    team_ids: Sequence[int] = (),
+) -> List[UsageRow]:
+    """回傳 ``[start_dt, end_dt]`` 內建立之 session 的每日彙總列（完整過去日期讀 rollup，其餘即時彙總）。"""
+    start = _to_naive_utc(start_dt)
+    end = _to_naive_utc(end_dt) + timedelta(microseconds=1)
+    rollup_days = _complete_days(start, end, today=_now().date())
+
+    served_days = list(rollup_days)
+    if rollup_days:
+        stale_days = await main_boundary.run_sync_read(
+            lambda sync_db: _stale_days_sync(sync_db, rollup_days, team_ids)
+        )
+        if stale_days:
+            try:
+                await main_boundary.run_sync_write(lambda sync_db: refresh_daily_rollups_sync(sync_db, stale_days))
+            except Exception:  # noqa: BLE001
+                # 併發重算或寫入失敗時，該批日期改走即時彙總，不影響統計結果
+                logger.warning("qa_ai_helper usage rollup refresh failed: days=%d", len(stale_days), exc_info=True)
+                served_days = [day for day in rollup_days if day not in set(stale_days)]
+
+    def _read(sync_db: Session) -> List[UsageRow]:
+        rows = _read_rollups_sync(sync_db, served_days, team_ids) if served_days else []
+        for interval_start, interval_end in _live_intervals(start, end, served_days):
+            rows.extend(
+                aggregate_usage_sync(sync_db, start=interval_start, end=interval_end, team_ids=team_ids).values()
+            )
+        return rows
+
+    return await main_boundary.run_sync_read(_read)
+
+
+# ---------------------------------------------------------------------------
+# 統計回應快取
+# ---------------------------------------------------------------------------
+
+
+class StatsResponseCache:
+    """有界 LRU + TTL 的統計回應快取（per-worker）。"""
+
+    def __init__(self, *, max_entries: int = 256, ttl_seconds: float = 60.0) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.ttl_seconds:
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+qa_ai_helper_stats_cache = StatsResponseCache()
+
+
+def invalidate_qa_ai_helper_stats_cache() -> None:
+    qa_ai_helper_stats_cache.clear()
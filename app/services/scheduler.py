@@ -1,27 +1,48 @@
-"""定時任務管理器。"""
+"""定時任務管理器。
+
+排程主循環是跑在 app event loop 上的 asyncio task（不再另開 thread 逐一阻塞執行），到期的任務
+各自成為獨立 task 並行執行；單一任務的並行上限、逾時與啟動 jitter 由
+``SchedulableServiceDefinition`` 設定。
+
+排程器在每個 worker 上都會運作：任務執行前先取得該任務的 ``job_lock`` 並確認 DB 中的
+``next_run_at`` 仍是這次到期的時段，才算認領成功，因此同一時段只會有一個 worker 執行。
+jitter 讓各 worker 不會在同一瞬間搶鎖與打 DB。
+
+逾時以取消 coroutine 實作，只能中止 event loop 上的工作；主要工作跑在 worker thread 的任務
+（``asyncio.to_thread``）無法被中止，這類任務設 ``cancel_on_timeout=False``：逾時只記錄，
+並持續持有任務鎖直到 thread 真正結束，下一次執行不會與之重疊。
+"""
 
 from __future__ import annotations
 
 import asyncio
 import inspect
 import logging
+import random
 import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime, time as dt_time, timedelta
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db_access.main import MainAccessBoundary, get_main_access_boundary
 from app.models.database_models import ScheduledService
+from app.runtime_locks import BackgroundLeaderLock, job_lock
 from app.services.lark_org_sync_service import get_lark_org_sync_service
 
 LOGGER = logging.getLogger(__name__)
 DEFAULT_SCHEDULE_TYPE = "daily"
 DEFAULT_SERVICE_TIME = "02:00"
 RECOVERY_STATUS = "interrupted"
+TIMEOUT_STATUS = "timeout"
+# 主循環最長睡眠秒數；排程設定變更會立即喚醒
+SCHEDULER_MAX_SLEEP_SECONDS = 60
+# 內建任務的啟動 jitter 上限（秒），分散多個 worker 同時認領
+DEFAULT_JOB_JITTER_SECONDS = 30.0
+_SCHEDULE_PERIODS = {DEFAULT_SCHEDULE_TYPE: timedelta(days=1)}
 
 
 @dataclass(frozen=True)
@@ -32,6 +53,34 @@ class SchedulableServiceDefinition:
     schedule_type: str
     default_run_at_time: str
     runner: Callable[[], Any]
+    # 排程派發時同一任務在本行程內的並行上限；超過時本次略過並計入 skipped_overlap。
+    # 手動 trigger_task 直接執行，不經過此檢查與 job_lock
+    max_concurrency: int = 1
+    timeout_seconds: Optional[float] = None
+    # False：runner 在 worker thread 執行，取消無效；逾時只記錄並等待執行結束（期間持續持有任務鎖）
+    cancel_on_timeout: bool = True
+    jitter_seconds: float = 0.0
+    # True：跨 worker 以 job_lock 認領，同一時段只執行一次；False：每個 worker 各自執行
+    exclusive: bool = True
+
+
+def _new_job_metrics() -> dict[str, Any]:
+    return {
+        "runs": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "timed_out": 0,
+        "running": 0,
+        "skipped_overlap": 0,
+        "skipped_claimed_elsewhere": 0,
+        "missed_runs": 0,
+        "last_lag_seconds": None,
+        "max_lag_seconds": 0.0,
+        "last_duration_seconds": None,
+        "max_duration_seconds": 0.0,
+        "total_duration_seconds": 0.0,
+        "last_outcome": None,
+    }
 
 
 class TaskScheduler:
@@ -44,6 +93,13 @@ class TaskScheduler:
         self.scheduler_thread: threading.Thread | None = None
         self._runtime_loop: asyncio.AbstractEventLoop | None = None
         self._runtime_loop_thread_id: int | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._job_tasks: dict[str, set[asyncio.Task]] = {}
+        self._job_locks: dict[str, BackgroundLeaderLock] = {}
+        self._job_lock_holders: dict[str, int] = {}
+        self._dispatched_slots: dict[str, datetime] = {}
+        self._job_metrics: dict[str, dict[str, Any]] = {}
         self.tasks: dict[str, dict[str, Any]] = {}
         self.service_registry: dict[str, SchedulableServiceDefinition] = {
             "lark_org_sync": SchedulableServiceDefinition(
@@ -53,6 +109,8 @@ class TaskScheduler:
                 schedule_type=DEFAULT_SCHEDULE_TYPE,
                 default_run_at_time=DEFAULT_SERVICE_TIME,
                 runner=self._run_lark_org_sync,
+                timeout_seconds=3600,
+                jitter_seconds=DEFAULT_JOB_JITTER_SECONDS,
             ),
             "audit_cleanup": SchedulableServiceDefinition(
                 service_key="audit_cleanup",
@@ -61,30 +119,82 @@ class TaskScheduler:
                 schedule_type=DEFAULT_SCHEDULE_TYPE,
                 default_run_at_time="03:00",
                 runner=self._run_audit_cleanup,
+                timeout_seconds=1800,
+                jitter_seconds=DEFAULT_JOB_JITTER_SECONDS,
+            ),
+            "external_read_counts_reconcile": SchedulableServiceDefinition(
+                service_key="external_read_counts_reconcile",
+                display_name="外部讀取計數校正",
+                description="重新計算 external_read_counts 快取，修正非 ORM 寫入造成的計數漂移。",
+                schedule_type=DEFAULT_SCHEDULE_TYPE,
+                default_run_at_time="04:00",
+                runner=self._run_external_read_counts_reconcile,
+                timeout_seconds=1800,
+                jitter_seconds=DEFAULT_JOB_JITTER_SECONDS,
+            ),
+            "database_backup": SchedulableServiceDefinition(
+                service_key="database_backup",
+                display_name="資料庫備份",
+                description="以線上備份建立完整快照，兩次完整備份之間只保存增量（SQLite 變動 page、append-only 資料列）。",
+                schedule_type=DEFAULT_SCHEDULE_TYPE,
+                default_run_at_time="01:30",
+                runner=self._run_database_backup,
+                timeout_seconds=6 * 3600,
+                # 備份在 asyncio.to_thread 中執行，逾時取消不會停止 thread
+                cancel_on_timeout=False,
+                jitter_seconds=DEFAULT_JOB_JITTER_SECONDS,
             ),
         }
 
     async def initialize(self) -> None:
-        """在啟動時載入排程設定並回收殘留狀態。"""
+        """在啟動時載入排程設定，並回收沒有任何 worker 持有任務鎖的殘留執行狀態。"""
         self._bind_runtime_loop()
-        await self._refresh_from_database_async(recover_running=True)
+        await self._refresh_from_database_async(recover_running=False)
+        stale_keys = [key for key, task in self.tasks.items() if task.get("is_running")]
+        if not stale_keys:
+            return
+
+        acquired: list[str] = []
+        try:
+            for service_key in stale_keys:
+                # 取得得到鎖代表沒有其他 worker 正在執行，is_running 是上次行程中斷留下的
+                if await asyncio.to_thread(self._get_job_lock(service_key).try_acquire):
+                    acquired.append(service_key)
+            if acquired:
+                await self._refresh_from_database_async(recover_running=True, recoverable=set(acquired))
+        finally:
+            for service_key in acquired:
+                await asyncio.to_thread(self._get_job_lock(service_key).release)
 
     def start(self):
-        """啟動調度器。"""
+        """啟動調度器：有執行中的 event loop 時以 asyncio task 運作，否則開一個專用 loop thread。"""
         if self.running:
             return
 
         self._bind_runtime_loop()
-
         self.running = True
 
-        self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
-        self.scheduler_thread.start()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._loop_task = loop.create_task(self._scheduler_loop(), name="task-scheduler")
+        else:
+            self.scheduler_thread = threading.Thread(
+                target=lambda: asyncio.run(self._scheduler_loop()),
+                name="task-scheduler",
+                daemon=True,
+            )
+            self.scheduler_thread.start()
         self.logger.info("定時任務調度器已啟動")
 
     def stop(self):
-        """停止調度器。"""
+        """停止調度器主循環（執行中的任務不中斷，由 ``shutdown`` 取消）。"""
         self.running = False
+        self._wake()
+        if self._loop_task is not None and not self._loop_task.done():
+            self._loop_task.cancel()
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             if self._runtime_loop_thread_id == threading.get_ident():
                 self.logger.info("略過在 runtime event loop 執行緒上等待 scheduler thread 結束")
@@ -92,6 +202,19 @@ class TaskScheduler:
                 self.scheduler_thread.join(timeout=5)
         self.logger.info("定時任務調度器已停止")
 
+    async def shutdown(self, timeout: float = 5.0) -> None:
+        """停止主循環並取消執行中的任務；被取消的任務於下次啟動時回收為 interrupted。"""
+        self.stop()
+        pending = [task for tasks in self._job_tasks.values() for task in tasks if not task.done()]
+        if self._loop_task is not None:
+            pending.append(self._loop_task)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        self._loop_task = None
+        self._wakeup = None
+
     async def list_services(self) -> list[dict[str, Any]]:
         """回傳所有可排程服務與目前狀態。"""
         self._bind_runtime_loop()
@@ -127,6 +250,7 @@ class TaskScheduler:
 
         payload = await self.main_boundary.run_write(_update)
         await self._refresh_from_database_async(recover_running=False)
+        self._wake()
         return payload
 
     def get_task_status(self) -> dict[str, Any]:
@@ -136,32 +260,195 @@ class TaskScheduler:
             "tasks": {task_key: self._snapshot_task(task) for task_key, task in self.tasks.items()},
         }
 
+    def metrics_snapshot(self) -> dict[str, Any]:
+        """各任務的執行次數、耗時、延遲（實際開始 - 排定時間）與錯過次數。"""
+        jobs: dict[str, dict[str, Any]] = {}
+        for service_key, definition in self.service_registry.items():
+            metrics = dict(self._job_metrics.get(service_key) or _new_job_metrics())
+            metrics["running"] = sum(1 for task in self._job_tasks.get(service_key, ()) if not task.done())
+            finished = metrics["succeeded"] + metrics["failed"] + metrics["timed_out"]
+            metrics["avg_duration_seconds"] = (
+                round(metrics["total_duration_seconds"] / finished, 3) if finished else None
+            )
+            metrics.update(
+                max_concurrency=definition.max_concurrency,
+                timeout_seconds=definition.timeout_seconds,
+                jitter_seconds=definition.jitter_seconds,
+                exclusive=definition.exclusive,
+                next_run=(
+                    self.tasks[service_key]["next_run"].isoformat()
+                    if self.tasks.get(service_key, {}).get("next_run")
+                    else None
+                ),
+            )
+            jobs[service_key] = metrics
+        return {
+            "scheduler_running": self.running,
+            "mode": "event_loop" if self._loop_task is not None else ("thread" if self.scheduler_thread else None),
+            "jobs": jobs,
+        }
+
     def trigger_task(self, task_name: str) -> bool:
-        """手動觸發任務執行。"""
+        """手動觸發任務執行（同步等待完成；不檢查 max_concurrency、不取得 job_lock）。"""
         task_info = self.tasks.get(task_name)
         if not task_info:
             return False
         self._execute_task(task_name, task_info)
         return True
 
-    def _scheduler_loop(self):
-        """調度主循環。"""
+    async def _scheduler_loop(self) -> None:
+        """調度主循環：派發到期任務後，睡到下一個到期時間（最長 SCHEDULER_MAX_SLEEP_SECONDS）。"""
+        self._wakeup = asyncio.Event()
         while self.running:
             try:
-                self._run_due_tasks()
-                time.sleep(60)
+                await self._refresh_from_database_async(recover_running=False)
+                self.dispatch_due_tasks()
+            except asyncio.CancelledError:
+                raise
             except Exception as exc:  # noqa: BLE001
                 self.logger.error("調度器循環異常: %s", exc, exc_info=True)
-                time.sleep(60)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_next_due())
+            except asyncio.TimeoutError:
+                pass
 
-    def _run_due_tasks(self, reference_time: datetime | None = None) -> None:
+    def _seconds_until_next_due(self) -> float:
+        now = self._current_local_time()
+        upcoming = [
+            task["next_run"]
+            for key, task in self.tasks.items()
+            if task.get("enabled") and task.get("next_run") and self._dispatched_slots.get(key) != task["next_run"]
+        ]
+        if not upcoming:
+            return float(SCHEDULER_MAX_SLEEP_SECONDS)
+        delay = (min(upcoming) - now).total_seconds()
+        return min(float(SCHEDULER_MAX_SLEEP_SECONDS), max(1.0, delay))
+
+    def _wake(self) -> None:
+        wakeup = self._wakeup
+        if wakeup is None:
+            return
+        runtime_loop = self._runtime_loop
+        cross_thread = self._runtime_loop_thread_id != threading.get_ident()
+        if runtime_loop is not None and runtime_loop.is_running() and cross_thread:
+            runtime_loop.call_soon_threadsafe(wakeup.set)
+        else:
+            wakeup.set()
+
+    def dispatch_due_tasks(self, reference_time: datetime | None = None) -> list[asyncio.Task]:
+        """把到期任務各自派發成 asyncio task（必須在 event loop 內呼叫），回傳本次派發的 task。"""
         current_time = reference_time or self._current_local_time()
+        dispatched: list[asyncio.Task] = []
         for task_name, task_info in list(self.tasks.items()):
-            if not task_info.get("enabled"):
-                continue
             next_run = task_info.get("next_run")
-            if next_run and current_time >= next_run and not task_info.get("is_running"):
-                self._execute_task(task_name, task_info)
+            if not task_info.get("enabled") or not next_run or current_time < next_run:
+                continue
+            if self._dispatched_slots.get(task_name) == next_run:
+                continue
+            self._dispatched_slots[task_name] = next_run
+            metrics = self._metrics_for(task_name)
+            definition = task_info["definition"]
+            if self._inflight_count(task_name) >= max(1, definition.max_concurrency):
+                metrics["skipped_overlap"] += 1
+                self.logger.warning("定時任務 %s 上一次執行尚未結束，略過 %s 這次排程", task_name, next_run)
+                continue
+            missed = self._count_missed_periods(definition, next_run, current_time)
+            if missed:
+                metrics["missed_runs"] += missed
+                self.logger.warning("定時任務 %s 錯過 %d 次排程（合併為一次執行）", task_name, missed)
+            dispatched.append(self._spawn_job(task_name, self._run_scheduled_job(task_name, next_run)))
+        return dispatched
+
+    def _run_due_tasks(self, reference_time: datetime | None = None) -> None:
+        """同步入口：派發到期任務並等待執行完畢（測試與無 event loop 的腳本使用）。"""
+
+        async def _dispatch_and_wait() -> None:
+            self._bind_runtime_loop()
+            tasks = self.dispatch_due_tasks(reference_time)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._run_coroutine_blocking(_dispatch_and_wait(), allow_running_loop=False)
+
+    def _spawn_job(self, task_name: str, coroutine: Any) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coroutine, name=f"scheduled-job:{task_name}")
+        inflight = self._job_tasks.setdefault(task_name, set())
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+        return task
+
+    def _inflight_count(self, task_name: str) -> int:
+        return sum(1 for task in self._job_tasks.get(task_name, ()) if not task.done())
+
+    def _count_missed_periods(self, definition: SchedulableServiceDefinition, slot: datetime, now: datetime) -> int:
+        period = _SCHEDULE_PERIODS.get(definition.schedule_type)
+        if period is None:
+            return 0
+        return max(0, int((now - slot) / period))
+
+    async def _run_scheduled_job(self, task_name: str, scheduled_for: datetime) -> Optional[str]:
+        """jitter → 認領（job_lock + DB 時段確認）→ 執行；回傳執行結果狀態，未認領則回 None。"""
+        definition = self._get_definition(task_name)
+        metrics = self._metrics_for(task_name)
+        if definition.jitter_seconds > 0:
+            await asyncio.sleep(random.uniform(0, definition.jitter_seconds))
+
+        if definition.exclusive and not await self._acquire_job_lock(task_name):
+            metrics["skipped_claimed_elsewhere"] += 1
+            self.logger.info("定時任務 %s 已由其他 worker 執行，本 worker 略過", task_name)
+            return None
+        try:
+            if definition.exclusive and not await self._claim_scheduled_run(task_name, scheduled_for):
+                metrics["skipped_claimed_elsewhere"] += 1
+                self.logger.info("定時任務 %s 的 %s 時段已由其他 worker 完成，本 worker 略過", task_name, scheduled_for)
+                return None
+            started = self._current_local_time()
+            lag = max(0.0, (started - scheduled_for).total_seconds())
+            metrics["last_lag_seconds"] = round(lag, 3)
+            metrics["max_lag_seconds"] = round(max(metrics["max_lag_seconds"], lag), 3)
+            return await self._execute_task_async(task_name, self.tasks.get(task_name) or {"definition": definition})
+        finally:
+            if definition.exclusive:
+                await self._release_job_lock(task_name)
+
+    async def _claim_scheduled_run(self, service_key: str, scheduled_for: datetime) -> bool:
+        """持有 job_lock 時確認 DB 的 next_run_at 仍停在這次時段（尚未被其他 worker 執行並推進）。"""
+        definition = self._get_definition(service_key)
+
+        async def _check(session: AsyncSession) -> bool:
+            record = await self._ensure_service_record(session, definition)
+            return bool(
+                record.enabled
+                and not record.is_running
+                and record.next_run_at is not None
+                and record.next_run_at <= scheduled_for
+            )
+
+        return await self.main_boundary.run_read(_check)
+
+    async def _acquire_job_lock(self, service_key: str) -> bool:
+        # 同一行程內同一任務的多個執行共用一把鎖，以計數決定何時真正釋放
+        holders = self._job_lock_holders.get(service_key, 0)
+        if holders == 0 and not await asyncio.to_thread(self._get_job_lock(service_key).try_acquire):
+            return False
+        self._job_lock_holders[service_key] = holders + 1
+        return True
+
+    async def _release_job_lock(self, service_key: str) -> None:
+        holders = self._job_lock_holders.get(service_key, 0) - 1
+        self._job_lock_holders[service_key] = max(0, holders)
+        if holders <= 0:
+            await asyncio.to_thread(self._get_job_lock(service_key).release)
+
+    def _get_job_lock(self, service_key: str) -> BackgroundLeaderLock:
+        lock = self._job_locks.get(service_key)
+        if lock is None:
+            lock = self._job_locks[service_key] = job_lock(service_key)
+        return lock
+
+    def _metrics_for(self, service_key: str) -> dict[str, Any]:
+        return self._job_metrics.setdefault(service_key, _new_job_metrics())
 
     def _execute_task(self, task_name: str, task_info: dict[str, Any]):
         """執行單個任務。"""
@@ -170,18 +457,22 @@ class TaskScheduler:
             allow_running_loop=False,
         )
 
-    async def _execute_task_async(self, task_name: str, task_info: dict[str, Any]) -> None:
-        """在綁定的 event loop 中執行單個任務。"""
+    async def _execute_task_async(self, task_name: str, task_info: dict[str, Any]) -> str:
+        """在綁定的 event loop 中執行單個任務；回傳 completed / failed / timeout。"""
         definition = task_info["definition"]
+        metrics = self._metrics_for(task_name)
         started_at = self._current_local_time()
+        started_clock = time.perf_counter()
+        outcome = "failed"
 
         try:
             self.logger.info("開始執行定時任務: %s", task_name)
             await self._mark_task_started(task_name, started_at)
 
             result = definition.runner()
+            overran = False
             if inspect.isawaitable(result):
-                result = await result
+                result, overran = await self._await_runner(task_name, definition, result)
             if not isinstance(result, dict):
                 result = {
                     "success": bool(result),
@@ -192,6 +483,11 @@ class TaskScheduler:
             success = bool(result.get("success", False))
             message = str(result.get("message") or "")
             last_error = None if success else (message or str(result.get("error") or ""))
+            outcome = "completed" if success else "failed"
+            if overran:
+                outcome = TIMEOUT_STATUS
+                message = f"執行超過逾時 {definition.timeout_seconds} 秒（無法中止，已等待執行結束）：{message}"
+                last_error = message
 
             await self._mark_task_finished(
                 task_name,
@@ -199,6 +495,7 @@ class TaskScheduler:
                 success=success,
                 message=message,
                 last_error=last_error,
+                status=TIMEOUT_STATUS if overran else None,
             )
 
             execution_seconds = (finished_at - started_at).total_seconds()
@@ -208,6 +505,18 @@ class TaskScheduler:
                 execution_seconds,
                 message or success,
             )
+        except asyncio.TimeoutError:
+            outcome = TIMEOUT_STATUS
+            message = f"執行逾時（超過 {definition.timeout_seconds} 秒），已中止"
+            self.logger.error("定時任務 %s %s", task_name, message)
+            await self._mark_task_finished(
+                task_name,
+                finished_at=self._current_local_time(),
+                success=False,
+                message=message,
+                last_error=message,
+                status=TIMEOUT_STATUS,
+            )
         except Exception as exc:  # noqa: BLE001
             self.logger.error("定時任務 %s 執行失敗: %s", task_name, exc, exc_info=True)
             await self._mark_task_finished(
@@ -217,15 +526,81 @@ class TaskScheduler:
                 message=str(exc),
                 last_error=str(exc),
             )
+        finally:
+            duration = time.perf_counter() - started_clock
+            metrics["runs"] += 1
+            metrics["last_outcome"] = outcome
+            metrics["last_duration_seconds"] = round(duration, 3)
+            metrics["max_duration_seconds"] = round(max(metrics["max_duration_seconds"], duration), 3)
+            metrics["total_duration_seconds"] = round(metrics["total_duration_seconds"] + duration, 3)
+            metrics[{"completed": "succeeded", TIMEOUT_STATUS: "timed_out"}.get(outcome, "failed")] += 1
+        return outcome
+
+    async def _await_runner(
+        self,
+        task_name: str,
+        definition: SchedulableServiceDefinition,
+        awaitable: Any,
+    ) -> tuple[Any, bool]:
+        """等待 runner 結果並套用逾時；回傳 (結果, 是否超時但無法中止)。
+
+        可取消的任務逾時時會取消並等取消完成才拋出 TimeoutError，確保任務鎖釋放時工作已停止。
+        """
+        work = asyncio.ensure_future(awaitable)
+        if not definition.timeout_seconds:
+            return await work, False
+        try:
+            return await asyncio.wait_for(asyncio.shield(work), timeout=definition.timeout_seconds), False
+        except asyncio.TimeoutError:
+            if definition.cancel_on_timeout:
+                work.cancel()
+                await asyncio.gather(work, return_exceptions=True)
+                raise
+            self.logger.error(
+                "定時任務 %s 超過逾時 %s 秒，但工作在 worker thread 執行無法中止；持續持有任務鎖等待結束",
+                task_name,
+                definition.timeout_seconds,
+            )
+            return await work, True
+        except asyncio.CancelledError:
+            work.cancel()
+            raise
 
-    async def _refresh_from_database_async(self, *, recover_running: bool) -> None:
+    async def _refresh_from_database_async(
+        self,
+        *,
+        recover_running: bool,
+        recoverable: set[str] | None = None,
+    ) -> None:
         definitions = list(self.service_registry.values())
 
+        if not recover_running:
+            # 主循環每個 tick 都會重新載入；紀錄齊全時只讀，避免每個 worker 週期性開寫入交易
+            async def _read(session: AsyncSession) -> Optional[list[dict[str, Any]]]:
+                result = await session.execute(
+                    select(ScheduledService).where(
+                        ScheduledService.service_key.in_([definition.service_key for definition in definitions])
+                    )
+                )
+                by_key = {record.service_key: record for record in result.scalars().all()}
+                if any(self._record_needs_sync(by_key.get(item.service_key), item) for item in definitions):
+                    return None
+                return [self._serialize_record(by_key[definition.service_key]) for definition in definitions]
+
+            records = await self.main_boundary.run_read(_read)
+            if records is not None:
+                self.tasks = {record["service_key"]: self._build_task_info(record) for record in records}
+                return
+
         async def _load(session: AsyncSession) -> list[dict[str, Any]]:
             payloads: list[dict[str, Any]] = []
             for definition in definitions:
                 record = await self._ensure_service_record(session, definition)
-                if recover_running and record.is_running:
+                if (
+                    recover_running
+                    and record.is_running
+                    and (recoverable is None or definition.service_key in recoverable)
+                ):
                     self._recover_stale_record(record)
                 payloads.append(self._serialize_record(record))
             await session.flush()
@@ -260,6 +635,7 @@ class TaskScheduler:
         success: bool,
         message: str,
         last_error: str | None,
+        status: str | None = None,
     ) -> None:
         definition = self._get_definition(service_key)
 
@@ -267,7 +643,7 @@ class TaskScheduler:
             record = await self._ensure_service_record(session, definition)
             record.is_running = False
             record.last_run_finished_at = finished_at
-            record.last_run_status = "completed" if success else "failed"
+            record.last_run_status = status or ("completed" if success else "failed")
             record.last_run_message = message or ("執行成功" if success else "執行失敗")
             record.last_error = last_error
             record.next_run_at = self._compute_next_run_at(
@@ -320,6 +696,25 @@ class TaskScheduler:
             "deleted_count": deleted,
         }
 
+    async def _run_external_read_counts_reconcile(self) -> dict[str, Any]:
+        """重新計算 MCP / app 讀取 API 使用的計數快取。"""
+        from app.services.external_read_counts import reconcile_external_read_counts
+
+        result = await self.main_boundary.run_sync_write(reconcile_external_read_counts)
+        return {
+            "success": True,
+            "message": (
+                f"外部讀取計數校正完成，新增 {result['inserted']} 筆、移除 {result['deleted']} 筆"
+            ),
+            **result,
+        }
+
+    async def _run_database_backup(self) -> dict[str, Any]:
+        """依 backup 設定備份各資料庫 target。"""
+        from app.services.database_backup_service import get_database_backup_service
+
+        return await get_database_backup_service().run_scheduled_backups()
+
     async def _ensure_service_record(
         self,
         session: AsyncSession,
@@ -359,6 +754,18 @@ class TaskScheduler:
             )
         return record
 
+    @staticmethod
+    def _record_needs_sync(record: Optional[ScheduledService], definition: SchedulableServiceDefinition) -> bool:
+        """紀錄不存在或與 definition 不一致（``_ensure_service_record`` 會改寫）時需走寫入路徑。"""
+        return (
+            record is None
+            or record.display_name != definition.display_name
+            or record.description != definition.description
+            or record.schedule_type != definition.schedule_type
+            or not record.run_at_time
+            or (bool(record.enabled) and record.next_run_at is None)
+        )
+
     def _recover_stale_record(self, record: ScheduledService) -> None:
         now = self._current_local_time()
         record.is_running = False
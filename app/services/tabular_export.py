@@ -0,0 +1,171 @@
+"""
+串流表格匯出引擎
+
+供 CSV / XLSX 匯出端點共用：
+- 以 ``AsyncSession.stream`` + ``yield_per`` 走 server-side cursor，分批讀取
+- 每批資料立即序列化並送出（CSV），不在記憶體累積整份檔案
+- XLSX 使用 openpyxl write-only workbook 寫入暫存檔後分段送出（openpyxl 為選用套件）
+- 每批之間檢查 client 是否已斷線，斷線即停止讀取並釋放連線
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import tempfile
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Sequence
+
+from sqlalchemy.sql import Select
+
+from ..db_access.core import ManagedAccessBoundary
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FETCH_CHUNK_SIZE = 500
+XLSX_READ_CHUNK_BYTES = 64 * 1024
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_MEDIA_TYPES = {
+    "csv": CSV_MEDIA_TYPE,
+    "xlsx": XLSX_MEDIA_TYPE,
+}
+
+RowBuilder = Callable[[Any], Sequence[Any]]
+DisconnectCheck = Callable[[], Awaitable[bool]]
+
+
+class ExportFormatUnavailableError(RuntimeError):
+    """請求的匯出格式在目前環境不可用（例如未安裝 openpyxl）"""
+
+
+def _load_openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        return None
+    return openpyxl
+
+
+def is_export_format_available(export_format: str) -> bool:
+    if export_format == "csv":
+        return True
+    if export_format == "xlsx":
+        return _load_openpyxl() is not None
+    return False
+
+
+async def iter_statement_chunks(
+    boundary: ManagedAccessBoundary,
+    statement: Select,
+    *,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[List[Any]]:
+    """以 server-side cursor 分批讀取查詢結果；generator 關閉時一併釋放 session"""
+    chunk_size = chunk_size or EXPORT_FETCH_CHUNK_SIZE
+    async with boundary.session_scope() as session:
+        result = await session.stream(statement.execution_options(yield_per=chunk_size))
+        try:
+            async for partition in result.partitions(chunk_size):
+                yield partition
+        finally:
+            await result.close()
+
+
+async def _client_gone(is_disconnected: Optional[DisconnectCheck]) -> bool:
+    if is_disconnected is None:
+        return False
+    try:
+        return await is_disconnected()
+    except Exception:  # noqa: BLE001
+        return False
+
+
+async def stream_csv(
+    columns: Sequence[str],
+    chunks: AsyncIterator[List[Any]],
+    row_builder: RowBuilder,
+    *,
+    is_disconnected: Optional[DisconnectCheck] = None,
+) -> AsyncIterator[bytes]:
+    """逐批輸出 CSV bytes；第一段只含 BOM + 表頭，讓 client 立即收到回應"""
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8-sig")
+
+    try:
+        async for chunk in chunks:
+            if await _client_gone(is_disconnected):
+                logger.info("匯出中止：client 已斷線")
+                return
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows(row_builder(row) for row in chunk)
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        await chunks.aclose()
+
+
+async def stream_xlsx(
+    columns: Sequence[str],
+    chunks: AsyncIterator[List[Any]],
+    row_builder: RowBuilder,
+    *,
+    sheet_title: str = "Export",
+    is_disconnected: Optional[DisconnectCheck] = None,
+) -> AsyncIterator[bytes]:
+    """以 write-only workbook 寫入暫存檔，完成後分段送出
+
+    XLSX 為 zip 容器，必須寫完才能產生目錄區，因此無法邊讀邊送；
+    write-only 模式讓記憶體維持常數，檔案內容落在暫存檔。
+    """
+    openpyxl = _load_openpyxl()
+    if openpyxl is None:
+        await chunks.aclose()
+        raise ExportFormatUnavailableError("XLSX 匯出需要安裝 openpyxl")
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31] or "Export")
+    sheet.append(list(columns))
+
+    try:
+        async for chunk in chunks:
+            if await _client_gone(is_disconnected):
+                logger.info("匯出中止：client 已斷線")
+                return
+            for row in chunk:
+                sheet.append(list(row_builder(row)))
+    finally:
+        await chunks.aclose()
+
+    with tempfile.TemporaryFile(suffix=".xlsx") as handle:
+        await asyncio.to_thread(workbook.save, handle)
+        handle.seek(0)
+        while True:
+            data = handle.read(XLSX_READ_CHUNK_BYTES)
+            if not data:
+                break
+            yield data
+
+
+def stream_tabular_export(
+    export_format: str,
+    columns: Sequence[str],
+    chunks: AsyncIterator[List[Any]],
+    row_builder: RowBuilder,
+    *,
+    sheet_title: str = "Export",
+    is_disconnected: Optional[DisconnectCheck] = None,
+) -> AsyncIterator[bytes]:
+    if export_format == "csv":
+        return stream_csv(columns, chunks, row_builder, is_disconnected=is_disconnected)
+    if export_format == "xlsx":
+        return stream_xlsx(
+            columns,
+            chunks,
+            row_builder,
+            sheet_title=sheet_title,
+            is_disconnected=is_disconnected,
+        )
+    raise ValueError(f"不支援的匯出格式: {export_format}")
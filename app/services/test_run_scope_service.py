@@ -2,13 +2,14 @@ import hashlib
 import json
 from typing import Dict, Iterable, List, Optional
 
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
 from ..models.database_models import (
     TestCaseLocal as TestCaseLocalDB,
     TestCaseSet as TestCaseSetDB,
     TestRunConfig as TestRunConfigDB,
+    TestRunConfigScope as TestRunConfigScopeDB,
     TestRunItem as TestRunItemDB,
     TestRunItemResultHistory as TestRunItemResultHistoryDB,
     Team as TeamDB,
@@ -46,15 +47,14 @@ class TestRunScopeService:
         return query.order_by(TestRunConfigDB.id.asc()).with_for_update().all()
 
     @staticmethod
-    def _stable_row_payload(row) -> dict:
+    def _stable_mapping_payload(mapping) -> dict:
         payload = {}
-        for column in row.__table__.columns:
-            value = getattr(row, column.name)
+        for key, value in mapping.items():
             if hasattr(value, "value"):
                 value = value.value
             elif hasattr(value, "isoformat"):
                 value = value.isoformat()
-            payload[column.name] = value
+            payload[key] = value
         return payload
 
     @staticmethod
@@ -139,6 +139,50 @@ class TestRunScopeService:
     def set_config_scope_ids(cls, config: TestRunConfigDB, scope_ids: Iterable[int]) -> None:
         config.test_case_set_ids_json = cls.dump_scope_ids_json(scope_ids)
 
+    @classmethod
+    def get_scope_ids_for_configs(
+        cls,
+        db: Session,
+        config_ids: Iterable[int],
+        allow_fallback: bool = True,
+    ) -> Dict[int, List[int]]:
+        """Resolve scope for many configs at once.
+
+        Explicit scopes come from ``test_run_config_scope`` in one query; configs
+        without an explicit scope fall back to one batched derivation over their
+        Run Items (same rule as ``get_config_scope_ids``).
+        """
+        normalized = cls.normalize_scope_ids(config_ids)
+        if not normalized:
+            return {}
+        scopes: Dict[int, List[int]] = {config_id: [] for config_id in normalized}
+        rows = (
+            db.query(TestRunConfigScopeDB.config_id, TestRunConfigScopeDB.set_id)
+            .filter(TestRunConfigScopeDB.config_id.in_(normalized))
+            .order_by(TestRunConfigScopeDB.config_id.asc(), TestRunConfigScopeDB.position.asc())
+            .all()
+        )
+        for config_id, set_id in rows:
+            scopes[config_id].append(set_id)
+
+        missing = [config_id for config_id, scope in scopes.items() if not scope]
+        if allow_fallback and missing:
+            derived = cls._derive_scope_ids_for_configs(db, team_id=None, config_ids=missing)
+            for config_id in missing:
+                scopes[config_id] = derived.get(config_id, [])
+        return scopes
+
+    @classmethod
+    def get_config_ids_for_set(cls, db: Session, set_id: int) -> List[int]:
+        """Configs whose explicit scope includes ``set_id`` (indexed reverse lookup)."""
+        rows = (
+            db.query(TestRunConfigScopeDB.config_id)
+            .filter(TestRunConfigScopeDB.set_id == set_id)
+            .order_by(TestRunConfigScopeDB.config_id.asc())
+            .all()
+        )
+        return [row[0] for row in rows]
+
     @classmethod
     def validate_scope_ids(
         cls,
@@ -169,86 +213,72 @@ class TestRunScopeService:
         return normalized
 
     @classmethod
-    def _summarize_impact_rows(cls, rows: List[dict]) -> dict:
-        impacted_map: Dict[int, dict] = {}
-        impacted_item_ids: List[int] = []
-        for row in rows:
-            item_id = int(row["item_id"])
-            config_id = int(row["config_id"])
-            config_name = row.get("config_name") or f"Test Run #{config_id}"
-            impacted_item_ids.append(item_id)
-
-            info = impacted_map.get(config_id)
-            if info is None:
-                impacted_map[config_id] = {
-                    "config_id": config_id,
-                    "config_name": config_name,
-                    "removed_item_count": 1,
-                }
-            else:
-                info["removed_item_count"] += 1
-
+    def _summarize_impact_counts(cls, rows: Iterable) -> dict:
+        """Summarize ``(config_id, config_name, item_count)`` rows into the impact payload."""
         impacted_runs = sorted(
-            impacted_map.values(),
+            (
+                {
+                    "config_id": int(config_id),
+                    "config_name": config_name or f"Test Run #{config_id}",
+                    "removed_item_count": int(item_count),
+                }
+                for config_id, config_name, item_count in rows
+                if item_count
+            ),
             key=lambda item: (-item["removed_item_count"], item["config_id"]),
         )
         return {
-            "impacted_item_ids": impacted_item_ids,
             "impacted_test_runs": impacted_runs,
-            "removed_item_count": len(impacted_item_ids),
+            "removed_item_count": sum(item["removed_item_count"] for item in impacted_runs),
         }
 
     @classmethod
-    def _build_rows_for_removed_sets(
+    def _count_items_by_config(cls, db: Session, criteria: List) -> List[tuple]:
+        return (
+            db.query(
+                TestRunItemDB.config_id,
+                TestRunConfigDB.name,
+                func.count(TestRunItemDB.id),
+            )
+            .join(TestRunConfigDB, TestRunConfigDB.id == TestRunItemDB.config_id)
+            .filter(*criteria)
+            .group_by(TestRunItemDB.config_id, TestRunConfigDB.name)
+            .all()
+        )
+
+    @classmethod
+    def _removed_sets_item_criteria(
         cls,
-        db: Session,
         team_id: int,
         removed_set_ids: List[int],
         config_id: Optional[int] = None,
-    ) -> List[dict]:
-        if not removed_set_ids:
-            return []
-        query = (
-            db.query(
-                TestRunItemDB.id.label("item_id"),
-                TestRunItemDB.config_id.label("config_id"),
-                TestRunConfigDB.name.label("config_name"),
-            )
-            .join(TestRunConfigDB, TestRunConfigDB.id == TestRunItemDB.config_id)
-            .join(
-                TestCaseLocalDB,
-                and_(
-                    TestCaseLocalDB.team_id == TestRunItemDB.team_id,
-                    TestCaseLocalDB.test_case_number == TestRunItemDB.test_case_number,
-                ),
-            )
-            .filter(
-                TestRunItemDB.team_id == team_id,
+    ) -> List:
+        # EXISTS（而非 JOIN）：同一 item 只計一次，且可直接用於 DELETE
+        case_in_removed_sets = (
+            select(TestCaseLocalDB.id)
+            .where(
+                TestCaseLocalDB.team_id == TestRunItemDB.team_id,
+                TestCaseLocalDB.test_case_number == TestRunItemDB.test_case_number,
                 TestCaseLocalDB.test_case_set_id.in_(removed_set_ids),
             )
+            .correlate(TestRunItemDB)
+            .exists()
         )
+        criteria = [TestRunItemDB.team_id == team_id, case_in_removed_sets]
         if config_id is not None:
-            query = query.filter(TestRunItemDB.config_id == config_id)
-        rows = query.all()
-        return [
-            {
-                "item_id": row.item_id,
-                "config_id": row.config_id,
-                "config_name": row.config_name,
-            }
-            for row in rows
-        ]
+            criteria.append(TestRunItemDB.config_id == config_id)
+        return criteria
 
     @classmethod
     def _derive_scope_ids_for_configs(
         cls,
         db: Session,
-        team_id: int,
+        team_id: Optional[int],
         config_ids: List[int],
     ) -> Dict[int, List[int]]:
         if not config_ids:
             return {}
-        rows = (
+        query = (
             db.query(
                 TestRunItemDB.config_id,
                 TestCaseLocalDB.test_case_set_id,
@@ -260,13 +290,11 @@ class TestRunScopeService:
                     TestCaseLocalDB.test_case_number == TestRunItemDB.test_case_number,
                 ),
             )
-            .filter(
-                TestRunItemDB.team_id == team_id,
-                TestRunItemDB.config_id.in_(config_ids),
-            )
-            .distinct()
-            .all()
+            .filter(TestRunItemDB.config_id.in_(config_ids))
         )
+        if team_id is not None:
+            query = query.filter(TestRunItemDB.team_id == team_id)
+        rows = query.distinct().all()
         grouped: Dict[int, List[int]] = {}
         for config_id, set_id in rows:
             if set_id is None:
@@ -278,64 +306,38 @@ class TestRunScopeService:
         }
 
     @classmethod
-    def _build_rows_for_case_move(
+    def _clean_case_numbers(cls, case_numbers: Iterable[str]) -> List[str]:
+        return [str(num).strip() for num in case_numbers if num and str(num).strip()]
+
+    @classmethod
+    def _case_move_impact(
         cls,
         db: Session,
         team_id: int,
         case_numbers: List[str],
         target_set_id: int,
-    ) -> List[dict]:
-        cleaned_numbers = [num.strip() for num in case_numbers if num and str(num).strip()]
-        if not cleaned_numbers:
-            return []
-
-        rows = (
-            db.query(
-                TestRunItemDB.id.label("item_id"),
-                TestRunItemDB.config_id.label("config_id"),
-                TestRunConfigDB.name.label("config_name"),
-                TestRunConfigDB.test_case_set_ids_json.label("scope_json"),
-            )
-            .join(TestRunConfigDB, TestRunConfigDB.id == TestRunItemDB.config_id)
-            .filter(
-                TestRunItemDB.team_id == team_id,
-                TestRunItemDB.test_case_number.in_(cleaned_numbers),
-            )
-            .all()
-        )
-        if not rows:
-            return []
-
-        scope_cache: Dict[int, List[int]] = {}
-        missing_scope_config_ids: List[int] = []
-        for row in rows:
-            scope = cls.parse_scope_ids_json(row.scope_json)
-            if scope:
-                scope_cache[row.config_id] = scope
-            else:
-                missing_scope_config_ids.append(row.config_id)
+    ) -> tuple:
+        """Set-based impact of moving cases into ``target_set_id``.
 
-        derived_scope_map = cls._derive_scope_ids_for_configs(
+        Returns ``(summary, impacted_config_ids, config_scopes)``: per-config
+        item counts are aggregated in SQL and only configs whose scope excludes
+        the target are impacted.
+        """
+        if not case_numbers:
+            return cls._summarize_impact_counts([]), [], {}
+        counts = cls._count_items_by_config(
             db,
-            team_id=team_id,
-            config_ids=cls.normalize_scope_ids(missing_scope_config_ids),
+            [
+                TestRunItemDB.team_id == team_id,
+                TestRunItemDB.test_case_number.in_(case_numbers),
+            ],
         )
-
-        impacted_rows: List[dict] = []
-        for row in rows:
-            scope = scope_cache.get(row.config_id)
-            if scope is None:
-                scope = derived_scope_map.get(row.config_id, [])
-                scope_cache[row.config_id] = scope
-            if target_set_id not in scope:
-                impacted_rows.append(
-                    {
-                        "item_id": row.item_id,
-                        "config_id": row.config_id,
-                        "config_name": row.config_name,
-                    }
-                )
-        return impacted_rows
+        config_scopes = cls.get_scope_ids_for_configs(db, [row[0] for row in counts])
+        impacted_rows = [
+            row for row in counts if target_set_id not in config_scopes.get(row[0], [])
+        ]
+        impacted_config_ids = sorted(row[0] for row in impacted_rows)
+        return cls._summarize_impact_counts(impacted_rows), impacted_config_ids, config_scopes
 
     @classmethod
     def preview_set_deletion(
@@ -344,12 +346,9 @@ class TestRunScopeService:
         team_id: int,
         set_id: int,
     ) -> dict:
-        rows = cls._build_rows_for_removed_sets(
-            db,
-            team_id=team_id,
-            removed_set_ids=[set_id],
+        summary = cls._summarize_impact_counts(
+            cls._count_items_by_config(db, cls._removed_sets_item_criteria(team_id, [set_id]))
         )
-        summary = cls._summarize_impact_rows(rows)
         return {
             "impacted_item_count": summary["removed_item_count"],
             "impacted_test_runs": summary["impacted_test_runs"],
@@ -365,13 +364,12 @@ class TestRunScopeService:
         case_numbers: List[str],
         target_set_id: int,
     ) -> dict:
-        rows = cls._build_rows_for_case_move(
+        summary, _config_ids, _scopes = cls._case_move_impact(
             db,
             team_id=team_id,
-            case_numbers=case_numbers,
+            case_numbers=cls._clean_case_numbers(case_numbers),
             target_set_id=target_set_id,
         )
-        summary = cls._summarize_impact_rows(rows)
         return {
             "impacted_item_count": summary["removed_item_count"],
             "impacted_test_runs": summary["impacted_test_runs"],
@@ -389,7 +387,12 @@ class TestRunScopeService:
         *,
         lock: bool = False,
     ) -> dict:
-        """Build the exact preview and deletion-state fingerprint for a case move."""
+        """Build the exact preview and deletion-state fingerprint for a case move.
+
+        Impact counts are aggregated in SQL first; the fingerprint then streams
+        the impacted item and history rows into the hash instead of building a
+        full snapshot document.
+        """
         ordered_cases = sorted(cases, key=lambda case: case.id)
         all_case_numbers = [case.test_case_number for case in ordered_cases]
         case_numbers = [
@@ -397,100 +400,74 @@ class TestRunScopeService:
             for case in ordered_cases
             if case.test_case_set_id != target_set_id
         ]
-        locked_configs = []
         if lock:
-            locked_configs = (
-                db.query(TestRunConfigDB)
-                .filter(TestRunConfigDB.team_id == team_id)
-                .order_by(TestRunConfigDB.id.asc())
-                .with_for_update()
-                .all()
-            )
-        item_query = (
-            db.query(TestRunItemDB)
-            .filter(
-                TestRunItemDB.team_id == team_id,
-                TestRunItemDB.test_case_number.in_(case_numbers),
-            )
-            .order_by(TestRunItemDB.config_id.asc(), TestRunItemDB.id.asc())
+            db.query(TestRunConfigDB.id).filter(
+                TestRunConfigDB.team_id == team_id
+            ).order_by(TestRunConfigDB.id.asc()).with_for_update().all()
+            if case_numbers:
+                db.query(TestRunItemDB.id).filter(
+                    TestRunItemDB.team_id == team_id,
+                    TestRunItemDB.test_case_number.in_(case_numbers),
+                ).order_by(TestRunItemDB.config_id.asc(), TestRunItemDB.id.asc()).with_for_update().all()
+
+        summary, impacted_config_ids, config_scopes = cls._case_move_impact(
+            db, team_id, case_numbers, target_set_id
         )
-        if lock:
-            item_query = item_query.with_for_update()
-        items = item_query.all()
 
-        config_ids = sorted({item.config_id for item in items})
-        if lock:
-            configs = [config for config in locked_configs if config.id in config_ids]
-        else:
-            configs = (
-                db.query(TestRunConfigDB)
-                .filter(
-                    TestRunConfigDB.team_id == team_id,
-                    TestRunConfigDB.id.in_(config_ids),
-                )
-                .order_by(TestRunConfigDB.id.asc())
-                .all()
-            )
-            if not config_ids:
-                configs = []
-        config_scope = {
-            config.id: cls.get_config_scope_ids(
-                db, config, allow_fallback=True, persist_fallback=False
-            )
-            for config in configs
-        }
-        impacted_items = [
-            item for item in items if target_set_id not in config_scope.get(item.config_id, [])
-        ]
-        impacted_item_ids = [item.id for item in impacted_items]
-
-        history_query = (
-            db.query(TestRunItemResultHistoryDB)
-            .filter(TestRunItemResultHistoryDB.item_id.in_(impacted_item_ids))
-            .order_by(
-                TestRunItemResultHistoryDB.item_id.asc(),
-                TestRunItemResultHistoryDB.id.asc(),
+        hasher = hashlib.sha256()
+
+        def _feed(payload) -> None:
+            hasher.update(
+                json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
             )
-        )
-        if lock:
-            history_query = history_query.with_for_update()
-        histories = history_query.all() if impacted_item_ids else []
+            hasher.update(b"\n")
 
-        snapshot = {
-            "team_id": team_id,
-            "target_test_case_set_id": target_set_id,
-            "cases": [
-                {
-                    "id": case.id,
-                    "test_case_number": case.test_case_number,
-                    "test_case_set_id": case.test_case_set_id,
-                    "test_case_section_id": case.test_case_section_id,
-                }
-                for case in ordered_cases
-            ],
-            "config_scopes": [
-                {"config_id": config_id, "scope_ids": config_scope[config_id]}
-                for config_id in sorted(config_scope)
-            ],
-            "impacted_items": [cls._stable_row_payload(item) for item in impacted_items],
-            "histories": [cls._stable_row_payload(history) for history in histories],
-        }
-        fingerprint = hashlib.sha256(
-            json.dumps(snapshot, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
-        ).hexdigest()
-        summary = cls._summarize_impact_rows(
-            [
-                {
-                    "item_id": item.id,
-                    "config_id": item.config_id,
-                    "config_name": next(
-                        (config.name for config in configs if config.id == item.config_id),
-                        "",
-                    ),
-                }
-                for item in impacted_items
-            ]
+        _feed(
+            {
+                "team_id": team_id,
+                "target_test_case_set_id": target_set_id,
+                "cases": [
+                    {
+                        "id": case.id,
+                        "test_case_number": case.test_case_number,
+                        "test_case_set_id": case.test_case_set_id,
+                        "test_case_section_id": case.test_case_section_id,
+                    }
+                    for case in ordered_cases
+                ],
+                "config_scopes": [
+                    {"config_id": config_id, "scope_ids": config_scopes[config_id]}
+                    for config_id in sorted(config_scopes)
+                ],
+            }
         )
+        if impacted_config_ids:
+            item_criteria = [
+                TestRunItemDB.team_id == team_id,
+                TestRunItemDB.test_case_number.in_(case_numbers),
+                TestRunItemDB.config_id.in_(impacted_config_ids),
+            ]
+            items_table = TestRunItemDB.__table__
+            for row in db.execute(
+                select(items_table)
+                .where(*item_criteria)
+                .order_by(items_table.c.config_id.asc(), items_table.c.id.asc())
+            ).mappings():
+                _feed(["item", cls._stable_mapping_payload(row)])
+
+            histories_table = TestRunItemResultHistoryDB.__table__
+            history_statement = (
+                select(histories_table)
+                .where(histories_table.c.item_id.in_(select(TestRunItemDB.id).where(*item_criteria)))
+                .order_by(histories_table.c.item_id.asc(), histories_table.c.id.asc())
+            )
+            if lock:
+                # History writers do not take the item row lock, so the rows feeding
+                # the fingerprint must be locked themselves until the move commits.
+                history_statement = history_statement.with_for_update()
+            for row in db.execute(history_statement).mappings():
+                _feed(["history", cls._stable_mapping_payload(row)])
+
         return {
             "impacted_item_count": summary["removed_item_count"],
             "impacted_test_runs": summary["impacted_test_runs"],
@@ -501,7 +478,7 @@ class TestRunScopeService:
             "source_test_case_set_ids": cls.normalize_scope_ids(
                 [case.test_case_set_id for case in ordered_cases]
             ),
-            "impact_fingerprint": fingerprint,
+            "impact_fingerprint": hasher.hexdigest(),
         }
 
     @classmethod
@@ -512,17 +489,12 @@ class TestRunScopeService:
         config_id: int,
         removed_set_ids: List[int],
     ) -> dict:
-        rows = cls._build_rows_for_removed_sets(
-            db,
-            team_id=team_id,
-            removed_set_ids=removed_set_ids,
-            config_id=config_id,
-        )
-        summary = cls._summarize_impact_rows(rows)
-        if summary["impacted_item_ids"]:
-            db.query(TestRunItemDB).filter(
-                TestRunItemDB.id.in_(summary["impacted_item_ids"])
-            ).delete(synchronize_session=False)
+        summary = cls._summarize_impact_counts([])
+        if removed_set_ids:
+            criteria = cls._removed_sets_item_criteria(team_id, removed_set_ids, config_id=config_id)
+            summary = cls._summarize_impact_counts(cls._count_items_by_config(db, criteria))
+            if summary["removed_item_count"]:
+                db.query(TestRunItemDB).filter(*criteria).delete(synchronize_session=False)
         return {
             "removed_item_count": summary["removed_item_count"],
             "impacted_test_runs": summary["impacted_test_runs"],
@@ -537,16 +509,10 @@ class TestRunScopeService:
         team_id: int,
         set_id: int,
     ) -> dict:
-        rows = cls._build_rows_for_removed_sets(
-            db,
-            team_id=team_id,
-            removed_set_ids=[set_id],
-        )
-        summary = cls._summarize_impact_rows(rows)
-        if summary["impacted_item_ids"]:
-            db.query(TestRunItemDB).filter(
-                TestRunItemDB.id.in_(summary["impacted_item_ids"])
-            ).delete(synchronize_session=False)
+        criteria = cls._removed_sets_item_criteria(team_id, [set_id])
+        summary = cls._summarize_impact_counts(cls._count_items_by_config(db, criteria))
+        if summary["removed_item_count"]:
+            db.query(TestRunItemDB).filter(*criteria).delete(synchronize_session=False)
         return {
             "removed_item_count": summary["removed_item_count"],
             "impacted_test_runs": summary["impacted_test_runs"],
@@ -563,16 +529,18 @@ class TestRunScopeService:
         case_numbers: List[str],
         target_set_id: int,
     ) -> dict:
-        rows = cls._build_rows_for_case_move(
+        cleaned_numbers = cls._clean_case_numbers(case_numbers)
+        summary, impacted_config_ids, _scopes = cls._case_move_impact(
             db,
             team_id=team_id,
-            case_numbers=case_numbers,
+            case_numbers=cleaned_numbers,
             target_set_id=target_set_id,
         )
-        summary = cls._summarize_impact_rows(rows)
-        if summary["impacted_item_ids"]:
+        if impacted_config_ids:
             db.query(TestRunItemDB).filter(
-                TestRunItemDB.id.in_(summary["impacted_item_ids"])
+                TestRunItemDB.team_id == team_id,
+                TestRunItemDB.test_case_number.in_(cleaned_numbers),
+                TestRunItemDB.config_id.in_(impacted_config_ids),
             ).delete(synchronize_session=False)
         return {
             "removed_item_count": summary["removed_item_count"],
@@ -589,12 +557,17 @@ class TestRunScopeService:
         set_id: int,
     ) -> Dict[int, List[int]]:
         updates: Dict[int, List[int]] = {}
-        configs = db.query(TestRunConfigDB).filter(TestRunConfigDB.team_id == team_id).all()
+        team_config_ids = [
+            row[0]
+            for row in db.query(TestRunConfigDB.id).filter(TestRunConfigDB.team_id == team_id).all()
+        ]
+        scope_map = cls.get_scope_ids_for_configs(db, team_config_ids)
+        affected_ids = [config_id for config_id, scope in scope_map.items() if set_id in scope]
+        if not affected_ids:
+            return updates
+        configs = db.query(TestRunConfigDB).filter(TestRunConfigDB.id.in_(affected_ids)).all()
         for config in configs:
-            current_scope = cls.get_config_scope_ids(db, config, allow_fallback=True)
-            if set_id not in current_scope:
-                continue
-            next_scope = [sid for sid in current_scope if sid != set_id]
+            next_scope = [sid for sid in scope_map[config.id] if sid != set_id]
             cls.set_config_scope_ids(config, next_scope)
             updates[config.id] = next_scope
         return updates
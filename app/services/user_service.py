@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 
 from app.auth.models import UserCreate, UserRole, UserUpdate
 from app.auth.password_service import PasswordService
+from app.auth.session_service import session_service
 from app.db_access.main import MainAccessBoundary, get_main_access_boundary
 from app.models.database_models import LarkUser, User
 
@@ -318,7 +319,10 @@ class UserService:
             await session.refresh(user)
             return user
 
-        return await UserService._resolve_main_boundary(main_boundary).run_write(_deactivate)
+        user = await UserService._resolve_main_boundary(main_boundary).run_write(_deactivate)
+        if user is not None:
+            session_service.invalidate_user_principals(user.id)
+        return user
 
 
 user_service = UserService()
@@ -116,6 +116,8 @@
         const labels = {
             lark_org_sync: t('dashboard.larkOrgSyncService', 'Lark 組織同步'),
             audit_cleanup: t('dashboard.auditCleanupService', '審計記錄清理'),
+            external_read_counts_reconcile: t('dashboard.externalReadCountsReconcileService', '外部讀取計數校正'),
+            database_backup: t('dashboard.databaseBackupService', '資料庫備份'),
         };
         return labels[serviceKey] || serviceKey;
     }
@@ -678,7 +678,7 @@ function renderScheduledServiceCard(service) {
                     <i class="fas fa-clock me-2"></i><span>${escapeHtml(getI18n('scheduledServices.saveSchedule', '儲存排程'))}</span>
                 </button>
             </form>
-            <div class="scheduled-service-card__hint text-muted small">${escapeHtml(getI18n('scheduledServices.timeHint', '第一版支援每日固定時間排程；多副本部署需額外處理 leader lock。'))}</div>
+            <div class="scheduled-service-card__hint text-muted small">${escapeHtml(getI18n('scheduledServices.timeHint', '支援每日固定時間排程；多副本部署時每個時段只會由一個 worker 執行。'))}</div>
         </section>
     `;
 }
@@ -689,6 +689,7 @@ function getScheduledServiceStatusClass(status, isRunning) {
         case 'completed':
             return 'text-bg-success-subtle text-success-emphasis';
         case 'failed':
+        case 'timeout':
             return 'text-bg-danger-subtle text-danger-emphasis';
         case 'interrupted':
             return 'text-bg-secondary';
@@ -706,6 +707,8 @@ function getScheduledServiceStatusText(status, isRunning) {
             return getI18n('scheduledServices.statusCompleted', '最近成功');
         case 'failed':
             return getI18n('scheduledServices.statusFailed', '最近失敗');
+        case 'timeout':
+            return getI18n('scheduledServices.statusTimeout', '最近逾時');
         case 'interrupted':
             return getI18n('scheduledServices.statusInterrupted', '啟動時回收');
         case 'running':
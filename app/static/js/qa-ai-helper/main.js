@@ -23,6 +23,7 @@
     testcaseDataDrafts: {},
     expandedSeedCommentIds: {},
     seedActionInFlight: false,
+    seedStreaming: false,
     testcaseActionInFlight: false,
     selectedTargetSetMode: 'existing',
     selectedExistingTargetSetId: null,
@@ -1911,8 +1912,8 @@
       }
     }
 
-    if (refineButton) refineButton.disabled = !seedSet || !dirtyComments || state.seedActionInFlight;
-    if (lockButton) lockButton.disabled = !seedSet || isSeedSetLocked() || dirtyComments || state.seedActionInFlight;
+    if (refineButton) refineButton.disabled = !seedSet || !dirtyComments || state.seedActionInFlight || state.seedStreaming;
+    if (lockButton) lockButton.disabled = !seedSet || isSeedSetLocked() || dirtyComments || state.seedActionInFlight || state.seedStreaming;
     if (unlockButton) unlockButton.disabled = !seedSet || !isSeedSetLocked() || state.seedActionInFlight;
     const seedLocked = seedSet && isSeedSetLocked();
     const seedReady = seedLocked && Number(seedSet.included_seed_count || 0) > 0 && !dirtyComments;
@@ -2188,9 +2189,96 @@
     renderSeedReviewSummary();
   }
 
+  async function readSseStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+        let eventType = 'message';
+        const dataLines = [];
+        block.split('\n').forEach((line) => {
+          if (line.startsWith('event:')) eventType = line.slice(6).trim();
+          else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+        });
+        if (!dataLines.length) continue;
+        try {
+          onEvent(eventType, JSON.parse(dataLines.join('\n')));
+        } catch (err) {
+          console.error('[qa-ai-helper] SSE event handling failed', err);
+        }
+      }
+    }
+  }
+
+  async function streamSeedSetGeneration(teamId) {
+    // 逐 batch 串流：seed set 建立後即可開始檢視，後續 batch 完成時再更新 workspace
+    const response = await authFetch(`/api/teams/${teamId}/qa-ai-helper/sessions/${state.sessionId}/seed-sets/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify({ force_regenerate: true }),
+    });
+    if (!response.ok) {
+      throw new Error(await response.text());
+    }
+    let doneEvent = null;
+    state.seedStreaming = true;
+    try {
+      await readSseStream(response, (eventType, data) => {
+        if (eventType === 'seed_set_created') {
+          updateWorkspace(data.workspace);
+          setActivePhaseView('plan', { force: true });
+          state.seedActionInFlight = false;
+          if (window.AiThinkingAnimation) window.AiThinkingAnimation.hide();
+          setFeedback('info', t('qaAiHelper.seedSetStreaming', { completed: 0, total: data.batch_count }, `正在產生 Test Case 種子（0/${data.batch_count}），已完成的段落可先開始檢視。`));
+        } else if (eventType === 'batch_complete') {
+          if (data.workspace) updateWorkspace(data.workspace);
+        } else if (eventType === 'done') {
+          doneEvent = data;
+          if (data.workspace) updateWorkspace(data.workspace);
+        }
+        renderSeedReviewSummary();
+      });
+    } finally {
+      state.seedStreaming = false;
+    }
+    if (!doneEvent) {
+      throw new Error(t('qaAiHelper.seedSetStreamInterrupted', {}, 'Test Case 種子產生中斷，請重新整理後確認結果。'));
+    }
+    if (!doneEvent.success && !doneEvent.seed_set_id) {
+      throw new Error(doneEvent.error || 'seed generation failed');
+    }
+    if (doneEvent.success) {
+      setFeedback('success', t('qaAiHelper.seedSetGenerated', {}, '已產生 Test Case 種子，請確認納入範圍與註解。'));
+    } else {
+      const failed = (doneEvent.failed_batches || []).length;
+      setFeedback('warning', t('qaAiHelper.seedSetPartiallyGenerated', { count: failed }, `有 ${failed} 個批次產生失敗，對應種子保留預設內容，可重新產生。`));
+    }
+  }
+
   async function generateSeedSet(forceRegenerate = false) {
     const teamId = ensureTeamId();
     if (!teamId || !state.sessionId) return;
+    if (forceRegenerate || !currentSeedSet()) {
+      state.seedActionInFlight = true;
+      renderSeedReviewSummary();
+      if (window.AiThinkingAnimation) window.AiThinkingAnimation.show(t('qaAiHelper.aiThinkingSeed', {}, 'AI 正在產生 Test Case 種子...'));
+      try {
+        await streamSeedSetGeneration(teamId);
+      } finally {
+        state.seedActionInFlight = false;
+        renderSeedReviewSummary();
+        if (window.AiThinkingAnimation) window.AiThinkingAnimation.hide();
+      }
+      return;
+    }
     state.seedActionInFlight = true;
     renderSeedReviewSummary();
     if (window.AiThinkingAnimation) window.AiThinkingAnimation.show(t('qaAiHelper.aiThinkingSeed', {}, 'AI 正在產生 Test Case 種子...'));
@@ -44,3 +44,20 @@ def pytest_collection_modifyitems(items):
     for item in items:
         # These are legitimate production classes, not test classes.
         item.add_marker(pytest.mark.filterwarnings("ignore::pytest.PytestCollectionWarning"))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_machine_api_governance(monkeypatch):
+    """Keep machine API rate-limit state per test.
+
+    The production store is a host-wide SQLite file shared by every worker;
+    tests reuse credential ids across disposable databases, so a shared file
+    would leak bucket usage from one test into the next.
+    """
+    from app.config import settings
+    from app.services.machine_api_governance import reset_machine_api_governor
+
+    monkeypatch.setattr(settings.auth, "machine_api_governance_state_path", ":memory:")
+    reset_machine_api_governor()
+    yield
+    reset_machine_api_governor()
@@ -0,0 +1,158 @@
+"""In-process fake Lark Open API server for sync tests and benchmarks.
+
+Serves the subset of endpoints the org sync and Bitable scan use, with
+page_token pagination, optional per-request latency, and request / peak
+concurrency counters on ``app.state.fake_lark``. Mount it through
+``httpx.ASGITransport`` so no socket is opened.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from fastapi import FastAPI, Query
+
+from app.models.database_models import LarkDepartment
+
+FAKE_LARK_BASE_URL = "http://fake-lark.test/open-apis"
+
+
+@dataclass
+class FakeLarkState:
+    department_users: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    table_records: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    latency_seconds: float = 0.0
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+
+class FakeLarkAuthManager:
+    """Stand-in for ``LarkAuthManager`` that never touches the network."""
+
+    def get_tenant_access_token(self, force_refresh: bool = False) -> str:
+        return "fake-tenant-token"
+
+
+def build_fake_user(user_id: str, *, name: str | None = None) -> dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "open_id": f"ou_{user_id}",
+        "union_id": f"on_{user_id}",
+        "name": name or f"User {user_id}",
+        "en_name": f"user-{user_id}",
+        "enterprise_email": f"{user_id}@example.test",
+        "job_title": "Engineer",
+        "employee_type": 1,
+        "status": {"is_activated": True, "is_exited": False},
+        "avatar": {"avatar_240": f"https://avatar.test/{user_id}/240"},
+    }
+
+
+def build_fake_org(
+    department_count: int,
+    users_per_department: int,
+    *,
+    shared_users: int = 0,
+) -> dict[str, list[dict[str, Any]]]:
+    """Departments ``od_<n>`` with unique users plus ``shared_users`` present in every department."""
+    shared = [build_fake_user(f"shared{index}") for index in range(shared_users)]
+    return {
+        f"od_{dept}": [
+            build_fake_user(f"u{dept}_{index}") for index in range(users_per_department)
+        ] + list(shared)
+        for dept in range(department_count)
+    }
+
+
+def create_fake_lark_app(
+    *,
+    department_users: dict[str, list[dict[str, Any]]] | None = None,
+    table_records: dict[str, list[dict[str, Any]]] | None = None,
+    latency_seconds: float = 0.0,
+) -> FastAPI:
+    state = FakeLarkState(
+        department_users=department_users or {},
+        table_records=table_records or {},
+        latency_seconds=latency_seconds,
+    )
+    app = FastAPI()
+    app.state.fake_lark = state
+
+    async def _tracked(payload_factory):
+        state.requests += 1
+        state.in_flight += 1
+        state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+        try:
+            if state.latency_seconds:
+                await asyncio.sleep(state.latency_seconds)
+            return payload_factory()
+        finally:
+            state.in_flight -= 1
+
+    def _page(items: list[dict[str, Any]], page_size: int, page_token: str | None) -> dict[str, Any]:
+        offset = int(page_token or 0)
+        window = items[offset:offset + page_size]
+        next_offset = offset + len(window)
+        has_more = next_offset < len(items)
+        return {
+            "code": 0,
+            "msg": "success",
+            "data": {
+                "items": window,
+                "has_more": has_more,
+                "page_token": str(next_offset) if has_more else None,
+            },
+        }
+
+    @app.post("/open-apis/auth/v3/tenant_access_token/internal")
+    async def tenant_access_token():
+        return {"code": 0, "tenant_access_token": "fake-tenant-token", "expire": 7200}
+
+    @app.get("/open-apis/contact/v3/users/find_by_department")
+    async def find_by_department(
+        department_id: str,
+        page_size: int = Query(50),
+        page_token: str | None = None,
+    ):
+        if department_id not in state.department_users:
+            return await _tracked(lambda: {"code": 40003, "msg": "department not found"})
+        users = state.department_users[department_id]
+        return await _tracked(lambda: _page(users, min(page_size, 50), page_token))
+
+    @app.get("/open-apis/bitable/v1/apps/{obj_token}/tables/{table_id}/records")
+    async def list_records(
+        obj_token: str,
+        table_id: str,
+        page_size: int = Query(500),
+        page_token: str | None = None,
+    ):
+        records = state.table_records.get(table_id, [])
+        return await _tracked(lambda: _page(records, min(page_size, 500), page_token))
+
+    return app
+
+
+def fake_lark_transport(app: FastAPI) -> httpx.ASGITransport:
+    return httpx.ASGITransport(app=app)
+
+
+def seed_fake_lark_departments(database_bundle: dict[str, Any], department_ids) -> None:
+    """Insert active ``LarkDepartment`` rows so user sync has departments to walk."""
+    with database_bundle["sync_session_factory"]() as session:
+        session.add_all(
+            LarkDepartment(department_id=dept_id, level=1, path=f"/{dept_id}", status="active")
+            for dept_id in department_ids
+        )
+        session.commit()
+
+
+async def run_lark_user_sync(database_bundle: dict[str, Any], service) -> dict[str, Any]:
+    """Run ``LarkUserService.sync_all_users`` in its own committed session."""
+    async with database_bundle["async_session_factory"]() as session:
+        result = await service.sync_all_users(session)
+        await session.commit()
+    return result
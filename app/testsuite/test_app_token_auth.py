@@ -651,3 +651,71 @@ class TestAppTokenPrincipalModel:
         )
         assert principal.is_legacy
         assert principal.legacy_permission == "mcp_read"
+
+
+class TestMachineApiGovernance:
+    """Per-credential quota and in-flight governance applied after successful auth."""
+
+    def test_quota_exhaustion_returns_429_with_retry_after(self, temp_db, monkeypatch):
+        from app.config import get_settings
+
+        auth_cfg = get_settings().auth
+        monkeypatch.setattr(auth_cfg, "machine_api_credential_burst", 3)
+        monkeypatch.setattr(auth_cfg, "machine_api_credential_rate_per_minute", 6)
+        with temp_db() as session:
+            seeded = _seed_app_tokens(session)
+        with TestClient(app) as client:
+            statuses = [
+                client.get(
+                    f"/test/app/teams/{seeded['team_a_id']}/ping",
+                    headers=_bearer(seeded["read_token"]),
+                )
+                for _ in range(4)
+            ]
+            assert [resp.status_code for resp in statuses[:3]] == [200, 200, 200]
+            throttled = statuses[3]
+            assert throttled.status_code == 429
+            assert throttled.json()["detail"]["code"] == AppTokenErrorCodes.RATE_LIMITED
+            assert int(throttled.headers["Retry-After"]) >= 1
+
+            # Another credential of a different bucket is unaffected.
+            resp = client.get(
+                f"/test/app/teams/{seeded['team_a_id']}/ping",
+                headers=_bearer(seeded["rw_token"]),
+            )
+            assert resp.status_code == 200
+
+    def test_in_flight_leases_are_released_after_each_response(self, temp_db, monkeypatch):
+        from app.config import get_settings
+        from app.services.machine_api_governance import get_machine_api_governor
+
+        monkeypatch.setattr(get_settings().auth, "machine_api_credential_max_in_flight", 1)
+        with temp_db() as session:
+            seeded = _seed_app_tokens(session)
+        with TestClient(app) as client:
+            for _ in range(5):
+                resp = client.get(
+                    f"/test/app/teams/{seeded['team_a_id']}/ping",
+                    headers=_bearer(seeded["read_token"]),
+                )
+                assert resp.status_code == 200
+
+        usage = get_machine_api_governor().store.usage_snapshot()
+        assert all(row["in_flight"] == 0 for row in usage)
+        assert any(row["requests_allowed"] == 5 for row in usage)
+
+    def test_governance_can_be_disabled(self, temp_db, monkeypatch):
+        from app.config import get_settings
+
+        auth_cfg = get_settings().auth
+        monkeypatch.setattr(auth_cfg, "machine_api_governance_enabled", False)
+        monkeypatch.setattr(auth_cfg, "machine_api_credential_burst", 1)
+        with temp_db() as session:
+            seeded = _seed_app_tokens(session)
+        with TestClient(app) as client:
+            for _ in range(3):
+                resp = client.get(
+                    f"/test/app/teams/{seeded['team_a_id']}/ping",
+                    headers=_bearer(seeded["read_token"]),
+                )
+                assert resp.status_code == 200
@@ -135,6 +135,54 @@ async def test_read_chain_then_write_creates_pending_and_stops(agent_db, monkeyp
     assert event_types[-1] == "done"
 
 
+async def test_tool_loop_loads_history_once_and_appends_new_messages_incrementally(agent_db, monkeypatch):
+    """per-turn context：完整歷史只載入一次，之後每次迭代只取回本 turn 的新訊息；
+    事件（tool_finished 等）延後到下一個 checkpoint 寫入，但順序與逐筆寫入時一致。"""
+    executor, conv_svc, registry, cfg = _make_services()
+    llm = _install_llm(monkeypatch, [
+        AssistantLLMResult(content=None, tool_calls=[ParsedToolCall(provider_tool_call_id="p1", name="list_test_cases", arguments={"limit": 1})]),
+        AssistantLLMResult(content=None, tool_calls=[ParsedToolCall(provider_tool_call_id="p2", name="list_test_cases", arguments={"limit": 2})]),
+        AssistantLLMResult(content="all done", tool_calls=[]),
+    ])
+    seen_messages = []
+    scripted_call = AssistantLLMService.call
+
+    async def _recording_call(self, *, system_prompt, messages, tools):
+        seen_messages.append(list(messages))
+        return await scripted_call(self, system_prompt=system_prompt, messages=messages, tools=tools)
+
+    monkeypatch.setattr(AssistantLLMService, "call", _recording_call)
+    full_loads = []
+    original_load = conv_svc.load_conversation_messages
+
+    async def _counting_load(*, conversation_id):
+        full_loads.append(conversation_id)
+        return await original_load(conversation_id=conversation_id)
+
+    monkeypatch.setattr(conv_svc, "load_conversation_messages", _counting_load)
+
+    conv, turn = await _new_turn(conv_svc, text="list twice")
+    await agent_svc.run_agent_turn(
+        conversation=conv, turn=turn, user_id=1, role=UserRole.USER, jwt="fake",
+        conversation_service=conv_svc, executor=executor, llm_service=AssistantLLMService(), registry=registry, config=cfg,
+    )
+
+    assert llm.calls == 3
+    assert full_loads == [conv.id], "history must be loaded once per turn, not once per iteration"
+    assert [[m["role"] for m in msgs] for msgs in seen_messages] == [
+        ["user"],
+        ["user", "assistant", "tool"],
+        ["user", "assistant", "tool", "assistant", "tool"],
+    ]
+    assert seen_messages[2] == history_builder.build_llm_messages(
+        (await original_load(conversation_id=conv.id))[:-1], max_chars=cfg.history_max_chars,
+    ), "incremental context must match a full rebuild of the same rows"
+    events = await conv_svc.get_events_after(turn_id=turn.id, after_seq=-1)
+    assert [e.event_type for e in events] == [
+        "message_start", "tool_started", "tool_finished", "tool_started", "tool_finished", "text_delta", "done",
+    ]
+
+
 async def test_max_iterations_terminates_without_executing_further_tools(agent_db, monkeypatch):
     cfg = AssistantConfig(max_iterations=3)
     executor, conv_svc, registry, _ = _make_services(cfg)
@@ -0,0 +1,142 @@
+"""assistant 工具 in-process 直接派送測試。
+
+直接派送必須與 HTTP loopback 回傳相同的 status / payload（含 JWT 驗證與權限），
+無法等價處理的呼叫（找不到 route、multipart）退回 loopback，並可由設定強制走 loopback。
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.auth.auth_service import auth_service
+from app.auth.models import UserRole
+from app.config import AssistantConfig
+from app.database import get_db
+from app.db_access.main import get_main_access_boundary
+from app.main import app
+from app.models.database_models import Team, TestCaseLocal, TestCaseSet, TestCaseSection, User
+from app.services.assistant.direct_dispatch import DirectToolDispatcher
+from app.services.assistant.tool_executor import ToolExecutor
+from app.services.assistant.tool_registry import get_tool_registry
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+    install_main_database_overrides,
+)
+
+
+@pytest.fixture
+def dispatch_db(tmp_path, monkeypatch):
+    bundle = create_managed_test_database(tmp_path / "assistant_direct_dispatch.db")
+    install_main_database_overrides(
+        monkeypatch=monkeypatch,
+        app=app,
+        get_db_dependency=get_db,
+        async_engine=bundle["async_engine"],
+        async_session_factory=bundle["async_session_factory"],
+    )
+    with bundle["sync_session_factory"]() as session:
+        session.add(User(id=1, username="dispatch-admin", hashed_password="x", role=UserRole.SUPER_ADMIN, is_active=True))
+        session.add(Team(id=1, name="ART", description="", wiki_token="wt", test_case_table_id="tbl1"))
+        session.flush()
+        tcs = TestCaseSet(team_id=1, name="Default", description="", is_default=True)
+        session.add(tcs)
+        session.flush()
+        session.add(TestCaseSection(test_case_set_id=tcs.id, name="Unassigned", level=1, sort_order=0))
+        for index in range(3):
+            session.add(TestCaseLocal(
+                team_id=1, test_case_set_id=tcs.id, test_case_number=f"TC-DD-{index:03d}", title=f"Case {index}",
+            ))
+        session.commit()
+
+    token, _jti, _expires = asyncio.run(
+        auth_service.create_access_token(user_id=1, username="dispatch-admin", role=UserRole.SUPER_ADMIN)
+    )
+    yield {"bundle": bundle, "jwt": token}
+
+    app.dependency_overrides.pop(get_db, None)
+    dispose_managed_test_database(bundle)
+
+
+def _executor(mode: str = "direct") -> ToolExecutor:
+    return ToolExecutor(
+        app=app,
+        main_boundary=get_main_access_boundary(),
+        config=AssistantConfig(tool_dispatch_mode=mode),
+        registry=get_tool_registry(),
+    )
+
+
+def _list_cases(executor: ToolExecutor, jwt: str, *, http: bool = False):
+    tool = get_tool_registry().get("list_test_cases")
+    call = executor._http_loopback if http else executor._loopback
+    return asyncio.run(call(
+        tool, team_id=1, path_params={}, query_params={"limit": 5, "sort_by": "test_case_number"},
+        body_params={}, jwt=jwt, conversation_key="conv-direct",
+    ))
+
+
+def test_direct_dispatch_matches_http_loopback_payload(dispatch_db):
+    executor = _executor()
+    direct_status, direct_payload = _list_cases(executor, dispatch_db["jwt"])
+    http_status, http_payload = _list_cases(executor, dispatch_db["jwt"], http=True)
+
+    assert direct_status == http_status == 200
+    assert direct_payload == http_payload
+    assert sorted(row["test_case_number"] for row in direct_payload) == ["TC-DD-000", "TC-DD-001", "TC-DD-002"]
+
+
+def test_direct_dispatch_rejects_invalid_token_like_loopback(dispatch_db):
+    executor = _executor()
+    direct_status, direct_payload = _list_cases(executor, "not-a-jwt")
+    http_status, _http_payload = _list_cases(executor, "not-a-jwt", http=True)
+
+    assert direct_status == http_status == 401
+    assert direct_payload["detail"]["code"] == "INVALID_TOKEN"
+
+
+def test_unknown_route_falls_back_to_loopback(dispatch_db):
+    dispatcher = DirectToolDispatcher(app)
+    result = asyncio.run(dispatcher.dispatch(
+        "GET", "/api/definitely-not-a-route", query_params={}, body=None, headers={}, jwt=dispatch_db["jwt"],
+    ))
+    assert result is None
+
+
+def test_loopback_mode_skips_direct_dispatch(dispatch_db, monkeypatch):
+    executor = _executor(mode="loopback")
+
+    async def _fail(*_args, **_kwargs):
+        raise AssertionError("loopback 模式不應走直接派送")
+
+    monkeypatch.setattr(executor._direct_dispatcher, "dispatch", _fail)
+    status, payload = _list_cases(executor, dispatch_db["jwt"])
+    assert status == 200
+    assert len(payload) == 3
+
+
+def test_cached_principal_is_dropped_after_token_revocation(dispatch_db):
+    executor = _executor()
+    assert _list_cases(executor, dispatch_db["jwt"])[0] == 200
+
+    token_data = asyncio.run(auth_service.verify_token(dispatch_db["jwt"]))
+    assert asyncio.run(auth_service.revoke_token(token_data.jti, "logout"))
+
+    status_code, payload = _list_cases(executor, dispatch_db["jwt"])
+    assert status_code == 401
+    assert payload["detail"]["code"] == "INVALID_TOKEN"
+
+
+def test_cached_principal_is_dropped_after_user_deactivation(dispatch_db):
+    from app.services.user_service import UserService
+
+    executor = _executor()
+    assert _list_cases(executor, dispatch_db["jwt"])[0] == 200
+
+    assert asyncio.run(UserService.deactivate_user(1, main_boundary=get_main_access_boundary())) is not None
+
+    direct_status, direct_payload = _list_cases(executor, dispatch_db["jwt"])
+    http_status, http_payload = _list_cases(executor, dispatch_db["jwt"], http=True)
+    assert direct_status == http_status == 401
+    assert direct_payload["detail"]["code"] == http_payload["detail"]["code"] == "USER_NOT_FOUND_OR_INACTIVE"
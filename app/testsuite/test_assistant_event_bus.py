@@ -0,0 +1,121 @@
+"""assistant SSE 事件匯流排測試。
+
+事件 commit 後立即喚醒同行程訂閱者（rollback 不喚醒）；SSE tail 閒置時不輪詢 DB；
+其他 worker 寫入（不經本行程 session）的事件由 turn 序號水位輪詢接手。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.config import AssistantConfig
+from app.database import get_db
+from app.db_access.main import get_main_access_boundary
+from app.main import app
+from app.api.assistant import _tail_turn_events
+from app.models.database_models import AssistantEvent, AssistantTurn, Team
+from app.services.assistant.conversation_service import ConversationService
+from app.services.assistant.event_bus import get_assistant_event_bus
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+    install_main_database_overrides,
+)
+
+
+@pytest.fixture
+def bus_db(tmp_path, monkeypatch):
+    bundle = create_managed_test_database(tmp_path / "assistant_event_bus.db")
+    install_main_database_overrides(
+        monkeypatch=monkeypatch,
+        app=app,
+        get_db_dependency=get_db,
+        async_engine=bundle["async_engine"],
+        async_session_factory=bundle["async_session_factory"],
+    )
+    with bundle["sync_session_factory"]() as session:
+        session.add(Team(id=1, name="ART", description="", wiki_token="wt", test_case_table_id="tbl1"))
+        session.commit()
+    yield bundle
+    app.dependency_overrides.pop(get_db, None)
+    dispose_managed_test_database(bundle)
+
+
+async def _start_turn(backend: str):
+    conv_svc = ConversationService(
+        get_main_access_boundary(),
+        AssistantConfig(enabled=True, event_bus_backend=backend, event_bus_poll_interval_ms=50),
+    )
+    get_assistant_event_bus().configure(conv_svc.config)
+    conv = await conv_svc.create_conversation(user_id=1, scope_type="team", team_id=1, title="t")
+    turn = (await conv_svc.start_turn(conversation=conv, client_message_id="m1", text="hi", attachment_digests=[])).turn
+    return conv_svc, turn
+
+
+async def test_committed_event_wakes_subscriber_and_rollback_does_not(bus_db):
+    conv_svc, turn = await _start_turn("local")
+    bus = get_assistant_event_bus()
+
+    with bus.subscribe(turn.id) as subscription:
+        async def _rolled_back(session):
+            session.add(AssistantEvent(turn_id=turn.id, seq=99, event_type="text_delta", payload_json=None))
+            await session.flush()
+            raise RuntimeError("abort")
+
+        with pytest.raises(RuntimeError):
+            await conv_svc.main_boundary.run_write(_rolled_back)
+        assert await subscription.wait(0.1) is False
+
+        await conv_svc.append_event(turn_id=turn.id, event_type="text_delta", payload={"content": "a"})
+        assert await subscription.wait(1.0) is True
+
+    assert bus.subscribed_turn_ids() == []
+
+
+async def test_tail_waits_for_notification_instead_of_polling(bus_db, monkeypatch):
+    conv_svc, turn = await _start_turn("local")
+    reads = []
+    original = conv_svc.get_events_after
+
+    async def _counting_get_events_after(**kwargs):
+        reads.append(kwargs["after_seq"])
+        return await original(**kwargs)
+
+    monkeypatch.setattr(conv_svc, "get_events_after", _counting_get_events_after)
+    stream = _tail_turn_events(conv_svc, turn_id=turn.id, turn_key=turn.turn_key, after_seq=-1)
+    first = asyncio.ensure_future(stream.__anext__())
+
+    await asyncio.sleep(0.3)
+    assert not first.done()
+    assert len(reads) == 1, "閒置時不應定時重讀 DB"
+
+    await conv_svc.append_event(turn_id=turn.id, event_type="text_delta", payload={"content": "hi"})
+    chunk = await asyncio.wait_for(first, timeout=1.0)
+    assert chunk.startswith(b"event: text_delta\n")
+    assert json.loads(chunk.decode().split("data: ", 1)[1]) == {"seq": 0, "payload": {"content": "hi"}}
+
+    await conv_svc.append_event(turn_id=turn.id, event_type="done", payload=None)
+    chunk = await asyncio.wait_for(stream.__anext__(), timeout=1.0)
+    assert chunk.startswith(b"event: done\n")
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert reads == [-1, -1, 0]
+
+
+async def test_watermark_poll_picks_up_events_written_by_another_worker(bus_db):
+    _conv_svc, turn = await _start_turn("poll")
+    bus = get_assistant_event_bus()
+
+    with bus.subscribe(turn.id) as subscription:
+        await subscription.wait(0.2)  # 首次輪詢建立水位
+        subscription.clear()
+        # 直接以 Core 寫入，模擬不經本行程 session hook 的其他 worker
+        with bus_db["sync_engine"].begin() as connection:
+            connection.execute(insert(AssistantEvent).values(turn_id=turn.id, seq=0, event_type="text_delta"))
+            connection.execute(update(AssistantTurn).where(AssistantTurn.id == turn.id).values(next_event_seq=1))
+        assert await subscription.wait(1.0) is True
+
+    await bus.stop()
@@ -0,0 +1,230 @@
+"""assistant LLM 串流呼叫測試：以本機 aiohttp fake endpoint 模擬 OpenRouter SSE。
+
+涵蓋 content / tool-call delta 的增量解析、text sink 轉送、共用連線池重用、串流中途錯誤，
+以及 agent loop 於生成期間寫出 partial `text_delta` 事件。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.auth.models import UserRole
+from app.config import AssistantConfig
+from app.database import get_db
+from app.db_access.main import get_main_access_boundary
+from app.main import app
+from app.models.database_models import Team
+from app.services.assistant import assistant_agent_service as agent_svc
+from app.services.assistant.assistant_llm_service import (
+    AssistantLLMContextLengthError,
+    AssistantLLMService,
+    close_llm_http_session,
+    stream_text_deltas,
+)
+from app.services.assistant.conversation_service import ConversationService
+from app.services.assistant.tool_executor import ToolExecutor
+from app.services.assistant.tool_registry import get_tool_registry
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+    install_main_database_overrides,
+)
+
+
+def _chunk(*, content=None, tool_calls=None, finish_reason=None, usage=None):
+    delta = {}
+    if content is not None:
+        delta["content"] = content
+    if tool_calls is not None:
+        delta["tool_calls"] = tool_calls
+    body = {"id": "gen-1", "model": "fake/model", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+    if usage is not None:
+        body = {"id": "gen-1", "model": "fake/model", "choices": [], "usage": usage}
+    return body
+
+
+class _FakeOpenRouter:
+    def __init__(self, chunks, *, delay_seconds=0.0):
+        self.chunks = chunks
+        self.delay_seconds = delay_seconds
+        self.requests = []
+        self.peer_ports = []
+
+    async def handle(self, request):
+        self.requests.append(await request.json())
+        self.peer_ports.append(request.transport.get_extra_info("peername")[1])
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": OPENROUTER PROCESSING\n\n")
+        for chunk in self.chunks:
+            if self.delay_seconds:
+                await asyncio.sleep(self.delay_seconds)
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+async def _serve(fake):
+    web_app = web.Application()
+    web_app.router.add_post("/api/v1/chat/completions", fake.handle)
+    server = TestServer(web_app)
+    await server.start_server()
+    return server, str(server.make_url("/api/v1/chat/completions"))
+
+
+def _settings(**assistant_overrides):
+    assistant = AssistantConfig(enabled=True, llm_stream_flush_interval_ms=0, **assistant_overrides)
+    return SimpleNamespace(
+        openrouter=SimpleNamespace(api_key="fake-key"),
+        ai=SimpleNamespace(assistant=assistant),
+        app=None,
+    )
+
+
+_TEXT_CHUNKS = [
+    _chunk(content="Hello"),
+    _chunk(content=", "),
+    _chunk(content="world"),
+    _chunk(finish_reason="stop"),
+    _chunk(usage={"prompt_tokens": 10, "completion_tokens": 3}),
+]
+
+
+async def test_streaming_call_forwards_accumulated_text_and_records_metrics():
+    fake = _FakeOpenRouter(_TEXT_CHUNKS, delay_seconds=0.02)
+    server, url = await _serve(fake)
+    try:
+        service = AssistantLLMService(_settings(), endpoint_url=url)
+        seen = []
+
+        async def _sink(content):
+            seen.append(content)
+
+        with stream_text_deltas(_sink):
+            result = await service.call(system_prompt="sys", messages=[{"role": "user", "content": "hi"}], tools=[])
+    finally:
+        await close_llm_http_session()
+        await server.close()
+
+    assert fake.requests[0]["stream"] is True
+    assert seen == ["Hello", "Hello, ", "Hello, world"]
+    assert result.content == "Hello, world"
+    assert result.tool_calls == []
+    assert result.finish_reason == "stop"
+    metrics = result.metrics
+    assert metrics.streamed is True
+    assert metrics.completion_tokens == 3
+    assert 0 < metrics.time_to_first_token_ms < metrics.total_ms
+    assert metrics.tokens_per_second and metrics.tokens_per_second > 0
+
+
+async def test_streaming_call_assembles_tool_call_deltas_without_forwarding_text():
+    fake = _FakeOpenRouter([
+        _chunk(tool_calls=[{"index": 0, "id": "call_1", "function": {"name": "list_test_cases", "arguments": ""}}]),
+        _chunk(tool_calls=[{"index": 0, "function": {"arguments": "{\"lim"}}]),
+        _chunk(tool_calls=[{"index": 0, "function": {"arguments": "it\": 5}"}}]),
+        _chunk(finish_reason="tool_calls"),
+    ])
+    server, url = await _serve(fake)
+    try:
+        service = AssistantLLMService(_settings(), endpoint_url=url)
+        seen = []
+
+        async def _sink(content):
+            seen.append(content)
+
+        with stream_text_deltas(_sink):
+            result = await service.call(system_prompt="sys", messages=[], tools=[{"type": "function"}])
+    finally:
+        await close_llm_http_session()
+        await server.close()
+
+    assert seen == []
+    assert result.content is None
+    assert [(c.provider_tool_call_id, c.name, c.arguments) for c in result.tool_calls] == [
+        ("call_1", "list_test_cases", {"limit": 5})
+    ]
+
+
+async def test_calls_reuse_the_pooled_connection():
+    fake = _FakeOpenRouter(_TEXT_CHUNKS)
+    server, url = await _serve(fake)
+    try:
+        service = AssistantLLMService(_settings(), endpoint_url=url)
+        for _ in range(3):
+            await service.call(system_prompt="sys", messages=[], tools=[])
+    finally:
+        await close_llm_http_session()
+        await server.close()
+
+    assert len(fake.peer_ports) == 3
+    assert len(set(fake.peer_ports)) == 1, "keep-alive pool should serve every call over one connection"
+
+
+async def test_mid_stream_context_length_error_is_classified():
+    fake = _FakeOpenRouter([
+        {"error": {"code": 400, "message": "This endpoint's maximum context length is 1000 tokens"}},
+    ])
+    server, url = await _serve(fake)
+    try:
+        service = AssistantLLMService(_settings(), endpoint_url=url)
+        with pytest.raises(AssistantLLMContextLengthError):
+            await service.call(system_prompt="sys", messages=[], tools=[])
+    finally:
+        await close_llm_http_session()
+        await server.close()
+
+
+@pytest.fixture
+def streaming_db(tmp_path, monkeypatch):
+    bundle = create_managed_test_database(tmp_path / "assistant_llm_streaming.db")
+    install_main_database_overrides(
+        monkeypatch=monkeypatch,
+        app=app,
+        get_db_dependency=get_db,
+        async_engine=bundle["async_engine"],
+        async_session_factory=bundle["async_session_factory"],
+    )
+    with bundle["sync_session_factory"]() as session:
+        session.add(Team(id=1, name="ART", description="", wiki_token="wt", test_case_table_id="tbl1"))
+        session.commit()
+    yield bundle
+    app.dependency_overrides.pop(get_db, None)
+    dispose_managed_test_database(bundle)
+
+
+async def test_agent_loop_emits_partial_text_deltas_while_streaming(streaming_db):
+    fake = _FakeOpenRouter(_TEXT_CHUNKS, delay_seconds=0.01)
+    server, url = await _serve(fake)
+    settings = _settings()
+    cfg = settings.ai.assistant
+    boundary = get_main_access_boundary()
+    registry = get_tool_registry()
+    conv_svc = ConversationService(boundary, cfg)
+    executor = ToolExecutor(app=app, main_boundary=boundary, config=cfg, registry=registry)
+    try:
+        conv = await conv_svc.create_conversation(user_id=1, scope_type="team", team_id=1, title="t")
+        turn = (await conv_svc.start_turn(
+            conversation=conv, client_message_id="m1", text="hi", attachment_digests=[],
+        )).turn
+        await agent_svc.run_agent_turn(
+            conversation=conv, turn=turn, user_id=1, role=UserRole.USER, jwt="fake",
+            conversation_service=conv_svc, executor=executor,
+            llm_service=AssistantLLMService(settings, endpoint_url=url), registry=registry, config=cfg,
+        )
+    finally:
+        await close_llm_http_session()
+        await server.close()
+
+    events = await conv_svc.get_events_after(turn_id=turn.id, after_seq=-1)
+    text_events = [json.loads(e.payload_json) for e in events if e.event_type == "text_delta"]
+    assert [e.event_type for e in events][0] == "message_start"
+    assert [e.event_type for e in events][-1] == "done"
+    assert [p["content"] for p in text_events if p.get("partial")] == ["Hello", "Hello, ", "Hello, world"]
+    assert text_events[-1] == {"content": "Hello, world"}
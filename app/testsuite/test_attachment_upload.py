@@ -0,0 +1,139 @@
+"""附件串流上傳：分塊寫入、大小上限、sha256 去重與 blob 回收"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.attachment_upload import (
+    STAGING_DIR_NAME,
+    AttachmentTooLargeError,
+    blob_path_for,
+    discard_stored_uploads,
+    release_deduplicated_blob,
+    store_upload_streaming,
+)
+
+
+def _upload(name: str, body: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(body), filename=name)
+
+
+def test_streams_in_chunks_and_deduplicates_within_scope(tmp_path):
+    scope = tmp_path / "test-runs" / "1"
+    staging = tmp_path / STAGING_DIR_NAME
+    body = b"0123456789" * 1000
+
+    first = asyncio.run(
+        store_upload_streaming(
+            _upload("a.mp4", body), scope / "10" / "100" / "a.mp4", staging_dir=staging,
+            dedup_scope=scope, chunk_size=333,
+        )
+    )
+    second = asyncio.run(
+        store_upload_streaming(
+            _upload("b.mp4", body), scope / "11" / "200" / "b.mp4", staging_dir=staging,
+            dedup_scope=scope, chunk_size=4096,
+        )
+    )
+
+    assert first.size == second.size == len(body)
+    assert first.sha256 == second.sha256 == hashlib.sha256(body).hexdigest()
+    assert first.deduplicated is False
+    assert second.deduplicated is True
+    assert first.path.read_bytes() == body
+    blob = blob_path_for(scope, first.sha256)
+    assert first.path.stat().st_ino == second.path.stat().st_ino == blob.stat().st_ino
+    assert list(staging.iterdir()) == []
+
+    first.path.unlink()
+    release_deduplicated_blob(scope, first.sha256)
+    assert blob.exists()
+    second.path.unlink()
+    release_deduplicated_blob(scope, second.sha256)
+    assert not blob.exists()
+
+
+def test_size_limit_is_enforced_while_streaming(tmp_path):
+    scope = tmp_path / "test-runs" / "1"
+    staging = tmp_path / STAGING_DIR_NAME
+    target = scope / "10" / "100" / "big.bin"
+
+    with pytest.raises(AttachmentTooLargeError) as exc_info:
+        asyncio.run(
+            store_upload_streaming(
+                _upload("big.bin", b"x" * 5000), target, staging_dir=staging,
+                dedup_scope=scope, max_bytes=4096, chunk_size=1024,
+            )
+        )
+
+    assert exc_info.value.max_bytes == 4096
+    assert not target.exists()
+    assert list(staging.iterdir()) == []
+
+
+def test_discard_stored_uploads_removes_partial_batch(tmp_path):
+    scope = tmp_path / "test-runs" / "1"
+    stored = asyncio.run(
+        store_upload_streaming(
+            _upload("a.txt", b"hello"), scope / "10" / "100" / "a.txt",
+            staging_dir=tmp_path / STAGING_DIR_NAME, dedup_scope=scope,
+        )
+    )
+
+    discard_stored_uploads([stored], scope)
+
+    assert not stored.path.exists()
+    assert not blob_path_for(scope, stored.sha256).exists()
+
+
+def _limited_upload_app(calls):
+    from fastapi import FastAPI, File
+
+    from app.middlewares import UploadSizeLimitMiddleware
+
+    limited = FastAPI()
+
+    @limited.post("/items/{item_id}/upload-results")
+    async def upload(item_id: int, files: list[UploadFile] = File(...)):
+        calls.append(item_id)
+        return {"files": len(files)}
+
+    limited.add_middleware(UploadSizeLimitMiddleware)
+    return limited
+
+
+def test_upload_request_over_limit_is_rejected_before_multipart_parsing(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings.attachments, "max_request_mb", 1)
+    calls = []
+    client = TestClient(_limited_upload_app(calls))
+
+    small = client.post("/items/1/upload-results", files={"files": ("a.txt", b"x" * 1024)})
+    assert small.status_code == 200
+
+    # 有 Content-Length：不讀 body 直接 413
+    large = client.post("/items/2/upload-results", files={"files": ("b.bin", b"x" * (2 * 1024 * 1024))})
+    assert large.status_code == 413
+
+    # chunked（沒有 Content-Length）：接收中累計超過即中止
+    def chunks():
+        yield b"--b\r\nContent-Disposition: form-data; name=\"files\"; filename=\"c.bin\"\r\n\r\n"
+        for _ in range(4):
+            yield b"x" * (512 * 1024)
+        yield b"\r\n--b--\r\n"
+
+    chunked = client.post(
+        "/items/3/upload-results",
+        content=chunks(),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    assert chunked.status_code == 413
+    assert calls == [1]
@@ -1,4 +1,5 @@
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
 import pytest
@@ -15,7 +16,12 @@ from app.models.database_models import (
     TestCaseSection as CaseSectionModel,
     TestCaseSet as CaseSetModel,
 )
-from app.services.automation.coverage_service import AutomationCoverageService
+from app.db_access.main import MainAccessBoundary
+from app.services.automation.coverage_service import (
+    AutomationCoverageService,
+    install_coverage_snapshot_hooks,
+    load_team_coverage,
+)
 from app.testsuite.db_test_helpers import create_managed_test_database, dispose_managed_test_database
 
 
@@ -115,9 +121,14 @@ def automation_coverage_db(tmp_path):
         ]
         session.add_all(links)
         session.commit()
-        ids = {"team_id": team.id}
+        ids = {
+            "team_id": team.id,
+            "set_id": case_set.id,
+            "case_ids": [item.id for item in cases],
+            "script_ids": [item.id for item in scripts],
+        }
 
-    yield {"ids": ids, "async_sessionmaker": AsyncSessionLocal}
+    yield {"ids": ids, "async_sessionmaker": AsyncSessionLocal, "sync_sessionmaker": SyncSessionLocal}
     dispose_managed_test_database(database_bundle)
 
 
@@ -200,3 +211,72 @@ async def test_list_cases_search_and_pagination(automation_coverage_db):
         assert [i["test_case_number"] for i in page1] == ["TC-001", "TC-002"]
         page2, _ = await service.list_cases(team_id=ids["team_id"], skip=2, limit=2)
         assert [i["test_case_number"] for i in page2] == ["TC-003", "TC-004"]
+
+
+@pytest.mark.asyncio
+async def test_coverage_snapshot_is_reused_until_coverage_sources_change(automation_coverage_db):
+    install_coverage_snapshot_hooks()
+    ids = automation_coverage_db["ids"]
+    session_factory = automation_coverage_db["async_sessionmaker"]
+
+    @asynccontextmanager
+    async def _provider():
+        async with session_factory() as session:
+            yield session
+
+    boundary = MainAccessBoundary(session_provider=_provider)
+    first = await load_team_coverage(boundary, ids["team_id"], uncovered_limit=1)
+    async with session_factory() as session:
+        live = await AutomationCoverageService(session).compute_coverage(team_id=ids["team_id"], uncovered_limit=1)
+    assert {key: value for key, value in first.items() if key != "snapshot_computed_at"} == live
+    assert [item["test_case_number"] for item in first["uncovered_sample"]] == ["TC-003"]
+
+    second = await load_team_coverage(boundary, ids["team_id"], uncovered_limit=50)
+    assert second["snapshot_computed_at"] == first["snapshot_computed_at"]
+    assert [item["test_case_number"] for item in second["uncovered_sample"]] == ["TC-003", "TC-004"]
+
+    # 非 coverage 欄位的變動不會使快照失效
+    with automation_coverage_db["sync_sessionmaker"]() as session:
+        script = session.get(AutomationScript, ids["script_ids"][0])
+        script.last_synced_at = datetime.utcnow()
+        session.commit()
+    assert (await load_team_coverage(boundary, ids["team_id"], uncovered_limit=50))[
+        "snapshot_computed_at"
+    ] == first["snapshot_computed_at"]
+
+    with automation_coverage_db["sync_sessionmaker"]() as session:
+        session.add_all(
+            [
+                AutomationScriptCaseLink(
+                    team_id=ids["team_id"],
+                    automation_script_id=ids["script_ids"][2],
+                    test_case_id=ids["case_ids"][3],
+                    link_type=AutomationScriptLinkType.COVERS,
+                ),
+                CaseModel(
+                    team_id=ids["team_id"],
+                    test_case_set_id=ids["set_id"],
+                    test_case_number="TCG-7.010",
+                    title="Dotted A",
+                ),
+                CaseModel(
+                    team_id=ids["team_id"],
+                    test_case_set_id=ids["set_id"],
+                    test_case_number="TCG-7.020",
+                    title="Dotted B",
+                ),
+            ]
+        )
+        session.commit()
+
+    refreshed = await load_team_coverage(boundary, ids["team_id"], uncovered_limit=50)
+    assert refreshed["snapshot_computed_at"] >= first["snapshot_computed_at"]
+    assert refreshed["total_test_cases"] == 6
+    assert refreshed["with_any_link"] == 3
+    assert refreshed["trend"][-1]["with_any_link"] == 3
+    assert {g["group"]: g["total"] for g in refreshed["by_group"]}["TCG-7"] == 2
+    assert [item["test_case_number"] for item in refreshed["uncovered_sample"]] == [
+        "TC-003",
+        "TCG-7.010",
+        "TCG-7.020",
+    ]
@@ -169,6 +169,29 @@ def test_audit_legacy_varchar_enum_schema_is_treated_as_compatible(tmp_path: Pat
                 "CREATE INDEX ix_knowledge_query_logs_user_timestamp ON knowledge_query_logs (user_id, timestamp)",
             ):
                 conn.execute(text(ddl))
+            # audit_user_activity 同為當前 baseline 的一員（dashboard 近期活動索引）
+            conn.execute(
+                text(
+                    """
+                    CREATE TABLE audit_user_activity (
+                        id INTEGER NOT NULL,
+                        user_id INTEGER NOT NULL,
+                        team_id INTEGER NOT NULL,
+                        timestamp DATETIME NOT NULL,
+                        action_type VARCHAR(32) NOT NULL,
+                        resource_type VARCHAR(64) NOT NULL,
+                        resource_id VARCHAR(100) NOT NULL,
+                        PRIMARY KEY (id)
+                    )
+                    """
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX ix_audit_user_activity_user_team_time "
+                    "ON audit_user_activity (user_id, team_id, timestamp)"
+                )
+            )
     finally:
         engine.dispose()
 
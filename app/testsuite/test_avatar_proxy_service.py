@@ -1,10 +1,14 @@
-"""Unit tests for the avatar proxy service (placeholder + host allowlist)."""
+"""Unit tests for the avatar proxy service (placeholder, host allowlist, cache tiers)."""
 
 from __future__ import annotations
 
+import asyncio
+import time
+
+import httpx
 import pytest
 
-from app.services.avatar_proxy_service import AvatarProxyService
+from app.services.avatar_proxy_service import CACHE_TTL_SECONDS, AvatarProxyService
 
 
 @pytest.fixture
@@ -54,3 +58,99 @@ async def test_resolve_falls_back_to_placeholder_without_upstream(service: Avata
         seed="1",
     )
     assert again.cache_hit is True
+
+
+_PNG = b"\x89PNG\r\n\x1a\n" + b"x" * 64
+_AVATAR_URL = "https://s1.feishucdn.com/avatar/a.png"
+
+
+class _Upstream:
+    """httpx MockTransport that counts requests and honours If-None-Match."""
+
+    def __init__(self, body: bytes = _PNG, *, etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests: list[httpx.Request] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.available = True
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await self.release.wait()
+        if not self.available:
+            return httpx.Response(503)
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304, headers={"etag": self.etag})
+        return httpx.Response(200, content=self.body, headers={"content-type": "image/png", "etag": self.etag})
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handler)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_fetch(tmp_path):
+    upstream = _Upstream()
+    upstream.release.clear()
+    service = AvatarProxyService(disk_dir=tmp_path, transport=upstream.transport())
+
+    async def _resolve():
+        return await service.resolve(cache_key="lark:ou_1", upstream_url=_AVATAR_URL, display_name="A", seed="1")
+
+    tasks = [asyncio.create_task(_resolve()) for _ in range(20)]
+    await asyncio.sleep(0.01)
+    upstream.release.set()
+    payloads = await asyncio.gather(*tasks)
+
+    assert len(upstream.requests) == 1
+    assert {payload.body for payload in payloads} == {_PNG}
+    assert service.metrics.coalesced == 19
+    assert service.metrics.misses == 1
+    assert (await _resolve()).cache_hit is True
+    assert service.metrics.memory_hits == 1
+    await service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart_and_revalidates_when_expired(tmp_path):
+    upstream = _Upstream()
+    first = AvatarProxyService(disk_dir=tmp_path, transport=upstream.transport())
+    await first.resolve(cache_key="user:7", upstream_url=_AVATAR_URL, display_name="B", seed="7")
+    await first.aclose()
+    assert len(upstream.requests) == 1
+
+    # A new worker finds the avatar on disk without contacting the upstream.
+    now = [time.time()]
+    restarted = AvatarProxyService(disk_dir=tmp_path, transport=upstream.transport(), clock=lambda: now[0])
+    payload = await restarted.resolve(cache_key="user:7", upstream_url=_AVATAR_URL, display_name="B", seed="7")
+    assert payload.body == _PNG and payload.cache_hit is True
+    assert restarted.metrics.disk_hits == 1
+    assert len(upstream.requests) == 1
+
+    # Past the TTL the disk copy is revalidated (304) instead of refetched.
+    now[0] += CACHE_TTL_SECONDS + 1
+    restarted.clear_cache()
+    payload = await restarted.resolve(cache_key="user:7", upstream_url=_AVATAR_URL, display_name="B", seed="7")
+    assert payload.body == _PNG
+    assert upstream.requests[-1].headers["if-none-match"] == '"v1"'
+    assert restarted.metrics.revalidated == 1
+
+    # Upstream down during revalidation: serve the stale copy, not a placeholder.
+    upstream.available = False
+    now[0] += CACHE_TTL_SECONDS + 1
+    restarted.clear_cache()
+    payload = await restarted.resolve(cache_key="user:7", upstream_url=_AVATAR_URL, display_name="B", seed="7")
+    assert payload.body == _PNG
+    assert restarted.metrics.stale_served == 1
+    await restarted.aclose()
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_bounded_by_bytes():
+    service = AvatarProxyService(memory_max_bytes=800)
+    for index in range(5):
+        await service.resolve(cache_key=f"user:{index}", upstream_url=None, display_name=f"U{index}", seed=str(index))
+    snapshot = service.metrics_snapshot()
+    assert 0 < snapshot["memory_bytes"] <= 800
+    assert snapshot["evictions"] == 5 - snapshot["memory_entries"]
+    assert snapshot["evictions"] >= 1
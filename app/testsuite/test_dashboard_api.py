@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta
 from types import SimpleNamespace
 
@@ -8,6 +9,8 @@ from fastapi.testclient import TestClient
 from sqlalchemy import text
 
 from app.api import dashboard as dashboard_api
+from app.audit import ActionType, ResourceType, audit_service
+from app.audit.database import USER_ACTIVITY_INDEX_DEPTH, AuditLogTable, AuditUserActivityTable
 from app.auth.dependencies import get_current_user
 from app.auth.models import UserRole
 from app.database import get_db
@@ -28,11 +31,12 @@ from app.models.database_models import (
 from app.models.lark_types import TestResultStatus
 from app.models.test_run_config import TestRunStatus
 from app.models.team import TeamStatus
-from app.services.dashboard_service import DashboardService
+from app.services.dashboard_service import DashboardService, dashboard_snapshot_cache
 from app.services.system_settings_service import AUTOMATION_HUB_ENTRY_ENABLED_KEY
 from app.testsuite.db_test_helpers import (
     create_managed_test_database,
     dispose_managed_test_database,
+    install_audit_database_overrides,
     install_main_database_overrides,
 )
 
@@ -88,6 +92,7 @@ class _AuditBoundaryWithResumeRows:
 
 @pytest.fixture
 def dashboard_db(tmp_path, monkeypatch):
+    dashboard_snapshot_cache.clear()
     bundle = create_managed_test_database(tmp_path / "dashboard.db")
     install_main_database_overrides(
         monkeypatch=monkeypatch,
@@ -291,6 +296,7 @@ def dashboard_db(tmp_path, monkeypatch):
     app.dependency_overrides.pop(dashboard_api.get_audit_access_boundary, None)
     app.dependency_overrides.pop(get_db, None)
     dispose_managed_test_database(bundle)
+    dashboard_snapshot_cache.clear()
 
 
 def test_personal_dashboard_uses_fk_before_legacy_fallback_and_is_no_store(dashboard_db):
@@ -968,3 +974,104 @@ def test_system_dashboard_normalizes_scheduler_persistence_statuses(dashboard_db
     }
     assert "do-not-leak-interrupted-error" not in response.text
     assert "Do not leak interrupted display text" not in response.text
+
+
+def _log_team_action(action_type: ActionType, team_id: int | None) -> None:
+    asyncio.run(
+        audit_service.log_action(
+            user_id=999,
+            username="other-user",
+            role="user",
+            action_type=action_type,
+            resource_type=ResourceType.TEST_RUN,
+            resource_id="1",
+            team_id=team_id,
+        )
+    )
+
+
+def test_personal_dashboard_snapshot_is_reused_until_an_audited_write(dashboard_db):
+    app.dependency_overrides[dashboard_api.get_audit_access_boundary] = lambda: (
+        _AuditBoundaryWithResumeRows([])
+    )
+
+    with TestClient(app) as client:
+        first = client.get("/api/dashboard").json()
+        second = client.get("/api/dashboard").json()
+        team_id = first["sections"]["teams"]["items"][0]["id"]
+        _log_team_action(ActionType.READ, team_id)
+        after_read = client.get("/api/dashboard").json()
+        _log_team_action(ActionType.UPDATE, team_id)
+        after_write = client.get("/api/dashboard").json()
+
+    assert first["cached"] is False
+    assert set(first["section_timings_ms"]) == {"teams", "main", "automation_hub", "audit"}
+    assert second["cached"] is True
+    assert second["sections"] == first["sections"]
+    assert after_read["cached"] is True
+    assert after_write["cached"] is False
+
+
+def test_degraded_dashboard_is_not_cached(dashboard_db):
+    with TestClient(app) as client:
+        first = client.get("/api/dashboard").json()
+        second = client.get("/api/dashboard").json()
+
+    assert first["sections"]["audit"]["state"] == "unavailable"
+    assert second["cached"] is False
+
+
+def test_audit_flush_maintains_trimmed_user_activity_index(tmp_path, monkeypatch):
+    bundle = create_managed_test_database(tmp_path / "dashboard_audit.db", target_name="audit")
+    install_audit_database_overrides(
+        monkeypatch=monkeypatch,
+        async_session_factory=bundle["async_session_factory"],
+    )
+    monkeypatch.setattr(audit_service.config, "enabled", True)
+    audit_service._batch_buffer.clear()
+
+    async def _log_actions():
+        for index in range(USER_ACTIVITY_INDEX_DEPTH + 5):
+            await audit_service.log_action(
+                user_id=7,
+                username="indexed-user",
+                role="user",
+                action_type=ActionType.UPDATE,
+                resource_type=ResourceType.TEST_CASE,
+                resource_id=f"TC-{index}",
+                team_id=3,
+            )
+        await audit_service.log_action(
+            user_id=7,
+            username="indexed-user",
+            role="user",
+            action_type=ActionType.LOGIN,
+            resource_type=ResourceType.USER,
+            resource_id="7",
+            team_id=None,
+        )
+        await audit_service.force_flush()
+
+    try:
+        asyncio.run(_log_actions())
+        with bundle["sync_session_factory"]() as session:
+            rows = (
+                session.query(AuditUserActivityTable)
+                .filter(AuditUserActivityTable.user_id == 7)
+                .order_by(AuditUserActivityTable.id.desc())
+                .all()
+            )
+            audit_count = session.query(AuditLogTable).count()
+    finally:
+        dispose_managed_test_database(bundle)
+
+    assert audit_count == USER_ACTIVITY_INDEX_DEPTH + 6
+    # 只保留每個 (user, team) 最近的 N 筆；沒有 team 的事件不進索引
+    assert len(rows) == USER_ACTIVITY_INDEX_DEPTH
+    assert {row.team_id for row in rows} == {3}
+    assert (rows[0].resource_id, rows[0].action_type, rows[0].resource_type) == (
+        f"TC-{USER_ACTIVITY_INDEX_DEPTH + 4}",
+        "UPDATE",
+        "test_case",
+    )
+    assert rows[-1].resource_id == "TC-5"
@@ -0,0 +1,138 @@
+"""Runtime 資料庫備份：SQLite 分段完整快照 + page 增量還原、append-only 資料列 watermark 匯出"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sqlite3
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, func, insert, select
+
+from app.config import BackupConfig
+from app.services.database_backup_service import (
+    DatabaseBackupService,
+    apply_row_delta,
+    export_rows_since_watermark,
+    list_snapshots,
+    restore_sqlite_chain,
+)
+
+
+def _seed_sqlite(path, rows: int) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"item-{i}" * 20,) for i in range(rows)])
+    conn.close()
+
+
+def _dump_rows(path) -> list[tuple]:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT id, name FROM items ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_sqlite_full_then_page_delta_restores_latest_state(tmp_path):
+    source = tmp_path / "main.db"
+    _seed_sqlite(source, 2000)
+    service = DatabaseBackupService(
+        BackupConfig(sqlite_pages_per_step=16, sqlite_step_sleep_ms=0, keep_full=1), root_dir=tmp_path / "backups"
+    )
+    url = f"sqlite:///{source}"
+
+    full = service.backup_target("main", url)
+    assert full.kind == "full"
+    assert full.extra["backup_steps"] > 1
+    assert full.pages_changed == full.pages_total > 0
+
+    with sqlite3.connect(source) as conn:
+        conn.execute("UPDATE items SET name = 'changed' WHERE id = 5")
+        conn.execute("INSERT INTO items (name) VALUES ('appended')")
+    conn.close()
+
+    delta = service.backup_target("main", url)
+    assert delta.kind == "pages"
+    assert 0 < delta.pages_changed < delta.pages_total
+    assert delta.bytes_written < full.bytes_written
+
+    target_dir = tmp_path / "backups" / "main"
+    assert [item["kind"] for item in list_snapshots(target_dir)] == ["full", "pages"]
+    assert not any((target_dir / ".work").iterdir())
+
+    restored = tmp_path / "restored.db"
+    result = restore_sqlite_chain(target_dir, restored)
+    assert result["applied_deltas"] == 1
+    assert _dump_rows(restored) == _dump_rows(source)
+
+    # 強制重做完整備份後，keep_full=1 只保留新的備份鏈
+    service.backup_target("main", url, force_full=True)
+    snapshots = list_snapshots(target_dir)
+    assert [item["kind"] for item in snapshots] == ["full"]
+    assert service.metrics_snapshot()["runs"] == 3
+
+
+def test_row_delta_exports_only_rows_after_watermark(tmp_path):
+    source_url = f"sqlite:///{tmp_path / 'audit.db'}"
+    metadata = MetaData()
+    logs = Table(
+        "audit_logs", metadata, Column("id", Integer, primary_key=True), Column("action", String(32), nullable=False)
+    )
+    engine = create_engine(source_url, future=True)
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(logs), [{"action": f"a{i}"} for i in range(1, 6)])
+
+    delta_path = tmp_path / "rows.jsonl.gz"
+    watermarks, exported, _ = export_rows_since_watermark(
+        source_url, delta_path, {"audit_logs": "id"}, {"audit_logs": 3}, compress_level=1
+    )
+    assert exported == 2
+    assert watermarks == {"audit_logs": 5}
+    with gzip.open(delta_path, "rt", encoding="utf-8") as handle:
+        lines = [json.loads(line) for line in handle]
+    assert lines[0]["columns"] == ["id", "action"]
+    assert lines[1:] == [[4, "a4"], [5, "a5"]]
+
+    target_url = f"sqlite:///{tmp_path / 'restored.db'}"
+    target_engine = create_engine(target_url, future=True)
+    metadata.create_all(target_engine)
+    assert apply_row_delta(target_url, delta_path) == 2
+    with target_engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(logs)).scalar() == 2
+    engine.dispose()
+    target_engine.dispose()
+
+
+def test_row_delta_overlapping_full_snapshot_restores_without_duplicates(tmp_path):
+    source_url = f"sqlite:///{tmp_path / 'audit.db'}"
+    metadata = MetaData()
+    logs = Table(
+        "audit_logs", metadata, Column("id", Integer, primary_key=True), Column("action", String(32), nullable=False)
+    )
+    engine = create_engine(source_url, future=True)
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(logs), [{"action": f"a{i}"} for i in range(1, 6)])
+
+    # 完整快照已含 1..3；watermark 在 dump 前讀到 2，safety window 再往回重讀，增量與快照重疊
+    target_url = f"sqlite:///{tmp_path / 'restored.db'}"
+    target_engine = create_engine(target_url, future=True)
+    metadata.create_all(target_engine)
+    with target_engine.begin() as connection:
+        connection.execute(insert(logs), [{"id": i, "action": f"a{i}"} for i in range(1, 4)])
+
+    delta_path = tmp_path / "rows.jsonl.gz"
+    watermarks, exported, _ = export_rows_since_watermark(
+        source_url, delta_path, {"audit_logs": "id"}, {"audit_logs": 2}, compress_level=1, safety_window=10
+    )
+    assert exported == 5
+    assert watermarks == {"audit_logs": 5}
+
+    assert apply_row_delta(target_url, delta_path) == 2
+    # 重複套用同一份增量仍是冪等的
+    assert apply_row_delta(target_url, delta_path) == 0
+    with target_engine.connect() as connection:
+        assert connection.execute(select(logs.c.id).order_by(logs.c.id)).scalars().all() == [1, 2, 3, 4, 5]
+    engine.dispose()
+    target_engine.dispose()
@@ -258,6 +258,130 @@ def test_run_job_reset_target_replaces_existing_rows(tmp_path: Path) -> None:
         target_engine.dispose()
 
 
+def test_run_job_checkpoint_resumes_after_table_failure(tmp_path: Path, monkeypatch) -> None:
+    """逐表 transaction 模式：失敗的 table 整表 rollback，重跑時略過 checkpoint 內已完成的 tables。"""
+    module = _load_script_module()
+    source_path = tmp_path / "source_resume.db"
+    target_path = tmp_path / "target_resume.db"
+    checkpoint_path = tmp_path / "checkpoint.json"
+    schema = [
+        "CREATE TABLE parent (id INTEGER PRIMARY KEY, name TEXT NOT NULL)",
+        "CREATE TABLE other (id INTEGER PRIMARY KEY, name TEXT NOT NULL)",
+        "CREATE TABLE child (id INTEGER PRIMARY KEY, parent_id INTEGER NOT NULL, "
+        "FOREIGN KEY(parent_id) REFERENCES parent(id))",
+    ]
+
+    source_engine = create_engine(_sqlite_url(source_path), future=True)
+    target_engine = create_engine(_sqlite_url(target_path), future=True)
+    try:
+        for engine in (source_engine, target_engine):
+            with engine.begin() as connection:
+                for statement in schema:
+                    connection.execute(text(statement))
+        with source_engine.begin() as connection:
+            connection.execute(text("INSERT INTO parent (id, name) VALUES (1, 'p1'), (2, 'p2')"))
+            connection.execute(text("INSERT INTO other (id, name) VALUES (1, 'o1')"))
+            connection.execute(text("INSERT INTO child (id, parent_id) VALUES (10, 1), (11, 2), (12, 2)"))
+
+        original_copy = module.copy_table_data
+
+        def _failing_child_copy(source_connection, target_connection, source_table, target_table, **kwargs):
+            copied = original_copy(source_connection, target_connection, source_table, target_table, **kwargs)
+            if target_table.name == "child":
+                raise RuntimeError("connection lost")
+            return copied
+
+        job = module.TransferJob(
+            name="resume",
+            source_url=_sqlite_url(source_path),
+            target_url=_sqlite_url(target_path),
+            chunk_size=2,
+            workers=3,
+            checkpoint_path=str(checkpoint_path),
+        )
+        monkeypatch.setattr(module, "copy_table_data", _failing_child_copy)
+        with pytest.raises(RuntimeError, match="table child"):
+            module.run_job(job, module.Logger(quiet=True))
+
+        checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+        assert set(checkpoint["tables"]) == {"parent", "other"}
+        with target_engine.connect() as connection:
+            assert connection.execute(text("SELECT COUNT(*) FROM child")).scalar_one() == 0
+
+        monkeypatch.setattr(module, "copy_table_data", original_copy)
+        summary = module.run_job(job, module.Logger(quiet=True))
+
+        assert summary["status"] == "completed"
+        assert summary["row_counts_match"] is True
+        by_table = {item["table"]: item for item in summary["tables"]}
+        assert by_table["parent"]["resumed"] is True
+        assert by_table["other"]["resumed"] is True
+        assert "resumed" not in by_table["child"]
+        assert by_table["child"]["rows"] == 3
+        assert by_table["child"]["loader"] == "generic"
+        assert by_table["child"]["rows_per_sec"] is not None
+    finally:
+        source_engine.dispose()
+        target_engine.dispose()
+
+
+def test_copy_tables_concurrently_waits_for_foreign_key_dependencies(tmp_path: Path) -> None:
+    module = _load_script_module()
+    source_path = tmp_path / "source_dag.db"
+    target_path = tmp_path / "target_dag.db"
+    tables = ["a", "b", "c", "d"]
+    dependencies = {"a": set(), "b": set(), "c": {"a"}, "d": {"b", "c"}}
+
+    for path in (source_path, target_path):
+        engine = create_engine(_sqlite_url(path), future=True)
+        with engine.begin() as connection:
+            for name in tables:
+                connection.execute(text(f"CREATE TABLE {name} (id INTEGER PRIMARY KEY)"))
+        engine.dispose()
+
+    job = module.TransferJob(name="dag", source_url=_sqlite_url(source_path), target_url=_sqlite_url(target_path))
+    source_engine = module.build_engine(job.source_url)
+    target_engine = module.build_engine(job.target_url)
+    source_metadata, _ = module.reflect_selected_metadata(source_engine, include_tables=[], exclude_tables=[])
+    target_metadata, _ = module.reflect_selected_metadata(target_engine, include_tables=[], exclude_tables=[])
+
+    events: list[tuple[str, str]] = []
+    original_copy_single_table = module.copy_single_table
+
+    def _tracking_copy(source_connection, target_connection, table_name, **kwargs):
+        events.append(("start", table_name))
+        result = original_copy_single_table(source_connection, target_connection, table_name, **kwargs)
+        events.append(("end", table_name))
+        return result
+
+    module.copy_single_table = _tracking_copy
+    try:
+        records, _ = module.copy_tables_concurrently(
+            source_engine,
+            target_engine,
+            ["a", "b", "c", "d"],
+            dependencies,
+            completed_tables=set(),
+            workers=2,
+            checkpoint=module.TableCheckpoint(None, job),
+            job=job,
+            source_metadata=source_metadata,
+            target_metadata=target_metadata,
+            logger=module.Logger(quiet=True),
+            shared_context={},
+        )
+    finally:
+        module.copy_single_table = original_copy_single_table
+        source_engine.dispose()
+        target_engine.dispose()
+
+    assert sorted(record["table"] for record in records) == tables
+    for table_name, deps in dependencies.items():
+        started_at = events.index(("start", table_name))
+        for dep in deps:
+            assert events.index(("end", dep)) < started_at
+
+
 def test_load_jobs_from_config(tmp_path: Path) -> None:
     module = _load_script_module()
     config_path = tmp_path / "db_cross_migrate.yaml"
@@ -626,6 +750,10 @@ def test_resolve_jobs_applies_cli_overrides_for_config(tmp_path: Path) -> None:
             "--reset-target",
             "--chunk-size",
             "7",
+            "--workers",
+            "4",
+            "--checkpoint",
+            str(tmp_path / "checkpoint.json"),
         ]
     )
     jobs = module.resolve_jobs(args)
@@ -633,6 +761,9 @@ def test_resolve_jobs_applies_cli_overrides_for_config(tmp_path: Path) -> None:
     assert len(jobs) == 1
     assert jobs[0].reset_target is True
     assert jobs[0].chunk_size == 7
+    assert jobs[0].workers == 4
+    assert jobs[0].checkpoint_path == str(tmp_path / "checkpoint.json")
+    assert jobs[0].bulk_loader == "auto"
 
 
 def test_copy_table_data_skips_orphan_test_run_item_history(tmp_path: Path) -> None:
@@ -5,6 +5,7 @@ Covers:
 - enqueue_test_case_sync / enqueue_usm_node_sync (hooks layer)
 - start_sync_workers / stop_sync_workers (worker lifecycle)
 - write_entity operation="delete" dispatch
+- enqueue_test_case_batch_sync / write_entity("test_case_batch")
 """
 
 from __future__ import annotations
@@ -123,6 +124,24 @@ async def test_write_entity_unknown_entity_type_is_warning() -> None:
     await svc.write_entity("nonsense", "x", payload={"operation": "delete"})
 
 
+@pytest.mark.asyncio
+async def test_write_entity_test_case_batch_embeds_once() -> None:
+    """A batch task embeds all cases in one call and upserts one point each."""
+    svc, fake_qdrant = _make_svc()
+    svc._ensure_collections = AsyncMock(return_value=True)  # type: ignore[method-assign]
+    svc._embedding.embed_batch = AsyncMock(return_value=[[0.1] * 4, [0.2] * 4])
+    entities = [
+        {"test_case_number": "TC-001", "title": "Login", "steps": "1. open"},
+        {"test_case_number": "TC-002", "title": "Logout", "steps": "1. close"},
+        {"test_case_number": "TC-003"},  # 無可嵌入文字，略過
+    ]
+    await svc.write_entity("test_case_batch", "commit:1", payload={"entities": entities})
+    svc._embedding.embed_batch.assert_awaited_once()
+    collection, points = fake_qdrant.upsert_points.await_args.args
+    assert collection == "t1"
+    assert [point.payload["test_case_number"] for point in points] == ["TC-001", "TC-002"]
+
+
 # ---- task_queue default path: operation extracted from payload ----
 
 
@@ -380,6 +399,35 @@ async def test_enqueues_bulk_test_cases_with_dict_payloads(
     importlib.reload(hooks)
 
 
+@pytest.mark.asyncio
+async def test_enqueue_test_case_batch_sync_uses_single_task(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The batch hook enqueues one task carrying every entity with a number."""
+    import app.services.knowledge as kg_module
+
+    fake_queue = AsyncMock()
+    fake_queue.enqueue = AsyncMock(return_value=True)
+    monkeypatch.setattr(kg_module, "is_knowledge_graph_enabled", lambda: True)
+    monkeypatch.setattr(kg_module, "_task_queue", fake_queue)
+    monkeypatch.setattr(kg_module, "get_task_queue", lambda: fake_queue)
+
+    import importlib
+    from app.services.knowledge import hooks
+    importlib.reload(hooks)
+
+    items = [{"test_case_number": "TC-001", "title": "T1"}, {"title": "no number"}]
+    assert await hooks.enqueue_test_case_batch_sync("commit:1", items) is True
+    assert await hooks.enqueue_test_case_batch_sync("commit:2", []) is False
+    fake_queue.enqueue.assert_awaited_once()
+    call = fake_queue.enqueue.await_args
+    assert call.kwargs["entity_type"] == "test_case_batch"
+    assert call.kwargs["entity_id"] == "commit:1"
+    assert call.kwargs["payload"] == {"operation": "upsert", "entity": {"entities": items[:1]}}
+
+    importlib.reload(hooks)
+
+
 # ---- worker lifecycle ----
 
 
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.models.database_models import LarkDepartment, LarkUser
+from app.services.lark_async_client import AsyncLarkClient
+from app.services.lark_user_service import LarkUserService
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+)
+from app.testsuite.fake_lark_server import (
+    FAKE_LARK_BASE_URL,
+    FakeLarkAuthManager,
+    build_fake_org,
+    create_fake_lark_app,
+    fake_lark_transport,
+    run_lark_user_sync,
+    seed_fake_lark_departments,
+)
+
+
+@pytest.fixture
+def lark_db(tmp_path):
+    bundle = create_managed_test_database(tmp_path / "lark_sync.db")
+    yield bundle
+    dispose_managed_test_database(bundle)
+
+
+def _make_service(fake_app, *, max_concurrency: int = 4) -> LarkUserService:
+    service = LarkUserService(auth_manager=FakeLarkAuthManager())
+    service.async_client_factory = lambda: AsyncLarkClient(
+        service.auth_manager,
+        base_url=FAKE_LARK_BASE_URL,
+        max_concurrency=max_concurrency,
+        rate_per_second=0,
+        transport=fake_lark_transport(fake_app),
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_sync_all_users_fetches_departments_concurrently_and_bulk_inserts(lark_db):
+    org = build_fake_org(department_count=6, users_per_department=120, shared_users=2)
+    seed_fake_lark_departments(lark_db, org)
+    fake_app = create_fake_lark_app(department_users=org, latency_seconds=0.01)
+    service = _make_service(fake_app, max_concurrency=4)
+
+    result = await run_lark_user_sync(lark_db, service)
+
+    assert result["success"] is True
+    stats = result["stats"]
+    assert stats["departments_processed"] == 6
+    assert stats["users_created"] == 6 * 120 + 2
+    assert stats["users_duplicated"] == 2 * 5
+    # 122 users per department at 50 per page -> 3 pages each
+    assert stats["api_calls"] == 6 * 3
+    assert 1 < fake_app.state.fake_lark.peak_in_flight <= 4
+
+    with lark_db["sync_session_factory"]() as session:
+        shared = session.get(LarkUser, "shared0")
+        assert shared.primary_department_id == "od_0"
+        assert json.loads(shared.department_ids_json) == [f"od_{n}" for n in range(6)]
+        assert shared.content_hash
+        department = session.get(LarkDepartment, "od_3")
+        assert department.direct_user_count == 120
+
+
+@pytest.mark.asyncio
+async def test_sync_all_users_skips_unchanged_users_by_content_hash(lark_db):
+    org = build_fake_org(department_count=2, users_per_department=3)
+    seed_fake_lark_departments(lark_db, org)
+    fake_app = create_fake_lark_app(department_users=org)
+    service = _make_service(fake_app)
+
+    await run_lark_user_sync(lark_db, service)
+    with lark_db["sync_session_factory"]() as session:
+        first_sync_at = session.get(LarkUser, "u0_0").last_sync_at
+
+    org["od_0"][0]["name"] = "Renamed"
+    result = await run_lark_user_sync(lark_db, service)
+
+    assert result["stats"]["users_created"] == 0
+    assert result["stats"]["users_updated"] == 1
+    assert result["stats"]["users_unchanged"] == 5
+
+    with lark_db["sync_session_factory"]() as session:
+        renamed = session.get(LarkUser, "u0_0")
+        assert renamed.name == "Renamed"
+        assert renamed.last_sync_at >= first_sync_at
+        untouched_sync_times = session.execute(select(LarkUser.last_sync_at)).scalars().all()
+        assert all(value >= first_sync_at for value in untouched_sync_times)
+
+
+@pytest.mark.asyncio
+async def test_sync_all_users_reports_failed_department_without_aborting(lark_db):
+    org = build_fake_org(department_count=2, users_per_department=2)
+    seed_fake_lark_departments(lark_db, [*org, "od_missing"])
+    fake_app = create_fake_lark_app(department_users=org)
+    service = _make_service(fake_app)
+
+    result = await run_lark_user_sync(lark_db, service)
+
+    assert result["success"] is True
+    assert result["stats"]["departments_processed"] == 2
+    assert result["stats"]["users_created"] == 4
+    assert result["stats"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_get_all_records_follows_page_tokens():
+    records = [{"record_id": f"rec{index}", "fields": {}} for index in range(1203)]
+    fake_app = create_fake_lark_app(table_records={"tbl1": records})
+    async with AsyncLarkClient(
+        FakeLarkAuthManager(),
+        base_url=FAKE_LARK_BASE_URL,
+        rate_per_second=0,
+        transport=fake_lark_transport(fake_app),
+    ) as client:
+        fetched = await client.get_all_records("app-token", "tbl1")
+
+    assert [record["record_id"] for record in fetched] == [record["record_id"] for record in records]
+    assert client.stats["api_calls"] == 3
@@ -0,0 +1,160 @@
+"""全域 LLM scheduler：優先級與公平排隊、token 預算、429 退避，以及叢集 slot 協調。"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.config import LLMSchedulerConfig
+from app.database import get_db
+from app.db_access.main import get_main_access_boundary
+from app.main import app
+from app.services.llm_scheduler import (
+    LLMPriority,
+    LLMRateLimitedError,
+    LLMScheduler,
+    llm_request_scope,
+    parse_retry_after,
+)
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+    install_main_database_overrides,
+)
+
+
+def _scheduler(**overrides) -> LLMScheduler:
+    config = LLMSchedulerConfig(**{"rate_limit_backoff_seconds": 0.01, **overrides})
+    return LLMScheduler(config_provider=lambda: config)
+
+
+class _Gate:
+    """讓測試控制呼叫何時完成，並記錄開始順序。"""
+
+    def __init__(self):
+        self.started: list[str] = []
+        self.release = asyncio.Event()
+
+    def call(self, name: str):
+        async def _run():
+            self.started.append(name)
+            await self.release.wait()
+            return name
+
+        return _run
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_interactive_calls_jump_ahead_and_teams_are_served_round_robin():
+    scheduler = _scheduler(worker_max_concurrency=1)
+    gate = _Gate()
+
+    async def _submit(name: str, team_id: int, priority: LLMPriority):
+        with llm_request_scope(team_id=team_id, user_id=team_id * 10):
+            return await scheduler.run(gate.call(name), stage="test", priority=priority)
+
+    tasks = [asyncio.create_task(_submit("a1", 1, LLMPriority.BATCH))]
+    await _settle()
+    for name, team_id in (("a2", 1), ("a3", 1), ("b1", 2)):
+        tasks.append(asyncio.create_task(_submit(name, team_id, LLMPriority.BATCH)))
+    tasks.append(asyncio.create_task(_submit("chat", 3, LLMPriority.INTERACTIVE)))
+    await _settle()
+    assert gate.started == ["a1"]
+    assert scheduler.snapshot()["queued"] == {"interactive": 1, "batch": 3}
+
+    gate.release.set()
+    await asyncio.gather(*tasks)
+    # interactive 先於 batch；同優先級 team 1 與 team 2 輪替，不會讓 team 1 連續佔用
+    assert gate.started == ["a1", "chat", "a2", "b1", "a3"]
+    snapshot = scheduler.snapshot()
+    assert snapshot["in_flight"] == 0
+    assert snapshot["granted_total"] == 5
+    assert snapshot["queue_wait"]["batch"]["samples"] == 4
+
+
+async def test_tokens_per_minute_budget_delays_dispatch_until_window_frees(monkeypatch):
+    monkeypatch.setattr(LLMScheduler, "_TOKEN_WINDOW_SECONDS", 0.2)
+    scheduler = _scheduler(worker_max_concurrency=4, worker_tokens_per_minute=100)
+    gate = _Gate()
+    gate.release.set()
+
+    first = await scheduler.run(gate.call("first"), stage="test", estimated_tokens=80)
+    second = asyncio.create_task(scheduler.run(gate.call("second"), stage="test", estimated_tokens=80))
+    await _settle()
+    assert not second.done()
+    assert scheduler.snapshot()["queued"]["interactive"] == 1
+
+    assert await asyncio.wait_for(second, timeout=1.0) == "second"
+    assert first == "first"
+    assert scheduler.metrics.waits[-1].wait_ms >= 100
+
+
+async def test_rate_limited_call_backs_off_and_halves_effective_concurrency():
+    scheduler = _scheduler(worker_max_concurrency=8, rate_limit_max_retries=2)
+    attempts = {"count": 0}
+
+    async def _flaky():
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            raise LLMRateLimitedError("HTTP 429", retry_after=0.05)
+        return "ok"
+
+    assert await scheduler.run(_flaky, stage="test") == "ok"
+    assert attempts["count"] == 2
+    snapshot = scheduler.snapshot()
+    assert snapshot["rate_limited_total"] == 1
+    assert snapshot["effective_concurrency"] < 8
+    assert scheduler.metrics.waits[-1].wait_ms >= 40
+
+    async def _always_limited():
+        raise LLMRateLimitedError("HTTP 429", retry_after=0)
+
+    with pytest.raises(LLMRateLimitedError):
+        await scheduler.run(_always_limited, stage="test")
+    assert scheduler.snapshot()["rate_limited_total"] == 4
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+@pytest.fixture
+def scheduler_db(tmp_path, monkeypatch):
+    bundle = create_managed_test_database(tmp_path / "llm_scheduler.db")
+    install_main_database_overrides(
+        monkeypatch=monkeypatch,
+        app=app,
+        get_db_dependency=get_db,
+        async_engine=bundle["async_engine"],
+        async_session_factory=bundle["async_session_factory"],
+    )
+    yield bundle
+    app.dependency_overrides.pop(get_db, None)
+    dispose_managed_test_database(bundle)
+
+
+async def test_cluster_slots_are_shared_across_workers(scheduler_db):
+    config = LLMSchedulerConfig(worker_max_concurrency=4, cluster_max_concurrency=1, cluster_poll_interval_ms=20)
+    worker_a = LLMScheduler(config_provider=lambda: config, main_boundary_provider=get_main_access_boundary)
+    worker_b = LLMScheduler(config_provider=lambda: config, main_boundary_provider=get_main_access_boundary)
+    gate = _Gate()
+
+    first = asyncio.create_task(worker_a.run(gate.call("a"), stage="test"))
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+        if gate.started:
+            break
+    second = asyncio.create_task(worker_b.run(gate.call("b"), stage="test"))
+    await asyncio.sleep(0.1)
+    assert gate.started == ["a"], "叢集僅一個 slot，另一個 worker 必須等待"
+
+    gate.release.set()
+    assert await asyncio.wait_for(asyncio.gather(first, second), timeout=2.0) == ["a", "b"]
+    assert gate.started == ["a", "b"]
@@ -0,0 +1,121 @@
+"""Tests for the machine API (app token / MCP) token-bucket and in-flight governance store."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.services.machine_api_governance import (
+    GovernanceLimits,
+    MachineApiGovernanceStore,
+    MachineApiQuotaExceeded,
+    resolve_endpoint_cost,
+)
+
+
+LIMITS = GovernanceLimits(rate_per_minute=60, burst=5, max_in_flight=0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    instance = MachineApiGovernanceStore(str(tmp_path / "governance.sqlite3"))
+    yield instance
+    instance.close()
+
+
+def test_bucket_drains_then_refills_with_retry_after(store):
+    for _ in range(5):
+        store.try_acquire([("credential:app:1", LIMITS)], 1.0, now=1000.0)
+
+    with pytest.raises(MachineApiQuotaExceeded) as exc_info:
+        store.try_acquire([("credential:app:1", LIMITS)], 2.0, now=1000.0)
+    assert exc_info.value.reason == "rate"
+    # 60/min = 1 token/s, deficit of 2 tokens -> retry after 2s.
+    assert exc_info.value.retry_after == 2
+
+    store.try_acquire([("credential:app:1", LIMITS)], 2.0, now=1002.0)
+
+
+def test_cost_above_capacity_is_admitted_from_a_full_bucket(store):
+    store.try_acquire([("credential:app:1", LIMITS)], 10.0, now=1000.0)
+    with pytest.raises(MachineApiQuotaExceeded):
+        store.try_acquire([("credential:app:1", LIMITS)], 10.0, now=1001.0)
+
+
+def test_in_flight_cap_is_released_with_lease(store):
+    limits = GovernanceLimits(rate_per_minute=600, burst=100, max_in_flight=2)
+    first = store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+    store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+
+    with pytest.raises(MachineApiQuotaExceeded) as exc_info:
+        store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+    assert exc_info.value.reason == "concurrency"
+
+    store.release(first)
+    store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+
+
+def test_expired_leases_from_dead_workers_are_reclaimed(store):
+    limits = GovernanceLimits(rate_per_minute=600, burst=100, max_in_flight=1)
+    store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+    with pytest.raises(MachineApiQuotaExceeded):
+        store.try_acquire([("credential:app:1", limits)], 1.0, now=1001.0)
+    store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0 + 10_000)
+
+
+def test_team_bucket_is_shared_by_credentials_of_the_same_team(store):
+    team_limits = GovernanceLimits(rate_per_minute=60, burst=3, max_in_flight=0)
+    credential_limits = GovernanceLimits(rate_per_minute=600, burst=100, max_in_flight=0)
+    for credential_id in (1, 2, 3):
+        store.try_acquire(
+            [(f"credential:app:{credential_id}", credential_limits), ("team:7", team_limits)],
+            1.0,
+            now=1000.0,
+        )
+    with pytest.raises(MachineApiQuotaExceeded) as exc_info:
+        store.try_acquire(
+            [("credential:app:4", credential_limits), ("team:7", team_limits)], 1.0, now=1000.0
+        )
+    assert exc_info.value.bucket_key == "team:7"
+
+
+def test_state_is_shared_between_store_instances_on_the_same_file(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    worker_a = MachineApiGovernanceStore(path)
+    worker_b = MachineApiGovernanceStore(path)
+    try:
+        for _ in range(5):
+            worker_a.try_acquire([("credential:app:1", LIMITS)], 1.0, now=1000.0)
+        with pytest.raises(MachineApiQuotaExceeded):
+            worker_b.try_acquire([("credential:app:1", LIMITS)], 1.0, now=1000.0)
+    finally:
+        worker_a.close()
+        worker_b.close()
+
+
+def test_usage_snapshot_reports_allowed_and_throttled_counts(store):
+    limits = GovernanceLimits(rate_per_minute=60, burst=2, max_in_flight=0)
+    store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+    store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+    with pytest.raises(MachineApiQuotaExceeded):
+        store.try_acquire([("credential:app:1", limits)], 1.0, now=1000.0)
+
+    (row,) = store.usage_snapshot(now=1000.0)
+    assert row["bucket_key"] == "credential:app:1"
+    assert row["requests_allowed"] == 2
+    assert row["requests_rate_limited"] == 1
+    assert row["cost_consumed"] == 2.0
+    assert row["in_flight"] == 2
+
+
+@pytest.mark.parametrize(
+    ("method", "route_path", "query", "expected"),
+    [
+        ("GET", "/api/app/teams/{team_id}/test-cases", {}, 1.0),
+        ("PUT", "/api/app/teams/{team_id}/test-cases/{case_id}", {}, 2.0),
+        ("POST", "/api/app/teams/{team_id}/test-run-sets/{set_id}/generate-report", {}, 10.0),
+        ("POST", "/api/app/teams/{team_id}/test-run-configs/{config_id}/items", {}, 5.0),
+        ("GET", "/api/mcp/test-cases/lookup", {"limit": "200", "include_test_data": "true"}, 8.0),
+    ],
+)
+def test_endpoint_cost_weights(method, route_path, query, expected):
+    assert resolve_endpoint_cost(method, route_path, query) == expected
@@ -1139,3 +1139,165 @@ def test_mcp_bogus_run_type_400_message_is_verbatim(temp_db):
         )
         assert resp.status_code == 400
         assert resp.json()["detail"] == "run_type 不支援的值: bogus"
+
+
+def test_mcp_team_test_cases_keyset_cursor_matches_offset_pages(temp_db):
+    with temp_db() as session:
+        seeded = _seed_mcp_data(session)
+        # 同一 created_at 的 case 需以 id 作為 tie-breaker
+        tied_at = datetime(2024, 1, 1, 12, 0, 0)
+        session.add_all(
+            [
+                TestCaseLocal(
+                    team_id=seeded["team_a_id"],
+                    test_case_number=f"TC-A-TIE-{index}",
+                    title=f"Tied case {index}",
+                    priority=Priority.MEDIUM,
+                    test_case_set_id=seeded["set_a_id"],
+                    created_at=tied_at,
+                )
+                for index in range(3)
+            ]
+        )
+        # created_at 為 NULL 的舊資料必須排在最後，且翻頁時不可重複出現
+        session.add_all(
+            [
+                TestCaseLocal(
+                    team_id=seeded["team_a_id"],
+                    test_case_number=f"TC-A-LEGACY-{index}",
+                    title=f"Legacy case {index}",
+                    priority=Priority.MEDIUM,
+                    test_case_set_id=seeded["set_a_id"],
+                )
+                for index in range(2)
+            ]
+        )
+        session.flush()
+        # created_at 有 ORM default，需另外以 UPDATE 清成 NULL
+        session.query(TestCaseLocal).filter(TestCaseLocal.test_case_number.like("TC-A-LEGACY-%")).update(
+            {TestCaseLocal.created_at: None}, synchronize_session=False
+        )
+        session.commit()
+
+    url = f"/api/mcp/teams/{seeded['team_a_id']}/test-cases"
+    headers = _bearer(seeded["all_token"])
+    with TestClient(app) as client:
+        offset_payload = client.get(url, headers=headers, params={"limit": 100}).json()
+        expected_ids = [case["id"] for case in offset_payload["test_cases"]]
+        assert len(expected_ids) == offset_payload["page"]["total"] == 10
+        assert [case["title"] for case in offset_payload["test_cases"][-2:]] == ["Legacy case 1", "Legacy case 0"]
+        assert offset_payload["page"]["next_cursor"] is None
+
+        walked_ids: list[int] = []
+        cursor = None
+        while True:
+            params = {"limit": 3, "skip": 99}
+            if cursor:
+                params["cursor"] = cursor
+            else:
+                params["skip"] = 0
+            payload = client.get(url, headers=headers, params=params).json()
+            assert payload["page"]["total"] == 10
+            walked_ids.extend(case["id"] for case in payload["test_cases"])
+            cursor = payload["page"]["next_cursor"]
+            assert payload["page"]["has_next"] is (cursor is not None)
+            if cursor is None:
+                break
+        assert walked_ids == expected_ids
+
+        invalid = client.get(url, headers=headers, params={"cursor": "not-a-cursor"})
+        assert invalid.status_code == 400
+
+
+def test_external_read_counts_follow_orm_writes_and_reconcile(temp_db):
+    from sqlalchemy import delete, select, update
+
+    from app.models.database_models import ExternalReadCount
+    from app.services.external_read_counts import reconcile_external_read_counts
+
+    with temp_db() as session:
+        seeded = _seed_mcp_data(session)
+
+        def _counts() -> dict[tuple[str, int], tuple[int, int, int]]:
+            rows = session.execute(select(ExternalReadCount)).scalars().all()
+            return {
+                (row.scope, row.scope_id): (row.item_count, row.sheet_count, row.executed_count)
+                for row in rows
+            }
+
+        counts = _counts()
+        assert counts[("team", seeded["team_a_id"])][0] == 5
+        assert counts[("case_set", seeded["set_a_id"])][0] == 5
+        assert counts[("case_set", seeded["set_a2_id"])][0] == 0
+        adhoc_counts = {
+            key[1]: value for key, value in counts.items() if key[0] == "adhoc_run"
+        }
+        assert sorted(adhoc_counts.values()) == [(1, 1, 1), (2, 1, 1)]
+
+        # 搬移、刪除與新增 case 皆於同一個 flush 內反映到快取
+        moved = session.get(TestCaseLocal, seeded["tc_a2_id"])
+        moved.test_case_set_id = seeded["set_a2_id"]
+        session.delete(session.get(TestCaseLocal, seeded["tc_b1_id"]))
+        session.add(
+            TestCaseLocal(
+                team_id=seeded["team_a_id"],
+                test_case_number="TC-A-NEW",
+                title="New case",
+                priority=Priority.LOW,
+                test_case_set_id=seeded["set_a2_id"],
+            )
+        )
+        session.commit()
+        counts = _counts()
+        assert counts[("team", seeded["team_a_id"])][0] == 6
+        assert counts[("case_set", seeded["set_a_id"])][0] == 4
+        assert counts[("case_set", seeded["set_a2_id"])][0] == 2
+        assert counts[("team", seeded["team_b_id"])][0] == 0
+
+        # bulk UPDATE 以受影響 team 重新計算
+        session.execute(
+            update(TestCaseLocal)
+            .where(TestCaseLocal.test_case_set_id == seeded["set_a2_id"])
+            .values(test_case_set_id=seeded["set_a_id"])
+        )
+        session.commit()
+        counts = _counts()
+        assert counts[("case_set", seeded["set_a_id"])][0] == 6
+        assert counts[("case_set", seeded["set_a2_id"])][0] == 0
+
+        # 非 ORM 寫入造成的漂移由 reconcile 修正
+        session.execute(
+            update(ExternalReadCount)
+            .where(ExternalReadCount.scope == "team")
+            .values(item_count=99)
+        )
+        session.execute(delete(ExternalReadCount).where(ExternalReadCount.scope == "case_set"))
+        session.commit()
+        result = reconcile_external_read_counts(session)
+        session.commit()
+        assert result == {"inserted": 3, "deleted": 0}
+        counts = _counts()
+        assert counts[("team", seeded["team_a_id"])][0] == 6
+        assert counts[("case_set", seeded["set_a_id"])][0] == 6
+        assert counts[("case_set", seeded["set_b_id"])][0] == 0
+
+    with TestClient(app) as client:
+        runs = client.get(
+            f"/api/mcp/teams/{seeded['team_a_id']}/test-runs",
+            headers=_bearer(seeded["all_token"]),
+            params={"run_type": "adhoc"},
+        ).json()
+        assert [(item["total_test_cases"], item["executed_cases"]) for item in runs["adhoc"]] == [(2, 1)]
+
+
+def test_case_page_order_puts_null_created_at_last_on_every_dialect():
+    from sqlalchemy import select
+    from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+    from app.services.external_read.queries import _CASE_PAGE_ORDER
+
+    statement = select(TestCaseLocal.id).order_by(*_CASE_PAGE_ORDER)
+    for dialect in (postgresql.dialect(), mysql.dialect(), sqlite.dialect()):
+        order_by = str(statement.compile(dialect=dialect)).split("ORDER BY", 1)[1]
+        assert order_by.strip().startswith("test_cases.created_at IS NULL")
+        assert "NULLS" not in order_by
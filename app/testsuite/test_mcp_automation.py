@@ -22,6 +22,7 @@ from app.models.database_models import (
     AutomationScriptFormat,
     AutomationScriptGroup,
     AutomationScriptGroupJobType,
+    AutomationScriptGroupMember,
     AutomationScriptLinkType,
     MCPMachineCredential,
     MCPMachineCredentialStatus,
@@ -332,6 +333,85 @@ def test_mcp_automation_script_groups_lists_with_resolved_member_ids(temp_db):
         assert decoy_id not in suite["script_ids"]
 
 
+def test_mcp_automation_scripts_keyset_cursor_pages_in_id_desc(temp_db):
+    with temp_db() as session:
+        seeded = _seed(session)
+        for index in range(3):
+            session.add(
+                AutomationScript(
+                    team_id=seeded["team_id"],
+                    provider_id=seeded["provider_id"],
+                    name=f"test_extra_{index}.py",
+                    script_format=AutomationScriptFormat.PYTEST,
+                    ref_path=f"tests/test_extra_{index}.py",
+                    ref_repo="ex/auto",
+                    ref_branch="main",
+                    tags_json="[]",
+                )
+            )
+        session.commit()
+
+    url = f"/api/mcp/teams/{seeded['team_id']}/automation-scripts"
+    with TestClient(app) as client:
+        seen: list[int] = []
+        cursor = None
+        for _ in range(5):
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            resp = client.get(url, params=params, headers=_bearer(seeded["token"]))
+            assert resp.status_code == 200, resp.text
+            payload = resp.json()
+            assert payload["page"]["total"] == 5
+            seen.extend(item["id"] for item in payload["items"])
+            cursor = payload["page"]["next_cursor"]
+            assert payload["page"]["has_next"] is (cursor is not None)
+            if cursor is None:
+                break
+
+        assert len(seen) == 5
+        assert seen == sorted(seen, reverse=True)
+        assert seeded["script_login_id"] in seen
+
+        # Linked numbers are still aggregated per script on a cursor page.
+        resp = client.get(
+            url,
+            params={"limit": 1, "cursor": seeded["script_login_id"] + 1},
+            headers=_bearer(seeded["token"]),
+        )
+        item = resp.json()["items"][0]
+        assert item["id"] == seeded["script_login_id"]
+        assert item["linked_test_case_numbers"] == ["TC-001"]
+
+
+def test_script_group_members_follow_group_saves(temp_db):
+    with temp_db() as session:
+        seeded = _seed(session)
+
+        def _members():
+            return [
+                (row.position, row.ref_repo, row.ref_path)
+                for row in session.query(AutomationScriptGroupMember)
+                .filter(AutomationScriptGroupMember.group_id == seeded["suite_id"])
+                .order_by(AutomationScriptGroupMember.position)
+            ]
+
+        assert _members() == [
+            (0, "ex/auto", "tests/test_login.py"),
+            (1, "ex/auto", "tests/test_logout.py"),
+            (2, "ex/auto", "tests/test_ghost.py"),
+        ]
+
+        suite = session.get(AutomationScriptGroup, seeded["suite_id"])
+        suite.script_paths_json = json.dumps(["tests/test_logout.py", " "])
+        session.commit()
+        assert _members() == [(0, "ex/auto", "tests/test_logout.py")]
+
+        session.delete(suite)
+        session.commit()
+        assert _members() == []
+
+
 def test_mcp_automation_runs_filters(temp_db):
     with temp_db() as session:
         seeded = _seed(session)
@@ -31,6 +31,7 @@ from app.services.qa_ai_helper_llm_service import (
     QAAIHelperLLMResult,
     QAAIHelperLLMService,
 )
+from app.services import qa_ai_helper_service as qa_ai_helper_service_module
 from app.testsuite.db_test_helpers import (
     create_managed_test_database,
     dispose_managed_test_database,
@@ -1322,7 +1323,14 @@ def test_open_set_selection_requires_selected_valid_drafts(qa_ai_helper_db):
     assert payload["testcase_draft_set"]["selected_for_commit_count"] == 1
 
 
-def test_commit_selected_testcases_to_existing_set_creates_links_and_result_summary(qa_ai_helper_db):
+def test_commit_selected_testcases_to_existing_set_creates_links_and_result_summary(qa_ai_helper_db, monkeypatch):
+    enqueued_batches = []
+
+    async def _fake_enqueue_batch(batch_key, entities):
+        enqueued_batches.append((batch_key, entities))
+        return True
+
+    monkeypatch.setattr(qa_ai_helper_service_module, "enqueue_test_case_batch_sync", _fake_enqueue_batch)
     client = TestClient(app)
     team_id = qa_ai_helper_db["team_id"]
     session_id, selected_workspace = _prepare_selected_testcase_draft(client, team_id)
@@ -1385,6 +1393,18 @@ def test_commit_selected_testcases_to_existing_set_creates_links_and_result_summ
             .first()
         )
         assert telemetry is not None
+        throughput = json_storage_loads(telemetry.payload_json, {})["throughput"]
+        assert throughput["committed_count"] == 1
+        assert throughput["duration_ms"] == telemetry.duration_ms
+        assert throughput["cases_per_second"] > 0
+
+    # 整批 commit 只送出一個 knowledge sync 任務，entity 帶有可嵌入欄位
+    assert len(enqueued_batches) == 1
+    batch_key, entities = enqueued_batches[0]
+    assert batch_key == f"qa_ai_helper_commit:{draft_set['id']}"
+    assert [entity["test_case_number"] for entity in entities] == [draft["assigned_testcase_id"]]
+    assert entities[0]["test_case_id"] == case.id
+    assert entities[0]["steps"]
 
 
 def test_commit_selected_testcases_can_create_new_target_set(qa_ai_helper_db):
@@ -1625,3 +1645,166 @@ def test_generate_testcase_draft_set_ignores_retired_prompt_profile_field(qa_ai_
         assert telemetry is not None
         telemetry_payload = json.loads(telemetry.payload_json or "{}")
         assert "prompt_profile_id" not in telemetry_payload
+
+
+def _lock_multi_batch_requirement_plan(client: TestClient, team_id: int) -> int:
+    session_id = _create_session(client, team_id)["session"]["id"]
+    initialized = client.post(f"/api/teams/{team_id}/qa-ai-helper/sessions/{session_id}/requirement-plan")
+    assert initialized.status_code == 200, initialized.text
+    section = initialized.json()["requirement_plan"]["sections"][0]
+    condition_texts = ["成功開啟詳情頁", "無權限時不可進入", "找不到時顯示錯誤", "日期格式正確", "名稱狀態一致", "分頁標題一致"]
+    saved = client.put(
+        f"/api/teams/{team_id}/qa-ai-helper/sessions/{session_id}/requirement-plan",
+        json={
+            "section_start_number": "010",
+            "autosave": False,
+            "sections": [
+                {
+                    "id": section["id"],
+                    "section_key": section["section_key"],
+                    "section_title": section["section_title"],
+                    "given": section["given"],
+                    "when": section["when"],
+                    "then": section["then"],
+                    "verification_items": [
+                        {
+                            "category": "功能驗證",
+                            "summary": "點擊 audience name 開啟詳情頁",
+                            "check_conditions": [
+                                {"condition_text": text, "coverage_tag": "Happy Path"} for text in condition_texts
+                            ],
+                        }
+                    ],
+                }
+            ],
+        },
+    )
+    assert saved.status_code == 200, saved.text
+    locked = client.post(f"/api/teams/{team_id}/qa-ai-helper/sessions/{session_id}/requirement-plan/lock")
+    assert locked.status_code == 200, locked.text
+
+    return session_id
+
+
+def test_seed_generation_retry_only_recalls_failed_batches_with_response_cache(qa_ai_helper_db, monkeypatch):
+    monkeypatch.setattr(settings.ai.qa_ai_helper.response_cache, "enabled", True)
+    monkeypatch.setattr(settings.ai.qa_ai_helper, "batch_max_attempts", 1)
+    client = TestClient(app)
+    team_id = qa_ai_helper_db["team_id"]
+    session_id = _lock_multi_batch_requirement_plan(client, team_id)
+
+    calls: list[str] = []
+    fail_once = {"armed": True}
+
+    async def _flaky_call_stage(self, *, stage: str, prompt: str, max_tokens: int = 4000):
+        calls.append(prompt)
+        items = QAAIHelperLLMService._extract_json_blob(prompt, "GENERATION_ITEMS", [])
+        if fail_once["armed"] and any(item["item_index"] == 0 for item in items):
+            fail_once["armed"] = False
+            raise RuntimeError("simulated batch failure")
+        result = self._fallback_result(stage=stage, prompt=prompt, model_name="fake/seed")
+        result.cost_note = "test"
+        result.usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+        return result
+
+    monkeypatch.setattr(QAAIHelperLLMService, "call_stage", _flaky_call_stage)
+    seed_url = f"/api/teams/{team_id}/qa-ai-helper/sessions/{session_id}/seed-sets"
+
+    failed = client.post(seed_url)
+    assert failed.status_code >= 400
+    batch_count = len(calls)
+    assert batch_count > 1
+
+    calls.clear()
+    retried = client.post(seed_url)
+    assert retried.status_code == 200, retried.text
+    assert len(calls) == 1, "只有失敗的 batch 需要重新呼叫模型"
+    assert retried.json()["seed_set"]["generated_seed_count"] == 6
+
+    with qa_ai_helper_db["sync_session_factory"]() as sync_db:
+        event = (
+            sync_db.query(QAAIHelperTelemetryEvent)
+            .filter(QAAIHelperTelemetryEvent.session_id == session_id, QAAIHelperTelemetryEvent.stage == "seed")
+            .one()
+        )
+    assert event.total_tokens == 120
+    cache_payload = json_storage_loads(event.payload_json, {})["response_cache"]
+    assert cache_payload["hits"] == batch_count - 1
+    assert cache_payload["misses"] == 1
+    assert cache_payload["saved_total_tokens"] == 120 * (batch_count - 1)
+
+    calls.clear()
+    bypassed = client.post(seed_url, json={"force_regenerate": True, "bypass_cache": True})
+    assert bypassed.status_code == 200, bypassed.text
+    assert len(calls) == batch_count
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_seed_generation_stream_persists_batches_and_retries_failures_independently(qa_ai_helper_db, monkeypatch):
+    monkeypatch.setattr(qa_ai_helper_service_module, "_BATCH_RETRY_BACKOFF_SECONDS", 0)
+    client = TestClient(app)
+    team_id = qa_ai_helper_db["team_id"]
+    session_id = _lock_multi_batch_requirement_plan(client, team_id)
+
+    attempts: dict[int, int] = {}
+
+    async def _flaky_call_stage(self, *, stage: str, prompt: str, max_tokens: int = 4000):
+        items = QAAIHelperLLMService._extract_json_blob(prompt, "GENERATION_ITEMS", [])
+        first_index = items[0]["item_index"]
+        attempts[first_index] = attempts.get(first_index, 0) + 1
+        if first_index == 0 and attempts[first_index] == 1:
+            raise RuntimeError("transient batch failure")
+        if items[-1]["item_index"] == 5:
+            raise RuntimeError("persistent batch failure")
+        result = self._fallback_result(stage=stage, prompt=prompt, model_name="fake/seed")
+        result.cost_note = "test"
+        return result
+
+    monkeypatch.setattr(QAAIHelperLLMService, "call_stage", _flaky_call_stage)
+    response = client.post(f"/api/teams/{team_id}/qa-ai-helper/sessions/{session_id}/seed-sets/stream")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    event_types = [event_type for event_type, _data in events]
+
+    assert event_types[0] == "seed_set_created"
+    created = events[0][1]
+    assert created["workspace"]["seed_set"]["generated_seed_count"] == 6
+    batch_count = created["batch_count"]
+    assert batch_count > 2
+    # 暫時性失敗與持續失敗的 batch 各自重試一次，其餘 batch 不受影響
+    assert event_types.count("batch_retry") == 2
+    assert event_types.count("batch_failed") == 1
+    assert event_types.count("batch_complete") == batch_count - 1
+    assert sorted(attempts.values()) == [1] * (batch_count - 2) + [2, 2]
+    completes = [data for event_type, data in events if event_type == "batch_complete"]
+    assert [data["completed"] for data in completes] == list(range(1, batch_count))
+    assert all(data["workspace"]["seed_set"]["id"] == created["seed_set_id"] for data in completes)
+
+    done_type, done = events[-1]
+    assert done_type == "done"
+    assert done["success"] is False
+    assert len(done["failed_batches"]) == 1
+    assert "persistent batch failure" in done["failed_batches"][0]["error"]
+
+    with qa_ai_helper_db["sync_session_factory"]() as sync_db:
+        event = (
+            sync_db.query(QAAIHelperTelemetryEvent)
+            .filter(QAAIHelperTelemetryEvent.session_id == session_id, QAAIHelperTelemetryEvent.stage == "seed")
+            .one()
+        )
+        payload = json_storage_loads(event.payload_json, {})
+    assert event.status == "failed"
+    assert payload["failed_batch_count"] == 1
+    assert payload["streamed"] is True
+
+    workspace = client.get(f"/api/teams/{team_id}/qa-ai-helper/sessions/{session_id}").json()
+    assert workspace["seed_set"]["id"] == created["seed_set_id"]
+    assert workspace["session"]["current_screen"] == "seed_review"
@@ -0,0 +1,115 @@
+"""QA AI Helper response cache：TTL、LRU 上限與不可重用回應的處理。"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import QAAIHelperResponseCacheConfig
+from app.database import get_db
+from app.db_access.main import get_main_access_boundary
+from app.main import app
+from app.models.database_models import QAAIHelperLLMResponseCache
+from app.services.qa_ai_helper_llm_service import QAAIHelperLLMResult
+from app.services.qa_ai_helper_response_cache import QAAIHelperResponseCache, ResponseCacheStats
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+    install_main_database_overrides,
+)
+
+
+@pytest.fixture
+def cache_db(tmp_path, monkeypatch):
+    bundle = create_managed_test_database(tmp_path / "qa_ai_helper_response_cache.db")
+    install_main_database_overrides(
+        monkeypatch=monkeypatch,
+        app=app,
+        get_db_dependency=get_db,
+        async_engine=bundle["async_engine"],
+        async_session_factory=bundle["async_session_factory"],
+    )
+    yield bundle
+    app.dependency_overrides.pop(get_db, None)
+    dispose_managed_test_database(bundle)
+
+
+def _cache(**overrides) -> QAAIHelperResponseCache:
+    config = QAAIHelperResponseCacheConfig(enabled=True, **overrides)
+    return QAAIHelperResponseCache(get_main_access_boundary(), config)
+
+
+class _Model:
+    def __init__(self, content: str = '{"outputs": []}', finish_reason: str = "stop"):
+        self.content = content
+        self.finish_reason = finish_reason
+        self.calls = 0
+
+    async def __call__(self) -> QAAIHelperLLMResult:
+        self.calls += 1
+        return QAAIHelperLLMResult(
+            content=self.content,
+            usage={"prompt_tokens": 50, "completion_tokens": 5, "total_tokens": 55},
+            cost=0.0,
+            cost_note="",
+            model_name="fake/model",
+            finish_reason=self.finish_reason,
+        )
+
+
+def _call(cache, model, prompt, stats=None, **kwargs):
+    return asyncio.run(cache.call(
+        stage="seed", model_name="fake/model", temperature=0.1, prompt=prompt,
+        invoke=model, stats=stats or ResponseCacheStats(), **kwargs,
+    ))
+
+
+def test_expired_entries_are_not_served(cache_db):
+    cache = _cache()
+    model = _Model()
+    _call(cache, model, "p1")
+    with cache_db["sync_session_factory"]() as session:
+        session.query(QAAIHelperLLMResponseCache).update(
+            {QAAIHelperLLMResponseCache.expires_at: datetime.utcnow() - timedelta(seconds=1)}
+        )
+        session.commit()
+
+    stats = ResponseCacheStats()
+    result = _call(cache, model, "p1", stats)
+    assert model.calls == 2
+    assert result.cache_hit is False
+    assert (stats.hits, stats.misses) == (0, 1)
+
+
+def test_entry_limit_evicts_least_recently_used(cache_db):
+    cache = _cache(max_entries=2)
+    model = _Model()
+    _call(cache, model, "a")
+    _call(cache, model, "b")
+    assert _call(cache, model, "a").cache_hit is True  # a 變成最近使用
+    _call(cache, model, "c")
+
+    with cache_db["sync_session_factory"]() as session:
+        assert session.query(QAAIHelperLLMResponseCache).count() == 2
+    calls_before = model.calls
+    assert _call(cache, model, "a").cache_hit is True
+    assert _call(cache, model, "b").cache_hit is False
+    assert model.calls == calls_before + 1
+
+
+def test_truncated_or_invalid_json_responses_are_not_cached(cache_db):
+    cache = _cache()
+    truncated = _Model(finish_reason="length")
+    _call(cache, truncated, "t")
+    _call(cache, truncated, "t")
+    invalid = _Model(content="not json")
+    _call(cache, invalid, "j")
+    _call(cache, invalid, "j")
+
+    assert (truncated.calls, invalid.calls) == (2, 2)
+    # 純文字 stage（inspection extraction）則可快取非 JSON 內容
+    text_model = _Model(content="plain findings")
+    _call(cache, text_model, "x", json_output=False)
+    assert _call(cache, text_model, "x", json_output=False).content == "plain findings"
+    assert text_model.calls == 1
@@ -1,5 +1,6 @@
 
 import asyncio
+import dataclasses
 from datetime import datetime
 from types import SimpleNamespace
 
@@ -35,6 +36,8 @@ def scheduled_service_env(tmp_path, monkeypatch):
         async_session_factory=AsyncTestingSessionLocal,
     )
 
+    # job_lock 在 SQLite 上是檔案鎖，預設放在系統暫存目錄（全機共用）；測試各自隔離，避免並行測試互搶
+    monkeypatch.setenv("TCRT_RUNTIME_LOCK_DIR", str(tmp_path / "locks"))
     current_user_ref = {"value": None}
 
     def override_get_current_user():
@@ -247,7 +250,7 @@ def test_scheduler_thread_uses_bound_runtime_loop_for_async_db_calls(scheduled_s
     async def fake_mark_started(service_key, started_at):
         call_log.append(("started", service_key, started_at))
 
-    async def fake_mark_finished(service_key, *, finished_at, success, message, last_error):
+    async def fake_mark_finished(service_key, *, finished_at, success, message, last_error, status=None):
         call_log.append(("finished", service_key, finished_at, success, message, last_error))
 
     async def fake_runner():
@@ -294,3 +297,174 @@ def test_scheduler_thread_uses_bound_runtime_loop_for_async_db_calls(scheduled_s
 
     asyncio.run(exercise())
     assert [entry[0] for entry in call_log] == ["started", "runner", "finished"]
+
+
+def _install_runner(scheduler, service_key, runner, **overrides):
+    scheduler.service_registry[service_key] = dataclasses.replace(
+        scheduler.service_registry[service_key], runner=runner, jitter_seconds=0.0, **overrides
+    )
+
+
+def _schedule(scheduler, monkeypatch, service_key, run_at_time, *, now):
+    monkeypatch.setattr(scheduler, "_current_local_time", lambda: now)
+    asyncio.run(scheduler.update_service_schedule(service_key=service_key, enabled=True, run_at_time=run_at_time))
+
+
+def test_scheduler_runs_due_jobs_concurrently_on_event_loop(scheduled_service_env, monkeypatch):
+    scheduler = scheduled_service_env["scheduler"]
+    events = {}
+
+    async def slow_sync():
+        # 只有在 audit_cleanup 同時執行時才會結束；循序執行會卡住直到逾時
+        await asyncio.wait_for(events["released"].wait(), timeout=5)
+        return {"success": True, "message": "slow ok"}
+
+    async def fast_cleanup():
+        events["released"].set()
+        return {"success": True, "message": "fast ok"}
+
+    _install_runner(scheduler, "lark_org_sync", slow_sync)
+    _install_runner(scheduler, "audit_cleanup", fast_cleanup)
+    _schedule(scheduler, monkeypatch, "lark_org_sync", "13:00", now=datetime(2026, 3, 24, 12, 59, 0))
+    _schedule(scheduler, monkeypatch, "audit_cleanup", "13:00", now=datetime(2026, 3, 24, 12, 59, 0))
+    due_time = datetime(2026, 3, 24, 13, 0, 30)
+    monkeypatch.setattr(scheduler, "_current_local_time", lambda: due_time)
+
+    async def exercise():
+        events["released"] = asyncio.Event()
+        tasks = scheduler.dispatch_due_tasks(due_time)
+        # 同一時段再派發一次不會重複執行
+        assert scheduler.dispatch_due_tasks(due_time) == []
+        return await asyncio.gather(*tasks)
+
+    assert sorted(asyncio.run(exercise())) == ["completed", "completed"]
+    metrics = scheduler.metrics_snapshot()["jobs"]
+    assert metrics["lark_org_sync"]["succeeded"] == 1
+    assert metrics["lark_org_sync"]["last_lag_seconds"] == 30.0
+    assert metrics["audit_cleanup"]["succeeded"] == 1
+
+
+def test_scheduler_enforces_job_timeout_and_counts_missed_runs(scheduled_service_env, monkeypatch):
+    scheduler = scheduled_service_env["scheduler"]
+    session_factory = scheduled_service_env["session_factory"]
+
+    async def hanging_runner():
+        await asyncio.sleep(10)
+
+    _install_runner(scheduler, "lark_org_sync", hanging_runner, timeout_seconds=0.05)
+    _schedule(scheduler, monkeypatch, "lark_org_sync", "13:00", now=datetime(2026, 3, 21, 12, 0, 0))
+    # 服務停了三天才回來：錯過 3/22、3/23、3/24 三次，合併為一次執行
+    due_time = datetime(2026, 3, 24, 13, 5, 0)
+    monkeypatch.setattr(scheduler, "_current_local_time", lambda: due_time)
+
+    scheduler._run_due_tasks(reference_time=due_time)
+
+    metrics = scheduler.metrics_snapshot()["jobs"]["lark_org_sync"]
+    assert metrics["timed_out"] == 1
+    assert metrics["missed_runs"] == 3
+    with session_factory() as session:
+        record = session.query(ScheduledService).filter(ScheduledService.service_key == "lark_org_sync").one()
+        assert record.last_run_status == "timeout"
+        assert record.is_running is False
+        assert record.next_run_at == datetime(2026, 3, 25, 13, 0, 0)
+
+
+def test_scheduler_skips_slot_already_completed_by_another_worker(scheduled_service_env, monkeypatch):
+    scheduler = scheduled_service_env["scheduler"]
+    session_factory = scheduled_service_env["session_factory"]
+    executed = []
+
+    _install_runner(scheduler, "lark_org_sync", lambda: executed.append("ran") or {"success": True})
+    _schedule(scheduler, monkeypatch, "lark_org_sync", "13:00", now=datetime(2026, 3, 24, 12, 59, 0))
+    due_time = datetime(2026, 3, 24, 13, 0, 0)
+    monkeypatch.setattr(scheduler, "_current_local_time", lambda: due_time)
+
+    # 另一個 worker 已執行完這個時段並把 next_run_at 推到隔天，本 worker 的記憶體狀態仍是舊時段
+    with session_factory() as session:
+        record = session.query(ScheduledService).filter(ScheduledService.service_key == "lark_org_sync").one()
+        record.next_run_at = datetime(2026, 3, 25, 13, 0, 0)
+        record.last_run_status = "completed"
+        session.commit()
+
+    scheduler._run_due_tasks(reference_time=due_time)
+
+    assert executed == []
+    assert scheduler.metrics_snapshot()["jobs"]["lark_org_sync"]["skipped_claimed_elsewhere"] == 1
+
+
+def test_super_admin_can_read_scheduler_metrics(scheduled_service_env):
+    client = TestClient(app)
+
+    response = client.get("/api/organization/scheduled-services/metrics")
+
+    assert response.status_code == 200
+    jobs = response.json()["data"]["jobs"]
+    assert set(jobs) == set(scheduled_service_env["scheduler"].service_registry)
+    assert jobs["database_backup"]["timeout_seconds"] == 6 * 3600
+
+
+def test_thread_backed_job_keeps_lock_until_work_finishes_after_timeout(scheduled_service_env, monkeypatch):
+    import threading
+    import time as time_module
+
+    scheduler = scheduled_service_env["scheduler"]
+    session_factory = scheduled_service_env["session_factory"]
+    events = []
+    thread_done = threading.Event()
+
+    def blocking_backup():
+        time_module.sleep(0.3)
+        thread_done.set()
+        return {"success": True, "message": "backup ok"}
+
+    async def thread_backed_runner():
+        return await asyncio.to_thread(blocking_backup)
+
+    original_release = scheduler._release_job_lock
+
+    async def spy_release(service_key):
+        events.append(("release", thread_done.is_set()))
+        await original_release(service_key)
+
+    monkeypatch.setattr(scheduler, "_release_job_lock", spy_release)
+    _install_runner(scheduler, "database_backup", thread_backed_runner, timeout_seconds=0.05)
+    assert scheduler.service_registry["database_backup"].cancel_on_timeout is False
+    _schedule(scheduler, monkeypatch, "database_backup", "01:30", now=datetime(2026, 3, 24, 1, 0, 0))
+    due_time = datetime(2026, 3, 24, 1, 30, 0)
+    monkeypatch.setattr(scheduler, "_current_local_time", lambda: due_time)
+
+    scheduler._run_due_tasks(reference_time=due_time)
+
+    # 逾時無法中止 thread：任務鎖要等 thread 結束才釋放
+    assert events == [("release", True)]
+    assert scheduler.metrics_snapshot()["jobs"]["database_backup"]["timed_out"] == 1
+    with session_factory() as session:
+        record = session.query(ScheduledService).filter(ScheduledService.service_key == "database_backup").one()
+        assert record.last_run_status == "timeout"
+        assert "backup ok" in record.last_run_message
+        assert record.is_running is False
+
+
+def test_periodic_refresh_only_reads_when_records_are_in_sync(scheduled_service_env, monkeypatch):
+    scheduler = scheduled_service_env["scheduler"]
+    boundary = scheduler.main_boundary
+    calls = []
+
+    async def tracking_write(operation):
+        calls.append("write")
+        return await original_write(operation)
+
+    original_write = boundary.run_write
+    monkeypatch.setattr(boundary, "run_write", tracking_write)
+
+    asyncio.run(scheduler._refresh_from_database_async(recover_running=False))
+    assert calls == []
+    assert set(scheduler.tasks) == set(scheduler.service_registry)
+
+    # definition 變更（例如新版調整顯示名稱）時才走寫入路徑同步紀錄
+    scheduler.service_registry["audit_cleanup"] = dataclasses.replace(
+        scheduler.service_registry["audit_cleanup"], display_name="審計記錄清理（新）"
+    )
+    asyncio.run(scheduler._refresh_from_database_async(recover_running=False))
+    assert calls == ["write"]
+    assert scheduler.tasks["audit_cleanup"]["display_name"] == "審計記錄清理（新）"
@@ -0,0 +1,99 @@
+"""路由延遲載入 / group 停用與啟動剖析"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi import APIRouter, FastAPI
+
+from app.api import API_ROUTERS, ROOT_ROUTERS, ROUTER_GROUPS, RouterSpec, include_api_routers, load_router
+from app.utils.startup_profiler import StartupProfiler, parse_importtime
+
+REPO = Path(__file__).resolve().parents[2]
+
+# 載入 optional router 時不應被帶進來的服務圖；只能在新的直譯器裡檢查（本行程早已匯入過）
+_DEFERRED_MODULES = (
+    "aiohttp",
+    "app.services.qa_ai_helper_service",
+    "app.services.assistant.assistant_agent_service",
+    "app.services.assistant.assistant_llm_service",
+    "app.services.assistant.tool_executor",
+)
+_ROUTER_IMPORT_PROBE = """
+import json, sys
+from app.api import API_ROUTERS, load_router
+for spec in API_ROUTERS:
+    if spec.group in {"core", "assistant", "qa_ai_helper", "knowledge"}:
+        load_router(spec)
+print(json.dumps(sorted(name for name in json.loads(sys.argv[1]) if name in sys.modules)))
+"""
+
+
+def test_every_router_spec_resolves_to_a_router():
+    for spec in API_ROUTERS + ROOT_ROUTERS:
+        assert isinstance(load_router(spec), APIRouter), spec
+    assert {"core", "assistant", "qa_ai_helper", "mcp", "automation", "knowledge"} <= ROUTER_GROUPS
+
+
+def test_disabled_groups_are_not_mounted_and_core_cannot_be_disabled():
+    specs = (
+        RouterSpec("app.api.version"),
+        RouterSpec("app.api.mcp", group="mcp"),
+        RouterSpec("app.api.assistant", group="assistant"),
+    )
+    app = FastAPI()
+
+    mounted = include_api_routers(app, specs, prefix="/api", disabled_groups=["mcp", " assistant ", "core"])
+
+    assert mounted == ["app.api.version:router"]
+    paths = [route.path for route in app.routes]
+    assert any(path.startswith("/api/version") for path in paths)
+    assert not any(path.startswith(("/api/mcp", "/api/assistant")) for path in paths)
+
+
+def test_startup_profiler_keeps_latest_phase_record():
+    profiler = StartupProfiler()
+    with profiler.phase("startup"):
+        pass
+    with profiler.phase("routers"):
+        pass
+    with profiler.phase("startup"):
+        pass
+
+    phases = profiler.snapshot()["phases"]
+    assert [item["name"] for item in phases] == ["routers", "startup"]
+    assert all(item["duration_ms"] >= 0 for item in phases)
+
+
+def test_parse_importtime_groups_self_time_by_package():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     app.api.version",
+        "import time:      3000 |       3500 |   app.api.qa_ai_helper",
+        "import time:       400 |        400 |   sqlalchemy.orm",
+        "import time:      1000 |       5000 | app.main",
+    ]
+
+    report = parse_importtime(lines, top=2)
+
+    assert [item["module"] for item in report["slowest"]] == ["app.main", "app.api.qa_ai_helper"]
+    assert report["by_package"][0] == {"package": "app.api", "self_ms": 3.1}
+    assert report["total_self_ms"] == 4.5
+
+
+def test_loading_optional_routers_defers_their_service_graph():
+    result = subprocess.run(
+        [sys.executable, "-c", _ROUTER_IMPORT_PROBE, json.dumps(_DEFERRED_MODULES)],
+        cwd=str(REPO),
+        capture_output=True,
+        text=True,
+        timeout=120,
+        env={**os.environ, "PYTHONPATH": str(REPO)},
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
@@ -0,0 +1,196 @@
+"""串流表格匯出引擎與 Test Run Item 匯出端點測試"""
+
+import asyncio
+import csv
+import io
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.auth.dependencies import get_current_user
+from app.auth.models import UserRole
+from app.models.database_models import (
+    Team,
+    TestCaseLocal,
+    TestCaseSection,
+    TestCaseSet,
+    TestRunConfig,
+    TestRunItem,
+)
+from app.models.lark_types import Priority, TestResultStatus
+from app.api.test_run_items import TEST_RUN_ITEM_EXPORT_COLUMNS
+from app.services.tabular_export import stream_csv
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+    install_main_database_overrides,
+)
+
+
+async def _chunks(batches, closed):
+    try:
+        for batch in batches:
+            yield batch
+    finally:
+        closed.append(True)
+
+
+async def _collect(stream):
+    return [part async for part in stream]
+
+
+def test_stream_csv_emits_header_first_then_one_part_per_chunk():
+    closed = []
+    batches = [[("a", 1), ("b", 2)], [("c", 3)]]
+    parts = asyncio.run(
+        _collect(stream_csv(["name", "value"], _chunks(batches, closed), lambda row: list(row)))
+    )
+
+    assert len(parts) == 3
+    assert parts[0].startswith(b"\xef\xbb\xbf")
+    assert parts[0].decode("utf-8-sig") == "name,value\r\n"
+    assert parts[1].decode("utf-8") == "a,1\r\nb,2\r\n"
+    assert closed == [True]
+
+
+def test_stream_csv_stops_reading_when_client_disconnects():
+    closed = []
+    calls = []
+
+    async def _is_disconnected():
+        calls.append(True)
+        return len(calls) > 1
+
+    batches = [[("a",)], [("b",)], [("c",)]]
+    parts = asyncio.run(
+        _collect(
+            stream_csv(
+                ["name"],
+                _chunks(batches, closed),
+                lambda row: list(row),
+                is_disconnected=_is_disconnected,
+            )
+        )
+    )
+
+    assert [part.decode("utf-8-sig") for part in parts] == ["name\r\n", "a\r\n"]
+    assert closed == [True]
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    database_bundle = create_managed_test_database(tmp_path / "test_case_repo.db")
+    install_main_database_overrides(
+        monkeypatch=monkeypatch,
+        app=app,
+        get_db_dependency=get_db,
+        async_engine=database_bundle["async_engine"],
+        async_session_factory=database_bundle["async_session_factory"],
+    )
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+        id=1,
+        username="pytest-admin",
+        full_name="Pytest Admin",
+        role=UserRole.SUPER_ADMIN,
+    )
+
+    yield database_bundle["sync_session_factory"]
+
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_current_user, None)
+    dispose_managed_test_database(database_bundle)
+
+
+def test_export_test_run_items_streams_filtered_rows(temp_db, monkeypatch):
+    import app.services.tabular_export as tabular_export
+
+    monkeypatch.setattr(tabular_export, "EXPORT_FETCH_CHUNK_SIZE", 2)
+    with temp_db() as session:
+        team = Team(name="Export Team", wiki_token="tok", test_case_table_id="tbl")
+        session.add(team)
+        session.flush()
+        case_set = TestCaseSet(team_id=team.id, name="Export Set", is_default=True)
+        session.add(case_set)
+        session.flush()
+        section = TestCaseSection(test_case_set_id=case_set.id, name="Smoke", level=1, sort_order=0)
+        session.add(section)
+        session.flush()
+        config = TestRunConfig(team_id=team.id, name="Export Run")
+        session.add(config)
+        session.flush()
+        for index in range(5):
+            number = f"TC-{index:03d}"
+            session.add(
+                TestCaseLocal(
+                    team_id=team.id,
+                    test_case_set_id=case_set.id,
+                    test_case_section_id=section.id,
+                    test_case_number=number,
+                    title=f"Case {index}",
+                    priority=Priority.HIGH,
+                )
+            )
+            session.add(
+                TestRunItem(
+                    team_id=team.id,
+                    config_id=config.id,
+                    test_case_number=number,
+                    test_result=TestResultStatus.PASSED if index % 2 == 0 else None,
+                    bug_tickets_json='["BUG-1", "BUG-2"]' if index == 0 else None,
+                )
+            )
+        session.commit()
+        team_id, config_id = team.id, config.id
+
+    client = TestClient(app)
+    response = client.get(f"/api/teams/{team_id}/test-run-configs/{config_id}/items/export")
+    assert response.status_code == 200
+    assert "text/csv" in response.headers["content-type"]
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert rows[0] == TEST_RUN_ITEM_EXPORT_COLUMNS
+    assert [row[0] for row in rows[1:]] == [f"TC-{index:03d}" for index in range(5)]
+    idx = {column: position for position, column in enumerate(rows[0])}
+    first = rows[1]
+    assert first[idx["title"]] == "Case 0"
+    assert first[idx["priority"]] == "High"
+    assert first[idx["section_name"]] == "Smoke"
+    assert first[idx["test_result"]] == "Passed"
+    assert first[idx["bug_tickets"]] == '["BUG-1","BUG-2"]'
+
+    executed = client.get(
+        f"/api/teams/{team_id}/test-run-configs/{config_id}/items/export",
+        params={"executed_only": "true"},
+    )
+    executed_rows = list(csv.reader(io.StringIO(executed.content.decode("utf-8-sig"))))
+    assert [row[0] for row in executed_rows[1:]] == ["TC-000", "TC-002", "TC-004"]
+
+    missing = client.get(f"/api/teams/{team_id}/test-run-configs/999999/items/export")
+    assert missing.status_code == 404
+
+
+def test_export_test_run_items_requires_team_read_permission(temp_db, monkeypatch):
+    from app.auth.permission_service import permission_service
+
+    async def deny(*_args, **_kwargs):
+        return SimpleNamespace(has_permission=False)
+
+    with temp_db() as session:
+        team = Team(name="Export Guard Team", wiki_token="tok", test_case_table_id="tbl")
+        session.add(team)
+        session.flush()
+        config = TestRunConfig(team_id=team.id, name="Guarded Run")
+        session.add(config)
+        session.commit()
+        team_id, config_id = team.id, config.id
+
+    monkeypatch.setattr(permission_service, "check_team_permission", deny)
+    client = TestClient(app)
+    response = client.get(f"/api/teams/{team_id}/test-run-configs/{config_id}/items/export")
+    assert response.status_code == 403
+
+    app.dependency_overrides.pop(get_current_user, None)
+    anonymous = client.get(f"/api/teams/{team_id}/test-run-configs/{config_id}/items/export")
+    assert anonymous.status_code in (401, 403)
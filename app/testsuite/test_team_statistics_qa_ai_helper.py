@@ -4,6 +4,7 @@ QA AI Helper 團隊數據統計 API 測試
 測試 7 個端點的基本存取權限與回傳結構。
 """
 
+from datetime import datetime, timedelta
 from types import SimpleNamespace
 
 import pytest
@@ -15,6 +16,18 @@ from app.database import get_db
 from app.auth.dependencies import get_current_user
 from app.auth.models import UserRole
 from app.auth.permission_service import permission_service
+from app.models.database_models import (
+    QAAIHelperCommitLink,
+    QAAIHelperSeedItem,
+    QAAIHelperSeedSet,
+    QAAIHelperSession,
+    QAAIHelperTestcaseDraft,
+    QAAIHelperTestcaseDraftSet,
+    QAAIHelperUsageDailyRollup,
+    Team,
+    User,
+)
+from app.services.qa_ai_helper_usage_stats import StatsResponseCache, invalidate_qa_ai_helper_stats_cache
 from app.testsuite.db_test_helpers import (
     create_managed_test_database,
     dispose_managed_test_database,
@@ -38,6 +51,7 @@ ENDPOINTS = [
 def helper_stats_db(tmp_path, monkeypatch):
     db_path = tmp_path / "helper_stats_test.db"
     database_bundle = create_managed_test_database(db_path)
+    invalidate_qa_ai_helper_stats_cache()
 
     install_main_database_overrides(
         monkeypatch=monkeypatch,
@@ -278,3 +292,123 @@ def test_cache_returns_consistent_results(helper_stats_db, monkeypatch):
     assert r1.status_code == 200
     assert r2.status_code == 200
     assert r1.json() == r2.json()
+
+
+def test_cache_is_bounded_lru_with_ttl(monkeypatch):
+    cache = StatsResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a 變成最近使用
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    monkeypatch.setattr("app.services.qa_ai_helper_usage_stats.time.monotonic", lambda: 10**9)
+    assert cache.get("a") is None
+
+
+# ===========================================================================
+# 聚合與每日 rollup
+# ===========================================================================
+
+
+def _seed_helper_usage(sync_session_factory) -> dict:
+    now = datetime.utcnow()
+    past = (now - timedelta(days=3)).replace(hour=10, minute=0, second=0, microsecond=0)
+    with sync_session_factory() as db:
+        db.add_all(
+            [
+                Team(id=1, name="Alpha", wiki_token="a", test_case_table_id="a"),
+                Team(id=2, name="Beta", wiki_token="b", test_case_table_id="b"),
+                User(id=11, username="alice", hashed_password="x", role=UserRole.USER),
+                User(id=12, username="bob", hashed_password="x", role=UserRole.USER),
+            ]
+        )
+        past_session = QAAIHelperSession(
+            team_id=1, created_by_user_id=11, status="completed", created_at=past, updated_at=past
+        )
+        today_session = QAAIHelperSession(team_id=2, created_by_user_id=12, status="active", created_at=now, updated_at=now)
+        db.add_all([past_session, today_session])
+        db.flush()
+
+        past_seeds = QAAIHelperSeedSet(
+            session_id=past_session.id, requirement_plan_id=1, generated_seed_count=4, included_seed_count=3,
+            created_at=past, updated_at=past,
+        )
+        today_seeds = QAAIHelperSeedSet(
+            session_id=today_session.id, requirement_plan_id=2, generated_seed_count=2, included_seed_count=2,
+            created_at=now, updated_at=now,
+        )
+        db.add_all([past_seeds, today_seeds])
+        db.flush()
+        drafts = QAAIHelperTestcaseDraftSet(
+            session_id=past_session.id, seed_set_id=past_seeds.id, generated_testcase_count=3,
+            selected_for_commit_count=2, created_at=past, updated_at=past,
+        )
+        db.add(drafts)
+        db.flush()
+        for index, edited in enumerate((True, False)):
+            db.add(
+                QAAIHelperSeedItem(
+                    seed_set_id=past_seeds.id, seed_reference_key=f"S{index}", seed_summary="s",
+                    seed_body_json="{}", coverage_tags_json="[]", check_condition_refs_json="[]",
+                    is_ai_generated=True, user_edited=edited,
+                )
+            )
+        db.add(
+            QAAIHelperTestcaseDraft(
+                testcase_draft_set_id=drafts.id, seed_item_id=1, seed_reference_key="S0", body_json="{}",
+                is_ai_generated=True, user_edited=False,
+            )
+        )
+        for index in range(2):
+            db.add(
+                QAAIHelperCommitLink(
+                    session_id=past_session.id, testcase_draft_set_id=drafts.id, testcase_draft_id=1,
+                    seed_item_id=1, test_case_id=index + 1, test_case_set_id=1,
+                )
+            )
+        db.commit()
+        return {"past_session_id": past_session.id, "past_date": past.date(), "today": now.date()}
+
+
+def test_overview_and_adoption_aggregate_in_sql_and_maintain_daily_rollup(helper_stats_db, monkeypatch):
+    _setup_admin(monkeypatch)
+    seeded = _seed_helper_usage(helper_stats_db["sync_session_factory"])
+    client = TestClient(app)
+    query = f"start_date={seeded['today'] - timedelta(days=5)}&end_date={seeded['today']}"
+
+    kpi = client.get(f"{BASE_URL}/overview?{query}").json()["kpi"]
+    assert (kpi["total_sessions"], kpi["completed_sessions"], kpi["failed_sessions"]) == (2, 1, 0)
+    assert (kpi["total_seeds_generated"], kpi["total_tcs_generated"], kpi["total_tcs_committed"]) == (6, 3, 2)
+    assert kpi["overall_seed_adoption_rate"] == round(5 / 6, 4)
+
+    # 過去完整日期寫入 rollup；今日仍即時彙總
+    with helper_stats_db["sync_session_factory"]() as db:
+        rollups = db.query(QAAIHelperUsageDailyRollup).all()
+        assert [(r.stat_date, r.team_id, r.user_id, r.session_count, r.committed_tc_count) for r in rollups] == [
+            (seeded["past_date"], 1, 11, 1, 2)
+        ]
+
+    adoption = client.get(f"{BASE_URL}/adoption?{query}").json()
+    assert adoption["overall"]["user_edit_rate"] == round(1 / 3, 4)
+    assert adoption["overall"]["ai_generated_ratio"] == 1.0
+    past_index = adoption["overall_trend"]["dates"].index(seeded["past_date"].isoformat())
+    assert adoption["overall_trend"]["seed_adoption"][past_index] == 0.75
+    assert {row["team_name"]: row["sample_count"] for row in adoption["team_ranking"]} == {"Alpha": 1, "Beta": 1}
+    assert {row["username"]: row["team_name"] for row in adoption["user_ranking"]} == {"alice": "Alpha", "bob": "Beta"}
+
+    # 過去 session 異動後，rollup 指紋不符會重算該日
+    with helper_stats_db["sync_session_factory"]() as db:
+        session = db.get(QAAIHelperSession, seeded["past_session_id"])
+        session.status = "failed"
+        session.updated_at = datetime.utcnow()
+        db.commit()
+    invalidate_qa_ai_helper_stats_cache()
+
+    kpi = client.get(f"{BASE_URL}/overview?{query}").json()["kpi"]
+    assert (kpi["completed_sessions"], kpi["failed_sessions"]) == (0, 1)
+    with helper_stats_db["sync_session_factory"]() as db:
+        assert db.query(QAAIHelperUsageDailyRollup).one().failed_session_count == 1
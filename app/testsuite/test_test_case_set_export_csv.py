@@ -365,3 +365,32 @@ def test_export_csv_missing_or_wrong_team_set_returns_404(temp_db, test_data):
     # Wrong team trying to access target set
     response = client.get(f"/api/teams/{other_team_id}/test-case-sets/{target_set_id}/export-csv")
     assert response.status_code == 404
+
+
+def test_export_csv_reads_large_set_across_cursor_chunks(temp_db, monkeypatch):
+    import app.services.tabular_export as tabular_export
+
+    monkeypatch.setattr(tabular_export, "EXPORT_FETCH_CHUNK_SIZE", 50)
+    sync_engine, TestingSessionLocal = temp_db
+    cases = {f"BULK-{index:04d}": None for index in range(230)}
+    team_id, set_id = _seed_test_data_cases(TestingSessionLocal, cases)
+
+    client = TestClient(app)
+    response = client.get(f"/api/teams/{team_id}/test-case-sets/{set_id}/export-csv")
+    assert response.status_code == 200
+
+    rows = _parse_csv_response(response)
+    assert rows[0] == TEST_CASE_SET_CSV_COLUMNS
+    assert [row[0] for row in rows[1:]] == sorted(cases)
+
+
+def test_export_xlsx_without_openpyxl_is_rejected(temp_db, test_data, monkeypatch):
+    import app.services.tabular_export as tabular_export
+
+    monkeypatch.setattr(tabular_export, "_load_openpyxl", lambda: None)
+    client = TestClient(app)
+    response = client.get(
+        f"/api/teams/{test_data['team_id']}/test-case-sets/{test_data['target_set_id']}/export-csv",
+        params={"format": "xlsx"},
+    )
+    assert response.status_code == 400
@@ -13,8 +13,12 @@ from app.models.database_models import (
     TestCaseLocal,
     TestCaseSection,
     TestCaseSet,
+    TestRunConfig,
+    TestRunConfigScope,
+    TestRunItem,
 )
 from app.models.lark_types import Priority
+from app.services.test_run_scope_service import TestRunScopeService
 from app.testsuite.db_test_helpers import (
     create_managed_test_database,
     dispose_managed_test_database,
@@ -345,3 +349,239 @@ def test_move_test_case_preview_and_cleanup_summary(temp_db):
     )
     assert items_resp.status_code == 200
     assert items_resp.json() == []
+
+
+def _scope_rows(session, config_id: int) -> list[int]:
+    return [
+        row.set_id
+        for row in session.query(TestRunConfigScope)
+        .filter(TestRunConfigScope.config_id == config_id)
+        .order_by(TestRunConfigScope.position.asc())
+        .all()
+    ]
+
+
+def test_config_scope_table_follows_scope_json_and_batch_lookup(temp_db):
+    _, SessionLocal = temp_db
+    client = TestClient(app)
+
+    with SessionLocal() as session:
+        seeded = _seed_multi_set_team(session)
+
+    explicit = _create_multi_set_config(
+        client,
+        team_id=seeded["team_id"],
+        set_ids=[seeded["set_b_id"], seeded["set_a_id"]],
+        name="Explicit Scope",
+    )
+    with SessionLocal() as session:
+        assert _scope_rows(session, explicit["id"]) == [seeded["set_b_id"], seeded["set_a_id"]]
+        assert TestRunScopeService.get_config_ids_for_set(session, seeded["set_b_id"]) == [explicit["id"]]
+
+        # 舊資料：沒有明確範圍，需由 Run Items 回推
+        legacy = TestRunConfig(team_id=seeded["team_id"], name="Legacy Scope")
+        session.add(legacy)
+        session.flush()
+        session.add(
+            TestRunItem(
+                team_id=seeded["team_id"],
+                config_id=legacy.id,
+                test_case_number=seeded["case_b_no"],
+            )
+        )
+        session.commit()
+        legacy_id = legacy.id
+        assert _scope_rows(session, legacy_id) == []
+
+        scope_map = TestRunScopeService.get_scope_ids_for_configs(session, [explicit["id"], legacy_id])
+        assert scope_map == {
+            explicit["id"]: [seeded["set_b_id"], seeded["set_a_id"]],
+            legacy_id: [seeded["set_b_id"]],
+        }
+        assert TestRunScopeService.get_scope_ids_for_configs(
+            session, [legacy_id], allow_fallback=False
+        ) == {legacy_id: []}
+
+    update_resp = client.put(
+        f"/api/teams/{seeded['team_id']}/test-run-configs/{explicit['id']}",
+        json={"test_case_set_ids": [seeded["set_a_id"]]},
+    )
+    assert update_resp.status_code == 200
+
+    list_resp = client.get(f"/api/teams/{seeded['team_id']}/test-run-configs")
+    assert list_resp.status_code == 200
+    listed = {item["id"]: item["test_case_set_ids"] for item in list_resp.json()}
+    assert listed == {explicit["id"]: [seeded["set_a_id"]], legacy_id: [seeded["set_b_id"]]}
+
+    with SessionLocal() as session:
+        assert _scope_rows(session, explicit["id"]) == [seeded["set_a_id"]]
+        session.delete(session.get(TestRunConfig, explicit["id"]))
+        session.commit()
+        assert _scope_rows(session, explicit["id"]) == []
+
+
+def test_set_deletion_preview_counts_items_per_config(temp_db):
+    _, SessionLocal = temp_db
+    client = TestClient(app)
+
+    with SessionLocal() as session:
+        seeded = _seed_multi_set_team(session)
+
+    config_ids = []
+    for name, case_numbers in (
+        ("Wide", [seeded["case_a_no"], seeded["case_b_no"]]),
+        ("Narrow", [seeded["case_b_no"]]),
+        ("Untouched", [seeded["case_a_no"]]),
+    ):
+        config = _create_multi_set_config(
+            client,
+            team_id=seeded["team_id"],
+            set_ids=[seeded["set_a_id"], seeded["set_b_id"]],
+            name=name,
+        )
+        add_resp = client.post(
+            f"/api/teams/{seeded['team_id']}/test-run-configs/{config['id']}/items",
+            json={"items": [{"test_case_number": number} for number in case_numbers]},
+        )
+        assert add_resp.status_code == 201
+        config_ids.append(config["id"])
+
+    with SessionLocal() as session:
+        preview = TestRunScopeService.preview_set_deletion(
+            session, seeded["team_id"], seeded["set_b_id"]
+        )
+        assert preview["impacted_item_count"] == 2
+        assert [run["config_id"] for run in preview["impacted_test_runs"]] == sorted(config_ids[:2])
+        assert all(run["removed_item_count"] == 1 for run in preview["impacted_test_runs"])
+
+        summary = TestRunScopeService.cleanup_set_deletion(
+            session, seeded["team_id"], seeded["set_b_id"]
+        )
+        updates = TestRunScopeService.remove_set_from_all_scopes(
+            session, seeded["team_id"], seeded["set_b_id"]
+        )
+        session.commit()
+
+        assert summary["removed_item_count"] == 2
+        assert updates == {config_id: [seeded["set_a_id"]] for config_id in config_ids}
+        remaining = session.query(TestRunItem.test_case_number).order_by(TestRunItem.id).all()
+        assert [row[0] for row in remaining] == [seeded["case_a_no"], seeded["case_a_no"]]
+        assert TestRunScopeService.get_config_ids_for_set(session, seeded["set_b_id"]) == []
+
+
+def test_batch_create_items_prefetches_and_reports_per_item_outcomes(temp_db):
+    _, SessionLocal = temp_db
+    client = TestClient(app)
+
+    with SessionLocal() as session:
+        seeded = _seed_multi_set_team(session)
+
+    config = _create_multi_set_config(
+        client, team_id=seeded["team_id"], set_ids=[seeded["set_a_id"]], name="Set A Only"
+    )
+    url = f"/api/teams/{seeded['team_id']}/test-run-configs/{config['id']}/items"
+    first = client.post(url, json={"items": [{"test_case_number": seeded["case_a_no"]}]})
+    assert first.status_code == 201
+    assert first.json()["created_count"] == 1
+
+    second = client.post(
+        url,
+        json={
+            "items": [
+                {"test_case_number": seeded["case_a_no"]},  # 已存在
+                {"test_case_number": seeded["case_b_no"]},  # 不在範圍內
+                {"test_case_number": "TC-MISSING"},
+            ]
+        },
+    )
+    assert second.status_code == 201
+    payload = second.json()
+    assert payload["created_count"] == 0
+    assert payload["skipped_duplicates"] == 1
+    assert payload["success"] is False
+    assert payload["errors"][0].startswith("index 1:")
+    assert payload["errors"][1] == "index 2: 找不到測試案例 TC-MISSING"
+
+    # 同一批重複的編號只建立一次
+    other = _create_multi_set_config(
+        client, team_id=seeded["team_id"], set_ids=[seeded["set_b_id"]], name="Set B Only"
+    )
+    dup = client.post(
+        f"/api/teams/{seeded['team_id']}/test-run-configs/{other['id']}/items",
+        json={
+            "items": [
+                {"test_case_number": seeded["case_b_no"], "assignee_name": "Alice"},
+                {"test_case_number": seeded["case_b_no"]},
+            ]
+        },
+    )
+    assert dup.status_code == 201
+    assert (dup.json()["created_count"], dup.json()["skipped_duplicates"]) == (1, 1)
+    with SessionLocal() as session:
+        created = session.query(TestRunItem).filter(TestRunItem.config_id == other["id"]).one()
+        assert created.assignee_name == "Alice"
+        assert created.created_at is not None
+
+
+def test_batch_create_items_from_scope_inserts_server_side(temp_db):
+    _, SessionLocal = temp_db
+    client = TestClient(app)
+
+    with SessionLocal() as session:
+        seeded = _seed_multi_set_team(session)
+        unassigned_a = (
+            session.query(TestCaseSection)
+            .filter(TestCaseSection.test_case_set_id == seeded["set_a_id"])
+            .one()
+        )
+        child = TestCaseSection(
+            test_case_set_id=seeded["set_a_id"],
+            name="Login",
+            level=2,
+            sort_order=0,
+            parent_section_id=unassigned_a.id,
+        )
+        session.add(child)
+        session.flush()
+        session.add_all(
+            [
+                TestCaseLocal(
+                    team_id=seeded["team_id"],
+                    test_case_number=f"TC-A-10{index}",
+                    title=f"Login {index}",
+                    priority=Priority.HIGH if index % 2 else Priority.LOW,
+                    test_case_set_id=seeded["set_a_id"],
+                    test_case_section_id=child.id,
+                )
+                for index in range(4)
+            ]
+        )
+        session.commit()
+        child_id = child.id
+        unassigned_a_id = unassigned_a.id
+
+    config = _create_multi_set_config(
+        client, team_id=seeded["team_id"], set_ids=[seeded["set_a_id"]], name="From Scope"
+    )
+    url = f"/api/teams/{seeded['team_id']}/test-run-configs/{config['id']}/items/from-scope"
+
+    high_only = client.post(
+        url, json={"test_case_set_id": seeded["set_a_id"], "section_ids": [child_id], "priority": "High"}
+    )
+    assert high_only.status_code == 201, high_only.text
+    assert (high_only.json()["created_count"], high_only.json()["skipped_duplicates"]) == (2, 0)
+
+    # 以父 section 建立時包含子 section，已建立的項目計為 skipped
+    whole = client.post(url, json={"test_case_set_id": seeded["set_a_id"], "section_ids": [unassigned_a_id]})
+    assert whole.status_code == 201
+    assert (whole.json()["created_count"], whole.json()["skipped_duplicates"]) == (3, 2)
+
+    out_of_scope = client.post(url, json={"test_case_set_id": seeded["set_b_id"]})
+    assert out_of_scope.status_code == 400
+
+    with SessionLocal() as session:
+        numbers = sorted(
+            row[0]
+            for row in session.query(TestRunItem.test_case_number).filter(TestRunItem.config_id == config["id"])
+        )
+        assert numbers == ["TC-A-001", "TC-A-100", "TC-A-101", "TC-A-102", "TC-A-103"]
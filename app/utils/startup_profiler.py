@@ -0,0 +1,117 @@
+"""worker 啟動剖析：記錄各啟動階段（import、router 掛載、lifespan 初始化）的耗時與 RSS。
+
+main.py 以 ``startup_profiler.phase(...)`` 包住每個階段；結果經 /admin/system_metrics 的
+``startup`` 欄位查詢，``scripts/startup_benchmark.py`` 亦以此檢查冷啟動預算。
+import 細項（哪個模組最慢）需以 ``python -X importtime`` 取得，見 ``parse_importtime``。
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def current_rss_bytes() -> Optional[int]:
+    """目前行程的 RSS；Linux 讀 /proc（不需 psutil），其他平台回退 psutil。"""
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil  # type: ignore
+
+        return int(psutil.Process().memory_info().rss)
+    except Exception:
+        return None
+
+
+class StartupProfiler:
+    """依序記錄啟動階段；同名階段（例如 TestClient 多次進出 lifespan）保留最後一次。
+
+    階段可巢狀（``startup`` 包含 ``startup.*``），因此各階段耗時不可直接相加。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._phases: Dict[str, Dict[str, Any]] = {}
+        self._created_at = time.perf_counter()
+        self._created_rss = current_rss_bytes()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        rss_before = current_rss_bytes()
+        modules_before = len(sys.modules)
+        try:
+            yield
+        finally:
+            rss_after = current_rss_bytes()
+            record = {
+                "name": name,
+                "offset_ms": round((started - self._created_at) * 1000, 2),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "rss_after_bytes": rss_after,
+                "rss_delta_bytes": (
+                    rss_after - rss_before if rss_after is not None and rss_before is not None else None
+                ),
+                "modules_loaded": len(sys.modules) - modules_before,
+            }
+            with self._lock:
+                self._phases.pop(name, None)
+                self._phases[name] = record
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = list(self._phases.values())
+        return {
+            "rss_at_profiler_start_bytes": self._created_rss,
+            "rss_now_bytes": current_rss_bytes(),
+            "modules_loaded": len(sys.modules),
+            "phases": phases,
+        }
+
+
+def parse_importtime(lines: Iterable[str], *, top: int = 25, group_depth: int = 2) -> Dict[str, Any]:
+    """解析 ``python -X importtime`` 的 stderr 輸出。
+
+    回傳最慢的 top 個模組（cumulative）以及依套件前綴（例如 ``app.api``、``sqlalchemy``）
+    彙總的 self 時間，用來判斷延遲載入的優先順序。
+    """
+    modules: List[Dict[str, Any]] = []
+    for line in lines:
+        match = _IMPORTTIME_RE.match(line.rstrip("\n"))
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        modules.append(
+            {
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            }
+        )
+
+    groups: Dict[str, float] = {}
+    for item in modules:
+        prefix = ".".join(item["module"].split(".")[:group_depth])
+        groups[prefix] = groups.get(prefix, 0.0) + item["self_ms"]
+
+    return {
+        "total_self_ms": round(sum(item["self_ms"] for item in modules), 2),
+        "slowest": sorted(modules, key=lambda item: item["cumulative_ms"], reverse=True)[:top],
+        "by_package": [
+            {"package": name, "self_ms": round(value, 2)}
+            for name, value in sorted(groups.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ],
+    }
+
+
+startup_profiler = StartupProfiler()
@@ -87,6 +87,7 @@ MAIN_REQUIRED_TABLES: List[str] = [
     "system_automation_providers",
     "automation_scripts",
     "automation_script_groups",
+    "automation_script_group_members",
     "automation_script_case_links",
     "automation_environments",
     "automation_environment_params",
@@ -99,6 +100,7 @@ MAIN_REQUIRED_TABLES: List[str] = [
     "test_case_sets",
     "test_case_sections",
     "test_run_configs",
+    "test_run_config_scope",
     "test_run_sets",
     "test_run_set_memberships",
     "test_run_items",
@@ -117,6 +119,12 @@ MAIN_REQUIRED_TABLES: List[str] = [
     "qa_ai_helper_testcase_draft_sets",
     "qa_ai_helper_testcase_drafts",
     "qa_ai_helper_telemetry_events",
+    "qa_ai_helper_llm_response_cache",
+    "llm_scheduler_slots",
+    "llm_scheduler_token_buckets",
+    "qa_ai_helper_usage_daily_rollups",
+    "external_read_counts",
+    "automation_coverage_snapshots",
     "qa_ai_helper_commit_links",
     "lark_departments",
     "lark_users",
@@ -130,7 +138,7 @@ TARGET_LABELS = {
 }
 TARGET_REQUIRED_TABLES = {
     "main": MAIN_REQUIRED_TABLES,
-    "audit": ["audit_logs", "knowledge_query_logs"],
+    "audit": ["audit_logs", "knowledge_query_logs", "audit_user_activity"],
     "usm": ["user_story_maps", "user_story_map_nodes"],
 }
 TARGET_CRITICAL_TABLES = {
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Benchmark assistant tool-call latency: in-process dispatch vs HTTP loopback.
+
+Seeds a throwaway SQLite database with one team and a page of test cases,
+issues a real JWT, then runs the same read tool through
+``ToolExecutor._loopback`` with ``tool_dispatch_mode`` set to ``direct`` and
+``loopback``. Reports per-call latency percentiles for each mode.
+
+    PYTHONPATH=. python scripts/assistant_tool_dispatch_benchmark.py --calls 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import insert
+
+from app.auth.auth_service import auth_service
+from app.auth.models import UserRole
+from app.config import AssistantConfig
+from app.database import get_db
+from app.db_access.main import get_main_access_boundary
+from app.main import app
+from app.models.database_models import Team, TestCaseLocal, TestCaseSet, User
+from app.services.assistant.tool_executor import ToolExecutor
+from app.services.assistant.tool_registry import get_tool_registry
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+    install_main_database_overrides,
+)
+
+MODES = ("loopback", "direct")
+
+
+class _MonkeyPatch:
+    """Minimal ``monkeypatch`` stand-in for ``install_main_database_overrides``."""
+
+    def __init__(self) -> None:
+        self._undo: list[tuple[Any, str, Any]] = []
+
+    def setattr(self, target, name, value) -> None:
+        self._undo.append((target, name, getattr(target, name)))
+        setattr(target, name, value)
+
+    def undo(self) -> None:
+        while self._undo:
+            target, name, value = self._undo.pop()
+            setattr(target, name, value)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark assistant tool dispatch modes")
+    parser.add_argument("--calls", type=int, default=200, help="Tool calls per mode")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed calls per mode")
+    parser.add_argument("--cases", type=int, default=200, help="Test cases seeded in the team")
+    parser.add_argument("--limit", type=int, default=20, help="Page size requested by the tool")
+    return parser.parse_args()
+
+
+def seed_database(bundle: dict[str, Any], cases: int) -> None:
+    now = datetime.utcnow()
+    with bundle["sync_engine"].begin() as connection:
+        connection.execute(
+            insert(User).values(
+                id=1, username="bench-admin", hashed_password="x", role=UserRole.SUPER_ADMIN,
+                is_active=True, created_at=now, updated_at=now,
+            )
+        )
+        connection.execute(insert(Team).values(id=1, name="Dispatch Bench", wiki_token="bench", test_case_table_id="bench"))
+        set_id = connection.execute(
+            insert(TestCaseSet).values(team_id=1, name="Dispatch Bench Set", is_default=True)
+        ).inserted_primary_key[0]
+        connection.execute(
+            insert(TestCaseLocal),
+            [
+                {
+                    "team_id": 1,
+                    "test_case_set_id": set_id,
+                    "test_case_number": f"BENCH-{index:05d}",
+                    "title": f"Benchmark case {index}",
+                    "priority": "Medium",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for index in range(cases)
+            ],
+        )
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_mode(mode: str, args: argparse.Namespace, jwt: str) -> dict[str, Any]:
+    executor = ToolExecutor(
+        app=app,
+        main_boundary=get_main_access_boundary(),
+        config=AssistantConfig(tool_dispatch_mode=mode),
+        registry=get_tool_registry(),
+    )
+    tool = get_tool_registry().get("list_test_cases")
+
+    async def _call() -> tuple[int, Any]:
+        return await executor._loopback(
+            tool, team_id=1, path_params={}, query_params={"limit": args.limit},
+            body_params={}, jwt=jwt, conversation_key="dispatch-bench",
+        )
+
+    for _ in range(args.warmup):
+        await _call()
+
+    samples: list[float] = []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        status_code, _payload = await _call()
+        samples.append((time.perf_counter() - start) * 1000)
+        if status_code != 200:
+            raise RuntimeError(f"{mode} dispatch returned HTTP {status_code}")
+
+    return {
+        "mode": mode,
+        "calls": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(_percentile(samples, 0.50), 3),
+        "p95_ms": round(_percentile(samples, 0.95), 3),
+        "p99_ms": round(_percentile(samples, 0.99), 3),
+    }
+
+
+async def run_all(args: argparse.Namespace) -> list[dict[str, Any]]:
+    jwt, _jti, _expires = await auth_service.create_access_token(
+        user_id=1, username="bench-admin", role=UserRole.SUPER_ADMIN
+    )
+    return [await run_mode(mode, args, jwt) for mode in MODES]
+
+
+def main() -> int:
+    args = parse_args()
+    patcher = _MonkeyPatch()
+    with tempfile.TemporaryDirectory(prefix="tcrt-dispatch-bench-") as tmp:
+        bundle = create_managed_test_database(Path(tmp) / "dispatch_bench.db")
+        try:
+            seed_database(bundle, args.cases)
+            install_main_database_overrides(
+                monkeypatch=patcher,
+                app=app,
+                get_db_dependency=get_db,
+                async_engine=bundle["async_engine"],
+                async_session_factory=bundle["async_session_factory"],
+            )
+            results = asyncio.run(run_all(args))
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            patcher.undo()
+            dispose_managed_test_database(bundle)
+
+    by_mode = {result["mode"]: result for result in results}
+    speedup = round(by_mode["loopback"]["mean_ms"] / by_mode["direct"]["mean_ms"], 2)
+    print(json.dumps({"config": vars(args), "results": results, "mean_speedup": speedup}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
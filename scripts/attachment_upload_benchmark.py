@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark event-loop lag while test run result attachments are being stored.
+
+Spools N large files to disk (as Starlette does for multipart bodies), then
+stores them concurrently with two pipelines while a probe task measures how
+late the event loop wakes up from short sleeps:
+
+* ``legacy``: ``await f.read()`` of the whole file plus a synchronous
+  ``open().write`` on the loop (the pre-streaming upload handlers).
+* ``streaming``: ``store_upload_streaming`` (chunked, off-loop writes, sha256
+  in the same pass, atomic move, per-scope dedup).
+
+Also reports the peak Python heap allocation per mode via ``tracemalloc``.
+
+    PYTHONPATH=. python scripts/attachment_upload_benchmark.py --files 4 --size-mb 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from fastapi import UploadFile
+
+from app.services.attachment_upload import STAGING_DIR_NAME, store_upload_streaming
+
+MODES = ("legacy", "streaming")
+_WRITE_BLOCK = 4 * 1024 * 1024
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark attachment upload pipelines")
+    parser.add_argument("--files", type=int, default=4, help="Concurrent uploads per mode")
+    parser.add_argument("--size-mb", type=int, default=128, help="Size of each uploaded file")
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0, help="Probe sleep interval")
+    parser.add_argument("--distinct", action="store_true", help="Give every file distinct content (no dedup)")
+    return parser.parse_args()
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _spool_source(directory: Path, index: int, size: int, distinct: bool) -> Path:
+    path = directory / f"source-{index}.bin"
+    block = (bytes([index % 251]) if distinct else b"\x5a") * _WRITE_BLOCK
+    with open(path, "wb") as out:
+        remaining = size
+        while remaining > 0:
+            out.write(block[: min(remaining, len(block))])
+            remaining -= len(block)
+    return path
+
+
+async def _legacy_store(upload: UploadFile, target: Path) -> None:
+    content = await upload.read()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, "wb") as out:
+        out.write(content)
+
+
+async def _probe(stop: asyncio.Event, interval: float, lags: list[float]) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, (time.perf_counter() - expected) * 1000))
+
+
+async def run_mode(mode: str, sources: list[Path], root: Path, args: argparse.Namespace) -> dict[str, Any]:
+    scope = root / mode / "test-runs" / "1"
+    handles = [open(path, "rb") for path in sources]
+    uploads = [UploadFile(file=handle, filename=path.name) for handle, path in zip(handles, sources)]
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    tracemalloc.start()
+    probe = asyncio.create_task(_probe(stop, args.probe_interval_ms / 1000, lags))
+    await asyncio.sleep(args.probe_interval_ms / 1000 * 4)
+    start = time.perf_counter()
+    try:
+        if mode == "legacy":
+            await asyncio.gather(
+                *(_legacy_store(upload, scope / str(i) / upload.filename) for i, upload in enumerate(uploads))
+            )
+        else:
+            await asyncio.gather(
+                *(
+                    store_upload_streaming(
+                        upload, scope / str(i) / upload.filename,
+                        staging_dir=root / mode / STAGING_DIR_NAME, dedup_scope=scope,
+                    )
+                    for i, upload in enumerate(uploads)
+                )
+            )
+        elapsed = time.perf_counter() - start
+    finally:
+        stop.set()
+        await probe
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        for handle in handles:
+            handle.close()
+
+    stored_bytes = sum(os.stat(p).st_size for p in scope.rglob("*") if p.is_file() and ".blobs" not in p.parts)
+    disk_blocks = {(os.stat(p).st_dev, os.stat(p).st_ino) for p in scope.rglob("*") if p.is_file()}
+    return {
+        "mode": mode,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_mb_s": round(stored_bytes / (1024 * 1024) / elapsed, 1),
+        "probe_samples": len(lags),
+        "loop_lag_mean_ms": round(statistics.fmean(lags), 2) if lags else None,
+        "loop_lag_p99_ms": round(_percentile(lags, 0.99), 2) if lags else None,
+        "loop_lag_max_ms": round(max(lags), 2) if lags else None,
+        "peak_heap_mb": round(peak / (1024 * 1024), 1),
+        "unique_inodes": len(disk_blocks),
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    size = args.size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory(prefix="tcrt-upload-bench-") as tmp:
+        root = Path(tmp)
+        sources = [_spool_source(root, index, size, args.distinct) for index in range(args.files)]
+        results = [asyncio.run(run_mode(mode, sources, root / "attachments", args)) for mode in MODES]
+
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
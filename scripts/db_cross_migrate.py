@@ -7,15 +7,23 @@ Design goals:
 - No dependency on app/* or project runtime components
 - Supports CLI flags or YAML config file
 - Assumes target schema is already initialized unless --create-target-schema is used
+- Streams source rows (yield_per) and uses backend bulk loaders (PostgreSQL COPY,
+  MySQL multi-row INSERT) unless --bulk-loader generic
+- --workers N copies independent tables concurrently following the FK DAG, one
+  transaction per table; --checkpoint FILE makes such runs resumable per table
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
 import shutil
+import threading
+import time
 import warnings
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -66,6 +74,7 @@ KNOWN_IGNORED_SOURCE_COLUMNS = {
     "test_cases": {"attachment_count", "has_attachments"},
 }
 FILTERED_ROW_REPAIR_KEYS = {"skipped_orphan_item_refs"}
+BULK_LOADER_CHOICES = ("auto", "generic")
 
 
 @dataclass
@@ -80,6 +89,9 @@ class TransferJob:
     create_target_schema: bool = False
     disable_constraints: bool = False
     dry_run: bool = False
+    workers: int = 1
+    checkpoint_path: str | None = None
+    bulk_loader: str = "auto"
 
 
 class Logger:
@@ -143,6 +155,23 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=None,
         help="Validate and plan only; do not write data",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Copy independent tables concurrently (per-table transactions); default 1 = single transaction",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="JSON checkpoint file; committed tables are recorded and skipped when the job is re-run",
+    )
+    parser.add_argument(
+        "--bulk-loader",
+        choices=BULK_LOADER_CHOICES,
+        default=None,
+        help="auto: PostgreSQL COPY / MySQL multi-row INSERT when available; generic: SQLAlchemy executemany",
+    )
     parser.add_argument("--json", action="store_true", help="Emit JSON summary")
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--verbose", action="store_true")
@@ -182,6 +211,9 @@ def load_jobs_from_config(path: Path, only_job: str | None = None) -> list[Trans
             create_target_schema=bool(merged.get("create_target_schema", False)),
             disable_constraints=bool(merged.get("disable_constraints", False)),
             dry_run=bool(merged.get("dry_run", False)),
+            workers=int(merged.get("workers", 1)),
+            checkpoint_path=merged.get("checkpoint_path") or None,
+            bulk_loader=str(merged.get("bulk_loader", "auto")),
         )
         if only_job and job.name != only_job:
             continue
@@ -206,6 +238,9 @@ def build_single_job(args: argparse.Namespace) -> TransferJob:
         create_target_schema=bool(args.create_target_schema),
         disable_constraints=bool(args.disable_constraints),
         dry_run=bool(args.dry_run),
+        workers=args.workers if args.workers is not None else 1,
+        checkpoint_path=args.checkpoint,
+        bulk_loader=args.bulk_loader or "auto",
     )
 
 
@@ -228,6 +263,12 @@ def apply_cli_overrides_to_jobs(jobs: list[TransferJob], args: argparse.Namespac
             job.disable_constraints = True
         if args.dry_run:
             job.dry_run = True
+        if args.workers is not None:
+            job.workers = args.workers
+        if args.checkpoint:
+            job.checkpoint_path = args.checkpoint
+        if args.bulk_loader:
+            job.bulk_loader = args.bulk_loader
     return jobs
 
 
@@ -238,13 +279,16 @@ def resolve_jobs(args: argparse.Namespace) -> list[TransferJob]:
     return [build_single_job(args)]
 
 
-def build_engine(database_url: str) -> Engine:
+def build_engine(database_url: str, *, pool_size: int | None = None) -> Engine:
     engine_kwargs: dict[str, Any] = {"future": True, "pool_pre_ping": True}
     if database_url.startswith("sqlite:"):
         engine_kwargs["connect_args"] = {
             "check_same_thread": False,
             "timeout": 30,
         }
+    if pool_size and make_url(database_url).database not in (None, "", ":memory:"):
+        # 平行搬移時每個 worker 各占一條 source / target 連線
+        engine_kwargs["pool_size"] = pool_size
     return create_engine(database_url, **engine_kwargs)
 
 
@@ -314,16 +358,13 @@ def apply_mysql_mediumtext_defaults(metadata: MetaData) -> None:
             column.type = mysql.MEDIUMTEXT()
 
 
-def resolve_table_order(
+def build_table_dependencies(
     source_metadata: MetaData,
     target_metadata: MetaData,
     selected_tables: list[str],
-    *,
-    allow_cycles: bool,
-) -> list[str]:
+) -> dict[str, set[str]]:
+    """回傳每個 table 依賴（FK 指向）的其他 selected tables；來源與目標 schema 的 FK 取聯集。"""
     dependency_map: dict[str, set[str]] = {}
-    reverse_map: dict[str, set[str]] = {name: set() for name in selected_tables}
-
     for table_name in selected_tables:
         dependencies: set[str] = set()
         for metadata in (source_metadata, target_metadata):
@@ -334,6 +375,19 @@ def resolve_table_order(
                 if fk.column.table.name in selected_tables and fk.column.table.name != table_name
             )
         dependency_map[table_name] = dependencies
+    return dependency_map
+
+
+def resolve_table_order(
+    source_metadata: MetaData,
+    target_metadata: MetaData,
+    selected_tables: list[str],
+    *,
+    allow_cycles: bool,
+) -> list[str]:
+    dependency_map = build_table_dependencies(source_metadata, target_metadata, selected_tables)
+    reverse_map: dict[str, set[str]] = {name: set() for name in selected_tables}
+    for table_name, dependencies in dependency_map.items():
         for dependency in dependencies:
             reverse_map[dependency].add(table_name)
 
@@ -687,6 +741,157 @@ def _coerce_value_for_target(source_column, target_column, value: Any) -> Any:
     return value
 
 
+def resolve_bulk_loader(target_connection: Connection, requested: str = "auto") -> str:
+    """依目標 backend 選擇寫入方式。
+
+    - postgresql + psycopg（3）：``COPY ... FROM STDIN``
+    - mysql（pymysql / mysqlclient）：DBAPI ``executemany``，driver 會改寫成多列 ``INSERT ... VALUES``
+    - 其他（含 SQLite）或指定 ``generic``：SQLAlchemy ``insert()`` executemany
+    """
+    if requested != "auto":
+        return "generic"
+    dialect = target_connection.engine.dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg":
+        return "postgresql_copy"
+    if dialect.name == "mysql" and dialect.paramstyle in {"format", "pyformat"}:
+        return "mysql_multirow"
+    return "generic"
+
+
+def _json_column_names(target_table, column_names: list[str]) -> set[str]:
+    return {name for name in column_names if isinstance(target_table.c[name].type, SQLAlchemyJSON)}
+
+
+def _copy_into_postgresql(
+    target_connection: Connection,
+    target_table,
+    column_names: list[str],
+    payload: list[dict[str, Any]],
+) -> None:
+    from psycopg.types.json import Json
+
+    preparer = target_connection.engine.dialect.identifier_preparer
+    json_columns = _json_column_names(target_table, column_names)
+    statement = (
+        f"COPY {preparer.format_table(target_table)} "
+        f"({', '.join(preparer.quote(name) for name in column_names)}) FROM STDIN"
+    )
+    cursor = target_connection.connection.dbapi_connection.cursor()
+    try:
+        with cursor.copy(statement) as copy:
+            for row in payload:
+                copy.write_row(
+                    tuple(
+                        Json(row[name]) if name in json_columns and row[name] is not None else row[name]
+                        for name in column_names
+                    )
+                )
+    finally:
+        cursor.close()
+
+
+def _insert_mysql_multirow(
+    target_connection: Connection,
+    target_table,
+    column_names: list[str],
+    payload: list[dict[str, Any]],
+) -> None:
+    preparer = target_connection.engine.dialect.identifier_preparer
+    json_columns = _json_column_names(target_table, column_names)
+    statement = (
+        f"INSERT INTO {preparer.format_table(target_table)} "
+        f"({', '.join(preparer.quote(name) for name in column_names)}) "
+        f"VALUES ({', '.join(['%s'] * len(column_names))})"
+    )
+    cursor = target_connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.executemany(
+            statement,
+            [
+                tuple(
+                    _dump_json_parameter_value(row[name])
+                    if name in json_columns and row[name] is not None
+                    else row[name]
+                    for name in column_names
+                )
+                for row in payload
+            ],
+        )
+    finally:
+        cursor.close()
+
+
+def insert_batch(
+    target_connection: Connection,
+    target_table,
+    column_names: list[str],
+    payload: list[dict[str, Any]],
+    *,
+    loader: str,
+) -> None:
+    if loader == "postgresql_copy":
+        _copy_into_postgresql(target_connection, target_table, column_names, payload)
+    elif loader == "mysql_multirow":
+        _insert_mysql_multirow(target_connection, target_table, column_names, payload)
+    else:
+        target_connection.execute(target_table.insert(), payload)
+
+
+def _self_reference_dependencies(
+    row: Any,
+    row_key: tuple[Any, ...],
+    self_reference_specs: list[tuple[tuple[str, ...], tuple[str, ...]]],
+) -> set[tuple[Any, ...]]:
+    dependencies: set[tuple[Any, ...]] = set()
+    for constrained_columns, _referred_columns in self_reference_specs:
+        dependency_key = tuple(row._mapping[column_name] for column_name in constrained_columns)
+        if any(value is None for value in dependency_key) or dependency_key == row_key:
+            continue
+        dependencies.add(dependency_key)
+    return dependencies
+
+
+def _iter_self_referential_rows(
+    rows: Iterator[Any],
+    primary_key_names: tuple[str, ...],
+    self_reference_specs: list[tuple[tuple[str, ...], tuple[str, ...]]],
+) -> Iterator[Any]:
+    """串流輸出同表自參照的列，保證父列先於子列。
+
+    來源依 PK 排序後通常父列在前，可直接輸出；只有「父列尚未出現」的列會暫存在記憶體，
+    等父列輸出後再釋放。串流結束仍未釋放的列（父列不在表內或形成循環）交給
+    ``_sort_rows_for_self_references`` 做最後排序，與整表載入時的行為一致。
+    """
+    emitted: set[tuple[Any, ...]] = set()
+    waiting: dict[tuple[Any, ...], list[tuple[tuple[Any, ...], Any, set[tuple[Any, ...]]]]] = {}
+    deferred: dict[tuple[Any, ...], Any] = {}
+
+    def _emit(row_key: tuple[Any, ...], row: Any) -> Iterator[Any]:
+        stack = [(row_key, row)]
+        while stack:
+            current_key, current_row = stack.pop()
+            emitted.add(current_key)
+            deferred.pop(current_key, None)
+            yield current_row
+            for dependant_key, dependant_row, pending in waiting.pop(current_key, []):
+                pending.discard(current_key)
+                if not pending and dependant_key in deferred:
+                    stack.append((dependant_key, dependant_row))
+
+    for row in rows:
+        row_key = tuple(row._mapping[column_name] for column_name in primary_key_names)
+        pending = _self_reference_dependencies(row, row_key, self_reference_specs) - emitted
+        if not pending:
+            yield from _emit(row_key, row)
+            continue
+        deferred[row_key] = row
+        for dependency_key in pending:
+            waiting.setdefault(dependency_key, []).append((row_key, row, pending))
+
+    if deferred:
+        yield from _sort_rows_for_self_references(list(deferred.values()), primary_key_names, self_reference_specs)
+
+
 def copy_table_data(
     source_connection: Connection,
     target_connection: Connection,
@@ -696,6 +901,7 @@ def copy_table_data(
     chunk_size: int,
     logger: Logger | None = None,
     shared_context: dict[str, Any] | None = None,
+    bulk_loader: str = "auto",
 ) -> int:
     transferable_columns = [column.name for column in target_table.columns if column.name in source_table.c]
     if not transferable_columns:
@@ -704,6 +910,7 @@ def copy_table_data(
         (column_name, source_table.c[column_name], target_table.c[column_name])
         for column_name in transferable_columns
     ]
+    loader = resolve_bulk_loader(target_connection, bulk_loader)
 
     repair_totals: dict[str, int] = {}
     context_cache: dict[str, Any] = shared_context if shared_context is not None else {}
@@ -739,37 +946,33 @@ def copy_table_data(
             for row in repaired_payload
         ]
 
+    # yield_per 讓支援 server-side cursor 的 driver（psycopg / pymysql SSCursor）分批取回來源資料
+    result = source_connection.execution_options(yield_per=chunk_size).execute(_ordered_select(source_table))
+    rows: Iterator[Any] = iter(result)
     self_reference_specs = _self_referential_fk_specs(source_table, target_table)
     if self_reference_specs:
         primary_key_names = tuple(column.name for column in source_table.primary_key.columns)
-        rows = source_connection.execute(_ordered_select(source_table)).fetchall()
-        ordered_rows = _sort_rows_for_self_references(rows, primary_key_names, self_reference_specs)
-        copied_rows = 0
-        for offset in range(0, len(ordered_rows), chunk_size):
-            batch = ordered_rows[offset : offset + chunk_size]
-            payload = _build_payload(batch)
-            if payload:
-                target_connection.execute(target_table.insert(), payload)
-                copied_rows += len(payload)
-        if logger and repair_totals:
-            logger.warn(
-                f"table {target_table.name} 自動修補資料："
-                + ", ".join(f"{key}={value}" for key, value in sorted(repair_totals.items()) if value)
-            )
-        _record_repair_totals()
-        return copied_rows
+        rows = _iter_self_referential_rows(rows, primary_key_names, self_reference_specs)
 
-    result = source_connection.execution_options(stream_results=True).execute(_ordered_select(source_table))
     copied_rows = 0
-    while True:
-        rows = result.fetchmany(chunk_size)
-        if not rows:
-            break
-        payload = _build_payload(rows)
+    batch: list[Any] = []
+
+    def _flush() -> None:
+        nonlocal copied_rows
+        payload = _build_payload(batch)
+        batch.clear()
         if not payload:
-            continue
-        target_connection.execute(target_table.insert(), payload)
+            return
+        insert_batch(target_connection, target_table, transferable_columns, payload, loader=loader)
         copied_rows += len(payload)
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            _flush()
+    if batch:
+        _flush()
+
     if logger and repair_totals:
         logger.warn(
             f"table {target_table.name} 自動修補資料："
@@ -956,10 +1159,187 @@ def reset_postgresql_sequences(
     return reset_results
 
 
+def copy_single_table(
+    source_connection: Connection,
+    target_connection: Connection,
+    table_name: str,
+    *,
+    job: TransferJob,
+    source_metadata: MetaData,
+    target_metadata: MetaData,
+    logger: Logger,
+    shared_context: dict[str, Any],
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """搬移單一 table，回傳 summary 紀錄（含耗時與 rows/sec）與 MySQL 欄位升級計畫。"""
+    source_table = source_metadata.tables[table_name]
+    target_table = target_metadata.tables[table_name]
+    widen_plans = ensure_mysql_text_capacity(
+        source_connection,
+        target_connection,
+        source_table,
+        target_table,
+        logger,
+    )
+    started = time.perf_counter()
+    copied_rows = copy_table_data(
+        source_connection,
+        target_connection,
+        source_table,
+        target_table,
+        chunk_size=job.chunk_size,
+        logger=logger,
+        shared_context=shared_context,
+        bulk_loader=job.bulk_loader,
+    )
+    elapsed = time.perf_counter() - started
+    rows_per_sec = round(copied_rows / elapsed, 1) if elapsed > 0 else None
+    loader = resolve_bulk_loader(target_connection, job.bulk_loader)
+    repair_counts = dict(shared_context.get(("repair_counts", table_name), {}))
+    logger.info(
+        f"job={job.name} 搬移 {table_name}: {copied_rows} rows"
+        f"（{elapsed:.2f}s, {rows_per_sec or 0} rows/s, loader={loader}）"
+    )
+    record = {
+        "table": table_name,
+        "rows": copied_rows,
+        "repair_counts": repair_counts,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": rows_per_sec,
+        "loader": loader,
+    }
+    return record, widen_plans
+
+
+class TableCheckpoint:
+    """以 JSON 檔記錄已 commit 的 tables；中斷後以相同 checkpoint 重跑會略過這些 tables。
+
+    只在逐表 transaction 模式（``--workers`` > 1 或指定 ``--checkpoint``）下使用：每個 table
+    在自己的 transaction 內搬完並 commit 後才寫入 checkpoint，因此檔案內的 tables 一定完整存在於目標。
+    """
+
+    def __init__(self, path: Path | None, job: TransferJob):
+        self.path = path
+        self._lock = threading.Lock()
+        self._identity = {
+            "job": job.name,
+            "source_url": redact_database_url(job.source_url),
+            "target_url": redact_database_url(job.target_url),
+        }
+        self.completed: dict[str, dict[str, Any]] = {}
+        if path is not None and path.exists():
+            payload = json.loads(path.read_text(encoding="utf-8") or "{}")
+            if {key: payload.get(key) for key in self._identity} != self._identity:
+                raise RuntimeError(f"checkpoint {path} 屬於其他 job 或 source/target，請改用新的檔案或刪除後重跑")
+            self.completed = dict(payload.get("tables") or {})
+
+    def mark_completed(self, table_name: str, record: dict[str, Any]) -> None:
+        with self._lock:
+            self.completed[table_name] = {**record, "completed_at": datetime.now().isoformat(timespec="seconds")}
+            if self.path is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f"{self.path.name}.tmp")
+            temp_path.write_text(
+                json.dumps({**self._identity, "tables": self.completed}, ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+            os.replace(temp_path, self.path)
+
+
+def copy_tables_concurrently(
+    source_engine: Engine,
+    target_engine: Engine,
+    ordered_tables: list[str],
+    dependencies: dict[str, set[str]],
+    *,
+    completed_tables: set[str],
+    workers: int,
+    checkpoint: TableCheckpoint,
+    job: TransferJob,
+    source_metadata: MetaData,
+    target_metadata: MetaData,
+    logger: Logger,
+    shared_context: dict[str, Any],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """依 FK 依賴 DAG 排程，互不依賴的 tables 以最多 workers 個 thread 同時搬移。
+
+    每個 table 使用獨立的 source / target 連線與 transaction；一個 table 只有在它依賴的
+    tables 都 commit 後才會開始。循環依賴（僅在 --disable-constraints 時允許）以
+    ``ordered_tables`` 的先後為準，只等待排在前面的 tables。
+    """
+    position = {name: index for index, name in enumerate(ordered_tables)}
+    remaining = {
+        name: {dep for dep in dependencies.get(name, set()) if position[dep] < position[name]} - completed_tables
+        for name in ordered_tables
+        if name not in completed_tables
+    }
+    dependants: dict[str, set[str]] = {name: set() for name in ordered_tables}
+    for name, deps in remaining.items():
+        for dep in deps:
+            dependants[dep].add(name)
+
+    def _copy(table_name: str) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        with source_engine.connect() as source_connection, target_engine.begin() as target_connection:
+            guard = constraint_override(target_connection) if job.disable_constraints else nullcontext()
+            with guard:
+                return copy_single_table(
+                    source_connection,
+                    target_connection,
+                    table_name,
+                    job=job,
+                    source_metadata=source_metadata,
+                    target_metadata=target_metadata,
+                    logger=logger,
+                    shared_context=shared_context,
+                )
+
+    records: list[dict[str, Any]] = []
+    schema_adjustments: list[dict[str, Any]] = []
+    failures: list[tuple[str, BaseException]] = []
+    started: set[str] = set()
+    running: dict[Future, str] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="db-cross-migrate") as executor:
+
+        def _submit_ready() -> None:
+            for name in ordered_tables:
+                if len(running) >= max(1, workers):
+                    return
+                if name in remaining and name not in started and not remaining[name]:
+                    started.add(name)
+                    running[executor.submit(_copy, name)] = name
+
+        _submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                table_name = running.pop(future)
+                try:
+                    record, widen_plans = future.result()
+                except Exception as exc:
+                    failures.append((table_name, exc))
+                    continue
+                checkpoint.mark_completed(table_name, record)
+                records.append(record)
+                if widen_plans:
+                    schema_adjustments.append({"table": table_name, "actions": widen_plans})
+                for dependant in dependants[table_name]:
+                    remaining[dependant].discard(table_name)
+            # 任一 table 失敗就不再派發新工作，只等待執行中的 tables 結束並寫入 checkpoint
+            if not failures:
+                _submit_ready()
+
+    if failures:
+        table_name, exc = failures[0]
+        raise RuntimeError(f"table {table_name} 搬移失敗: {exc}") from exc
+    return records, schema_adjustments
+
+
 def run_job(job: TransferJob, logger: Logger) -> dict[str, Any]:
     logger.info(f"開始執行 job={job.name}")
-    source_engine = build_engine(job.source_url)
-    target_engine = build_engine(job.target_url)
+    pool_size = job.workers if job.workers > 5 else None
+    source_engine = build_engine(job.source_url, pool_size=pool_size)
+    target_engine = build_engine(job.target_url, pool_size=pool_size)
 
     try:
         source_metadata, selected_tables = reflect_selected_metadata(
@@ -1018,60 +1398,92 @@ def run_job(job: TransferJob, logger: Logger) -> dict[str, Any]:
             summary["status"] = "dry_run"
             return summary
 
-        with source_engine.connect() as source_connection, target_engine.begin() as target_connection:
-            guard = constraint_override(target_connection) if job.disable_constraints else nullcontext()
-            with guard:
-                if job.reset_target:
-                    logger.info(f"job={job.name} 清空目標資料")
-                    reset_target_data(target_connection, target_metadata, ordered_tables)
-
-                shared_context: dict[str, Any] = {}
-                for table_name in ordered_tables:
-                    source_table = source_metadata.tables[table_name]
-                    target_table = target_metadata.tables[table_name]
-                    widen_plans = ensure_mysql_text_capacity(
-                        source_connection,
-                        target_connection,
-                        source_table,
-                        target_table,
-                        logger,
-                    )
-                    if widen_plans:
-                        summary.setdefault("schema_adjustments", []).append(
-                            {
-                                "table": table_name,
-                                "actions": widen_plans,
-                            }
-                        )
-                    copied_rows = copy_table_data(
-                        source_connection,
-                        target_connection,
-                        source_table,
-                        target_table,
-                        chunk_size=job.chunk_size,
-                        logger=logger,
-                        shared_context=shared_context,
-                    )
-                    repair_counts = dict(
-                        shared_context.get(("repair_counts", table_name), {})
-                    )
-                    logger.info(f"job={job.name} 搬移 {table_name}: {copied_rows} rows")
-                    summary["tables"].append(
-                        {
-                            "table": table_name,
-                            "rows": copied_rows,
-                            "repair_counts": repair_counts,
-                        }
-                    )
+        shared_context: dict[str, Any] = {}
+        copy_options = {
+            "job": job,
+            "source_metadata": source_metadata,
+            "target_metadata": target_metadata,
+            "logger": logger,
+            "shared_context": shared_context,
+        }
+        if job.workers > 1 or job.checkpoint_path:
+            checkpoint = TableCheckpoint(Path(job.checkpoint_path) if job.checkpoint_path else None, job)
+            pending_tables = [name for name in ordered_tables if name not in checkpoint.completed]
+            for table_name in ordered_tables:
+                if table_name in checkpoint.completed:
+                    record = {**checkpoint.completed[table_name], "resumed": True}
+                    shared_context[("repair_counts", table_name)] = dict(record.get("repair_counts") or {})
+                    summary["tables"].append(record)
+            if len(pending_tables) < len(ordered_tables):
+                logger.info(
+                    f"job={job.name} 依 checkpoint 略過已完成的 {len(ordered_tables) - len(pending_tables)} 個 tables"
+                )
 
-                if target_engine.dialect.name == "postgresql":
-                    sequence_resets = reset_postgresql_sequences(
-                        target_connection,
-                        target_metadata,
-                        ordered_tables,
-                    )
-                    if sequence_resets:
-                        summary["postgresql_sequence_resets"] = sequence_resets
+            if job.reset_target and pending_tables:
+                logger.info(f"job={job.name} 清空目標資料")
+                with target_engine.begin() as target_connection:
+                    guard = constraint_override(target_connection) if job.disable_constraints else nullcontext()
+                    with guard:
+                        reset_target_data(target_connection, target_metadata, pending_tables)
+
+            workers = job.workers
+            if target_engine.dialect.name == "sqlite" and workers > 1:
+                # SQLite 同時只允許一個 writer，多個 worker 只會互相等待 database lock
+                logger.info(f"job={job.name} 目標為 SQLite，改以單一 worker 逐表搬移")
+                workers = 1
+            summary["workers"] = workers
+            summary["checkpoint_path"] = job.checkpoint_path
+            records, schema_adjustments = copy_tables_concurrently(
+                source_engine,
+                target_engine,
+                ordered_tables,
+                build_table_dependencies(source_metadata, target_metadata, selected_tables),
+                completed_tables=set(checkpoint.completed),
+                workers=workers,
+                checkpoint=checkpoint,
+                **copy_options,
+            )
+            summary["tables"].extend(records)
+            position = {name: index for index, name in enumerate(ordered_tables)}
+            summary["tables"].sort(key=lambda item: position[item["table"]])
+            if schema_adjustments:
+                summary["schema_adjustments"] = schema_adjustments
+
+            if target_engine.dialect.name == "postgresql":
+                with target_engine.begin() as target_connection:
+                    sequence_resets = reset_postgresql_sequences(target_connection, target_metadata, ordered_tables)
+                if sequence_resets:
+                    summary["postgresql_sequence_resets"] = sequence_resets
+        else:
+            summary["workers"] = 1
+            with source_engine.connect() as source_connection, target_engine.begin() as target_connection:
+                guard = constraint_override(target_connection) if job.disable_constraints else nullcontext()
+                with guard:
+                    if job.reset_target:
+                        logger.info(f"job={job.name} 清空目標資料")
+                        reset_target_data(target_connection, target_metadata, ordered_tables)
+
+                    for table_name in ordered_tables:
+                        record, widen_plans = copy_single_table(
+                            source_connection, target_connection, table_name, **copy_options
+                        )
+                        if widen_plans:
+                            summary.setdefault("schema_adjustments", []).append(
+                                {
+                                    "table": table_name,
+                                    "actions": widen_plans,
+                                }
+                            )
+                        summary["tables"].append(record)
+
+                    if target_engine.dialect.name == "postgresql":
+                        sequence_resets = reset_postgresql_sequences(
+                            target_connection,
+                            target_metadata,
+                            ordered_tables,
+                        )
+                        if sequence_resets:
+                            summary["postgresql_sequence_resets"] = sequence_resets
 
         row_count_verification: list[dict[str, Any]] = []
         with source_engine.connect() as verify_source_conn, target_engine.connect() as verify_target_conn:
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Benchmark the streaming tabular export engine against a buffered export.
+
+Seeds a throwaway SQLite database with one large Test Case Set, then exports
+it through ``app.services.tabular_export`` either streamed (chunks sent as
+they are read) or buffered (whole file built before the first byte, the
+previous export behaviour). Each mode runs in its own subprocess so peak RSS
+is not polluted by the other mode.
+
+    PYTHONPATH=. python scripts/export_benchmark.py --cases 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import psutil
+from sqlalchemy import insert, select
+
+from app.api.test_case_sets import TEST_CASE_SET_CSV_COLUMNS, TEST_CASE_SET_EXPORT_FIELDS
+from app.db_access.main import MainAccessBoundary
+from app.models.database_models import Team, TestCaseLocal, TestCaseSet
+from app.services.tabular_export import iter_statement_chunks, stream_tabular_export
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+)
+
+MODES = ("streaming", "buffered")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark streaming CSV/XLSX export")
+    parser.add_argument("--cases", type=int, default=20000, help="Test cases in the exported set")
+    parser.add_argument("--steps-bytes", type=int, default=600, help="Approximate size of each steps cell")
+    parser.add_argument("--format", dest="export_format", choices=("csv", "xlsx"), default="csv")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--database", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def seed_database(bundle: dict[str, Any], cases: int, steps_bytes: int) -> tuple[int, int]:
+    now = datetime.utcnow()
+    steps = ("1. Open the page and verify the layout\n" * (steps_bytes // 40 + 1))[:steps_bytes]
+    with bundle["sync_engine"].begin() as connection:
+        team_id = connection.execute(
+            insert(Team).values(name="Export Bench", wiki_token="bench", test_case_table_id="bench")
+        ).inserted_primary_key[0]
+        set_id = connection.execute(
+            insert(TestCaseSet).values(team_id=team_id, name="Export Bench Set", is_default=True)
+        ).inserted_primary_key[0]
+        for offset in range(0, cases, 5000):
+            connection.execute(
+                insert(TestCaseLocal),
+                [
+                    {
+                        "team_id": team_id,
+                        "test_case_set_id": set_id,
+                        "test_case_number": f"BENCH-{index:07d}",
+                        "title": f"Benchmark case {index}",
+                        "priority": "Medium",
+                        "steps": steps,
+                        "expected_result": "Page renders without errors",
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for index in range(offset, min(offset + 5000, cases))
+                ],
+            )
+    return team_id, set_id
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.005):
+        self._process = psutil.Process()
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            time.sleep(self._interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+
+
+async def run_export(args: argparse.Namespace, bundle: dict[str, Any]) -> dict[str, Any]:
+    async_session_factory = bundle["async_session_factory"]
+
+    @asynccontextmanager
+    async def _session_provider():
+        async with async_session_factory() as session:
+            yield session
+
+    boundary = MainAccessBoundary(session_provider=_session_provider, session_provider_name="benchmark")
+    async with async_session_factory() as session:
+        set_id = (await session.execute(select(TestCaseSet.id))).scalar_one()
+    statement = (
+        select(*TEST_CASE_SET_EXPORT_FIELDS)
+        .where(TestCaseLocal.test_case_set_id == set_id)
+        .order_by(TestCaseLocal.test_case_number.asc(), TestCaseLocal.id.asc())
+    )
+
+    def _build_row(row):
+        return [
+            "" if value is None else (value.isoformat() if hasattr(value, "isoformat") else str(value))
+            for value in row
+        ]
+
+    body = stream_tabular_export(
+        args.export_format,
+        TEST_CASE_SET_CSV_COLUMNS,
+        iter_statement_chunks(boundary, statement),
+        _build_row,
+    )
+
+    baseline_rss = psutil.Process().memory_info().rss
+    total_bytes = 0
+    parts = 0
+    start = time.perf_counter()
+    first_byte_at = None
+    with RssSampler() as sampler:
+        if args.mode == "buffered":
+            payload = b"".join([part async for part in body])
+            first_byte_at = time.perf_counter()
+            total_bytes, parts = len(payload), 1
+            del payload
+        else:
+            async for part in body:
+                if first_byte_at is None:
+                    first_byte_at = time.perf_counter()
+                total_bytes += len(part)
+                parts += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": args.mode,
+        "format": args.export_format,
+        "time_to_first_byte_ms": round((first_byte_at - start) * 1000, 2),
+        "total_ms": round(elapsed * 1000, 2),
+        "bytes": total_bytes,
+        "parts": parts,
+        "peak_rss_delta_mb": round((sampler.peak - baseline_rss) / (1024 * 1024), 2),
+    }
+
+
+def run_mode(args: argparse.Namespace) -> int:
+    # 直接開啟既有的 benchmark DB，不重跑 migration
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{args.database}")
+    bundle = {"async_session_factory": async_sessionmaker(engine, expire_on_commit=False)}
+    try:
+        result = asyncio.run(run_export(args, bundle))
+    finally:
+        asyncio.run(engine.dispose())
+    print(json.dumps(result))
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    if args.mode:
+        return run_mode(args)
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="tcrt-export-bench-") as tmp:
+        database = Path(tmp) / "export_bench.db"
+        bundle = create_managed_test_database(database)
+        try:
+            seed_database(bundle, args.cases, args.steps_bytes)
+        finally:
+            dispose_managed_test_database(bundle)
+
+        for mode in MODES:
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--mode",
+                    mode,
+                    "--database",
+                    str(database),
+                    "--format",
+                    args.export_format,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    config = {key: value for key, value in vars(args).items() if key not in ("mode", "database")}
+    print(json.dumps({"config": config, "results": results}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
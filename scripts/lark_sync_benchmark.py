@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark Lark user sync against the in-process fake Lark server.
+
+Runs ``LarkUserService.sync_all_users`` twice per concurrency level on a
+throwaway SQLite database: a cold sync (all inserts) and a warm sync (all
+rows unchanged, skipped by content hash).
+
+    PYTHONPATH=. python scripts/lark_sync_benchmark.py --concurrency 1 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from app.services.lark_async_client import AsyncLarkClient
+from app.services.lark_user_service import LarkUserService
+from app.testsuite.db_test_helpers import (
+    create_managed_test_database,
+    dispose_managed_test_database,
+)
+from app.testsuite.fake_lark_server import (
+    FAKE_LARK_BASE_URL,
+    FakeLarkAuthManager,
+    build_fake_org,
+    create_fake_lark_app,
+    fake_lark_transport,
+    run_lark_user_sync,
+    seed_fake_lark_departments,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark batched Lark user sync")
+    parser.add_argument("--departments", type=int, default=40, help="Fake department count")
+    parser.add_argument("--users-per-department", type=int, default=100, help="Users per department")
+    parser.add_argument("--shared-users", type=int, default=5, help="Users present in every department")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake server latency per request")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 8],
+        help="Concurrency levels to compare (1 = serial page fetches)",
+    )
+    return parser.parse_args()
+
+
+async def run_level(args: argparse.Namespace, concurrency: int, bundle: dict[str, Any]) -> dict[str, Any]:
+    org = build_fake_org(
+        args.departments,
+        args.users_per_department,
+        shared_users=args.shared_users,
+    )
+    fake_app = create_fake_lark_app(department_users=org, latency_seconds=args.latency_ms / 1000)
+    seed_fake_lark_departments(bundle, org)
+
+    service = LarkUserService(auth_manager=FakeLarkAuthManager())
+    service.async_client_factory = lambda: AsyncLarkClient(
+        service.auth_manager,
+        base_url=FAKE_LARK_BASE_URL,
+        max_concurrency=concurrency,
+        rate_per_second=0,
+        transport=fake_lark_transport(fake_app),
+    )
+
+    timings: dict[str, Any] = {"concurrency": concurrency}
+    for phase in ("cold", "warm"):
+        start = time.perf_counter()
+        result = await run_lark_user_sync(bundle, service)
+        timings[f"{phase}_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        timings[f"{phase}_stats"] = {
+            key: result["stats"][key]
+            for key in ("api_calls", "users_created", "users_updated", "users_unchanged", "errors")
+        }
+    timings["peak_in_flight"] = fake_app.state.fake_lark.peak_in_flight
+    return timings
+
+
+def main() -> int:
+    args = parse_args()
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="tcrt-lark-bench-") as tmp:
+        for level in args.concurrency:
+            # Schema migration runs its own event loop, so build the DB outside asyncio.run
+            bundle = create_managed_test_database(Path(tmp) / f"lark_bench_c{level}.db")
+            try:
+                results.append(asyncio.run(run_level(args, level, bundle)))
+            finally:
+                dispose_managed_test_database(bundle)
+    print(json.dumps({"config": vars(args), "results": results}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Measure worker cold-start time and RSS, and fail when they exceed a budget.
+
+Every run is a fresh interpreter (same as a new uvicorn worker) that imports
+``app.main`` and, with ``--lifespan``, also runs the FastAPI startup/shutdown
+handlers. Reports the median/max across runs plus the per-phase breakdown
+recorded by ``app.utils.startup_profiler``. ``--importtime`` adds one extra
+run under ``python -X importtime`` and prints the slowest modules and the
+self time per package, which is where lazy loading pays off first.
+
+    PYTHONPATH=. python scripts/startup_benchmark.py --runs 5 --max-startup-s 4 --max-rss-mb 300
+    PYTHONPATH=. python scripts/startup_benchmark.py --disabled-groups assistant,qa_ai_helper,knowledge
+
+Exit status is 1 when the median startup time or the max RSS is over budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.utils.startup_profiler import parse_importtime  # noqa: E402
+
+_PROBE = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+if sys.argv[1] == "1":
+    async def _cycle():
+        async with app.main.app.router.lifespan_context(app.main.app):
+            pass
+    asyncio.run(_cycle())
+finished = time.perf_counter()
+from app.utils.startup_profiler import current_rss_bytes, startup_profiler
+snapshot = startup_profiler.snapshot()
+print("@@RESULT@@" + json.dumps({
+    "import_s": imported - started,
+    "startup_s": finished - started,
+    "rss_bytes": current_rss_bytes(),
+    "routes": len(app.main.app.routes),
+    "modules_loaded": snapshot["modules_loaded"],
+    "phases": snapshot["phases"],
+}))
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark worker cold start")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure")
+    parser.add_argument("--lifespan", action="store_true", help="Also run the lifespan startup/shutdown")
+    parser.add_argument("--disabled-groups", default=None, help="Value for TCRT_DISABLED_ROUTER_GROUPS")
+    parser.add_argument("--importtime", action="store_true", help="Add an import-time breakdown run")
+    parser.add_argument("--top", type=int, default=20, help="Rows in the import-time breakdown")
+    parser.add_argument("--max-startup-s", type=float, default=None, help="Budget for the median startup time")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="Budget for the max RSS after startup")
+    return parser.parse_args()
+
+
+def _child_env(args: argparse.Namespace) -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    env.setdefault("JWT_SECRET_KEY", "startup-benchmark-" + "x" * 32)
+    if args.disabled_groups is not None:
+        env["TCRT_DISABLED_ROUTER_GROUPS"] = args.disabled_groups
+    return env
+
+
+def cold_start(args: argparse.Namespace, *, importtime: bool = False) -> tuple[dict[str, Any], str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _PROBE, "1" if args.lifespan else "0"]
+    completed = subprocess.run(
+        command, cwd=PROJECT_ROOT, env=_child_env(args), capture_output=True, text=True, check=False
+    )
+    marker = next((line for line in completed.stdout.splitlines() if line.startswith("@@RESULT@@")), None)
+    if completed.returncode != 0 or marker is None:
+        raise SystemExit(f"cold start failed (exit={completed.returncode}):\n{completed.stderr[-4000:]}")
+    return json.loads(marker[len("@@RESULT@@"):]), completed.stderr
+
+
+def main() -> int:
+    args = parse_args()
+    runs = [cold_start(args)[0] for _ in range(max(1, args.runs))]
+    startup = [run["startup_s"] for run in runs]
+    rss_mb = [run["rss_bytes"] / (1024 * 1024) for run in runs if run["rss_bytes"] is not None]
+
+    report: dict[str, Any] = {
+        "config": vars(args),
+        "startup_s": {"median": round(statistics.median(startup), 3), "max": round(max(startup), 3)},
+        "import_s_median": round(statistics.median(run["import_s"] for run in runs), 3),
+        "rss_mb": {"median": round(statistics.median(rss_mb), 1), "max": round(max(rss_mb), 1)} if rss_mb else None,
+        "routes": runs[-1]["routes"],
+        "modules_loaded": runs[-1]["modules_loaded"],
+        "phases": runs[-1]["phases"],
+    }
+    if args.importtime:
+        _result, stderr = cold_start(args, importtime=True)
+        report["importtime"] = parse_importtime(stderr.splitlines(), top=args.top)
+
+    violations = []
+    if args.max_startup_s is not None and report["startup_s"]["median"] > args.max_startup_s:
+        violations.append(f"median startup {report['startup_s']['median']}s > budget {args.max_startup_s}s")
+    if args.max_rss_mb is not None and rss_mb and report["rss_mb"]["max"] > args.max_rss_mb:
+        violations.append(f"max RSS {report['rss_mb']['max']} MB > budget {args.max_rss_mb} MB")
+    report["budget_violations"] = violations
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())